@@ -42,6 +42,7 @@ import time
 
 # Import coupler and driver classes
 from hmc.driver.configuration.drv_configuration_hmc_logging import ModelLogging
+from hmc.driver.configuration.drv_configuration_hmc_monitor import ModelMonitor
 from hmc.coupler.cpl_hmc_manager import ModelInitializer, ModelCleaner
 from hmc.coupler.cpl_hmc_builder import ModelBuilder
 from hmc.coupler.cpl_hmc_runner import ModelRunner
@@ -73,6 +74,10 @@ def main(settings_algorithm=None, settings_datasets=None, settings_time=None):
     # Set logging file
     driver_hmc_logging = ModelLogging(script_settings_algorithm)
     log_stream = driver_hmc_logging.configure_logging()
+
+    # Set monitor of the stages (time, cpu, memory and bytes of coupler and driver steps)
+    driver_hmc_monitor = ModelMonitor(script_settings_algorithm)
+    driver_hmc_monitor.configure_monitor()
     # -------------------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------------------
@@ -116,11 +121,7 @@ def main(settings_algorithm=None, settings_datasets=None, settings_time=None):
                                     command_line_info=run_cline_collections,
                                     obj_args=driver_hmc_initializer.obj_args,
                                     obj_ancillary=driver_hmc_initializer.obj_ancillary)
-    # Configure model execution
-    driver_hmc_runner.configure_execution(ancillary_datasets_collections)
-    # -------------------------------------------------------------------------------------
 
-    # -------------------------------------------------------------------------------------
     # Configure model finalizer class
     driver_hmc_finalizer = ModelFinalizer(
         collection_dynamic=forcing_datasets_collections,
@@ -129,9 +130,23 @@ def main(settings_algorithm=None, settings_datasets=None, settings_time=None):
         obj_run=driver_hmc_initializer.obj_run,
         obj_ancillary=driver_hmc_initializer.obj_ancillary)
 
-    # Configure outcome datasets
-    outcome_datasets_collections = driver_hmc_finalizer.configure_dynamic_datasets(
-        time_series_collections, time_info_collections, static_datasets_collections, ancillary_datasets_collections)
+    if driver_hmc_finalizer.analysis_pipeline:
+        # Configure model execution and outcome datasets (each run is analyzed as soon as it is completed)
+        driver_hmc_finalizer.open_dynamic_pipeline(
+            time_series_collections, time_info_collections, static_datasets_collections,
+            ancillary_datasets_collections)
+        driver_hmc_runner.configure_execution(
+            ancillary_datasets_collections, callback_run=driver_hmc_finalizer.submit_dynamic_pipeline)
+        outcome_datasets_collections = driver_hmc_finalizer.close_dynamic_pipeline(
+            time_series_collections, time_info_collections, static_datasets_collections,
+            ancillary_datasets_collections)
+    else:
+        # Configure model execution
+        driver_hmc_runner.configure_execution(ancillary_datasets_collections)
+        # Configure outcome datasets
+        outcome_datasets_collections = driver_hmc_finalizer.configure_dynamic_datasets(
+            time_series_collections, time_info_collections, static_datasets_collections,
+            ancillary_datasets_collections)
     # Configure summary datasets
     driver_hmc_finalizer.configure_summary_datasets(
         time_series_collections, time_info_collections, static_datasets_collections, outcome_datasets_collections)
@@ -154,6 +169,13 @@ def main(settings_algorithm=None, settings_datasets=None, settings_time=None):
     log_stream.info('Script: ' + str(script_name))
     # -------------------------------------------------------------------------------------
 
+    # -------------------------------------------------------------------------------------
+    # Dump monitor report (if activated)
+    driver_hmc_monitor.dump_monitor(report_info={
+        'script': script_name, 'settings_algorithm': script_settings_algorithm,
+        'settings_datasets': script_settings_datasets, 'time': script_time})
+    # -------------------------------------------------------------------------------------
+
     # -------------------------------------------------------------------------------------
     # End Program
     time_elapsed = round(time.time() - time_start, 1)
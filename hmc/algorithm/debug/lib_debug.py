@@ -12,9 +12,12 @@ import logging
 import os
 import shelve
 import pickle
-import scipy.io as sio
 
 from hmc.algorithm.default.lib_default_args import logger_name
+from hmc.algorithm.utils.lib_utils_import import import_lazy
+
+# Lazy module(s) (imported at the first use)
+sio = import_lazy('scipy.io')
 
 # Logging
 log_stream = logging.getLogger(logger_name)
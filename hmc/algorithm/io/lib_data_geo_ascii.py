@@ -10,13 +10,11 @@ Version:       '3.0.0'
 #######################################################################################
 # Libraries
 import logging
-import rasterio
 import os
 
 import numpy as np
 
 from copy import deepcopy
-from rasterio.crs import CRS
 from collections import OrderedDict
 from decimal import Decimal
 
@@ -27,12 +25,16 @@ from hmc.algorithm.utils.lib_utils_list import pad_or_truncate_list
 from hmc.algorithm.utils.lib_utils_string import parse_row2string
 from hmc.algorithm.default.lib_default_args import logger_name
 from hmc.algorithm.default.lib_default_args import proj_epsg as proj_epsg_default
+from hmc.algorithm.utils.lib_utils_import import import_lazy
+
+# Lazy module(s) (imported at the first use)
+rasterio = import_lazy('rasterio')
 
 # Logging
 log_stream = logging.getLogger(logger_name)
 
 # Debug
-import matplotlib.pylab as plt
+# import matplotlib.pylab as plt
 #######################################################################################
 
 
@@ -544,6 +546,8 @@ def write_data_point_undefined(file_path, element_n=2, element_init=0):
 # Method to write an ascii grid file
 def write_data_grid(file_name, file_data, file_ancillary=None):
 
+    from rasterio.crs import CRS
+
     if 'bb_left' in list(file_ancillary.keys()):
         bb_left = file_ancillary['bb_left']
     else:
@@ -605,6 +609,8 @@ def write_data_grid(file_name, file_data, file_ancillary=None):
 # Method to read an ascii grid file
 def read_data_grid(file_name, output_format='data_array', output_dtype='float32'):
 
+    from rasterio.crs import CRS
+
     try:
         dset = rasterio.open(file_name)
         bounds = dset.bounds
@@ -10,12 +10,15 @@ Version:       '1.1.0'
 #######################################################################################
 # Libraries
 import logging
-import geopandas as gpd
 import pandas as pd
 
 from copy import deepcopy
 
 from hmc.algorithm.default.lib_default_args import logger_name
+from hmc.algorithm.utils.lib_utils_import import import_lazy
+
+# Lazy module(s) (imported at the first use)
+gpd = import_lazy('geopandas')
 
 # Logging
 log_stream = logging.getLogger(logger_name)
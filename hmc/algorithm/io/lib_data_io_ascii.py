@@ -224,318 +224,172 @@ def read_outcome_point(file_name, file_time, file_columns=None, file_map=None, f
 
 
 # -------------------------------------------------------------------------------------
-# Method to read data point file
-def read_data_point(file_name, file_time, file_columns=None, file_lut=None, file_ancillary=None,
-                    select_columns=None):
+# Method to read data point file(s) in a table of tokens (one row for each point and time step)
+def read_data_point_table(file_name, file_time, file_columns):
 
-    if file_columns is None:
-        file_columns = {0: 'ref', 1: 'dset'}
-    if select_columns is None:
-        select_columns = list(file_columns.values())
-
-    if not isinstance(file_name, list):
-        file_name = [file_name]
-
-    idxs_lut = []
-    if file_lut is not None:
+    columns_n = file_columns.__len__()
 
-        list_lut = []
-        [list_lut.extend([k, v]) for k, v in file_lut.items()]
-
-        for step_lut in list_lut:
-            list_columns = list(file_columns.values())
-            if step_lut in list_columns:
-                idx_lut = list_columns.index(step_lut)
-                idxs_lut.append(idx_lut)
-
-    data_lut, data_obj, time_obj = {}, {}, {}
-    time_step_expected, time_step_exists = [], []
+    table_list, time_step_exists = [], []
     for file_n, (file_step, time_step) in enumerate(zip(file_name, file_time)):
 
-        time_step_expected.append(time_step)
-
         if os.path.exists(file_step):
 
-            file_table = pd.read_table(file_step, header=None)
-            time_step_exists.append(time_step)
-
-            id_nan = 0
-            for file_idx, file_array in zip(file_table.index, file_table.values):
-                file_row = file_array.tolist()[0]
-
-                if isinstance(file_row, str):
-                    file_row_strip = file_row.strip()
-                    file_row_split = file_row_strip.split()
-
-                else:
-                    log_stream.error(' ===> Data ascii point format is not allowed')
-                    raise NotImplementedError(' ===> Case not implemented yet')
-
-                file_row_lut = deepcopy(file_row_split)
-                for row_n, row_value in enumerate(file_row_split):
+            if os.path.getsize(file_step) == 0:
+                log_stream.warning(' ===> Size of ' + file_step + ' is equal to zero. File is empty.')
+                continue
 
-                    col_type = file_columns[row_n]
-                    if col_type == 'ref':
+            file_table = pd.read_csv(file_step, header=None, sep=r'\s+', dtype=str, engine='c')
+            time_step_exists.append(time_step)
 
-                        if row_value.isalpha() or row_value == '-':     # check for alphabet value(s)
+            if file_table.columns.__len__() > columns_n:
+                log_stream.error(' ===> Data ascii point format is not allowed')
+                raise NotImplementedError(' ===> Case not implemented yet')
+            file_table = file_table.reindex(columns=list(range(columns_n)))
+            file_table.columns = [file_columns[column_n] for column_n in range(columns_n)]
 
-                            row_value = deepcopy(row_value)
-                            row_type = 'alpha'
-                            if row_value == '-':
-                                row_check = False
-                            else:
-                                row_check = True
+            file_table['time'] = time_step
+            file_table['file'] = file_n
 
-                        elif row_value.isdigit():   # check for digit value(s)
+            table_list.append(file_table)
 
-                            row_value = float(row_value)
-                            row_type = 'digit'
-                            if row_value < 0:
-                                row_check = False
-                            else:
-                                row_check = True
-
-                        elif row_value.startswith('-99'):   # check for undefined value(s)
-                            row_value = float(row_value)
-                            if row_value < 0:
-                                row_check = False
-                            else:
-                                row_check = True
-
-                        else:
-
-                            log_stream.error(' ===> Column format must be "alphabet" or "digit"')
-                            raise NotImplementedError('Case not implemented yet')
-
-                        if not row_check:
-                            string_no_code = 'no_code_{}'.format(id_nan)
-                            # string_no_code = 'no_code_{}'.format(file_idx)
-                            id_nan += 1
-                            row_value_upd = string_no_code
-                            # update codes to lut variable(s)
-                            file_row_lut[row_n] = row_value_upd
-                        else:
-                            if row_type == 'alpha':
-                                row_value_upd = deepcopy(row_value)
-                            elif row_type == 'digit':
-                                row_value_upd = str(int(row_value))
-                    else:
-                        row_value_upd = row_value
-
-                    if col_type == 'ref':
-                        value_ref = row_value_upd
-                        if value_ref not in list(data_obj.keys()):
-                            data_obj[value_ref] = {}
-                        if value_ref not in list(time_obj.keys()):
-                            time_obj[value_ref] = {}
-                    else:
+    if table_list:
+        data_table = pd.concat(table_list, ignore_index=True)
+    else:
+        data_table = None
 
-                        if col_type in select_columns:
-                            if isinstance(row_value_upd, str):
+    return data_table, time_step_exists
+# -------------------------------------------------------------------------------------
 
-                                try:
-                                    row_value_upd = float(row_value_upd)
-                                except BaseException as exp_obj:
-                                    row_value_upd = row_value_upd
-                                    log_stream.warning(' ===> Value ' + str(row_value_upd) +
-                                                       ' is not cast to float. Check your time-series for errors'
-                                                       ' Exception ' + str(exp_obj))
 
-                            value_dset = row_value_upd
-                            if col_type not in list(data_obj[value_ref].keys()):
-                                data_obj[value_ref][col_type] = {}
-                                data_obj[value_ref][col_type] = [value_dset]
+# -------------------------------------------------------------------------------------
+# Method to define the code of data point references (alphabet, digit or undefined values)
+def define_data_point_ref(data_table, column_ref='ref'):
 
-                                time_obj[value_ref][col_type] = {}
-                                time_obj[value_ref][col_type] = [time_step]
-                            else:
-                                row_tmp = data_obj[value_ref][col_type]
-                                row_tmp.append(value_dset)
-                                data_obj[value_ref][col_type] = row_tmp
+    ref_raw = data_table[column_ref].astype(str)
 
-                                time_tmp = time_obj[value_ref][col_type]
-                                time_tmp.append(time_step)
-                                time_obj[value_ref][col_type] = time_tmp
+    ref_alpha = ref_raw.str.isalpha() | (ref_raw == '-')
+    ref_digit = ~ref_alpha & ref_raw.str.isdigit()
+    ref_undef = ~ref_alpha & ~ref_digit & ref_raw.str.startswith('-99')
 
-                if file_lut is not None:
-                    key_lut = file_row_lut[idxs_lut[0]]
-                    value_lut = file_row_lut[idxs_lut[1]]
+    if not (ref_alpha | ref_digit | ref_undef).all():
+        log_stream.error(' ===> Column format must be "alphabet" or "digit"')
+        raise NotImplementedError('Case not implemented yet')
 
-                    if isinstance(key_lut, str):
-                        key_lut = key_lut.lower()
+    # undefined values are named "no_code_{id}" using the position of the row in each file
+    ref_check = (ref_alpha & (ref_raw != '-')) | ref_digit
+    ref_nan = ~ref_check
+    ref_nan_id = ref_nan.astype(int).groupby(data_table['file']).cumsum() - 1
+    ref_nan_code = 'no_code_' + ref_nan_id.astype(str)
 
-                    if key_lut not in list(data_lut.keys()):
-                        data_lut[key_lut] = value_lut
+    ref_code = ref_raw.copy()
+    ref_code[ref_digit] = ref_raw[ref_digit].astype(float).astype(np.int64).astype(str)
+    ref_code[ref_nan] = ref_nan_code[ref_nan]
 
-    if data_obj:
-        n_obs = data_obj.__len__()
-        if file_ancillary is not None:
-            n_anc = file_ancillary.__len__()
-        else:
-            n_anc = 0
+    # codes in lut are updated only for the undefined values
+    ref_lut = ref_raw.copy()
+    ref_lut[ref_nan] = ref_nan_code[ref_nan]
 
-        if n_obs == n_anc:
-            file_keys_sel = deepcopy(file_ancillary)
-        elif n_obs != n_anc:
+    return ref_code, ref_lut
+# -------------------------------------------------------------------------------------
 
-            data_obj_select, time_obj_select = {}, {}
-            file_ancillary_select = []
-            for name_ancillary in file_ancillary:
 
-                if name_ancillary.lower() in list(data_lut.keys()):
-                    code_ancillary = data_lut[name_ancillary.lower()]
-                    if code_ancillary in list(data_obj.keys()):
+# -------------------------------------------------------------------------------------
+# Method to read data point file
+def read_data_point(file_name, file_time, file_columns=None, file_lut=None, file_ancillary=None,
+                    select_columns=None, no_data=-9999.0):
 
-                        data_ancillary = data_obj[code_ancillary]
-                        data_obj_select[code_ancillary] = data_ancillary
-                        file_ancillary_select.append(name_ancillary)
+    if file_columns is None:
+        file_columns = {0: 'ref', 1: 'dset'}
+    if select_columns is None:
+        select_columns = list(file_columns.values())
+    if file_ancillary is None:
+        file_ancillary = []
 
-                        time_ancillary = time_obj[code_ancillary]
-                        time_obj_select[code_ancillary] = time_ancillary
+    if not isinstance(file_name, list):
+        file_name = [file_name]
 
-                    else:
-                        log_stream.warning(' ===> Point "' + name_ancillary +
-                                           '" with code "' + code_ancillary + '" not found in the ascii datasets')
-                else:
-                    log_stream.warning(' ===> Point "' + name_ancillary + '" not found in the code lut')
-            data_obj = deepcopy(data_obj_select)
-            time_obj = deepcopy(time_obj_select)
-            file_keys_sel = deepcopy(file_ancillary_select)
+    columns_lut = []
+    if file_lut is not None:
+        list_lut = []
+        [list_lut.extend([k, v]) for k, v in file_lut.items()]
+        columns_lut = [step_lut for step_lut in list_lut if step_lut in list(file_columns.values())]
+
+    time_step_expected = list(file_time[:file_name.__len__()])
+
+    # Read all the file(s) of the period in a single table
+    data_table, time_step_exists = read_data_point_table(file_name, time_step_expected, file_columns)
+    if data_table is None:
+        return None
+
+    ref_code, ref_lut = define_data_point_ref(data_table, column_ref='ref')
+    data_table['ref'] = ref_code
+
+    # Define the lut between the point names and the point codes (first occurrence is kept)
+    data_lut = {}
+    if columns_lut.__len__() >= 2:
+        lut_values = {'ref': ref_lut}
+        key_lut = lut_values.get(columns_lut[0], data_table[columns_lut[0]])
+        value_lut = lut_values.get(columns_lut[1], data_table[columns_lut[1]])
+        key_lut = key_lut.where(key_lut.isna(), key_lut.astype(str).str.lower())
+
+        frame_lut = pd.DataFrame({'key': key_lut, 'value': value_lut}).drop_duplicates(subset='key', keep='first')
+        data_lut = dict(zip(frame_lut['key'].values, frame_lut['value'].values))
+
+    # Define the code(s) of the points (ordered by first occurrence)
+    data_codes = list(pd.unique(data_table['ref'].values))
+
+    # Associate each point of the ancillary list with its code
+    point_codes = []
+    for id_key, select_key in enumerate(file_ancillary):
+        if data_lut:
+            tag_lut = data_lut.get(select_key.lower(), None)
+            if tag_lut is None:
+                log_stream.warning(' ===> Point "' + select_key + '" not found in the code lut')
+            elif tag_lut not in data_codes:
+                log_stream.warning(' ===> Code for point "' + select_key + '" not found in the dynamic file')
+                tag_lut = None
         else:
-            log_stream.error(' ===> Data ascii time-series length case is not allowed')
-            raise NotImplementedError('Case not implemented yet')
-
-        # Data expected
-        time_n = time_step_expected.__len__()
-        var_data_expected = [-9999.0] * time_n
-
-        data_list, data_var, time_var = [], {}, {}
-        file_keys_lut = deepcopy(file_ancillary)
-        file_keys_tmp = [elem.lower() for elem in file_keys_sel]
-        for id_key, select_key in enumerate(file_keys_lut):
-
-            if select_key.lower() in file_keys_tmp:
-                idx_key = file_keys_tmp.index(select_key.lower())
-            else:
-                idx_key = None
-
-            if data_lut:
-                if idx_key is not None:
-                    name_key = file_keys_sel[idx_key]
-                    tag_lut = data_lut[name_key.lower()]
-                elif idx_key is None:
-                    tag_lut = 'NA'
-                    log_stream.warning(' ===> Data ascii time-series for point "' + select_key +
-                                       '" not found due to the lacking of values in the dynamic files')
-                else:
-                    tag_lut = None
-                    log_stream.warning(' ===> Data ascii time-series for point "' + select_key +
-                                       '" not found due to the mismatch between the static file and the dynamic files')
+            if id_key < data_codes.__len__():
+                tag_lut = data_codes[id_key]
             else:
-                tag_lut = list(data_obj.keys())[id_key]
-
-            if tag_lut:
-
-                if tag_lut in list(data_obj.keys()):
-
-                    data_value = data_obj[tag_lut]
-                    time_value = time_obj[tag_lut]
-
-                elif (tag_lut != 'NA') and (tag_lut not in list(data_obj.keys())):
+                log_stream.warning(' ===> Code for point "' + select_key + '" is undefined')
+                tag_lut = None
+        point_codes.append(tag_lut)
 
-                    log_stream.warning(' ===> Code for point "' + select_key + '" not found in the dynamic file')
-                    data_value, time_value = {}, {}
-                    for tag_columns in file_columns.values():
-                        if tag_columns != 'ref':
-                            data_value[tag_columns] = deepcopy(var_data_expected)
-                            time_value[tag_columns] = deepcopy(time_step_expected)
+    # Define the indexes of time and points
+    index_time = pd.Index(time_step_expected)
+    index_code = pd.Index(data_codes)
 
-                elif (tag_lut == 'NA') and (tag_lut not in list(data_obj.keys())):
+    point_idx = index_code.get_indexer([code if code is not None else '' for code in point_codes])
+    point_idx[[code is None for code in point_codes]] = -1
 
-                    log_stream.warning(' ===> Code for point "' + select_key + '" is undefined')
-                    data_value, time_value = {}, {}
-                    for tag_columns in file_columns.values():
-                        if tag_columns != 'ref':
-                            data_value[tag_columns] = deepcopy(var_data_expected)
-                            time_value[tag_columns] = deepcopy(time_step_expected)
-                else:
-                    log_stream.error(' ===> Time-series datasets fails in unknown error')
-                    raise RuntimeError('Check the routine to fix the bug.')
-
-                for tag_columns in file_columns.values():
-                    if tag_columns != 'ref':
-
-                        if tag_columns in list(data_value.keys()):
-                            data_ts = data_value[tag_columns]
-                            time_ts = time_value[tag_columns]
-
-                            if tag_columns not in list(data_var.keys()):
-                                data_var[tag_columns] = {}
-                                time_var[tag_columns] = {}
-                            if select_key not in list(data_var[tag_columns].keys()):
-                                data_var[tag_columns][select_key] = {}
-                                data_var[tag_columns][select_key] = data_ts
-
-                                time_var[tag_columns][select_key] = {}
-                                time_var[tag_columns][select_key] = time_ts
-
-                            if select_key not in data_list:
-                                data_list.append(select_key)
-
-        dframe_summary = {}
-        dframe_merged = pd.DataFrame(index=time_step_expected)
-        for var_id, (var_key, var_ts) in enumerate(data_var.items()):
-
-            flag_key = True
-            if select_columns is not None:
-                if var_key not in select_columns:
-                    flag_key = False
+    # Keep the last value if a point is duplicated in a file
+    data_table = data_table.drop_duplicates(subset=['time', 'ref'], keep='last')
+    row_time_idx = index_time.get_indexer(data_table['time'])
+    row_code_idx = index_code.get_indexer(data_table['ref'])
 
-            if flag_key:
-
-                time_ts = time_var[var_key]
-
-                for (var_pivot, var_data_defined), \
-                        (time_pivot, time_data_defined) in zip(var_ts.items(), time_ts.items()):
-
-                    if var_data_defined.__len__() == var_data_expected.__len__():
-
-                        dframe_expected = pd.DataFrame(index=time_step_expected, data=var_data_expected,
-                                                       columns=[var_pivot])
-                        dframe_expected.index.name = 'Time'
-
-                        dframe_point_tmp = pd.DataFrame(index=time_step_exists, data=var_data_defined,
-                                                        columns=[var_pivot])
-                        dframe_point_tmp.index.name = 'Time'
-
-                        dframe_expected.update(dframe_point_tmp)
-                        series_filled = dframe_expected.iloc[:, 0]
-                        dframe_merged[var_pivot] = series_filled
-                    else:
-                        log_stream.warning(
-                            ' ===> Data ascii time-series length for point "' + var_pivot +
-                            '" is less than the time period. Try to adapt to expected time period ... ')
+    # Fill the (time, point) array of each variable
+    dframe_summary = {}
+    for var_key in file_columns.values():
 
-                        dframe_expected = pd.DataFrame(index=time_step_expected, data=var_data_expected,
-                                                       columns=[var_pivot])
-                        dframe_expected.index.name = 'Time'
+        if (var_key == 'ref') or (var_key not in select_columns):
+            continue
 
-                        dframe_point_tmp = pd.DataFrame(index=time_data_defined, data=var_data_defined,
-                                                        columns=[var_pivot])
-                        dframe_point_tmp.index.name = 'Time'
+        var_values = pd.to_numeric(data_table[var_key], errors='coerce').values.astype(float)
+        var_invalid = data_table[var_key].notna().values & np.isnan(var_values)
+        if var_invalid.any():
+            log_stream.warning(' ===> Values ' + str(list(set(data_table[var_key].values[var_invalid]))) +
+                               ' are not cast to float. Check your time-series for errors')
 
-                        dframe_expected.update(dframe_point_tmp)
-                        series_filled = dframe_expected.iloc[:, 0]
-                        dframe_merged[var_pivot] = series_filled
+        var_valid = ~np.isnan(var_values) & (row_time_idx >= 0)
 
-                        log_stream.warning(
-                            ' ===> Data ascii time-series length for point "' + var_pivot +
-                            '" is less than the time period. Try to adapt to expected time period ... DONE')
+        var_array = np.full((index_time.__len__(), index_code.__len__() + 1), no_data, dtype=float)
+        var_array[row_time_idx[var_valid], row_code_idx[var_valid]] = var_values[var_valid]
 
-                dframe_summary[var_key] = deepcopy(dframe_merged)
+        # undefined point(s) are mapped to the last column (always filled by no data)
+        var_data = var_array[:, np.where(point_idx >= 0, point_idx, index_code.__len__())]
 
-    else:
-        dframe_summary = None
+        dframe_summary[var_key] = pd.DataFrame(index=time_step_expected, data=var_data, columns=list(file_ancillary))
 
     return dframe_summary
 # -------------------------------------------------------------------------------------
@@ -3,50 +3,81 @@ Library Features:
 
 Name:          lib_data_io_binary
 Author(s):     Fabio Delogu (fabio.delogu@cimafoundation.org)
-Date:          '20201203'
-Version:       '1.5.0'
+Date:          '20261018'
+Version:       '3.1.6'
 """
 #################################################################################
 # Library
 import logging
+import os
 import numpy as np
-import struct
+
+from hmc.algorithm.default.lib_default_args import logger_name
+
+# Logging
+log_stream = logging.getLogger(logger_name)
+
+# Default value(s)
+no_data_default = -9999.0
 
 # Debug
-import matplotlib.pylab as plt
+# import matplotlib.pylab as plt
 #################################################################################
 
 
 # --------------------------------------------------------------------------------
-# Method to write 2d variable in binary format (saved as 1d integer array)
-def write_var2d(file_name, file_data, file_format='i', scale_factor=10):
+# Method to define the data type of the binary values (struct codes, native byte order as the model files)
+def define_var_dtype(file_format='i'):
+    return np.dtype(file_format)
+# --------------------------------------------------------------------------------
 
-    # Open file handle
-    file_handle = open(file_name, 'wb')
 
-    # Define nodata value
-    no_data = -9999.0
-    no_data = no_data / scale_factor
+# --------------------------------------------------------------------------------
+# Method to compute the number of 2d fields stored in a binary file
+def compute_var_steps(file_name, rows, cols, file_format='i'):
+
+    file_dtype = define_var_dtype(file_format)
+    file_bytes = os.path.getsize(file_name)
+    field_bytes = rows * cols * file_dtype.itemsize
+
+    if (field_bytes == 0) or (file_bytes % field_bytes != 0):
+        log_stream.error(' ===> Binary file "' + file_name + '" size (' + str(file_bytes) +
+                         ' bytes) is not a multiple of the field size (' + str(rows) + 'x' + str(cols) + ' ' +
+                         file_dtype.name + ')')
+        raise IOError('Binary file size is not compatible with the expected domain')
+
+    return file_bytes // field_bytes
+# --------------------------------------------------------------------------------
 
-    # Values shape
-    file_n = file_data.shape[0] * file_data.shape[1]
-    # Values format
-    data_format = file_format * file_n
+
+# --------------------------------------------------------------------------------
+# Method to prepare 2d values to binary format (nodata instead of NaN values and scaled)
+def prepare_var_values(file_data, file_dtype, scale_factor=10, no_data=no_data_default):
+
+    file_data = np.asarray(file_data)
 
     # Define nodata value (instead of NaN values)
-    file_data[np.where(np.isnan(file_data))] = no_data
+    no_data = no_data / scale_factor
+    file_values = np.where(np.isnan(file_data), no_data, file_data) * scale_factor
+    # Casting as the previous int32 conversion (truncated towards zero)
+    return file_values.astype(file_dtype, copy=False)
+# --------------------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------------------
+# Method to write 2d variable in binary format (saved as 1d integer array)
+def write_var2d(file_name, file_data, file_format='i', scale_factor=10):
 
     # NOTA BENE:
     # NON OCCORRE FARE IL FLIPUD SE LE VAR SONO ORIENTATE IN MODO CORRETTO partendo da angolo
     # IN BASSO A SX [sud-->nord ovest --> est]
     # a1iVarData = np.int32((numpy.flipud(a2dVarData)).reshape(iNVals, order='F') * iScaleFactor)
 
-    array_data = np.int32(((file_data)).reshape(file_n, order='F') * scale_factor)
-    data_binary = struct.pack(data_format, *(array_data))
+    file_values = prepare_var_values(file_data, define_var_dtype(file_format), scale_factor=scale_factor)
 
-    # Write and close file handle
-    file_handle.write(data_binary)
-    file_handle.close()
+    # Write the raw buffer in Fortran order (the transposed array in C order)
+    with open(file_name, 'wb') as file_handle:
+        file_values.T.tofile(file_handle)
 
 # --------------------------------------------------------------------------------
 
@@ -55,24 +86,20 @@ def write_var2d(file_name, file_data, file_format='i', scale_factor=10):
 # Method to read 2d variable in binary format (saved as 1d integer array)
 def read_var2d(file_name, rows, cols, file_format='i', scale_factor=10):
 
-    # Open file handle
-    file_handle = open(file_name, 'rb')
+    # Check the binary file (a single 2d field is expected)
+    file_steps = compute_var_steps(file_name, rows, cols, file_format=file_format)
+    if file_steps != 1:
+        log_stream.error(' ===> Binary file "' + file_name + '" has ' + str(file_steps) +
+                         ' fields; expected 1 field (' + str(rows) + 'x' + str(cols) + ')')
+        raise IOError('Binary file size is not compatible with the expected domain')
 
-    # Values shape (1d)
-    file_n = rows * cols
-    # Values format
-    data_format = file_format * file_n
-    # Open and read binary file
-    file_stream = file_handle.read(-1)
-    array_data = struct.unpack(data_format, file_stream)
+    # Read the raw buffer
+    array_data = np.fromfile(file_name, dtype=define_var_dtype(file_format))
 
     # Reshape binary file in Fortran order and scale Data (float32)
     file_data = np.reshape(array_data, (rows, cols), order='F')
     file_data = np.float32(file_data / scale_factor)
 
-    # Close file handle
-    file_handle.close()
-
     # Debug
     # plt.figure(1)
     # plt.imshow(a2dVarDataCheck); plt.colorbar()
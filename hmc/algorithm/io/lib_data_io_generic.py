@@ -32,7 +32,7 @@ from hmc.algorithm.default.lib_default_args import logger_name
 log_stream = logging.getLogger(logger_name)
 
 # Debug
-import matplotlib.pylab as plt
+# import matplotlib.pylab as plt
 # -------------------------------------------------------------------------------------
 
 # -------------------------------------------------------------------------------------
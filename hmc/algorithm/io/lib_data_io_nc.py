@@ -11,7 +11,6 @@ Version:       '3.0.0'
 # Libraries
 import logging
 import os
-import netCDF4
 import time
 import re
 import warnings
@@ -26,67 +25,250 @@ from hmc.algorithm.io.lib_data_io_generic import reshape_var3d, create_darray_3d
 from hmc.algorithm.default.lib_default_args import logger_name, time_units, time_calendar, time_format_algorithm
 
 from hmc.algorithm.utils.lib_utils_system import create_folder
+from hmc.algorithm.utils.lib_utils_geo import compute_bbox_window
+from hmc.algorithm.utils.lib_utils_time import convert_time_values
+from hmc.algorithm.utils.lib_utils_catalog import check_catalog_file
+from hmc.algorithm.utils.lib_utils_import import import_lazy
+
+# Lazy module(s) (imported at the first use)
+netCDF4 = import_lazy('netCDF4')
 
 # Logging
 log_stream = logging.getLogger(logger_name)
 
 # Debug
-import matplotlib.pylab as plt
+# import matplotlib.pylab as plt
 #######################################################################################
 
 
 # -------------------------------------------------------------------------------------
-# Method to write collections
-def write_collections(file_name, file_data, file_time, file_attrs=None):
+# Method to organize collections in station series (keys "var:component:station" --> {var:component: {station: values}})
+# (keys without station and series of strings are kept as time series)
+def organize_collections(file_data, collections_sep=':'):
+
+    station_list, station_vars, time_vars = [], {}, {}
+    for file_key, file_dict in file_data.items():
+
+        file_values = np.asarray(list(file_dict.values()))
+        if file_values.dtype.kind in ['i', 'u', 'f', 'b']:
+            file_values = file_values.astype(np.float32)
+        elif file_values.dtype.kind in ['U', 'S', 'O'] and (file_values.shape[0] > 0) and \
+                isinstance(file_values[0], str):
+            time_vars[file_key] = file_values.astype(str)
+            continue
+        else:
+            log_stream.error(' ===> Variable format in collections is not allowed!')
+            raise IOError('Bad format of array')
+
+        file_parts = file_key.split(collections_sep, 2)
+        if file_parts.__len__() < 3:
+            time_vars[file_key] = file_values
+            continue
+
+        var_name, station_name = collections_sep.join(file_parts[:2]), file_parts[2]
+        if station_name not in station_list:
+            station_list.append(station_name)
+        if var_name not in station_vars:
+            station_vars[var_name] = {}
+        station_vars[var_name][station_name] = file_values
+
+    return station_list, station_vars, time_vars
+# -------------------------------------------------------------------------------------
 
-    time_date_list = []
-    time_str_list = []
-    for time_stamp_step in file_time:
-        time_str_step = time_stamp_step.strftime(format=time_format_algorithm)
-        time_str_list.append(time_str_step)
-        time_date_step = time_stamp_step.to_pydatetime()
-        time_date_list.append(time_date_step)
+
+# -------------------------------------------------------------------------------------
+# Method to write collections (cf discrete sampling geometry, timeSeries with orthogonal multidimensional layout;
+# each variable is written with a single bulk write of the [station, time] array)
+def write_collections(file_name, file_data, file_time, file_attrs=None, no_data=-9999.0,
+                      dim_name_time='time', dim_name_station='station'):
+
+    time_n = file_time.__len__()
+    time_str = np.array([time_stamp_step.strftime(format=time_format_algorithm) for time_stamp_step in file_time],
+                        dtype=str)
+    time_num = netCDF4.date2num([time_stamp_step.to_pydatetime() for time_stamp_step in file_time],
+                                units=time_units, calendar=time_calendar)
+
+    station_list, station_vars, time_vars = organize_collections(file_data)
+    station_n = station_list.__len__()
+    station_idx = {station_name: station_id for station_id, station_name in enumerate(station_list)}
 
     # File operation(s)
     file_handle = netCDF4.Dataset(file_name, 'w')
-    file_handle.createDimension('time', len(file_time))
+    file_handle.createDimension(dim_name_time, time_n)
+    file_handle.createDimension('time_strlen', max([len(time_step) for time_step in time_str] + [1]))
 
     # File attribute(s)
     if file_attrs is not None:
         for attr_key, attr_value in file_attrs.items():
             file_handle.setncattr(attr_key, attr_value)
+    file_handle.setncattr('Conventions', 'CF-1.8')
+    file_handle.setncattr('featureType', 'timeSeries')
 
     # Time information
-    file_time_num = file_handle.createVariable(varname='time', dimensions=('time',), datatype='float32')
-    file_time_num[:] = netCDF4.date2num(time_date_list, units=time_units, calendar=time_calendar)
-    file_time_str = file_handle.createVariable(varname='times', dimensions=('time',), datatype='str')
-    file_time_str[:] = np.array(time_str_list, dtype=object)
+    file_time_num = file_handle.createVariable(varname=dim_name_time, dimensions=(dim_name_time,), datatype='f8')
+    file_time_num.setncatts({'standard_name': 'time', 'units': time_units, 'calendar': time_calendar})
+    file_time_num[:] = time_num
+    file_time_str = file_handle.createVariable(
+        varname='times', dimensions=(dim_name_time, 'time_strlen'), datatype='S1')
+    file_time_str[:] = netCDF4.stringtochar(time_str.astype('S' + str(file_handle.dimensions['time_strlen'].size)))
 
     # Add file creation date
     file_handle.file_date = 'Created ' + time.ctime(time.time())
 
-    for file_key, file_dict in file_data.items():
+    # Station information (index and fixed-length name)
+    if station_n > 0:
+        station_strlen = max([len(station_name) for station_name in station_list])
+        file_handle.createDimension(dim_name_station, station_n)
+        file_handle.createDimension('name_strlen', station_strlen)
+
+        file_station_idx = file_handle.createVariable(
+            varname='station_index', dimensions=(dim_name_station,), datatype='i4')
+        file_station_idx[:] = np.arange(station_n, dtype=np.int32)
+
+        file_station_name = file_handle.createVariable(
+            varname='station_name', dimensions=(dim_name_station, 'name_strlen'), datatype='S1')
+        file_station_name.setncattr('cf_role', 'timeseries_id')
+        file_station_name[:] = netCDF4.stringtochar(np.array(station_list, dtype='S' + str(station_strlen)))
+
+    # Station variable(s) [station, time] (chunked by station to read a series with a single chunk)
+    for var_name, var_dict in station_vars.items():
+
+        var_data = np.full((station_n, time_n), no_data, dtype=np.float32)
+        for station_name, station_values in var_dict.items():
+            station_n_step = min(station_values.shape[0], time_n)
+            if station_values.shape[0] != time_n:
+                log_stream.warning(' ===> Variable "' + var_name + '" of station "' + station_name + '" has ' +
+                                   str(station_values.shape[0]) + ' steps; expected ' + str(time_n) + ' steps')
+            var_data[station_idx[station_name], :station_n_step] = station_values[:station_n_step]
+        var_data[np.isnan(var_data)] = no_data
+
+        file_var = file_handle.createVariable(
+            varname=var_name, dimensions=(dim_name_station, dim_name_time), datatype='f4', fill_value=no_data,
+            chunksizes=(1, max(time_n, 1)))
+        file_var.setncattr('coordinates', dim_name_time + ' station_name')
+        file_var[:, :] = var_data
+
+    # Time variable(s) [time]
+    for var_name, var_values in time_vars.items():
+        if var_values.dtype.kind == 'U':
+            file_var = file_handle.createVariable(varname=var_name, dimensions=(dim_name_time,), datatype='str')
+            file_var[:] = var_values.astype(object)
+        else:
+            file_var = file_handle.createVariable(varname=var_name, dimensions=(dim_name_time,), datatype='f4')
+            file_var[:] = var_values
 
-        file_values = list(file_dict.values())
+    file_handle.close()
 
-        if isinstance(file_values[0], str):
+# -------------------------------------------------------------------------------------
 
-            file_data = np.array(file_values, dtype=object)
-            file_var = file_handle.createVariable(varname=file_key, dimensions=('time',), datatype='str')
 
-        elif isinstance(file_values[0], (int, float)):
+# -------------------------------------------------------------------------------------
+# Method to select the datasets over a bounding box (by indexes on the geographical dimensions and before loading)
+def select_data_bbox(dst, var_bbox, var_bbox_margin=2,
+                     coord_name_geo_x='Longitude', coord_name_geo_y='Latitude', dim_name_time='time'):
+
+    coord_name_geo_x_list = [coord_name_geo_x, 'Longitude', 'longitude', 'lon', 'Lon', 'LON']
+    coord_name_geo_y_list = [coord_name_geo_y, 'Latitude', 'latitude', 'lat', 'Lat', 'LAT']
+
+    coord_name_geo_x_select, coord_name_geo_y_select = None, None
+    for coord_name_geo_x_tmp in coord_name_geo_x_list:
+        if coord_name_geo_x_tmp in list(dst.coords) or coord_name_geo_x_tmp in list(dst.variables):
+            coord_name_geo_x_select = coord_name_geo_x_tmp
+            break
+    for coord_name_geo_y_tmp in coord_name_geo_y_list:
+        if coord_name_geo_y_tmp in list(dst.coords) or coord_name_geo_y_tmp in list(dst.variables):
+            coord_name_geo_y_select = coord_name_geo_y_tmp
+            break
+    if (coord_name_geo_x_select is None) or (coord_name_geo_y_select is None):
+        log_stream.warning(' ===> Geographical coordinates are not available. Bounding box selection is skipped')
+        return dst
+
+    da_geo_x, da_geo_y = dst[coord_name_geo_x_select], dst[coord_name_geo_y_select]
+    if dim_name_time in list(da_geo_x.dims):
+        da_geo_x = da_geo_x.isel({dim_name_time: 0})
+    if dim_name_time in list(da_geo_y.dims):
+        da_geo_y = da_geo_y.isel({dim_name_time: 0})
+
+    if (da_geo_x.ndim == 1) and (da_geo_y.ndim == 1):
+        dim_name_geo_y, dim_name_geo_x = da_geo_y.dims[0], da_geo_x.dims[0]
+    elif (da_geo_x.ndim == 2) and (da_geo_x.dims == da_geo_y.dims):
+        dim_name_geo_y, dim_name_geo_x = da_geo_x.dims
+    else:
+        log_stream.warning(' ===> Geographical coordinates format is not supported. Bounding box selection is skipped')
+        return dst
 
-            file_data = file_values
-            file_var = file_handle.createVariable(varname=file_key, dimensions=('time',), datatype='f4')
+    bbox_window = compute_bbox_window(da_geo_x.values, da_geo_y.values, var_bbox, bbox_margin=var_bbox_margin)
+    if bbox_window is None:
+        log_stream.warning(' ===> Bounding box does not intersect the datasets domain. Selection is skipped')
+        return dst
 
+    rows_slice, cols_slice = bbox_window
+    dst = dst.isel({dim_name_geo_y: rows_slice, dim_name_geo_x: cols_slice})
+
+    return dst
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to read a list of single step files in a preallocated time stack (files are mapped by index on time)
+def read_data_stack(file_name_list, datetime_idx_list, dim_name_time='time', var_bbox=None, var_bbox_margin=2):
+
+    file_step_list, datetime_step_list = [], []
+    for file_name_step, datetime_idx_step in zip(file_name_list, datetime_idx_list):
+        if check_catalog_file(file_name_step):
+            file_step_list.append(file_name_step)
+            datetime_step_list.append(datetime_idx_step)
         else:
-            log_stream.error(' ===> Variable format in collections is not allowed!')
-            raise IOError('Bad format of array')
+            log_stream.warning(' ===> File ' + file_name_step + ' not available in loaded datasets!')
+            # raise IOError('File not found') # da rivedere nel caso ci siano dati non continui (tipo updating)
+
+    if not file_step_list:
+        return None
+
+    time_n = file_step_list.__len__()
+
+    dst_coords, dst_attrs, var_obj = None, None, {}
+    for time_id, file_name_step in enumerate(file_step_list):
+
+        with xr.open_dataset(file_name_step, decode_times=False) as dst_step:
+
+            if dim_name_time in list(dst_step.dims):
+                dst_step = dst_step.squeeze(dim_name_time)
+            if var_bbox is not None:
+                dst_step = select_data_bbox(dst_step, var_bbox, var_bbox_margin=var_bbox_margin,
+                                            dim_name_time=dim_name_time)
+
+            # Preallocate the stack using the first step (time, dims of the step)
+            if dst_coords is None:
+                dst_coords = {coord_name: coord_da.load() for coord_name, coord_da in dst_step.coords.items()
+                              if dim_name_time not in coord_da.dims and coord_name != dim_name_time}
+                dst_attrs = dst_step.attrs
+                for var_name, var_da in dst_step.data_vars.items():
+                    var_dtype = np.promote_types(var_da.dtype, np.float32)
+                    var_obj[var_name] = {
+                        'dims': (dim_name_time,) + tuple(var_da.dims), 'attrs': var_da.attrs,
+                        'values': np.full((time_n,) + tuple(var_da.shape), np.nan, dtype=var_dtype)}
+
+            # Write the step in the stack by index
+            for var_name, var_fields in var_obj.items():
+                if var_name in list(dst_step.data_vars):
+                    var_values = dst_step[var_name].values
+                    if var_values.shape == var_fields['values'].shape[1:]:
+                        var_fields['values'][time_id, ...] = var_values
+                    else:
+                        log_stream.warning(' ===> Variable ' + var_name + ' in file ' + file_name_step +
+                                           ' has a shape different from the first step. Step is undefined')
+                else:
+                    log_stream.warning(' ===> Variable ' + var_name + ' not available in file ' + file_name_step)
 
-        file_var[:] = file_data
+    dst_coords[dim_name_time] = pd.DatetimeIndex(datetime_step_list)
 
-    file_handle.close()
+    dst_stack = xr.Dataset(
+        {var_name: xr.Variable(var_fields['dims'], var_fields['values'], attrs=var_fields['attrs'])
+         for var_name, var_fields in var_obj.items()},
+        coords=dst_coords, attrs=dst_attrs)
 
+    return dst_stack
 # -------------------------------------------------------------------------------------
 
 
@@ -94,7 +276,8 @@ def write_collections(file_name, file_data, file_time, file_attrs=None):
 # Method to read data
 def read_data(file_name_list, var_name=None, var_time_start=None, var_time_end=None, var_time_freq='H',
               coord_name_time='time', coord_name_geo_x='Longitude', coord_name_geo_y='Latitude',
-              dim_name_time='time', dim_name_geo_x='west_east', dim_name_geo_y='south_north'):
+              dim_name_time='time', dim_name_geo_x='west_east', dim_name_geo_y='south_north', var_time_chunk=24,
+              var_bbox=None, var_bbox_margin=2):
 
     # File n
     file_n = file_name_list.__len__()
@@ -108,7 +291,7 @@ def read_data(file_name_list, var_name=None, var_time_start=None, var_time_end=N
 
     file_check_list = []
     for file_name_step in file_name_list:
-        if os.path.exists(file_name_step):
+        if check_catalog_file(file_name_step):
             file_check_list.append(True)
         else:
             file_check_list.append(False)
@@ -122,7 +305,7 @@ def read_data(file_name_list, var_name=None, var_time_start=None, var_time_end=N
             datetime_tmp = pd.date_range(start=var_time_start, end=var_time_end, freq=var_time_freq)
             datetime_idx_select = pd.DatetimeIndex(datetime_tmp)
 
-            if os.path.exists(file_name_list[0]):
+            if check_catalog_file(file_name_list[0]):
                 try:
 
                     dst_tmp = xr.open_dataset(file_name_list[0])
@@ -166,7 +349,7 @@ def read_data(file_name_list, var_name=None, var_time_start=None, var_time_end=N
                                 raise NotImplementedError('Case not implemented yet')
 
                             # Update the tmp datasets
-                            dst_tmp = deepcopy(dst_filled)
+                            dst_tmp = dst_filled
 
                 except BaseException as base_exp:
                     log_stream.warning(' ===> Exception ' + str(base_exp) + ' occurred in reading netcdf file list')
@@ -188,6 +371,12 @@ def read_data(file_name_list, var_name=None, var_time_start=None, var_time_end=N
                     dst_tmp = dst_tmp.set_coords('time')
                     dst_tmp = dst_tmp.expand_dims('time')
 
+                # Select the datasets over the bounding box (only the needed window is loaded)
+                if var_bbox is not None:
+                    dst_tmp = select_data_bbox(dst_tmp, var_bbox, var_bbox_margin=var_bbox_margin,
+                                               coord_name_geo_x=coord_name_geo_x, coord_name_geo_y=coord_name_geo_y,
+                                               dim_name_time=dim_name_time)
+
                 if var_name == 'ALL':
                     var_list = list(dst_tmp.data_vars)
                     dst = dst_tmp
@@ -233,30 +422,20 @@ def read_data(file_name_list, var_name=None, var_time_start=None, var_time_end=N
             try:
                 with warnings.catch_warnings():
                     warnings.simplefilter("ignore")
-                    dst_tmp = xr.open_mfdataset(file_name_list, combine='by_coords')
+                    # open the window lazily (data are loaded by chunks along the time dimension)
+                    dst_tmp = xr.open_mfdataset(file_name_list, combine='by_coords',
+                                                chunks={dim_name_time: var_time_chunk})
             except BaseException as base_exp:
 
                 log_stream.warning(' ===> Exception ' + str(base_exp) + ' occurred in reading netcdf file list')
-                dst_tmp = None
-                for file_name_step, datetime_idx_step in zip(file_name_list, datetime_idx_select):
-
-                    if os.path.exists(file_name_step):
-
-                        dst_step = xr.open_dataset(file_name_step, decode_times=False)
-
-                        if 'time' in list(dst_step.dims):
-                            dst_step = dst_step.squeeze(dim_name_time)
-
-                        dst_step['time'] = datetime_idx_step
-                        dst_step = dst_step.set_coords('time')
-                        dst_step = dst_step.expand_dims('time')
-                        if dst_tmp is None:
-                            dst_tmp = deepcopy(dst_step)
-                        else:
-                            dst_tmp = dst_tmp.combine_first(deepcopy(dst_step))
-                    else:
-                        log_stream.warning(' ===> File ' + file_name_step + ' not available in loaded datasets!')
-                        # raise IOError('File not found') # da rivedere nel caso ci siano dati non continui (tipo updating)
+                dst_tmp = read_data_stack(file_name_list, datetime_idx_select, dim_name_time=dim_name_time,
+                                          var_bbox=var_bbox, var_bbox_margin=var_bbox_margin)
+            else:
+                # Select the datasets over the bounding box (only the needed window is loaded)
+                if var_bbox is not None:
+                    dst_tmp = select_data_bbox(dst_tmp, var_bbox, var_bbox_margin=var_bbox_margin,
+                                               coord_name_geo_x=coord_name_geo_x, coord_name_geo_y=coord_name_geo_y,
+                                               dim_name_time=dim_name_time)
 
             if var_name == 'ALL':
                 var_list = list(dst_tmp.data_vars)
@@ -339,7 +518,7 @@ def read_data(file_name_list, var_name=None, var_time_start=None, var_time_end=N
                     dst_list_coords_tmp.remove(coord_name)
             if dst_list_coords_tmp.__len__() > 0:
                 log_stream.warning(' ===> Datasets coordinates "' + ','.join(dst_list_coords_tmp) + '" are not allowed')
-                dst_tmp = deepcopy(dst)
+                dst_tmp = dst
                 for coord_name_tmp in dst_list_coords_tmp:
                     log_stream.warning(' ===> Coordinate "' + coord_name_tmp + '" is not expected in dataset')
                     if dst_tmp.coords[coord_name_tmp].shape[0] == 1:
@@ -352,8 +531,8 @@ def read_data(file_name_list, var_name=None, var_time_start=None, var_time_end=N
                         log_stream.error(' ===> Coordinate "' + coord_name_tmp +
                                          '" dimension greater than 1. Dataset cannot be correct ')
                         raise NotImplementedError('Case not implemented yet')
-                dst = deepcopy(dst_tmp)
-                dst_list_coords = deepcopy(dst_tmp_list_coords)
+                dst = dst_tmp
+                dst_list_coords = list(dst_tmp.coords)
                 log_stream.warning(' ===> Datasets coordinates were corrected but errors could be found')
 
             # Check the dimensions of GeoX and GeoY
@@ -376,21 +555,13 @@ def read_data(file_name_list, var_name=None, var_time_start=None, var_time_end=N
                 raise IOError(' ===> GeoX and GeoY datasets must be in the data workspace')
 
             if da_time is not None:
-                time_stamp_period = []
 
-                if da_time.values.size == 1:
-                    time_list = [da_time.values]
-                elif da_time.values.size > 1:
-                    time_list = da_time.values
-                else:
+                if da_time.values.size == 0:
                     log_stream.error(' ===> Time values are not greater than 0')
                     raise NotImplemented(' ===> Case not implemented yet')
 
-                for time_step in time_list:
-                    timestamp_step = pd.to_datetime(time_step, format='%Y-%m-%d_%H:%M:%S')
-                    timestamp_step = timestamp_step.round('H')
-                    time_stamp_period.append(timestamp_step)
-                datetime_idx = pd.DatetimeIndex(time_stamp_period)
+                # convert and round the time values in one call
+                datetime_idx = convert_time_values(da_time.values, time_rounding='H')
             else:
                 datetime_idx = None
 
@@ -11,19 +11,23 @@ Version:       '1.0.0'
 # Libraries
 import logging
 import os
-import rasterio
-
 import numpy as np
 import xarray as xr
 import pandas as pd
 
+from concurrent.futures import ThreadPoolExecutor
+
 from hmc.algorithm.default.lib_default_args import logger_name
+from hmc.algorithm.utils.lib_utils_import import import_lazy, import_load
+
+# Lazy module(s) (imported at the first use)
+rasterio = import_lazy('rasterio')
 
 # Logging
 log_stream = logging.getLogger(logger_name)
 
 # Debug
-import matplotlib.pylab as plt
+# import matplotlib.pylab as plt
 #######################################################################################
 
 # -------------------------------------------------------------------------------------
@@ -33,104 +37,196 @@ proj_default_wkt = 'GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,2
 
 
 # -------------------------------------------------------------------------------------
-# Method to read data
-def read_data(file_name_list, var_name=None, var_time_start=None, var_time_end=None, var_time_freq='H',
-              coord_name_time='time', coord_name_geo_x='Longitude', coord_name_geo_y='Latitude',
-              dim_name_time='time', dim_name_geo_x='west_east', dim_name_geo_y='south_north',
-              dims_order_3d=None, decimal_round_data=2, decimal_round_geo=7):
+# Method to compute the window of a tiff file over a bounding box [left, bottom, right, top] (extended by a margin
+# of cells; None if the file does not intersect the bounding box)
+def compute_data_window(file_handle, var_bbox, var_bbox_margin=2):
 
-    if not isinstance(file_name_list, list):
-        file_name_list = [file_name_list]
+    from rasterio.windows import Window, from_bounds
 
-    if dims_order_3d is None:
-        dims_order_3d = [dim_name_geo_y, dim_name_geo_x, dim_name_time]
+    bbox_left, bbox_bottom, bbox_right, bbox_top = var_bbox
+    file_bounds = file_handle.bounds
+    if (bbox_right < file_bounds.left) or (bbox_left > file_bounds.right) or \
+            (bbox_top < min(file_bounds.bottom, file_bounds.top)) or \
+            (bbox_bottom > max(file_bounds.bottom, file_bounds.top)):
+        log_stream.warning(' ===> Bounding box does not intersect the tiff domain. Window selection is skipped')
+        return None
 
-    var_time_stamp = pd.date_range(start=var_time_start, end=var_time_end, freq=var_time_freq)
-    var_datetime_idx = pd.DatetimeIndex(var_time_stamp)
+    bbox_window = from_bounds(bbox_left, bbox_bottom, bbox_right, bbox_top, transform=file_handle.transform)
 
-    var_data_3d = None
-    var_geox_2d = None
-    var_geoy_2d = None
-    for file_id, (file_name_step, datetime_idx_step) in enumerate(zip(file_name_list, var_datetime_idx)):
+    col_start = max(int(np.floor(bbox_window.col_off)) - var_bbox_margin, 0)
+    row_start = max(int(np.floor(bbox_window.row_off)) - var_bbox_margin, 0)
+    col_stop = min(int(np.ceil(bbox_window.col_off + bbox_window.width)) + var_bbox_margin, file_handle.width)
+    row_stop = min(int(np.ceil(bbox_window.row_off + bbox_window.height)) + var_bbox_margin, file_handle.height)
 
-        if os.path.exists(file_name_step):
-            # Open file tiff
-            file_handle = rasterio.open(file_name_step)
-            # Read file info and values
+    return Window(col_start, row_start, col_stop - col_start, row_stop - row_start)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to define the geometry of the tiff files (read once; window over the bounding box and overview level)
+def define_data_geometry(file_name, var_bbox=None, var_bbox_margin=2, var_overview_level=None):
+
+    from rasterio.coords import BoundingBox
+    from rasterio.windows import bounds as window_bounds
+    from rasterio.windows import transform as window_transform
+
+    with rasterio.open(file_name) as file_handle:
+
+        # Read file info (only the window over the bounding box if defined)
+        file_window = None
+        if var_bbox is not None:
+            file_window = compute_data_window(file_handle, var_bbox, var_bbox_margin=var_bbox_margin)
+        if file_window is None:
             file_bounds = file_handle.bounds
-            file_res = file_handle.res
             file_transform = file_handle.transform
-            file_data = file_handle.read()
-            file_values = file_data[0, :, :]
+            file_high, file_wide = file_handle.height, file_handle.width
+        else:
+            file_bounds = BoundingBox(*window_bounds(file_window, file_handle.transform))
+            file_transform = window_transform(file_window, file_handle.transform)
+            file_high, file_wide = int(file_window.height), int(file_window.width)
+
+        # Decimate the window using the overview factor (overviews are used by gdal to fill the reduced shape)
+        file_shape = None
+        if var_overview_level is not None:
+            file_overviews = file_handle.overviews(1)
+            if file_overviews:
+                overview_factor = file_overviews[min(max(int(var_overview_level), 0), file_overviews.__len__() - 1)]
+                file_shape = (int(np.ceil(file_high / overview_factor)), int(np.ceil(file_wide / overview_factor)))
+                file_transform = file_transform * file_transform.scale(
+                    file_wide / file_shape[1], file_high / file_shape[0])
+                file_high, file_wide = file_shape
+            else:
+                log_stream.warning(' ===> Overviews of tiff ' + file_name + ' not available. Use full resolution.')
+        file_res = (abs(file_transform.a), abs(file_transform.e))
 
-            file_values = file_values.round(decimal_round_data)
+        if file_handle.crs is None:
+            file_proj = proj_default_wkt
+            log_stream.warning(' ===> Projection of tiff ' + file_name + ' not defined. Use constants settings.')
+        else:
+            file_proj = file_handle.crs.wkt
 
-            if file_handle.crs is None:
-                file_proj = proj_default_wkt
-                log_stream.warning(' ===> Projection of tiff ' + file_name_step + ' not defined. Use constants settings.')
-            else:
-                file_proj = file_handle.crs.wkt
-            file_geotrans = file_handle.transform
+    geometry_obj = {'bounds': file_bounds, 'transform': file_transform, 'res': file_res, 'proj': file_proj,
+                    'window': file_window, 'shape': file_shape, 'high': file_high, 'wide': file_wide}
 
-            # decimal_round_geo = 7
+    return geometry_obj
+# -------------------------------------------------------------------------------------
 
-            file_dims = file_values.shape
-            file_high = file_dims[0]
-            file_wide = file_dims[1]
 
-            center_right = file_bounds.right - (file_res[0] / 2)
-            center_left = file_bounds.left + (file_res[0] / 2)
-            center_top = file_bounds.top - (file_res[1] / 2)
-            center_bottom = file_bounds.bottom + (file_res[1] / 2)
+# -------------------------------------------------------------------------------------
+# Method to read the values of a tiff file using the geometry (window and overview) of the first file
+def read_data_step(file_name, geometry_obj, decimal_round_data=2, flip_data=False):
 
-            if center_bottom > center_top:
-                center_bottom_tmp = center_top
-                center_top_tmp = center_bottom
-                center_bottom = center_bottom_tmp
-                center_top = center_top_tmp
+    with rasterio.open(file_name) as file_handle:
+        file_values = file_handle.read(1, window=geometry_obj['window'], out_shape=geometry_obj['shape'])
 
-                file_values = np.flipud(file_values)
+    if file_values.shape != (geometry_obj['high'], geometry_obj['wide']):
+        log_stream.error(' ===> Shape of tiff ' + file_name + ' ' + str(file_values.shape) +
+                         ' is not equal to the shape of the first file ' +
+                         str((geometry_obj['high'], geometry_obj['wide'])))
+        raise IOError('Tiff files with different geometries are not supported')
 
-            if (var_geox_2d is None) or (var_geoy_2d is None):
-                lon = np.arange(center_left, center_right + np.abs(file_res[0] / 2), np.abs(file_res[0]), float)
-                lat = np.arange(center_bottom, center_top + np.abs(file_res[1] / 2), np.abs(file_res[1]), float)
-                lons, lats = np.meshgrid(lon, lat)
+    file_values = file_values.round(decimal_round_data)
+    if flip_data:
+        file_values = np.flipud(file_values)
 
-                min_lon_round = round(np.min(lons), decimal_round_geo)
-                max_lon_round = round(np.max(lons), decimal_round_geo)
-                min_lat_round = round(np.min(lats), decimal_round_geo)
-                max_lat_round = round(np.max(lats), decimal_round_geo)
+    return file_values
+# -------------------------------------------------------------------------------------
 
-                center_right_round = round(center_right, decimal_round_geo)
-                center_left_round = round(center_left, decimal_round_geo)
-                center_bottom_round = round(center_bottom, decimal_round_geo)
-                center_top_round = round(center_top, decimal_round_geo)
 
-                assert min_lon_round == center_left_round
-                assert max_lon_round == center_right_round
-                assert min_lat_round == center_bottom_round
-                assert max_lat_round == center_top_round
+# -------------------------------------------------------------------------------------
+# Method to read data
+# (steps are read by a thread pool, gdal releases the gil, and stored in the preallocated [y, x, time] array)
+def read_data(file_name_list, var_name=None, var_time_start=None, var_time_end=None, var_time_freq='H',
+              coord_name_time='time', coord_name_geo_x='Longitude', coord_name_geo_y='Latitude',
+              dim_name_time='time', dim_name_geo_x='west_east', dim_name_geo_y='south_north',
+              dims_order_3d=None, decimal_round_data=2, decimal_round_geo=7, var_bbox=None, var_bbox_margin=2,
+              var_overview_level=None, var_process_n=1):
 
-                var_geox_2d = lons
-                var_geoy_2d = np.flipud(lats)
+    if not isinstance(file_name_list, list):
+        file_name_list = [file_name_list]
 
-            if var_data_3d is None:
-                var_data_3d = np.zeros(shape=[var_geox_2d.shape[0], var_geoy_2d.shape[1], var_time_stamp.__len__()])
-                var_data_3d[:, :, :] = np.nan
+    if dims_order_3d is None:
+        dims_order_3d = [dim_name_geo_y, dim_name_geo_x, dim_name_time]
 
-            var_data_3d[:, :, file_id] = file_values
+    var_time_stamp = pd.date_range(start=var_time_start, end=var_time_end, freq=var_time_freq)
+    var_datetime_idx = pd.DatetimeIndex(var_time_stamp)
 
+    file_steps = []
+    for file_id, (file_name_step, datetime_idx_step) in enumerate(zip(file_name_list, var_datetime_idx)):
+        if os.path.exists(file_name_step):
+            file_steps.append((file_id, file_name_step))
         else:
             log_stream.warning(' ===> File ' + file_name_step + ' not available in loaded datasets!')
-            var_data_3d = None
 
-    if var_data_3d is not None:
+    if file_steps:
+
+        # Read the geometry once (all the steps share the geometry of the first available file)
+        geometry_obj = define_data_geometry(file_steps[0][1], var_bbox=var_bbox, var_bbox_margin=var_bbox_margin,
+                                            var_overview_level=var_overview_level)
+
+        file_bounds, file_res = geometry_obj['bounds'], geometry_obj['res']
+        file_proj, file_geotrans = geometry_obj['proj'], geometry_obj['transform']
+        file_high, file_wide = geometry_obj['high'], geometry_obj['wide']
+
+        center_right = file_bounds.right - (file_res[0] / 2)
+        center_left = file_bounds.left + (file_res[0] / 2)
+        center_top = file_bounds.top - (file_res[1] / 2)
+        center_bottom = file_bounds.bottom + (file_res[1] / 2)
+
+        flip_data = False
+        if center_bottom > center_top:
+            center_bottom_tmp = center_top
+            center_top_tmp = center_bottom
+            center_bottom = center_bottom_tmp
+            center_top = center_top_tmp
+
+            flip_data = True
+
+        lon = np.arange(center_left, center_right + np.abs(file_res[0] / 2), np.abs(file_res[0]), float)
+        lat = np.arange(center_bottom, center_top + np.abs(file_res[1] / 2), np.abs(file_res[1]), float)
+        lons, lats = np.meshgrid(lon, lat)
+
+        min_lon_round = round(np.min(lons), decimal_round_geo)
+        max_lon_round = round(np.max(lons), decimal_round_geo)
+        min_lat_round = round(np.min(lats), decimal_round_geo)
+        max_lat_round = round(np.max(lats), decimal_round_geo)
+
+        center_right_round = round(center_right, decimal_round_geo)
+        center_left_round = round(center_left, decimal_round_geo)
+        center_bottom_round = round(center_bottom, decimal_round_geo)
+        center_top_round = round(center_top, decimal_round_geo)
+
+        assert min_lon_round == center_left_round
+        assert max_lon_round == center_right_round
+        assert min_lat_round == center_bottom_round
+        assert max_lat_round == center_top_round
+
+        var_geox_2d = lons
+        var_geoy_2d = np.flipud(lats)
+
+        var_data_3d = np.full(
+            [var_geox_2d.shape[0], var_geoy_2d.shape[1], var_time_stamp.__len__()], np.nan, dtype=np.float32)
+
+        # Method to read a step and store the values in the time slice of the array
+        def fill_data_step(file_step):
+            file_id_step, file_name_step = file_step
+            var_data_3d[:, :, file_id_step] = read_data_step(
+                file_name_step, geometry_obj, decimal_round_data=decimal_round_data, flip_data=flip_data)
+
+        if (var_process_n > 1) and (file_steps.__len__() > 1):
+            # Load the lazy reader module before the workers (the first access is not thread-safe)
+            import_load('rasterio')
+            with ThreadPoolExecutor(max_workers=min(var_process_n, file_steps.__len__())) as exec_pool:
+                list(exec_pool.map(fill_data_step, file_steps))
+        else:
+            for file_step in file_steps:
+                fill_data_step(file_step)
 
         var_da = xr.DataArray(var_data_3d, name=var_name, dims=dims_order_3d,
                               coords={coord_name_time: ([dim_name_time], var_datetime_idx),
                                       coord_name_geo_x: ([dim_name_geo_y, dim_name_geo_x], var_geox_2d),
                                       coord_name_geo_y: ([dim_name_geo_y, dim_name_geo_x], var_geoy_2d)})
-        var_da.attrs = {'proj': file_proj, 'transform':file_geotrans, 'high': file_high, 'wide': file_wide}
+        var_da.attrs = {'proj': file_proj, 'transform': file_geotrans, 'high': file_high, 'wide': file_wide}
 
     else:
         log_stream.warning(' ===> All filenames in the selected period are not available')
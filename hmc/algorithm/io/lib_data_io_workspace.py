@@ -0,0 +1,294 @@
+"""
+Library Features:
+
+Name:          lib_data_io_workspace
+Author(s):     Fabio Delogu (fabio.delogu@cimafoundation.org)
+Date:          '20261018'
+Version:       '3.1.6'
+"""
+#######################################################################################
+# Library
+import logging
+import os
+import json
+import pickle
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from hmc.algorithm.default.lib_default_args import logger_name
+
+# Logging
+log_stream = logging.getLogger(logger_name)
+
+# Workspace layout (folder with the manifest, the pickled small objects and one npy file for each array)
+workspace_manifest_name = 'workspace.json'
+workspace_objects_name = 'workspace.pkl'
+workspace_array_template = 'array_{array_id:06d}.npy'
+workspace_format_version = 1
+
+# Debug
+# import matplotlib.pylab as plt
+#######################################################################################
+
+
+# -------------------------------------------------------------------------------------
+# Method to encode an object not supported by the columnar layout (pickled with the small objects)
+def encode_workspace_object(obj_data, workspace_obj):
+    workspace_obj['objects'].append(obj_data)
+    return {'type': 'object', 'index': workspace_obj['objects'].__len__() - 1}
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to encode an array (saved in a npy file; object arrays are pickled)
+def encode_workspace_array(obj_data, workspace_obj):
+
+    if obj_data.dtype.hasobject:
+        return encode_workspace_object(obj_data, workspace_obj)
+
+    array_node = {'type': 'array', 'shape': list(obj_data.shape), 'dtype': obj_data.dtype.str}
+    if obj_data.size > 0:
+        array_name = workspace_array_template.format(array_id=workspace_obj['array_n'])
+        np.save(os.path.join(workspace_obj['folder'], array_name), obj_data, allow_pickle=False)
+        array_node['file'] = array_name
+        workspace_obj['array_n'] += 1
+
+    return array_node
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to encode a xarray variable (dimensions, values, attributes and encoding)
+def encode_workspace_variable(obj_variable, workspace_obj):
+    return {'dims': list(obj_variable.dims),
+            'data': encode_workspace_array(np.asarray(obj_variable.values), workspace_obj),
+            'attrs': encode_workspace_node(dict(obj_variable.attrs), workspace_obj),
+            'encoding': encode_workspace_node(dict(obj_variable.encoding), workspace_obj)}
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to encode a pandas index (multi index and extension types are pickled)
+def encode_workspace_index(obj_data, workspace_obj):
+
+    if isinstance(obj_data, pd.MultiIndex) or (not isinstance(obj_data.dtype, np.dtype)):
+        return encode_workspace_object(obj_data, workspace_obj)
+
+    if isinstance(obj_data, pd.RangeIndex):
+        return {'type': 'range', 'start': int(obj_data.start), 'stop': int(obj_data.stop),
+                'step': int(obj_data.step), 'name': encode_workspace_node(obj_data.name, workspace_obj)}
+
+    index_freq = obj_data.freqstr if isinstance(obj_data, pd.DatetimeIndex) else None
+    return {'type': 'index', 'values': encode_workspace_array(obj_data.values, workspace_obj),
+            'name': encode_workspace_node(obj_data.name, workspace_obj), 'freq': index_freq}
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to encode an object in the workspace nodes (containers and json values are written in the manifest,
+# arrays in npy files; xarray and pandas objects are split in columns)
+def encode_workspace_node(obj_data, workspace_obj):
+
+    if type(obj_data) in [str, bool, int, float, type(None)]:
+        return {'type': 'value', 'value': obj_data}
+    elif isinstance(obj_data, dict):
+        return {'type': 'dict', 'items': [
+            [encode_workspace_node(obj_key, workspace_obj), encode_workspace_node(obj_value, workspace_obj)]
+            for obj_key, obj_value in obj_data.items()]}
+    elif type(obj_data) in [list, tuple]:
+        return {'type': type(obj_data).__name__, 'items': [
+            encode_workspace_node(obj_value, workspace_obj) for obj_value in obj_data]}
+    elif isinstance(obj_data, np.ndarray) and (not isinstance(obj_data, np.ma.MaskedArray)):
+        return encode_workspace_array(np.asarray(obj_data), workspace_obj)
+    elif isinstance(obj_data, xr.Dataset):
+        return {'type': 'dataset',
+                'data_vars': [[encode_workspace_node(var_name, workspace_obj),
+                               encode_workspace_variable(var_obj.variable, workspace_obj)]
+                              for var_name, var_obj in obj_data.data_vars.items()],
+                'coords': [[encode_workspace_node(coord_name, workspace_obj),
+                            encode_workspace_variable(coord_obj.variable, workspace_obj)]
+                           for coord_name, coord_obj in obj_data.coords.items()],
+                'attrs': encode_workspace_node(dict(obj_data.attrs), workspace_obj)}
+    elif isinstance(obj_data, xr.DataArray):
+        return {'type': 'dataarray', 'name': encode_workspace_node(obj_data.name, workspace_obj),
+                'variable': encode_workspace_variable(obj_data.variable, workspace_obj),
+                'coords': [[encode_workspace_node(coord_name, workspace_obj),
+                            encode_workspace_variable(coord_obj.variable, workspace_obj)]
+                           for coord_name, coord_obj in obj_data.coords.items()]}
+    elif isinstance(obj_data, pd.DataFrame):
+        if not all([isinstance(column_dtype, np.dtype) for column_dtype in obj_data.dtypes]):
+            return encode_workspace_object(obj_data, workspace_obj)
+        return {'type': 'dataframe', 'index': encode_workspace_index(obj_data.index, workspace_obj),
+                'columns': encode_workspace_index(obj_data.columns, workspace_obj),
+                'values': [encode_workspace_array(obj_data.iloc[:, column_id].to_numpy(), workspace_obj)
+                           for column_id in range(obj_data.shape[1])]}
+    elif isinstance(obj_data, pd.Series):
+        if not isinstance(obj_data.dtype, np.dtype):
+            return encode_workspace_object(obj_data, workspace_obj)
+        return {'type': 'series', 'index': encode_workspace_index(obj_data.index, workspace_obj),
+                'name': encode_workspace_node(obj_data.name, workspace_obj),
+                'values': encode_workspace_array(obj_data.to_numpy(), workspace_obj)}
+    elif isinstance(obj_data, pd.Index):
+        return encode_workspace_index(obj_data, workspace_obj)
+    else:
+        return encode_workspace_object(obj_data, workspace_obj)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to decode an array (memory-mapped copy-on-write: pages are read on access and changes are not written
+# back to the workspace)
+def decode_workspace_array(obj_node, workspace_obj):
+
+    if obj_node['type'] == 'object':
+        return workspace_obj['objects'][obj_node['index']]
+    if 'file' not in obj_node:
+        return np.empty(obj_node['shape'], dtype=np.dtype(obj_node['dtype']))
+
+    return np.load(os.path.join(workspace_obj['folder'], obj_node['file']), mmap_mode=workspace_obj['mmap_mode'],
+                   allow_pickle=False)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to decode a xarray variable [(dims, values, attrs), encoding]
+def decode_workspace_variable(obj_node, workspace_obj):
+    obj_variable = (obj_node['dims'], decode_workspace_array(obj_node['data'], workspace_obj),
+                    decode_workspace_node(obj_node['attrs'], workspace_obj))
+    return obj_variable, decode_workspace_node(obj_node['encoding'], workspace_obj)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to decode the xarray coordinates [{name: (dims, values, attrs)}, {name: encoding}]
+def decode_workspace_coords(obj_node, workspace_obj):
+    obj_coords, obj_encoding = {}, {}
+    for coord_node, coord_fields in obj_node:
+        coord_name = decode_workspace_node(coord_node, workspace_obj)
+        obj_coords[coord_name], obj_encoding[coord_name] = decode_workspace_variable(coord_fields, workspace_obj)
+    return obj_coords, obj_encoding
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to decode a pandas index
+def decode_workspace_index(obj_node, workspace_obj):
+
+    if obj_node['type'] == 'object':
+        return workspace_obj['objects'][obj_node['index']]
+
+    index_name = decode_workspace_node(obj_node['name'], workspace_obj)
+    if obj_node['type'] == 'range':
+        return pd.RangeIndex(obj_node['start'], obj_node['stop'], obj_node['step'], name=index_name)
+
+    index_values = decode_workspace_array(obj_node['values'], workspace_obj)
+    if obj_node['freq'] is not None:
+        return pd.DatetimeIndex(index_values, freq=obj_node['freq'], name=index_name)
+    return pd.Index(index_values, name=index_name)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to decode the workspace nodes
+def decode_workspace_node(obj_node, workspace_obj):
+
+    obj_type = obj_node['type']
+    if obj_type == 'value':
+        return obj_node['value']
+    elif obj_type == 'object':
+        return workspace_obj['objects'][obj_node['index']]
+    elif obj_type == 'dict':
+        return {decode_workspace_node(key_node, workspace_obj): decode_workspace_node(value_node, workspace_obj)
+                for key_node, value_node in obj_node['items']}
+    elif obj_type == 'list':
+        return [decode_workspace_node(value_node, workspace_obj) for value_node in obj_node['items']]
+    elif obj_type == 'tuple':
+        return tuple([decode_workspace_node(value_node, workspace_obj) for value_node in obj_node['items']])
+    elif obj_type == 'array':
+        return decode_workspace_array(obj_node, workspace_obj)
+    elif obj_type == 'dataset':
+        data_vars, data_encoding = decode_workspace_coords(obj_node['data_vars'], workspace_obj)
+        data_coords, coords_encoding = decode_workspace_coords(obj_node['coords'], workspace_obj)
+        obj_data = xr.Dataset(data_vars=data_vars, coords=data_coords,
+                              attrs=decode_workspace_node(obj_node['attrs'], workspace_obj))
+        for var_name, var_encoding in {**data_encoding, **coords_encoding}.items():
+            obj_data[var_name].encoding = var_encoding
+        return obj_data
+    elif obj_type == 'dataarray':
+        (var_dims, var_data, var_attrs), var_encoding = decode_workspace_variable(obj_node['variable'], workspace_obj)
+        data_coords, coords_encoding = decode_workspace_coords(obj_node['coords'], workspace_obj)
+        obj_data = xr.DataArray(var_data, dims=var_dims, coords=data_coords, attrs=var_attrs,
+                                name=decode_workspace_node(obj_node['name'], workspace_obj))
+        obj_data.encoding = var_encoding
+        for coord_name, coord_encoding in coords_encoding.items():
+            obj_data[coord_name].encoding = coord_encoding
+        return obj_data
+    elif obj_type == 'dataframe':
+        obj_data = pd.DataFrame({column_id: decode_workspace_array(column_node, workspace_obj)
+                                 for column_id, column_node in enumerate(obj_node['values'])},
+                                index=decode_workspace_index(obj_node['index'], workspace_obj))
+        obj_data.columns = decode_workspace_index(obj_node['columns'], workspace_obj)
+        return obj_data
+    elif obj_type == 'series':
+        return pd.Series(decode_workspace_array(obj_node['values'], workspace_obj),
+                         index=decode_workspace_index(obj_node['index'], workspace_obj),
+                         name=decode_workspace_node(obj_node['name'], workspace_obj))
+    elif obj_type in ['index', 'range']:
+        return decode_workspace_index(obj_node, workspace_obj)
+    else:
+        log_stream.error(' ===> Workspace node type "' + str(obj_type) + '" is not supported')
+        raise NotImplementedError('Case not implemented yet')
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to write a workspace folder (the folder must not exist or must be empty)
+def write_workspace_data(folder_name, file_data):
+
+    os.makedirs(folder_name, exist_ok=True)
+
+    workspace_obj = {'folder': folder_name, 'array_n': 0, 'objects': []}
+    workspace_root = encode_workspace_node(file_data, workspace_obj)
+
+    with open(os.path.join(folder_name, workspace_objects_name), 'wb') as file_handle:
+        pickle.dump(workspace_obj['objects'], file_handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # manifest is written at the end (a folder without manifest is not a valid workspace)
+    workspace_manifest = {'format': workspace_format_version, 'arrays': workspace_obj['array_n'],
+                          'root': workspace_root}
+    with open(os.path.join(folder_name, workspace_manifest_name), 'w') as file_handle:
+        json.dump(workspace_manifest, file_handle)
+
+    return folder_name
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to read a workspace folder (manifest and small objects are read; arrays are memory-mapped)
+def read_workspace_data(folder_name, mmap_mode='c'):
+
+    with open(os.path.join(folder_name, workspace_manifest_name), 'r') as file_handle:
+        workspace_manifest = json.load(file_handle)
+    if workspace_manifest['format'] != workspace_format_version:
+        raise ValueError('Workspace format ' + str(workspace_manifest['format']) + ' is not supported')
+
+    with open(os.path.join(folder_name, workspace_objects_name), 'rb') as file_handle:
+        workspace_objects = pickle.load(file_handle)
+
+    workspace_obj = {'folder': folder_name, 'objects': workspace_objects, 'mmap_mode': mmap_mode}
+    return decode_workspace_node(workspace_manifest['root'], workspace_obj)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to compute the size of a workspace folder [bytes]
+def get_workspace_size(folder_name):
+    folder_size = 0
+    with os.scandir(folder_name) as folder_handle:
+        for entry_step in folder_handle:
+            if entry_step.is_file():
+                folder_size += entry_step.stat().st_size
+    return folder_size
+# -------------------------------------------------------------------------------------
@@ -10,39 +10,239 @@ Version:       '3.0.0'
 # Library
 import logging
 import gzip
+import json
+import os
+import time
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
 
 from hmc.algorithm.default.lib_default_args import logger_name
+from hmc.algorithm.utils.lib_utils_catalog import check_catalog_file
 
 # Logging
 log_stream = logging.getLogger(logger_name)
+
+# Unzip settings (block size in bytes and name of the cache index in the tmp folder)
+unzip_block_size = 1048576
+unzip_cache_index = 'hmc_unzip.cache'
+unzip_cache_lock = threading.Lock()
+unzip_cache_used = set()
 #################################################################################
 
 
 # --------------------------------------------------------------------------------
-# Method to unzip file
-def unzip_filename(file_name_zip, file_name_unzip):
+# Method to unzip file (streamed by blocks in a temporary file and moved to avoid partial files)
+def unzip_filename(file_name_zip, file_name_unzip, block_size=unzip_block_size):
+
+    file_name_tmp = file_name_unzip + '.' + str(os.getpid()) + '.' + str(threading.get_ident()) + '.tmp'
+
+    with gzip.open(file_name_zip, 'rb') as file_handle_zip, open(file_name_tmp, 'wb') as file_handle_unzip:
+        while True:
+            file_block = file_handle_zip.read(block_size)
+            if not file_block:
+                break
+            file_handle_unzip.write(file_block)
+
+    os.replace(file_name_tmp, file_name_unzip)
+
+# --------------------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------------------
+# Method to read the cache index of unzipped files
+def read_unzip_cache(folder_name):
+
+    file_path_index = os.path.join(folder_name, unzip_cache_index)
+    if os.path.exists(file_path_index):
+        try:
+            with open(file_path_index, 'r') as file_handle:
+                cache_index = json.load(file_handle)
+        except (OSError, ValueError):
+            cache_index = {}
+    else:
+        cache_index = {}
+
+    return cache_index
+# --------------------------------------------------------------------------------
 
-    file_handle_zip = gzip.GzipFile(file_name_zip, "rb")
-    file_handle_unzip = open(file_name_unzip, "wb")
 
-    file_data_unzip = file_handle_zip.read()
-    file_handle_unzip.write(file_data_unzip)
+# --------------------------------------------------------------------------------
+# Method to write the cache index of unzipped files
+def write_unzip_cache(folder_name, cache_index):
+
+    file_path_index = os.path.join(folder_name, unzip_cache_index)
+    file_path_tmp = file_path_index + '.' + str(os.getpid()) + '.tmp'
+    with open(file_path_tmp, 'w') as file_handle:
+        json.dump(cache_index, file_handle)
+    os.replace(file_path_tmp, file_path_index)
+# --------------------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------------------
+# Method to check if an unzipped file is still valid (same source path, mtime and size)
+def check_unzip_cache(cache_index, file_name_zip, file_name_unzip):
+
+    if file_name_unzip not in cache_index:
+        return False
+    cache_entry = cache_index[file_name_unzip]
 
-    file_handle_zip.close()
-    file_handle_unzip.close()
+    file_stat_zip = os.stat(file_name_zip)
+    if (cache_entry['source'] != file_name_zip) or (cache_entry['mtime'] != file_stat_zip.st_mtime_ns) or \
+            (cache_entry['size'] != file_stat_zip.st_size):
+        return False
+    if (not os.path.exists(file_name_unzip)) or (os.path.getsize(file_name_unzip) != cache_entry['bytes']):
+        return False
 
+    return True
 # --------------------------------------------------------------------------------
 
 
 # --------------------------------------------------------------------------------
-# Method to zip file
-def zip_filename(file_name_unzip, file_name_zip):
+# Method to evict the least recently used unzipped files (size in MB)
+def clean_unzip_cache(cache_index, cache_size_max, file_name_protected=None):
+
+    if file_name_protected is None:
+        file_name_protected = []
+
+    for file_name_unzip in list(cache_index.keys()):
+        if not os.path.exists(file_name_unzip):
+            cache_index.pop(file_name_unzip)
+
+    cache_size = sum([cache_entry['bytes'] for cache_entry in cache_index.values()])
+    cache_list = sorted(cache_index.items(), key=lambda cache_item: cache_item[1]['access'])
+
+    for file_name_unzip, cache_entry in cache_list:
+        if cache_size <= (cache_size_max * 1024.0 * 1024.0):
+            break
+        if file_name_unzip in file_name_protected:
+            continue
+        if os.path.exists(file_name_unzip):
+            os.remove(file_name_unzip)
+        cache_index.pop(file_name_unzip)
+        cache_size -= cache_entry['bytes']
+        log_stream.info(' ------> Evict unzipped file ' + file_name_unzip + ' ... DONE')
+
+    return cache_index
+# --------------------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------------------
+# Method to unzip a list of files (using a pool of threads and a cache of unzipped files in the tmp folder)
+def unzip_filename_list(file_name_zip_list, file_name_unzip_list, process_n=1, cache_size_max=None):
+
+    file_zip_select, file_unzip_select, file_missing = [], [], False
+    for file_name_zip, file_name_unzip in zip(file_name_zip_list, file_name_unzip_list):
+        if check_catalog_file(file_name_zip):
+            file_zip_select.append(file_name_zip)
+            file_unzip_select.append(file_name_unzip)
+        else:
+            file_missing = True
+
+    # Check the unzipped file(s) already available
+    cache_folders, cache_obj = sorted(set([os.path.dirname(file_name) for file_name in file_unzip_select])), {}
+    file_pairs = []
+    with unzip_cache_lock:
+        for cache_folder in cache_folders:
+            cache_obj[cache_folder] = read_unzip_cache(cache_folder) if cache_size_max else {}
+
+        for file_name_zip, file_name_unzip in zip(file_zip_select, file_unzip_select):
+            cache_index = cache_obj[os.path.dirname(file_name_unzip)]
+            if cache_size_max:
+                if check_unzip_cache(cache_index, file_name_zip, file_name_unzip):
+                    cache_index[file_name_unzip]['access'] = time.time()
+                    continue
+            else:
+                if os.path.exists(file_name_unzip):
+                    continue
+            if (file_name_zip, file_name_unzip) not in file_pairs:
+                file_pairs.append((file_name_zip, file_name_unzip))
+
+    # Unzip the file(s) (zlib releases the GIL during decompression)
+    if file_pairs:
+        if (process_n > 1) and (file_pairs.__len__() > 1):
+            with ThreadPoolExecutor(max_workers=min(process_n, file_pairs.__len__())) as exec_pool:
+                list(exec_pool.map(lambda file_pair: unzip_filename(*file_pair), file_pairs))
+        else:
+            for file_name_zip, file_name_unzip in file_pairs:
+                unzip_filename(file_name_zip, file_name_unzip)
+
+    # Update the cache index and evict the older file(s) (file(s) used by the current process are kept)
+    if cache_size_max:
+        with unzip_cache_lock:
+            unzip_cache_used.update(file_unzip_select)
+
+            for cache_folder in cache_folders:
+                cache_index = read_unzip_cache(cache_folder)
+                cache_index.update(cache_obj[cache_folder])
+                cache_obj[cache_folder] = cache_index
+
+            for file_name_zip, file_name_unzip in file_pairs:
+                file_stat_zip = os.stat(file_name_zip)
+                cache_obj[os.path.dirname(file_name_unzip)][file_name_unzip] = {
+                    'source': file_name_zip, 'mtime': file_stat_zip.st_mtime_ns, 'size': file_stat_zip.st_size,
+                    'bytes': os.path.getsize(file_name_unzip), 'access': time.time()}
+
+            for cache_folder in cache_folders:
+                cache_index = clean_unzip_cache(cache_obj[cache_folder], cache_size_max,
+                                                file_name_protected=unzip_cache_used)
+                write_unzip_cache(cache_folder, cache_index)
+
+    return file_missing
+# --------------------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------------------
+# Method to zip file (streamed by blocks; with member size, blocks are compressed in parallel as gzip members)
+def zip_filename(file_name_unzip, file_name_zip, block_size=unzip_block_size, member_size=None, process_n=1,
+                 compress_level=9):
+
+    file_name_tmp = file_name_zip + '.' + str(os.getpid()) + '.' + str(threading.get_ident()) + '.tmp'
+
+    if member_size is None:
+        with open(file_name_unzip, 'rb') as file_handle_unzip, \
+                gzip.open(file_name_tmp, 'wb', compresslevel=compress_level) as file_handle_zip:
+            while True:
+                file_block = file_handle_unzip.read(block_size)
+                if not file_block:
+                    break
+                file_handle_zip.write(file_block)
+    else:
+        # multi-member gzip (each member is a valid gzip stream; members are concatenated in order)
+        with open(file_name_unzip, 'rb') as file_handle_unzip, open(file_name_tmp, 'wb') as file_handle_zip, \
+                ThreadPoolExecutor(max_workers=max(process_n, 1)) as exec_pool:
+            while True:
+                file_blocks = []
+                for block_id in range(max(process_n, 1)):
+                    file_block = file_handle_unzip.read(member_size)
+                    if not file_block:
+                        break
+                    file_blocks.append(file_block)
+                if not file_blocks:
+                    break
+                for file_member in exec_pool.map(
+                        lambda file_block_step: gzip.compress(file_block_step, compresslevel=compress_level),
+                        file_blocks):
+                    file_handle_zip.write(file_member)
+
+    os.replace(file_name_tmp, file_name_zip)
+# --------------------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------------------
+# Method to zip a dumped file (old zipped file and unzipped file are removed)
+def zip_filename_step(file_name_unzip, file_name_zip, **kwargs):
+
+    if os.path.exists(file_name_zip):
+        os.remove(file_name_zip)
+
+    if not os.path.exists(file_name_unzip):
+        return False
 
-    file_handle_unzip = open(file_name_unzip, 'rb')
-    file_handle_zip = gzip.open(file_name_zip, 'wb')
+    zip_filename(file_name_unzip, file_name_zip, **kwargs)
 
-    file_handle_zip.writelines(file_handle_unzip)
+    if os.path.exists(file_name_zip) and os.path.exists(file_name_unzip):
+        os.remove(file_name_unzip)
 
-    file_handle_zip.close()
-    file_handle_unzip.close()
+    return True
 # --------------------------------------------------------------------------------
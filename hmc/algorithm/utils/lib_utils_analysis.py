@@ -10,22 +10,26 @@ Version:       '1.0.0'
 #######################################################################################
 # Library
 import logging
-import time
+import warnings
 
 import numpy as np
 import pandas as pd
 import xarray as xr
 
-from multiprocessing import Pool, cpu_count
-from copy import deepcopy
+from multiprocessing import Pool, cpu_count, shared_memory
 
 from hmc.algorithm.default.lib_default_args import logger_name
+from hmc.algorithm.utils.lib_utils_monitor import monitor_method
+from hmc.algorithm.utils.lib_utils_import import import_lazy
+
+# Lazy module(s) (imported at the first use)
+sparse = import_lazy('scipy.sparse')
 
 # Log
 log_stream = logging.getLogger(logger_name)
 
 # Debug
-import matplotlib.pylab as plt
+# import matplotlib.pylab as plt
 
 # Analysis variable constants
 variable_excluded_default = ['terrain', 'Terrain', 'mask', 'Mask']
@@ -103,277 +107,321 @@ def update_variable_names(var_ts_in, vars_excluded_list=None,
 
 
 # -------------------------------------------------------------------------------------
-# Method to collect results in mp async mode
-def organize_outcome(func_obj_out):
-    obj_data_out = func_obj_out[1]
+# Method to compute mean values over catchment using mp async method
+def compute_catchment_mean_parallel_async(var_dset, mask_da_obj, mask_var_name='mask',
+                                          var_dim_x='west_east', var_dim_y='south_north',
+                                          var_coord_x='longitude', var_coord_y='latitude',
+                                          cpu_n=40, cpu_max=None,
+                                          variable_domain_fields='{var_name}:{domain_name}',
+                                          variable_selected_list=None, mask_weights_obj=None):
 
-    global var_da_section_obj
-    if var_da_section_obj is None:
-        var_da_section_obj = obj_data_out
-    else:
-        var_da_section_obj = xr.merge([var_da_section_obj, obj_data_out])
+    log_stream.info(' ---------> Apply method to average time-series in parallel async mode ... ')
+    var_da_section_obj = compute_catchment_mean_parallel(
+        var_dset, mask_da_obj, var_dim_x=var_dim_x, var_dim_y=var_dim_y,
+        cpu_n=cpu_n, cpu_max=cpu_max, cpu_ordered=False,
+        variable_domain_fields=variable_domain_fields,
+        variable_selected_list=variable_selected_list, mask_weights_obj=mask_weights_obj)
+    log_stream.info(' ---------> Apply method to average time-series in parallel async mode ... DONE')
+
+    return var_da_section_obj
 
 # -------------------------------------------------------------------------------------
 
 
 # -------------------------------------------------------------------------------------
 # Method to compute mean values over catchment using mp sync method
-def compute_catchment_mean_parallel_async(var_dset, mask_da_obj, mask_var_name='mask',
-                                          var_dim_x='west_east', var_dim_y='south_north',
-                                          var_coord_x='longitude', var_coord_y='latitude',
-                                          cpu_n=40, cpu_max=None,
-                                          variable_domain_fields='{var_name}:{domain_name}',
-                                          variable_selected_list=None):
-    global var_da_section_obj
-    global var_dset_global
+def compute_catchment_mean_parallel_sync(var_dset, mask_da_obj, mask_var_name='mask',
+                                         var_dim_x='west_east', var_dim_y='south_north',
+                                         var_coord_x='longitude', var_coord_y='latitude',
+                                         cpu_n=20, cpu_max=20,
+                                         variable_domain_fields='{var_name}:{domain_name}',
+                                         variable_selected_list=None, mask_weights_obj=None):
 
-    log_stream.info(' ---------> Apply method to average time-series in parallel async mode ... ')
+    log_stream.info(' ---------> Apply method to average time-series in parallel sync mode ... ')
+    var_da_section_obj = compute_catchment_mean_parallel(
+        var_dset, mask_da_obj, var_dim_x=var_dim_x, var_dim_y=var_dim_y,
+        cpu_n=cpu_n, cpu_max=cpu_max, cpu_ordered=True,
+        variable_domain_fields=variable_domain_fields,
+        variable_selected_list=variable_selected_list, mask_weights_obj=mask_weights_obj)
+    log_stream.info(' ---------> Apply method to average time-series in parallel sync mode ... DONE')
+
+    return var_da_section_obj
+
+# -------------------------------------------------------------------------------------
 
-    var_dset_global = var_dset
 
-    if variable_selected_list is not None:
-        variable_dset_list = list(var_dset_global.data_vars)
-        for variable_dset_step in variable_dset_list:
-            if variable_dset_step not in variable_selected_list:
-                var_dset_global = var_dset_global.drop(variable_dset_step)
+# -------------------------------------------------------------------------------------
+# Method to compute mean values over catchment using a shared memory block and a pool of workers
+@monitor_method('analysis.compute_catchment_mean_parallel', 'analysis')
+def compute_catchment_mean_parallel(var_dset, mask_da_obj,
+                                    var_dim_x='west_east', var_dim_y='south_north',
+                                    cpu_n=20, cpu_max=None, cpu_ordered=False,
+                                    variable_domain_fields='{var_name}:{domain_name}',
+                                    variable_selected_list=None, mask_weights_obj=None, section_chunk_n=4):
 
-    time_start = time.time()
     if var_dim_x is None:
         var_dim_x = 'west_east'
     if var_dim_y is None:
         var_dim_y = 'south_north'
 
-    var_dim_order = [var_dim_y, var_dim_x]
-
     if cpu_max is None:
         cpu_max = cpu_count() - 1
     if cpu_n > cpu_max:
         log_stream.warning(' ===> Maximum of recommended processes must be less then ' + str(cpu_max))
         log_stream.warning(' ===> Set number of process from ' + str(cpu_n) + ' to ' + str(cpu_max))
         cpu_n = cpu_max
+    if cpu_n < 1:
+        cpu_n = 1
+
+    # Get the weights (if not previously computed)
+    if mask_weights_obj is None:
+        mask_weights_obj = compute_catchment_weights(mask_da_obj)
+    section_name_list, mask_weights, grid_shape = mask_weights_obj
+
+    if mask_weights is None:
+        return None
+
+    # Organize the variable(s) in a single (cells, columns) block
+    var_info_list, var_values_list = [], []
+    for var_name, var_da in var_dset.data_vars.items():
+
+        if var_name in variable_excluded_default:
+            continue
+        if (variable_selected_list is not None) and (var_name not in variable_selected_list):
+            continue
+        if (var_dim_y not in var_da.dims) or (var_dim_x not in var_da.dims):
+            continue
+
+        var_dims_extra = [var_dim for var_dim in var_da.dims if var_dim not in [var_dim_y, var_dim_x]]
+        var_da_ordered = var_da.transpose(*([var_dim_y, var_dim_x] + var_dims_extra))
+
+        if tuple(var_da_ordered.shape[:2]) != tuple(grid_shape):
+            log_stream.warning(' ===> Variable "' + var_name + '" shape ' + str(var_da_ordered.shape[:2]) +
+                               ' is not the same of the masks shape ' + str(grid_shape) + '. Skip variable')
+            continue
+
+        var_extra_shape = tuple(var_da_ordered.shape[2:])
+        var_coords = {var_dim: var_da_ordered[var_dim] for var_dim in var_dims_extra
+                      if var_dim in var_da_ordered.coords}
+
+        var_info_list.append([var_name, var_dims_extra, var_extra_shape, var_coords])
+        var_values_list.append(var_da_ordered)
+
+    if not var_info_list:
+        return xr.Dataset()
+
+    grid_cells = int(grid_shape[0] * grid_shape[1])
+    var_columns = [int(np.prod(var_info[2])) for var_info in var_info_list]
+    block_shape = (grid_cells, int(np.sum(var_columns)))
+    block_dtype = np.float64
+
+    # Copy the variable(s) in the shared memory block (only once)
+    block_shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(block_shape)) * 8))
+    try:
+        block_values = np.ndarray(block_shape, dtype=block_dtype, buffer=block_shm.buf)
+        column_start = 0
+        for var_da_ordered, var_column_n in zip(var_values_list, var_columns):
+            block_values[:, column_start:column_start + var_column_n] = \
+                np.asarray(var_da_ordered.values, dtype=block_dtype).reshape(grid_cells, var_column_n)
+            column_start += var_column_n
+
+        # Organize the section chunk(s) (workers get the cell indexes only)
+        section_idx_list = [mask_weights.indices[mask_weights.indptr[section_id]:mask_weights.indptr[section_id + 1]]
+                            for section_id in range(section_name_list.__len__())]
+        section_id_chunks = np.array_split(np.arange(section_name_list.__len__()),
+                                           max(1, min(section_name_list.__len__(), cpu_n * section_chunk_n)))
+        func_args_list = []
+        for section_id_chunk in section_id_chunks:
+            if section_id_chunk.size > 0:
+                func_args_list.append([block_shm.name, block_shape, block_dtype,
+                                       [[int(section_id), section_idx_list[section_id]]
+                                        for section_id in section_id_chunk]])
+
+        # Compute the mean values (results are assembled in a single allocation)
+        section_values = np.full((section_name_list.__len__(), block_shape[1]), np.nan, dtype=block_dtype)
+        with Pool(processes=cpu_n) as exec_pool:
+            if cpu_ordered:
+                exec_response = exec_pool.imap(exec_catchment_mean, func_args_list, chunksize=1)
+            else:
+                exec_response = exec_pool.imap_unordered(exec_catchment_mean, func_args_list, chunksize=1)
+            for section_id_step, section_values_step in exec_response:
+                section_values[section_id_step, :] = section_values_step
+
+        del block_values
+    finally:
+        block_shm.close()
+        block_shm.unlink()
+
+    # Organize the outcome datasets
+    var_section_dict = {}
+    column_start = 0
+    for (var_name, var_dims_extra, var_extra_shape, var_coords), var_column_n in zip(var_info_list, var_columns):
+        var_section_values = section_values[:, column_start:column_start + var_column_n]
+        for section_id, section_name in enumerate(section_name_list):
+            tag_dict = {'var_name': var_name, 'domain_name': section_name}
+            var_section_name = variable_domain_fields.format(**tag_dict)
+            var_section_dict[var_section_name] = xr.DataArray(
+                var_section_values[section_id].reshape(var_extra_shape), dims=var_dims_extra, coords=var_coords)
+        column_start += var_column_n
+
+    var_da_section_obj = xr.Dataset(var_section_dict)
+
+    log_stream.info(' ----------> Sections: ' + str(section_name_list.__len__()) + ' - Processes: ' + str(cpu_n))
 
-    var_da_section_obj = None
-    exec_pool = Pool(cpu_n)
-    for mask_key, mask_da in mask_da_obj.items():
-
-        mask_values = np.flipud(mask_da.values)
-        mask_geo_y = np.flipud(mask_da['Latitude'].values)
-        mask_geo_x = mask_da['Longitude'].values
+    return var_da_section_obj
 
-        if (mask_geo_x.shape.__len__() == 1) and (mask_geo_y.shape.__len__() == 1):
-            mask_geo_x_2d, var_geo_y_2d = np.meshgrid(mask_geo_x, mask_geo_y)
-        else:
-            mask_geo_x_2d = mask_geo_x
-            var_geo_y_2d = mask_geo_y
+# -------------------------------------------------------------------------------------
 
-        var_da_mask = xr.DataArray(mask_values, name=mask_var_name,
-                                   dims=var_dim_order,
-                                   coords={var_coord_x: ([var_dim_y, var_dim_x], mask_geo_x_2d),
-                                           var_coord_y: ([var_dim_y, var_dim_x], var_geo_y_2d)})
 
-        func_obj = {'var_mask': var_da_mask, 'var_dim': var_dim_order, 'var_template': variable_domain_fields}
-        exec_pool.apply_async(exec_grid2ts, args=(mask_key, func_obj), callback=organize_outcome)
+# -------------------------------------------------------------------------------------
+# Method to compute the mean values of a sections chunk (worker attached to the shared memory block)
+def exec_catchment_mean(func_args):
 
-    exec_pool.close()
-    exec_pool.join()
+    block_name, block_shape, block_dtype, section_chunk = func_args
 
-    time_end = time.time()
-    time_elapsed = time_end - time_start
+    block_shm = shared_memory.SharedMemory(name=block_name)
+    try:
+        block_values = np.ndarray(block_shape, dtype=block_dtype, buffer=block_shm.buf)
 
-    log_stream.info(' ----------> Elapsed time: ' + str(np.floor(time_elapsed)) +
-                    ' seconds. \n Consider to select a reduced number of variables if process takes a long time.\n')
+        section_id_list = [section_step[0] for section_step in section_chunk]
+        section_values = np.full((section_chunk.__len__(), block_shape[1]), np.nan, dtype=block_dtype)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            for section_n, (section_id, section_idx) in enumerate(section_chunk):
+                if section_idx.size > 0:
+                    section_values[section_n, :] = np.nanmean(block_values[section_idx, :], axis=0)
 
-    log_stream.info(' ---------> Apply method to average time-series in parallel async mode ... DONE')
+        del block_values
+    finally:
+        block_shm.close()
 
-    return var_da_section_obj
+    return section_id_list, section_values
 
 # -------------------------------------------------------------------------------------
 
 
 # -------------------------------------------------------------------------------------
-# Method to compute mean values over catchment using mp sync method
-def compute_catchment_mean_parallel_sync(var_dset, mask_da_obj, mask_var_name='mask',
-                                         var_dim_x='west_east', var_dim_y='south_north',
-                                         var_coord_x='longitude', var_coord_y='latitude',
-                                         cpu_n=20, cpu_max=20,
-                                         variable_domain_fields='{var_name}:{domain_name}',
-                                         variable_selected_list=None):
+# Method to compute the section-by-cell weights matrix (sparse csr) using the catchment masks
+def compute_catchment_weights(mask_da_obj, mask_flip=True):
 
-    global var_da_section_obj
-    global var_dset_global
+    section_name_list = []
+    section_row_list, section_col_list = [], []
+    grid_shape = None
+    for section_id, (mask_key, mask_da) in enumerate(mask_da_obj.items()):
 
-    log_stream.info(' ---------> Apply method to average time-series in parallel sync mode ... ')
+        if mask_flip:
+            mask_values = np.flipud(mask_da.values)
+        else:
+            mask_values = mask_da.values
 
-    var_dset_global = var_dset
+        if grid_shape is None:
+            grid_shape = mask_values.shape
+        elif grid_shape != mask_values.shape:
+            log_stream.error(' ===> Mask "' + mask_key + '" shape ' + str(mask_values.shape) +
+                             ' is not the same of the domain shape ' + str(grid_shape))
+            raise RuntimeError('Catchment masks must be defined on the same grid')
 
-    if variable_selected_list is not None:
-        variable_dset_list = list(var_dset_global.data_vars)
-        for variable_dset_step in variable_dset_list:
-            if variable_dset_step not in variable_selected_list:
-                var_dset_global = var_dset_global.drop(variable_dset_step)
+        mask_idx = np.flatnonzero(mask_values.ravel() == 1)
 
-    time_start = time.time()
-    if var_dim_x is None:
-        var_dim_x = 'west_east'
-    if var_dim_y is None:
-        var_dim_y = 'south_north'
+        section_name_list.append(mask_key)
+        section_row_list.append(np.full(mask_idx.shape[0], section_id, dtype=np.int32))
+        section_col_list.append(mask_idx.astype(np.int64))
 
-    var_dim_order = [var_dim_y, var_dim_x]
+    if grid_shape is None:
+        return section_name_list, None, None
 
-    if cpu_max is None:
-        cpu_max = cpu_count() - 1
-    if cpu_n > cpu_max:
-        log_stream.warning(' ===> Maximum of recommended processes must be less then ' + str(cpu_max))
-        log_stream.warning(' ===> Set number of process from ' + str(cpu_n) + ' to ' + str(cpu_max))
-        cpu_n = cpu_max
+    section_rows = np.concatenate(section_row_list)
+    section_cols = np.concatenate(section_col_list)
+    section_data = np.ones(section_rows.shape[0], dtype=np.float64)
 
-    func_obj_list = []
-    for mask_key, mask_da in mask_da_obj.items():
+    mask_weights = sparse.csr_matrix(
+        (section_data, (section_rows, section_cols)),
+        shape=(section_name_list.__len__(), int(grid_shape[0] * grid_shape[1])))
 
-        mask_values = np.flipud(mask_da.values)
-        mask_geo_y = np.flipud(mask_da['Latitude'].values)
-        mask_geo_x = mask_da['Longitude'].values
+    return section_name_list, mask_weights, grid_shape
 
-        if (mask_geo_x.shape.__len__() == 1) and (mask_geo_y.shape.__len__() == 1):
-            mask_geo_x_2d, var_geo_y_2d = np.meshgrid(mask_geo_x, mask_geo_y)
-        else:
-            mask_geo_x_2d = mask_geo_x
-            var_geo_y_2d = mask_geo_y
+# -------------------------------------------------------------------------------------
 
-        var_da_mask = xr.DataArray(mask_values, name=mask_var_name,
-                                   dims=var_dim_order,
-                                   coords={var_coord_x: ([var_dim_y, var_dim_x], mask_geo_x_2d),
-                                           var_coord_y: ([var_dim_y, var_dim_x], var_geo_y_2d)})
 
-        func_obj = {'var_mask': var_da_mask, 'var_dim': var_dim_order, 'var_template': variable_domain_fields}
+# -------------------------------------------------------------------------------------
+# Method to compute the mean values of a (y, x, ...) array over the sections (nan values are skipped)
+def compute_weights_mean(var_values, mask_weights):
 
-        func_obj_list.append([mask_key, func_obj])
+    grid_cells = var_values.shape[0] * var_values.shape[1]
+    var_extra_shape = var_values.shape[2:]
 
-    with Pool(processes=cpu_n, maxtasksperchild=1) as exec_pool:
-        var_da_section_collection = exec_pool.map(exec_grid2ts, func_obj_list, chunksize=20)
-        exec_pool.close()
-        exec_pool.join()
+    var_values_2d = var_values.reshape(grid_cells, -1)
+    var_valid_2d = np.isfinite(var_values_2d)
+    var_values_2d = np.where(var_valid_2d, var_values_2d, 0.0)
 
-    var_da_section_obj = None
-    for var_da_section_step in var_da_section_collection:
-        obj_data_out = var_da_section_step[1]
-        if var_da_section_obj is None:
-            var_da_section_obj = obj_data_out
-        else:
-            var_da_section_obj = xr.merge([var_da_section_obj, obj_data_out])
+    var_sum = mask_weights.dot(var_values_2d)
+    var_count = mask_weights.dot(var_valid_2d.astype(np.float64))
 
-    time_end = time.time()
-    time_elapsed = time_end - time_start
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var_mean = np.where(var_count > 0, var_sum / var_count, np.nan)
 
-    log_stream.info(' ----------> Elapsed time: ' + str(np.floor(time_elapsed)) +
-                    ' seconds. \n Consider to select a reduced number of variables if process takes a long time.\n')
-    log_stream.info(' ---------> Apply method to average time-series in parallel sync mode ... DONE')
-
-    return var_da_section_obj
+    return var_mean.reshape((mask_weights.shape[0],) + var_extra_shape)
 
 # -------------------------------------------------------------------------------------
 
 
 # -------------------------------------------------------------------------------------
-# Method to compute mean values over catchment
+# Method to compute mean values over catchment (all the sections in a single sparse product)
+@monitor_method('analysis.compute_catchment_mean_serial', 'analysis')
 def compute_catchment_mean_serial(var_dset, mask_da_obj, mask_var_name='mask',
                                   var_dim_x='west_east', var_dim_y='south_north',
                                   var_coord_x='longitude', var_coord_y='latitude',
                                   variable_domain_fields='{var_name}:{domain_name}',
-                                  variable_selected_list=None):
-    global var_da_section_obj
-    global var_dset_global
+                                  variable_selected_list=None, mask_weights_obj=None):
 
     log_stream.info(' ---------> Apply method to average time-series in serial mode ... ')
 
-    var_dset_global = var_dset
-
-    if variable_selected_list is not None:
-        variable_dset_list = list(var_dset_global.data_vars)
-        for variable_dset_step in variable_dset_list:
-            if variable_dset_step not in variable_selected_list:
-                var_dset_global = var_dset_global.drop(variable_dset_step)
-
-    time_start = time.time()
     if var_dim_x is None:
         var_dim_x = 'west_east'
     if var_dim_y is None:
         var_dim_y = 'south_north'
 
-    var_dim_order = [var_dim_y, var_dim_x]
+    # Get the weights (if not previously computed)
+    if mask_weights_obj is None:
+        mask_weights_obj = compute_catchment_weights(mask_da_obj)
+    section_name_list, mask_weights, grid_shape = mask_weights_obj
 
     var_da_section_obj = None
-    for mask_key, mask_da in mask_da_obj.items():
+    if mask_weights is not None:
 
-        var_dset_step = deepcopy(var_dset)
+        var_section_dict = {}
+        for var_name, var_da in var_dset.data_vars.items():
 
-        mask_values = np.flipud(mask_da.values)
-        mask_geo_y = np.flipud(mask_da['Latitude'].values)
-        mask_geo_x = mask_da['Longitude'].values
+            if var_name in variable_excluded_default:
+                continue
+            if (variable_selected_list is not None) and (var_name not in variable_selected_list):
+                continue
+            if (var_dim_y not in var_da.dims) or (var_dim_x not in var_da.dims):
+                continue
 
-        if (mask_geo_x.shape.__len__() == 1) and (mask_geo_y.shape.__len__() == 1):
-            mask_geo_x_2d, var_geo_y_2d = np.meshgrid(mask_geo_x, mask_geo_y)
-        else:
-            mask_geo_x_2d = mask_geo_x
-            var_geo_y_2d = mask_geo_y
-
-        var_da_mask = xr.DataArray(mask_values, name=mask_var_name,
-                                   dims=var_dim_order,
-                                   coords={var_coord_x: ([var_dim_y, var_dim_x], mask_geo_x_2d),
-                                           var_coord_y: ([var_dim_y, var_dim_x], var_geo_y_2d)})
+            var_dims_extra = [var_dim for var_dim in var_da.dims if var_dim not in [var_dim_y, var_dim_x]]
+            var_da_ordered = var_da.transpose(*([var_dim_y, var_dim_x] + var_dims_extra))
+            var_values = np.asarray(var_da_ordered.values, dtype=np.float64)
 
-        var_dset_step[mask_var_name] = var_da_mask
+            if tuple(var_values.shape[:2]) != tuple(grid_shape):
+                log_stream.warning(' ===> Variable "' + var_name + '" shape ' + str(var_values.shape[:2]) +
+                                   ' is not the same of the masks shape ' + str(grid_shape) + '. Skip variable')
+                continue
 
-        func_obj = {'var_mask': var_da_mask, 'var_dim': var_dim_order, 'var_template': variable_domain_fields}
-        obj_id_out, obj_data_out = exec_grid2ts(mask_key, func_obj)
+            var_mean = compute_weights_mean(var_values, mask_weights)
 
-        if var_da_section_obj is None:
-            var_da_section_obj = obj_data_out
-        else:
-            var_da_section_obj = xr.merge([var_da_section_obj, obj_data_out])
+            var_coords = {var_dim: var_da_ordered[var_dim] for var_dim in var_dims_extra
+                          if var_dim in var_da_ordered.coords}
+            for section_id, section_name in enumerate(section_name_list):
+                tag_dict = {'var_name': var_name, 'domain_name': section_name}
+                var_section_name = variable_domain_fields.format(**tag_dict)
+                var_section_dict[var_section_name] = xr.DataArray(
+                    var_mean[section_id], dims=var_dims_extra, coords=var_coords)
 
-    time_end = time.time()
-    time_elapsed = time_end - time_start
+        var_da_section_obj = xr.Dataset(var_section_dict)
 
-    log_stream.info(' ----------> Elapsed time: ' + str(np.floor(time_elapsed)) +
-                    ' seconds. \n Consider to use parallel mode if process takes a long time.\n')
     log_stream.info(' ---------> Apply method to average time-series in serial mode ... DONE')
 
     return var_da_section_obj
 
 # -------------------------------------------------------------------------------------
-
-
-# -------------------------------------------------------------------------------------
-# Method to compute grid2ts
-def exec_grid2ts(func_obj_interface, func_obj_in=None, excluded_var_list=None,
-                 mask_var_name='mask'):
-
-    if excluded_var_list:
-        excluded_var_list = variable_excluded_default
-
-    if (isinstance(func_obj_interface, str)) and (isinstance(func_obj_in, dict)):
-        func_obj_id = func_obj_interface
-        data_obj_in = func_obj_in
-    elif (isinstance(func_obj_interface, list)) and (func_obj_in is None):
-        data_obj_in = func_obj_interface[1]
-        func_obj_id = func_obj_interface[0]
-    else:
-        raise NotImplemented('Case not implemented yet')
-
-    da_mask = data_obj_in['var_mask']
-    var_dim = data_obj_in['var_dim']
-    var_template = data_obj_in['var_template']
-
-    var_dset_global[mask_var_name] = da_mask
-
-    var_dset_masked = var_dset_global.where(var_dset_global['mask'] == 1)
-    func_obj_tmp = var_dset_masked.mean(dim=var_dim)
-
-    func_obj_out = update_variable_names(func_obj_tmp,
-                                         vars_excluded_list=excluded_var_list,
-                                         var_domain_fields=var_template,
-                                         var_domain_template=func_obj_id)
-
-    return func_obj_id, func_obj_out
-# -------------------------------------------------------------------------------------
@@ -0,0 +1,358 @@
+"""
+Library Features:
+
+Name:          lib_utils_cache
+Author(s):     Fabio Delogu (fabio.delogu@cimafoundation.org)
+Date:          '20261018'
+Version:       '3.1.6'
+"""
+
+#######################################################################################
+# Library
+import logging
+import os
+import re
+import json
+import time
+import hashlib
+import shutil
+import datetime
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from hmc.algorithm.io.lib_data_io_workspace import read_workspace_data, write_workspace_data, get_workspace_size
+from hmc.algorithm.default.lib_default_args import logger_name
+from hmc.version import version as hmc_version
+
+# Logging
+log_stream = logging.getLogger(logger_name)
+
+# Cache entry name template (e.g. hmc.static.workspace --> hmc.static.0123456789abcdef.workspace)
+cache_key_length = 16
+cache_manifest_ext = '.cache'
+cache_outputs_name = 'cache_outputs.json'
+cache_entry_pattern = re.compile(r'^(?P<root>.+)\.(?P<key>[0-9a-f]{' + str(cache_key_length) + r'})(?P<ext>\.[^.]*)?$')
+
+# Debug
+# import matplotlib.pylab as plt
+#######################################################################################
+
+
+# -------------------------------------------------------------------------------------
+# Method to convert an object in a json-serializable structure (used to compute the cache key)
+def convert_cache_obj(obj_data):
+
+    if isinstance(obj_data, dict):
+        return {str(key): convert_cache_obj(value) for key, value in obj_data.items()}
+    elif isinstance(obj_data, (list, tuple, set)):
+        obj_list = [convert_cache_obj(value) for value in obj_data]
+        if isinstance(obj_data, set):
+            obj_list = sorted(obj_list, key=str)
+        return obj_list
+    elif isinstance(obj_data, pd.DataFrame):
+        return {'columns': convert_cache_obj(list(obj_data.columns)),
+                'index': convert_cache_obj(list(obj_data.index)),
+                'values': convert_cache_obj(obj_data.values.tolist())}
+    elif isinstance(obj_data, pd.Series):
+        return {'index': convert_cache_obj(list(obj_data.index)),
+                'values': convert_cache_obj(obj_data.values.tolist())}
+    elif isinstance(obj_data, pd.Index):
+        return convert_cache_obj(obj_data.tolist())
+    elif isinstance(obj_data, np.ndarray):
+        return {'shape': list(obj_data.shape), 'dtype': str(obj_data.dtype),
+                'digest': hashlib.sha1(np.ascontiguousarray(obj_data).tobytes()).hexdigest()}
+    elif isinstance(obj_data, (np.integer, np.floating, np.bool_)):
+        return obj_data.item()
+    elif isinstance(obj_data, (pd.Timestamp, datetime.datetime, datetime.date)):
+        return obj_data.isoformat()
+    elif isinstance(obj_data, (str, int, float, bool)) or obj_data is None:
+        return obj_data
+    else:
+        return str(obj_data)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to collect the file(s) referenced by an object (strings or whitespace-separated command lines)
+def collect_cache_files(obj_data, file_ext_zip='.gz'):
+
+    file_list = set()
+
+    def _search(obj_step):
+        if isinstance(obj_step, dict):
+            for value_step in obj_step.values():
+                _search(value_step)
+        elif isinstance(obj_step, (list, tuple, set)):
+            for value_step in obj_step:
+                _search(value_step)
+        elif isinstance(obj_step, str):
+            for token_step in obj_step.split():
+                if os.path.isabs(token_step):
+                    file_list.add(token_step)
+                    if not token_step.endswith(file_ext_zip):
+                        file_list.add(token_step + file_ext_zip)
+
+    _search(convert_cache_obj(obj_data))
+
+    return sorted(file_list)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to get the status of the available file(s) [[path, mtime (ns), size], ...]
+def get_cache_files_status(cache_files):
+
+    file_status = []
+    for file_path in cache_files:
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            continue
+        if os.path.isfile(file_path):
+            file_status.append([file_path, file_stat.st_mtime_ns, file_stat.st_size])
+
+    return file_status
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to compute the cache key of a stage (settings, input file(s) status, parent key(s) and package version)
+def compute_cache_key(cache_settings, cache_files=None, cache_parents=None, cache_version=hmc_version):
+
+    if cache_files is None:
+        cache_files = []
+    if cache_parents is None:
+        cache_parents = []
+
+    file_status = get_cache_files_status(cache_files)
+
+    cache_obj = {'version': cache_version, 'settings': convert_cache_obj(cache_settings),
+                 'files': file_status, 'parents': list(cache_parents)}
+
+    cache_string = json.dumps(cache_obj, sort_keys=True, separators=(',', ':'))
+    cache_key = hashlib.sha256(cache_string.encode('utf-8')).hexdigest()
+
+    return cache_key
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to define the cache entry filename
+def define_cache_entry(file_path, cache_key):
+    file_root, file_ext = os.path.splitext(file_path)
+    return file_root + '.' + cache_key[:cache_key_length] + file_ext
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to get the key of the last valid entry of a stage
+def get_cache_key(file_path):
+
+    file_path_manifest = file_path + cache_manifest_ext
+    if os.path.exists(file_path_manifest):
+        try:
+            with open(file_path_manifest, 'r') as file_handle:
+                cache_manifest = json.load(file_handle)
+        except (OSError, ValueError):
+            return None
+        cache_key = cache_manifest.get('key', None)
+        # the status of the output file(s) is part of the key used by the child stage(s)
+        if (cache_key is not None) and cache_manifest.get('outputs', None):
+            cache_key = cache_key + ':' + cache_manifest['outputs']
+        return cache_key
+    return None
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to update the manifest of a stage
+def set_cache_key(file_path, cache_key, cache_outputs=None):
+
+    cache_manifest = {'key': cache_key, 'version': hmc_version,
+                      'entry': define_cache_entry(file_path, cache_key),
+                      'time': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+    if cache_outputs:
+        cache_manifest['outputs'] = hashlib.sha256(
+            json.dumps(cache_outputs, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+    file_path_manifest = file_path + cache_manifest_ext
+    file_path_tmp = file_path_manifest + '.tmp'
+    with open(file_path_tmp, 'w') as file_handle:
+        json.dump(cache_manifest, file_handle, indent=2)
+    os.replace(file_path_tmp, file_path_manifest)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to remove a cache entry (workspace folder or pickle file of the previous releases)
+def delete_cache_entry(file_path_entry):
+    if os.path.isdir(file_path_entry):
+        shutil.rmtree(file_path_entry, ignore_errors=True)
+    elif os.path.exists(file_path_entry):
+        os.remove(file_path_entry)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to read the status of the output file(s) of a cache entry (empty for entries without outputs)
+def read_cache_outputs(file_path_entry):
+
+    file_path_outputs = os.path.join(file_path_entry, cache_outputs_name)
+    if not os.path.isfile(file_path_outputs):
+        return []
+    try:
+        with open(file_path_outputs, 'r') as file_handle:
+            return [list(file_status) for file_status in json.load(file_handle)]
+    except (OSError, ValueError):
+        return []
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to read a cache entry (None if the entry is not available or not readable)
+# (workspace entries are read with the metadata; arrays are memory-mapped and loaded on access)
+def read_cache_obj(file_path, cache_key):
+
+    file_path_entry = define_cache_entry(file_path, cache_key)
+    if not os.path.exists(file_path_entry):
+        return None
+
+    # check the output file(s) written by the stage (a stage restored from the cache does not write them again)
+    cache_outputs = read_cache_outputs(file_path_entry)
+    if cache_outputs:
+        cache_outputs_now = get_cache_files_status([file_status[0] for file_status in cache_outputs])
+        if cache_outputs_now != cache_outputs:
+            log_stream.warning(' ===> Cache entry ' + file_path_entry + ' is not valid [output file(s) removed or '
+                               'changed]. Entry will be removed')
+            delete_cache_entry(file_path_entry)
+            return None
+
+    try:
+        if os.path.isdir(file_path_entry):
+            cache_data = read_workspace_data(file_path_entry)
+        else:
+            with open(file_path_entry, 'rb') as file_handle:
+                cache_data = pickle.load(file_handle)
+    except (OSError, EOFError, ValueError, KeyError, NotImplementedError,
+            pickle.UnpicklingError, AttributeError, ImportError) as cache_error:
+        log_stream.warning(' ===> Cache entry ' + file_path_entry + ' is not readable [' + str(cache_error) +
+                           ']. Entry will be removed')
+        delete_cache_entry(file_path_entry)
+        return None
+
+    # update access time for the eviction policy
+    os.utime(file_path_entry, None)
+    set_cache_key(file_path, cache_key, cache_outputs=cache_outputs)
+
+    return cache_data
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to write a cache entry (written in a temporary workspace folder and moved to avoid partial entries)
+# (the status of the output file(s) written by the stage is stored with the entry and checked on read)
+def write_cache_obj(file_path, cache_key, cache_data, cache_outputs=None):
+
+    file_path_entry = define_cache_entry(file_path, cache_key)
+    file_path_tmp = file_path_entry + '.' + str(os.getpid()) + '.tmp'
+
+    delete_cache_entry(file_path_tmp)
+    write_workspace_data(file_path_tmp, cache_data)
+
+    cache_outputs_status = get_cache_files_status(cache_outputs) if cache_outputs is not None else []
+    with open(os.path.join(file_path_tmp, cache_outputs_name), 'w') as file_handle:
+        json.dump(cache_outputs_status, file_handle)
+
+    delete_cache_entry(file_path_entry)
+    os.replace(file_path_tmp, file_path_entry)
+
+    set_cache_key(file_path, cache_key, cache_outputs=cache_outputs_status)
+
+    return file_path_entry
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to remove all the entries of a stage
+def remove_cache_obj(file_path):
+
+    folder_name, file_name = os.path.split(file_path)
+    file_root, file_ext = os.path.splitext(file_name)
+
+    if os.path.exists(file_path):
+        os.remove(file_path)
+    if os.path.exists(file_path + cache_manifest_ext):
+        os.remove(file_path + cache_manifest_ext)
+
+    if folder_name and os.path.isdir(folder_name):
+        with os.scandir(folder_name) as folder_handle:
+            for entry_step in folder_handle:
+                entry_match = cache_entry_pattern.match(entry_step.name)
+                if entry_match and entry_match.group('root') == file_root and \
+                        (entry_match.group('ext') or '') == file_ext:
+                    delete_cache_entry(entry_step.path)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to evict the cache entries of a folder by age [hours] and total size [MB]
+def clean_cache_obj(folder_name, cache_age_max=None, cache_size_max=None):
+
+    if (folder_name is None) or (not os.path.isdir(folder_name)):
+        return []
+
+    time_now = time.time()
+
+    entry_list = []
+    with os.scandir(folder_name) as folder_handle:
+        for entry_step in folder_handle:
+            if cache_entry_pattern.match(entry_step.name):
+                entry_stat = entry_step.stat()
+                if entry_step.is_dir():
+                    entry_list.append([entry_step.path, entry_stat.st_mtime, get_workspace_size(entry_step.path)])
+                elif entry_step.is_file():
+                    entry_list.append([entry_step.path, entry_stat.st_mtime, entry_stat.st_size])
+
+    entry_removed = []
+    if cache_age_max is not None:
+        for entry_path, entry_time, entry_size in list(entry_list):
+            if (time_now - entry_time) > (cache_age_max * 3600.0):
+                delete_cache_entry(entry_path)
+                entry_removed.append(entry_path)
+                entry_list.remove([entry_path, entry_time, entry_size])
+
+    if cache_size_max is not None:
+        entry_list = sorted(entry_list, key=lambda entry: entry[1])
+        cache_size = sum([entry[2] for entry in entry_list])
+        while entry_list and (cache_size > (cache_size_max * 1024.0 * 1024.0)):
+            entry_path, entry_time, entry_size = entry_list.pop(0)
+            delete_cache_entry(entry_path)
+            entry_removed.append(entry_path)
+            cache_size -= entry_size
+
+    for entry_path in entry_removed:
+        log_stream.info(' ------> Evict cache entry ' + entry_path + ' ... DONE')
+
+    return entry_removed
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to get the eviction settings of the cache (age in hours, size in MB)
+def get_cache_settings(obj_flags, tag_cache_age='cache_ancillary_data_age', tag_cache_size='cache_ancillary_data_size',
+                       cache_age_default=168, cache_size_default=4096):
+
+    if tag_cache_age in list(obj_flags.keys()):
+        cache_age_max = obj_flags[tag_cache_age]
+    else:
+        cache_age_max = cache_age_default
+
+    if tag_cache_size in list(obj_flags.keys()):
+        cache_size_max = obj_flags[tag_cache_size]
+    else:
+        cache_size_max = cache_size_default
+
+    return cache_age_max, cache_size_max
+# -------------------------------------------------------------------------------------
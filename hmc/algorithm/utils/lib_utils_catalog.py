@@ -0,0 +1,207 @@
+"""
+Library Features:
+
+Name:          lib_utils_catalog
+Author(s):     Fabio Delogu (fabio.delogu@cimafoundation.org)
+Date:          '20261018'
+Version:       '3.1.6'
+"""
+
+#######################################################################################
+# Library
+import logging
+import os
+import stat
+import json
+import threading
+
+from hmc.algorithm.default.lib_default_args import logger_name
+
+# Logging
+log_stream = logging.getLogger(logger_name)
+
+# Catalog settings (folders are listed once per run; listings are stored in memory and, if defined, in the
+# catalog file and reused in the next runs while the folder mtime is not changed)
+catalog_obj = {'active': False, 'roots': [], 'file': None, 'folders': {}, 'updated': False}
+catalog_lock = threading.RLock()
+
+# Debug
+# import matplotlib.pylab as plt
+#######################################################################################
+
+
+# -------------------------------------------------------------------------------------
+# Method to activate the catalog (root folders of the archives and file of the persisted index)
+def set_catalog(catalog_active=True, catalog_file=None):
+
+    with catalog_lock:
+        catalog_obj['active'] = catalog_active
+        if catalog_file is not None and catalog_file != catalog_obj['file']:
+            catalog_obj['file'] = catalog_file
+            catalog_obj['folders'].update(read_catalog(catalog_file))
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to add the root folder(s) of the archives (defined by the static part of the folder templates)
+def add_catalog_root(folder_name_list):
+
+    if not isinstance(folder_name_list, list):
+        folder_name_list = [folder_name_list]
+
+    with catalog_lock:
+        for folder_name_raw in folder_name_list:
+            if (folder_name_raw is None) or (not isinstance(folder_name_raw, str)):
+                continue
+            folder_root = folder_name_raw.split('{')[0]
+            if '{' in folder_name_raw:
+                folder_root = os.path.dirname(folder_root)
+            folder_root = os.path.normpath(folder_root)
+            if folder_root in ['', '.', os.sep]:
+                continue
+            if folder_root not in catalog_obj['roots']:
+                catalog_obj['roots'].append(folder_root)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to check if a file is managed by the catalog
+def check_catalog_root(file_path):
+
+    if (not catalog_obj['active']) or (not catalog_obj['roots']):
+        return False
+
+    file_path = os.path.normpath(file_path)
+    for folder_root in catalog_obj['roots']:
+        if file_path.startswith(folder_root + os.sep):
+            return True
+    return False
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to read the persisted catalog
+def read_catalog(catalog_file):
+
+    if (catalog_file is None) or (not os.path.exists(catalog_file)):
+        return {}
+    try:
+        with open(catalog_file, 'r') as file_handle:
+            catalog_data = json.load(file_handle)
+        catalog_folders = {folder_name: {'mtime': folder_entry['mtime'], 'files': folder_entry['files']}
+                           for folder_name, folder_entry in catalog_data.items()}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        log_stream.warning(' ===> Catalog file ' + catalog_file + ' is not readable. Catalog will be rebuilt')
+        catalog_folders = {}
+
+    return catalog_folders
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to write the persisted catalog (only if some folders were scanned)
+def write_catalog():
+
+    with catalog_lock:
+        catalog_file = catalog_obj['file']
+        if (catalog_file is None) or (not catalog_obj['updated']):
+            return
+        catalog_folders = {folder_name: {'mtime': folder_entry['mtime'], 'files': folder_entry['files']}
+                           for folder_name, folder_entry in catalog_obj['folders'].items()
+                           if folder_entry['mtime'] is not None}
+        catalog_obj['updated'] = False
+
+    catalog_folder = os.path.dirname(catalog_file)
+    if catalog_folder:
+        os.makedirs(catalog_folder, exist_ok=True)
+    catalog_file_tmp = catalog_file + '.' + str(os.getpid()) + '.tmp'
+    with open(catalog_file_tmp, 'w') as file_handle:
+        json.dump(catalog_folders, file_handle)
+    os.replace(catalog_file_tmp, catalog_file)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to scan a folder (files are listed with size and mtime; missing folder gives an empty listing)
+def scan_catalog_folder(folder_name):
+
+    try:
+        folder_mtime = os.stat(folder_name).st_mtime_ns
+    except OSError:
+        return {'mtime': None, 'files': {}}
+
+    folder_files = {}
+    try:
+        with os.scandir(folder_name) as folder_handle:
+            for entry_step in folder_handle:
+                try:
+                    if entry_step.is_file():
+                        entry_stat = entry_step.stat()
+                        folder_files[entry_step.name] = [entry_stat.st_size, entry_stat.st_mtime_ns]
+                except OSError:
+                    continue
+    except OSError:
+        return {'mtime': None, 'files': {}}
+
+    return {'mtime': folder_mtime, 'files': folder_files}
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to get the listing of a folder (from memory, from the persisted catalog if still valid or scanned)
+def get_catalog_folder(folder_name):
+
+    with catalog_lock:
+        folder_entry = catalog_obj['folders'].get(folder_name, None)
+        if (folder_entry is not None) and folder_entry.get('checked', False):
+            return folder_entry
+
+        if folder_entry is not None:
+            try:
+                folder_mtime = os.stat(folder_name).st_mtime_ns
+            except OSError:
+                folder_mtime = None
+            if (folder_mtime is not None) and (folder_mtime == folder_entry['mtime']):
+                folder_entry['checked'] = True
+                return folder_entry
+
+        folder_entry = scan_catalog_folder(folder_name)
+        folder_entry['checked'] = True
+        catalog_obj['folders'][folder_name] = folder_entry
+        catalog_obj['updated'] = True
+
+    return folder_entry
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to get the info of a file [size, mtime] (None if the file is not available)
+def get_catalog_info(file_path):
+
+    if not check_catalog_root(file_path):
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(file_stat.st_mode):
+            return None
+        return [file_stat.st_size, file_stat.st_mtime_ns]
+
+    folder_name, file_name = os.path.split(os.path.normpath(file_path))
+    folder_entry = get_catalog_folder(folder_name)
+
+    return folder_entry['files'].get(file_name, None)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to check if a file is available (answered by the catalog for the archive folders)
+def check_catalog_file(file_path):
+
+    if not file_path:
+        return False
+    if not check_catalog_root(file_path):
+        return os.path.exists(file_path)
+
+    return get_catalog_info(file_path) is not None
+# -------------------------------------------------------------------------------------
@@ -10,9 +10,10 @@ Version:       '3.0.0'
 #################################################################################
 # Libraries
 import logging
-import pyproj
+import os
+import hashlib
+import threading
 
-from pysheds.grid import Grid
 import numpy as np
 import xarray as xr
 
@@ -21,79 +22,243 @@ from hmc.algorithm.default.lib_default_args import logger_name
 # Logging
 log_stream = logging.getLogger(logger_name)
 
+# Section labels workspace (in-memory cache shared by the threads; file cache in the ancillary folder)
+section_file_template = 'hmc_section_labels_{key}.npz'
+section_key_length = 16
+section_obj_cache = {}
+section_obj_lock = threading.Lock()
+
+# Flow directions steps (row, col) ordered as the default map [N, NE, E, SE, S, SW, W, NW]
+fdir_map_default = [8, 9, 6, 3, 2, 1, 4, 7]
+fdir_steps_default = [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)]
+
 # Debug
-import matplotlib.pylab as plt
+# import matplotlib.pylab as plt
 #################################################################################
 
 
 # --------------------------------------------------------------------------------
 # Method to define section mask
-def compute_section_mask(fdir_values, fdir_map=None, fdir_nodata=0, geo_reference=None, section_reference=None):
+def compute_section_mask(fdir_values, fdir_map=None, fdir_nodata=0, geo_reference=None, section_reference=None,
+                         mask_path=None):
 
     if fdir_map is None:
-        fdir_map = [8, 9, 6, 3, 2, 1, 4, 7]
+        fdir_map = fdir_map_default
 
     geo_values = geo_reference['values']
     geo_longitude = geo_reference['longitude']
-    geo_latitude = geo_reference['latitude']
-    geo_transform = geo_reference['transform']
-    geo_crs = geo_reference['crs']
-
-    mask_values = np.zeros([fdir_values.shape[0], fdir_values.shape[1]], dtype=bool)
-    mask_values[:, :] = True
-
-    grid = Grid()
-    grid.add_gridded_data(data=fdir_values, data_name='fdir',
-                          affine=geo_transform,
-                          crs=pyproj.Proj(geo_crs),
-                          nodata=fdir_nodata)
-    grid.add_gridded_data(data=mask_values, data_name='mask',
-                          affine=geo_transform,
-                          crs=pyproj.Proj(geo_crs),
-                          nodata=False)
+    geo_latitude = np.flipud(geo_reference['latitude'])
 
-    section_obj = {}
+    fdir_values = np.asarray(fdir_values)
+    fdir_rows, fdir_cols = fdir_values.shape[0], fdir_values.shape[1]
+
+    section_tags, section_cells = [], []
     for section_tag, section_fields in section_reference.items():
         section_idx_ji = section_fields['section_idx_ji']
-        section_j = section_idx_ji[0] - 1
-        section_i = section_idx_ji[1] - 1
-        section_mask = 'section_mask'
+        section_j = int(section_idx_ji[0]) - 1
+        section_i = int(section_idx_ji[1]) - 1
 
-        try:
-            grid.catchment(data=grid.fdir, x=section_i, y=section_j,
-                           dirmap=fdir_map, out_name=section_mask,
-                           recursionlimit=15000, nodata_out=0, ytype='index')
-            section_mask = np.array(grid.section_mask).astype(np.float32)
+        if (section_j < 0) or (section_j >= fdir_rows) or (section_i < 0) or (section_i >= fdir_cols):
+            log_stream.error(' ===> Compute mask for point "' + section_tag + ' failed unexpectedly.')
+            log_stream.error(' ===> Error occurred in compute_section_mask function "Point (' +
+                             str(section_j + 1) + ',' + str(section_i + 1) + ') is outside the domain"')
+            raise IOError('Point to compute mask is not correct. Check your (j,i).')
 
-            section_mask[section_mask == 0] = 0
-            section_mask[geo_values < 0] = 0
-            section_mask[section_mask >= 1] = 1
+        section_tags.append(section_tag)
+        section_cells.append(section_j * fdir_cols + section_i)
 
-            geo_latitude = np.flipud(geo_latitude)
+    # all the sections are labelled in a single pass over the flow directions
+    section_obj_labels = get_section_labels(fdir_values, section_cells, fdir_map=fdir_map, mask_path=mask_path)
+    section_labels = section_obj_labels['label'].ravel()
+    section_nodes = section_obj_labels['node']
+    section_tree = compute_section_tree(section_obj_labels['parent'])
 
-            section_da = create_darray_2d(section_mask, geo_longitude, geo_latitude,
-                                          coord_name_x='Longitude', coord_name_y='Latitude',
-                                          dim_name_x='west_east', dim_name_y='south_north',
-                                          dims_order=['south_north', 'west_east'])
-            # DEBUG
-            # plt.figure()
-            # plt.imshow(section_da.values)
-            # plt.show()
+    section_obj = {}
+    for section_tag, section_node in zip(section_tags, section_nodes):
 
-            section_obj[section_tag] = {}
-            section_obj[section_tag] = section_da
+        section_mask = np.isin(section_labels, section_tree[section_node]).reshape(fdir_values.shape)
+        section_mask = section_mask.astype(np.float32)
 
-        except BaseException as base_exc:
+        if not section_mask.any():
+            log_stream.warning(' ===> Mask for point "' + section_tag + '" is empty. Check the flow directions '
+                               'around the point (loop or no data)')
 
-            log_stream.error(' ===> Compute mask for point "' + section_tag + ' failed unexpectedly.')
-            log_stream.error(' ===> Error occurred in compute_section_mask function "' + str(base_exc) + '"')
-            raise IOError('Point to compute mask is not correct. Check your (j,i).')
+        section_mask[geo_values < 0] = 0
+
+        section_da = create_darray_2d(section_mask, geo_longitude, geo_latitude,
+                                      coord_name_x='Longitude', coord_name_y='Latitude',
+                                      dim_name_x='west_east', dim_name_y='south_north',
+                                      dims_order=['south_north', 'west_east'])
+        # DEBUG
+        # plt.figure()
+        # plt.imshow(section_da.values)
+        # plt.show()
+
+        section_obj[section_tag] = section_da
 
     return section_obj
 
 # --------------------------------------------------------------------------------
 
 
+# --------------------------------------------------------------------------------
+# Method to compute the key of the section labels (flow directions, map and section cells)
+def compute_section_key(fdir_values, section_cells, fdir_map=None):
+
+    if fdir_map is None:
+        fdir_map = fdir_map_default
+
+    fdir_values = np.ascontiguousarray(fdir_values)
+
+    section_hash = hashlib.sha1(str(fdir_values.shape).encode('utf-8'))
+    section_hash.update(fdir_values.dtype.str.encode('utf-8'))
+    section_hash.update(fdir_values.tobytes())
+    section_hash.update(str([int(fdir_code) for fdir_code in fdir_map]).encode('utf-8'))
+    section_hash.update(np.asarray(section_cells, dtype=np.int64).tobytes())
+
+    return section_hash.hexdigest()
+# --------------------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------------------
+# Method to compute the downstream cell of each cell (flat index; -1 for outlet, no data or out of domain)
+def compute_fdir_downstream(fdir_values, fdir_map=None):
+
+    if fdir_map is None:
+        fdir_map = fdir_map_default
+
+    fdir_rows, fdir_cols = fdir_values.shape[0], fdir_values.shape[1]
+    fdir_flat = np.asarray(fdir_values).ravel()
+
+    fdir_downstream = np.full(fdir_flat.shape[0], -1, dtype=np.int64)
+    for fdir_code, (step_row, step_col) in zip(fdir_map, fdir_steps_default):
+
+        cell_idx = np.flatnonzero(fdir_flat == fdir_code)
+        cell_row = cell_idx // fdir_cols + step_row
+        cell_col = cell_idx % fdir_cols + step_col
+
+        cell_valid = (cell_row >= 0) & (cell_row < fdir_rows) & (cell_col >= 0) & (cell_col < fdir_cols)
+        fdir_downstream[cell_idx[cell_valid]] = cell_row[cell_valid] * fdir_cols + cell_col[cell_valid]
+
+    return fdir_downstream
+# --------------------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------------------
+# Method to compute the section labels in a single upstream pass (iterative, level by level from the outlets)
+# (each cell gets the label of the first section met along its downstream path; -1 if no section is met;
+# the parent of a section is the label of its downstream cell, i.e. the first section downstream)
+def compute_section_labels(fdir_values, section_cells, fdir_map=None):
+
+    fdir_downstream = compute_fdir_downstream(fdir_values, fdir_map=fdir_map)
+    cell_n = fdir_downstream.shape[0]
+
+    # sections defined on the same cell share the node
+    section_cells_unique, section_nodes = np.unique(np.asarray(section_cells, dtype=np.int64), return_inverse=True)
+    section_n = section_cells_unique.shape[0]
+
+    label_dtype = np.int16 if section_n < np.iinfo(np.int16).max else np.int32
+
+    cell_node = np.full(cell_n, -1, dtype=label_dtype)
+    cell_node[section_cells_unique] = np.arange(section_n, dtype=label_dtype)
+
+    # upstream cells of each cell (compressed rows ordered by downstream cell)
+    cell_linked = np.flatnonzero(fdir_downstream >= 0)
+    upstream_idx = cell_linked[np.argsort(fdir_downstream[cell_linked], kind='stable')]
+    upstream_ptr = np.zeros(cell_n + 1, dtype=np.int64)
+    upstream_ptr[1:] = np.cumsum(np.bincount(fdir_downstream[cell_linked], minlength=cell_n))
+
+    # walk upstream from the outlets (each cell has one downstream cell, so it is visited once;
+    # cells on a flow loop are never reached and keep the -1 label)
+    cell_label = np.full(cell_n, -1, dtype=label_dtype)
+    cell_front = np.flatnonzero(fdir_downstream < 0)
+    cell_label[cell_front] = cell_node[cell_front]
+    while cell_front.shape[0] > 0:
+
+        upstream_count = upstream_ptr[cell_front + 1] - upstream_ptr[cell_front]
+        upstream_total = int(upstream_count.sum())
+        if upstream_total == 0:
+            break
+
+        upstream_offset = np.arange(upstream_total, dtype=np.int64) - np.repeat(
+            np.cumsum(upstream_count) - upstream_count, upstream_count)
+        cell_upstream = upstream_idx[np.repeat(upstream_ptr[cell_front], upstream_count) + upstream_offset]
+
+        node_upstream = cell_node[cell_upstream]
+        cell_label[cell_upstream] = np.where(
+            node_upstream >= 0, node_upstream, np.repeat(cell_label[cell_front], upstream_count))
+
+        cell_front = cell_upstream
+
+    section_downstream = fdir_downstream[section_cells_unique]
+    section_parent = np.where(section_downstream >= 0, cell_label[np.maximum(section_downstream, 0)], -1)
+
+    section_obj = {'label': cell_label.reshape(fdir_values.shape[0], fdir_values.shape[1]),
+                   'cell': section_cells_unique, 'parent': section_parent.astype(np.int32),
+                   'node': section_nodes.astype(np.int32)}
+
+    return section_obj
+# --------------------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------------------
+# Method to compute the nodes drained by each section node (the node itself and the nested sections)
+def compute_section_tree(section_parent):
+
+    section_n = section_parent.shape[0]
+    section_tree = [[section_node] for section_node in range(section_n)]
+    for section_node in range(section_n):
+        section_up = int(section_parent[section_node])
+        section_step = 0
+        while (section_up >= 0) and (section_step < section_n):
+            section_tree[section_up].append(section_node)
+            section_up = int(section_parent[section_up])
+            section_step += 1
+
+    return [np.asarray(section_nodes, dtype=np.int32) for section_nodes in section_tree]
+# --------------------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------------------
+# Method to get the section labels (from memory, from the file in the ancillary folder or computed)
+def get_section_labels(fdir_values, section_cells, fdir_map=None, mask_path=None):
+
+    section_key = compute_section_key(fdir_values, section_cells, fdir_map=fdir_map)
+
+    with section_obj_lock:
+        if section_key in section_obj_cache:
+            return section_obj_cache[section_key]
+
+    section_file = None
+    if mask_path is not None:
+        section_file = os.path.join(mask_path, section_file_template.format(key=section_key[:section_key_length]))
+
+    section_obj = None
+    if (section_file is not None) and os.path.exists(section_file):
+        try:
+            with np.load(section_file, allow_pickle=False) as section_data:
+                section_obj = {section_name: section_data[section_name] for section_name in section_data.files}
+        except (OSError, ValueError, KeyError) as section_error:
+            log_stream.warning(' ===> Section labels ' + section_file + ' are not readable [' +
+                               str(section_error) + ']. Labels will be computed')
+            section_obj = None
+
+    if section_obj is None:
+        section_obj = compute_section_labels(fdir_values, section_cells, fdir_map=fdir_map)
+
+        if section_file is not None:
+            os.makedirs(mask_path, exist_ok=True)
+            section_file_tmp = section_file + '.' + str(os.getpid()) + '.tmp.npz'
+            np.savez_compressed(section_file_tmp, **section_obj)
+            os.replace(section_file_tmp, section_file)
+
+    with section_obj_lock:
+        section_obj_cache[section_key] = section_obj
+
+    return section_obj
+# --------------------------------------------------------------------------------
+
+
 # -------------------------------------------------------------------------------------
 # Method to create a data array
 def create_darray_2d(data, geo_x, geo_y, geo_1d=True, time=None,
@@ -266,3 +431,37 @@ def clip_map(map, valid_range=None, missing_value=None):
         return map
 
 # -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to compute the rows and columns window of a grid covering a bounding box [left, bottom, right, top]
+# (window is extended by a margin of cells; None if the grid does not intersect the bounding box)
+def compute_bbox_window(geo_x, geo_y, bbox, bbox_margin=2):
+
+    geo_x, geo_y = np.asarray(geo_x), np.asarray(geo_y)
+    if (geo_x.ndim == 1) and (geo_y.ndim == 1):
+        geo_x_2d, geo_y_2d = geo_x[np.newaxis, :], geo_y[:, np.newaxis]
+    else:
+        geo_x_2d, geo_y_2d = geo_x, geo_y
+
+    # bounding box is extended by one cell to select the cells with centers outside and edges inside
+    step_x = np.nanmax(np.abs(np.diff(geo_x_2d, axis=1))) if geo_x_2d.shape[1] > 1 else 0.0
+    step_y = np.nanmax(np.abs(np.diff(geo_y_2d, axis=0))) if geo_y_2d.shape[0] > 1 else 0.0
+
+    bbox_left, bbox_bottom = bbox[0] - step_x, bbox[1] - step_y
+    bbox_right, bbox_top = bbox[2] + step_x, bbox[3] + step_y
+    bbox_mask = (geo_x_2d >= bbox_left) & (geo_x_2d <= bbox_right) & \
+                (geo_y_2d >= bbox_bottom) & (geo_y_2d <= bbox_top)
+    bbox_mask = np.broadcast_to(bbox_mask, np.broadcast(geo_x_2d, geo_y_2d).shape)
+
+    rows_idx = np.flatnonzero(bbox_mask.any(axis=1))
+    cols_idx = np.flatnonzero(bbox_mask.any(axis=0))
+    if (rows_idx.size == 0) or (cols_idx.size == 0):
+        return None
+
+    rows_n, cols_n = bbox_mask.shape
+    rows_slice = slice(max(rows_idx[0] - bbox_margin, 0), min(rows_idx[-1] + bbox_margin + 1, rows_n))
+    cols_slice = slice(max(cols_idx[0] - bbox_margin, 0), min(cols_idx[-1] + bbox_margin + 1, cols_n))
+
+    return rows_slice, cols_slice
+# -------------------------------------------------------------------------------------
@@ -0,0 +1,77 @@
+"""
+Library Features:
+
+Name:          lib_utils_import
+Author(s):     Fabio Delogu (fabio.delogu@cimafoundation.org)
+Date:          '20261018'
+Version:       '3.1.6'
+"""
+
+#######################################################################################
+# Library
+import sys
+import threading
+import importlib
+import importlib.util
+
+# Lock to create the lazy modules (a module is created once also if requested by more threads)
+import_lock = threading.Lock()
+# Lock to load the lazy modules (the lazy loader is not thread-safe; the first access must be serialized)
+import_load_lock = threading.RLock()
+
+# Debug
+# import matplotlib.pylab as plt
+#######################################################################################
+
+
+# -------------------------------------------------------------------------------------
+# Method to import a module at the first access of one of its attributes
+# (the parent packages of a submodule are imported when the module is defined)
+def import_lazy(module_name):
+
+    with import_lock:
+
+        if module_name in sys.modules:
+            return sys.modules[module_name]
+
+        module_spec = importlib.util.find_spec(module_name)
+        if module_spec is None:
+            raise ImportError('Module "' + module_name + '" is not available')
+
+        module_loader = importlib.util.LazyLoader(module_spec.loader)
+        module_spec.loader = module_loader
+        module_obj = importlib.util.module_from_spec(module_spec)
+        sys.modules[module_name] = module_obj
+        module_loader.exec_module(module_obj)
+
+    return module_obj
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to check if a module is already imported (without triggering the import of a lazy module)
+def check_import(module_name):
+    module_obj = sys.modules.get(module_name, None)
+    if module_obj is None:
+        return False
+    return type(module_obj).__name__ != '_LazyModule'
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to load the lazy module(s) before starting the threads that use them
+# (the import is executed once in the calling thread; modules not available are skipped)
+def import_load(module_list):
+
+    if isinstance(module_list, str):
+        module_list = [module_list]
+
+    for module_name in module_list:
+        module_obj = sys.modules.get(module_name, None)
+        if (module_obj is None) or check_import(module_name):
+            continue
+        with import_load_lock:
+            if not check_import(module_name):
+                # the first attribute access executes the module
+                getattr(module_obj, '__dict__')
+# -------------------------------------------------------------------------------------
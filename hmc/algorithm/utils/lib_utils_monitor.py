@@ -0,0 +1,287 @@
+"""
+Library Features:
+
+Name:          lib_utils_monitor
+Author(s):     Fabio Delogu (fabio.delogu@cimafoundation.org)
+Date:          '20261018'
+Version:       '3.1.6'
+"""
+
+#######################################################################################
+# Library
+import logging
+import os
+import json
+import time
+import threading
+import functools
+
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from hmc.algorithm.default.lib_default_args import logger_name
+from hmc.version import version as hmc_version
+
+# Logging
+log_stream = logging.getLogger(logger_name)
+
+# Monitor workspace (spans are collected by all the threads of the process; spans of the worker processes are lost)
+monitor_obj = {'active': False, 'time_origin': None, 'time_start': None, 'spans': []}
+monitor_lock = threading.Lock()
+monitor_stack = threading.local()
+
+# Monitor process files (linux)
+file_proc_status = '/proc/self/status'
+file_proc_io = '/proc/self/io'
+
+# Debug
+# import matplotlib.pylab as plt
+#######################################################################################
+
+
+# -------------------------------------------------------------------------------------
+# Method to set the monitor (spans collected before are removed)
+def set_monitor(monitor_active=True):
+    with monitor_lock:
+        monitor_obj['active'] = monitor_active
+        monitor_obj['time_origin'] = time.perf_counter()
+        monitor_obj['time_start'] = time.time()
+        monitor_obj['spans'] = []
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to check the monitor status
+def check_monitor():
+    return monitor_obj['active']
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to get the memory info of the process [MB] (current and peak rss)
+def get_process_memory():
+
+    memory_obj = {'rss': None, 'rss_peak': None}
+    try:
+        with open(file_proc_status, 'r') as file_handle:
+            for file_line in file_handle:
+                if file_line.startswith('VmRSS:'):
+                    memory_obj['rss'] = int(file_line.split()[1]) / 1024.0
+                elif file_line.startswith('VmHWM:'):
+                    memory_obj['rss_peak'] = int(file_line.split()[1]) / 1024.0
+    except (OSError, ValueError, IndexError):
+        pass
+
+    if (memory_obj['rss_peak'] is None) and (resource is not None):
+        memory_obj['rss_peak'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+    return memory_obj
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to get the i/o counters of the process [bytes]
+# (read/write are the bytes of the system calls; storage_read/storage_write are the bytes of the storage)
+def get_process_io():
+
+    io_obj = {'read': 0, 'write': 0, 'storage_read': 0, 'storage_write': 0}
+    io_lut = {'rchar': 'read', 'wchar': 'write', 'read_bytes': 'storage_read', 'write_bytes': 'storage_write'}
+    try:
+        with open(file_proc_io, 'r') as file_handle:
+            for file_line in file_handle:
+                io_key, io_value = file_line.split(':')
+                if io_key in io_lut:
+                    io_obj[io_lut[io_key]] = int(io_value)
+    except (OSError, ValueError):
+        pass
+
+    return io_obj
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to get the cpu time of the children processes (model runs and process pools) [seconds]
+def get_children_cpu():
+    if resource is None:
+        return 0.0
+    usage_obj = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage_obj.ru_utime + usage_obj.ru_stime
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to monitor a span (wall time, cpu time, peak rss delta and bytes read/written by the process)
+# (cpu time and bytes are counters of the process: spans running concurrently in threads share them)
+@contextmanager
+def monitor_span(span_name, span_group='stage', **span_args):
+
+    if not monitor_obj['active']:
+        yield None
+        return
+
+    if not hasattr(monitor_stack, 'spans'):
+        monitor_stack.spans = []
+    span_parent = monitor_stack.spans[-1] if monitor_stack.spans else None
+    monitor_stack.spans.append(span_name)
+
+    memory_start = get_process_memory()
+    io_start = get_process_io()
+    time_cpu_children_start = get_children_cpu()
+    time_cpu_start = time.process_time()
+    time_start = time.perf_counter()
+
+    span_status = 'done'
+    try:
+        yield span_args
+    except BaseException:
+        span_status = 'failed'
+        raise
+    finally:
+        time_end = time.perf_counter()
+        time_cpu_end = time.process_time()
+        time_cpu_children_end = get_children_cpu()
+        io_end = get_process_io()
+        memory_end = get_process_memory()
+
+        monitor_stack.spans.pop()
+
+        rss_peak_delta = None
+        if (memory_start['rss_peak'] is not None) and (memory_end['rss_peak'] is not None):
+            rss_peak_delta = round(memory_end['rss_peak'] - memory_start['rss_peak'], 1)
+
+        span_obj = {
+            'name': span_name, 'group': span_group, 'parent': span_parent, 'status': span_status,
+            'thread': threading.current_thread().name, 'thread_id': threading.get_ident(),
+            'time_start': round(time_start - monitor_obj['time_origin'], 6),
+            'time_elapsed': round(time_end - time_start, 6),
+            'time_cpu': round(time_cpu_end - time_cpu_start, 6),
+            'time_cpu_children': round(time_cpu_children_end - time_cpu_children_start, 6),
+            'rss_start': round(memory_start['rss'], 1) if memory_start['rss'] is not None else None,
+            'rss_end': round(memory_end['rss'], 1) if memory_end['rss'] is not None else None,
+            'rss_peak': round(memory_end['rss_peak'], 1) if memory_end['rss_peak'] is not None else None,
+            'rss_peak_delta': rss_peak_delta,
+            'bytes_read': io_end['read'] - io_start['read'],
+            'bytes_written': io_end['write'] - io_start['write'],
+            'bytes_storage_read': io_end['storage_read'] - io_start['storage_read'],
+            'bytes_storage_written': io_end['storage_write'] - io_start['storage_write'],
+            'args': {arg_key: str(arg_value) for arg_key, arg_value in span_args.items()}}
+
+        with monitor_lock:
+            monitor_obj['spans'].append(span_obj)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to monitor a function or a class method (decorator)
+def monitor_method(span_name, span_group='stage'):
+    def monitor_decorator(method_fx):
+        @functools.wraps(method_fx)
+        def monitor_wrapper(*args, **kwargs):
+            if not monitor_obj['active']:
+                return method_fx(*args, **kwargs)
+            with monitor_span(span_name, span_group):
+                return method_fx(*args, **kwargs)
+        return monitor_wrapper
+    return monitor_decorator
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to summarize the spans by name (count, total times, max peak rss delta and total bytes)
+def summarize_monitor(span_list):
+
+    summary_obj = {}
+    for span_obj in span_list:
+        span_key = span_obj['name']
+        if span_key not in summary_obj:
+            summary_obj[span_key] = {
+                'group': span_obj['group'], 'count': 0, 'time_elapsed': 0.0, 'time_elapsed_max': 0.0,
+                'time_cpu': 0.0, 'time_cpu_children': 0.0, 'rss_peak_delta': None,
+                'bytes_read': 0, 'bytes_written': 0, 'bytes_storage_read': 0, 'bytes_storage_written': 0}
+        summary_step = summary_obj[span_key]
+        summary_step['count'] += 1
+        summary_step['time_elapsed'] += span_obj['time_elapsed']
+        summary_step['time_elapsed_max'] = max(summary_step['time_elapsed_max'], span_obj['time_elapsed'])
+        summary_step['time_cpu'] += span_obj['time_cpu']
+        summary_step['time_cpu_children'] += span_obj['time_cpu_children']
+        if span_obj['rss_peak_delta'] is not None:
+            summary_step['rss_peak_delta'] = max(summary_step['rss_peak_delta'] or 0.0, span_obj['rss_peak_delta'])
+        for summary_key in ['bytes_read', 'bytes_written', 'bytes_storage_read', 'bytes_storage_written']:
+            summary_step[summary_key] += span_obj[summary_key]
+
+    for summary_step in summary_obj.values():
+        for summary_key in ['time_elapsed', 'time_elapsed_max', 'time_cpu', 'time_cpu_children']:
+            summary_step[summary_key] = round(summary_step[summary_key], 3)
+
+    return summary_obj
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to get the monitor report
+def get_monitor_report(report_info=None):
+
+    with monitor_lock:
+        span_list = sorted(monitor_obj['spans'], key=lambda span_obj: span_obj['time_start'])
+
+    time_elapsed = None
+    if monitor_obj['time_origin'] is not None:
+        time_elapsed = round(time.perf_counter() - monitor_obj['time_origin'], 3)
+    time_start = None
+    if monitor_obj['time_start'] is not None:
+        time_start = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(monitor_obj['time_start']))
+
+    report_obj = {
+        'info': {**{'hmc_version': hmc_version, 'pid': os.getpid(), 'time_start': time_start,
+                    'time_elapsed': time_elapsed, 'rss_peak': get_process_memory()['rss_peak']},
+                 **(report_info if report_info is not None else {})},
+        'summary': summarize_monitor(span_list),
+        'spans': span_list}
+
+    return report_obj
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to write the monitor report in json format
+def write_monitor_report(file_name, report_obj, file_indent=2):
+
+    folder_name = os.path.dirname(file_name)
+    if folder_name and not os.path.exists(folder_name):
+        os.makedirs(folder_name)
+
+    with open(file_name, 'w') as file_handle:
+        json.dump(report_obj, file_handle, indent=file_indent)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to write the monitor spans in chrome trace-event format (complete events in microseconds)
+def write_monitor_trace(file_name, report_obj):
+
+    pid = report_obj['info']['pid']
+    trace_events = []
+    for thread_id, thread_name in {span_obj['thread_id']: span_obj['thread']
+                                   for span_obj in report_obj['spans']}.items():
+        trace_events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread_id,
+                             'args': {'name': thread_name}})
+
+    for span_obj in report_obj['spans']:
+        trace_args = {span_key: span_obj[span_key] for span_key in [
+            'status', 'time_cpu', 'time_cpu_children', 'rss_peak_delta', 'bytes_read', 'bytes_written']}
+        trace_events.append({
+            'name': span_obj['name'], 'cat': span_obj['group'], 'ph': 'X', 'pid': pid, 'tid': span_obj['thread_id'],
+            'ts': int(span_obj['time_start'] * 1000000), 'dur': int(span_obj['time_elapsed'] * 1000000),
+            'args': {**trace_args, **span_obj['args']}})
+
+    folder_name = os.path.dirname(file_name)
+    if folder_name and not os.path.exists(folder_name):
+        os.makedirs(folder_name)
+
+    with open(file_name, 'w') as file_handle:
+        json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, file_handle)
+# -------------------------------------------------------------------------------------
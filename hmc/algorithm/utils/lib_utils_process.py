@@ -9,12 +9,18 @@ Version:       '3.0.0'
 #######################################################################################
 # Library
 import logging
+import logging.handlers
+import os
+import shlex
 import subprocess
+import threading
 import time
 
+from collections import deque
 from os import stat, chmod
 
 from hmc.algorithm.default.lib_default_args import logger_name
+from hmc.algorithm.utils.lib_utils_monitor import monitor_method
 
 # Logging
 log_stream = logging.getLogger(logger_name)
@@ -24,6 +30,44 @@ log_stream = logging.getLogger(logger_name)
 #######################################################################################
 
 
+# -------------------------------------------------------------------------------------
+# Class of the transient process failures (time-out or killed by a signal; the run can be retried)
+class ProcessTransientError(RuntimeError):
+    pass
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to create the registry of the running processes (used to terminate them if the execution is aborted)
+def create_process_registry():
+    return {'lock': threading.Lock(), 'handles': {}, 'abort': False}
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to terminate the running processes of a registry (killed if still alive after the grace period)
+def terminate_process_registry(process_registry, time_grace=10.0):
+
+    with process_registry['lock']:
+        process_registry['abort'] = True
+        process_handles = list(process_registry['handles'].values())
+
+    for process_handle in process_handles:
+        if process_handle.poll() is None:
+            log_stream.warning(' ===> Terminate process ' + str(process_handle.pid))
+            process_handle.terminate()
+
+    time_end = time.time() + time_grace
+    for process_handle in process_handles:
+        try:
+            process_handle.wait(timeout=max(0.0, time_end - time.time()))
+        except subprocess.TimeoutExpired:
+            log_stream.warning(' ===> Kill process ' + str(process_handle.pid))
+            process_handle.kill()
+            process_handle.wait()
+# -------------------------------------------------------------------------------------
+
+
 # -------------------------------------------------------------------------------------
 # Method to make executable a bash file
 def make_process(file):
@@ -34,88 +78,200 @@ def make_process(file):
 
 
 # -------------------------------------------------------------------------------------
-# Method to execute process
-def exec_process(command_line=None, time_elapsed_min=1):
+# Method to drain a process stream (into a ring buffer and a rotating file)
+def drain_stream(stream_handle, stream_buffer, stream_logger=None, stream_tag='stdout'):
+    for stream_line in iter(stream_handle.readline, b''):
+        try:
+            stream_line = stream_line.decode('UTF-8').rstrip()
+        except UnicodeDecodeError:
+            stream_line = stream_line.decode('UTF-8', errors='replace').rstrip()
+        stream_buffer.append(stream_line)
+        if stream_logger is not None:
+            stream_logger.info('[' + stream_tag + '] ' + stream_line)
+    stream_handle.close()
+# -------------------------------------------------------------------------------------
 
-    try:
 
-        # Info command-line start
-        log_stream.info(' ------> Process execution: ' + command_line + ' ... ')
+# -------------------------------------------------------------------------------------
+# Method to create the rotating file of the process streams
+def create_stream_logger(file_stream, file_stream_size=10485760, file_stream_backup=3):
 
-        # Execute command-line
-        process_handle = subprocess.Popen(
-            command_line, shell=True,
-            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    folder_stream = os.path.dirname(file_stream)
+    if folder_stream and not os.path.exists(folder_stream):
+        os.makedirs(folder_stream)
 
-        # Read standard output
-        time_start_run = time.time()
-        while True:
-            string_out = process_handle.stdout.readline()
-            if isinstance(string_out, bytes):
-                try:
-                    string_out = string_out.decode('UTF-8')
-                except BaseException as BExp:
-                    log_stream.warning(' ===> StdOut returns some non-ascii character. Get exception: ' + str(BExp))
-                    log_stream.warning(' ===> Some string variables have a wrong initialization')
-                    string_out = string_out.strip()
-            else:
-                print(string_out)
-
-            if string_out == '' and process_handle.poll() is not None:
-
-                if process_handle.poll() == 0:
-                    log_stream.info(' -------> Process POOL = ' + str(process_handle.poll()) + ' KILLED!')
-                    break
+    # One logger for each stream file (reused by the runs; the handler is removed at the end of each run)
+    stream_logger = logging.getLogger('hmc_process.' + os.path.abspath(file_stream).replace('.', '_'))
+    stream_logger.setLevel(logging.INFO)
+    stream_logger.propagate = False
+
+    stream_handler = logging.handlers.RotatingFileHandler(
+        file_stream, maxBytes=file_stream_size, backupCount=file_stream_backup)
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+    stream_logger.addHandler(stream_handler)
+
+    return stream_logger, stream_handler
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to wait process (collecting the resource usage of the process if available)
+def wait_process(process_handle, time_out=None, time_poll=0.1):
+
+    time_start = time.time()
+    process_usage = None
+    while True:
+        if hasattr(os, 'wait4'):
+            try:
+                process_pid, process_status, process_usage = os.wait4(process_handle.pid, os.WNOHANG)
+            except ChildProcessError:
+                process_handle.wait()
+                return False, None
+            if process_pid != 0:
+                if hasattr(os, 'waitstatus_to_exitcode'):
+                    process_handle.returncode = os.waitstatus_to_exitcode(process_status)
+                elif os.WIFSIGNALED(process_status):
+                    process_handle.returncode = -os.WTERMSIG(process_status)
                 else:
-                    log_stream.error(' ===> Run failed! Check command-line settings!')
-                    raise RuntimeError('Error in executing process')
-            if string_out:
-                log_stream.info(str(string_out.strip()))
+                    process_handle.returncode = os.WEXITSTATUS(process_status)
+                return False, process_usage
+        elif process_handle.poll() is not None:
+            return False, None
 
-        # Collect stdout and stderr and exitcode
-        std_out, std_err = process_handle.communicate()
-        std_exit = process_handle.poll()
+        if (time_out is not None) and ((time.time() - time_start) > time_out):
+            return True, None
+        time.sleep(time_poll)
+# -------------------------------------------------------------------------------------
 
-        if std_out == b'' or std_out == '':
-            std_out = None
-        if std_err == b'' or std_err == '':
-            std_err = None
 
-        # Check stream process
-        stream_process(std_out, std_err)
+# -------------------------------------------------------------------------------------
+# Method to execute process
+@monitor_method('runner.exec_process', 'process')
+def exec_process(command_line=None, time_elapsed_min=None, time_out=None,
+                 file_stream=None, file_stream_size=10485760, file_stream_backup=3,
+                 stream_buffer_lines=200, process_env=None, process_registry=None):
+
+    # Info command-line start
+    log_stream.info(' ------> Process execution: ' + command_line + ' ... ')
+
+    stream_logger, stream_handler = None, None
+    if file_stream is not None:
+        stream_logger, stream_handler = create_stream_logger(
+            file_stream, file_stream_size=file_stream_size, file_stream_backup=file_stream_backup)
+
+    process_handle = None
+    try:
 
-        # Compute elapsed time run
-        time_elapsed_run = round(time.time() - time_start_run, 1)
+        # Execute command-line (no shell)
+        time_start_run = time.time()
+        if process_registry is not None:
+            process_registry['lock'].acquire()
+        try:
+            if (process_registry is not None) and process_registry['abort']:
+                log_stream.error(' ===> Process execution ABORTED! Execution is stopped')
+                raise RuntimeError('Process execution is aborted')
+            process_handle = subprocess.Popen(
+                shlex.split(command_line), shell=False, env=process_env,
+                stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            if process_registry is not None:
+                process_registry['handles'][process_handle.pid] = process_handle
+        finally:
+            if process_registry is not None:
+                process_registry['lock'].release()
 
-        if time_elapsed_run < time_elapsed_min:
-            log_stream.error(' ===> Process execution FAILED! Run time elapsed: ' + str(time_elapsed_run))
-            raise RuntimeError('Run execution is not correctly completed. '
-                               'Check your model version, namelist version, algorithm or datasets configurations')
+        # Drain standard output and standard error
+        std_out_buffer = deque(maxlen=stream_buffer_lines)
+        std_err_buffer = deque(maxlen=stream_buffer_lines)
+        std_out_thread = threading.Thread(
+            target=drain_stream, args=(process_handle.stdout, std_out_buffer, stream_logger, 'stdout'), daemon=True)
+        std_err_thread = threading.Thread(
+            target=drain_stream, args=(process_handle.stderr, std_err_buffer, stream_logger, 'stderr'), daemon=True)
+        std_out_thread.start()
+        std_err_thread.start()
 
-        # Info command-line end
-        log_stream.info(' ------> Process execution: ' + command_line + ' ... DONE')
-        return [std_out, std_err, std_exit]
+        # Wait process (and kill it if the time-out is reached)
+        process_timeout, process_usage = wait_process(process_handle, time_out=time_out)
+        if process_timeout:
+            log_stream.error(' ===> Process execution reached the time-out of ' + str(time_out) +
+                             ' seconds. Kill process ' + str(process_handle.pid))
+            process_handle.terminate()
+            try:
+                process_handle.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process_handle.kill()
+                process_handle.wait()
 
-    except subprocess.CalledProcessError:
-        # Exit code for process error
-        log_stream.error(' ===> Process execution FAILED! Errors in the called executable!')
-        raise RuntimeError('Errors in the called executable')
+        std_out_thread.join()
+        std_err_thread.join()
 
-    except OSError:
+    except OSError as os_error:
         # Exit code for os error
-        log_stream.error(' ===> Process execution FAILED!')
+        log_stream.error(' ===> Process execution FAILED! ' + str(os_error))
         raise RuntimeError('Executable not found!')
 
+    finally:
+        if stream_handler is not None:
+            stream_handler.close()
+            stream_logger.removeHandler(stream_handler)
+        if (process_registry is not None) and (process_handle is not None):
+            with process_registry['lock']:
+                process_registry['handles'].pop(process_handle.pid, None)
+
+    # Compute elapsed time run and memory peak [MB]
+    time_elapsed_run = round(time.time() - time_start_run, 1)
+    # (only the usage of this process is used; the usage of all the children would include the other runs)
+    memory_peak = None
+    if process_usage is not None:
+        memory_peak = round(process_usage.ru_maxrss / 1024.0, 1)
+
+    std_exit = process_handle.returncode
+    std_out = '\n'.join(std_out_buffer) if std_out_buffer else None
+    std_err = '\n'.join(std_err_buffer) if std_err_buffer else None
+
+    process_result = {'command_line': command_line, 'exit_code': std_exit, 'time_elapsed': time_elapsed_run,
+                      'time_out': process_timeout, 'memory_peak': memory_peak,
+                      'stdout_tail': std_out, 'stderr_tail': std_err, 'file_stream': file_stream}
+
+    log_stream.info(' -------> Process exit code: ' + str(std_exit) + ' - Time elapsed: ' + str(time_elapsed_run) +
+                    ' seconds - Memory peak: ' + str(memory_peak) + ' MB')
+
+    if process_timeout:
+        log_stream.error(' ===> Process execution FAILED! Time-out reached')
+        raise ProcessTransientError('Run execution is not completed in the expected time')
+    if (std_exit is not None) and (std_exit < 0):
+        log_stream.error(' ===> Process execution FAILED! Process killed by signal ' + str(-std_exit))
+        raise ProcessTransientError('Run execution is killed by a signal')
+    if std_exit != 0:
+        log_stream.error(' ===> Run failed! Check command-line settings! Exit code: ' + str(std_exit))
+        if std_err is not None:
+            log_stream.error(' ===> StdErr (tail): \n' + std_err)
+        raise RuntimeError('Error in executing process')
+
+    if (time_elapsed_min is not None) and (time_elapsed_run < time_elapsed_min):
+        log_stream.error(' ===> Process execution FAILED! Run time elapsed: ' + str(time_elapsed_run))
+        raise RuntimeError('Run execution is not correctly completed. '
+                           'Check your model version, namelist version, algorithm or datasets configurations')
+
+    # Check stream process
+    stream_process(std_exit, std_err)
+
+    # Info command-line end
+    log_stream.info(' ------> Process execution: ' + command_line + ' ... DONE')
+
+    return process_result
+
 # -------------------------------------------------------------------------------------
 
 
 # -------------------------------------------------------------------------------------
-# Method to stream process
-def stream_process(std_out=None, std_err=None):
+# Method to stream process (warning only for a non-zero exit code; standard error is also used by the model logs)
+def stream_process(std_exit=None, std_err=None):
 
-    if std_out is None and std_err is None:
+    if (std_exit is None) or (std_exit == 0):
+        if std_err is not None:
+            log_stream.info(' -------> Process standard error is not empty (exit code 0)')
         return True
     else:
-        log_stream.warning(' ===> Exception occurred during process execution!')
+        log_stream.warning(' ===> Exception occurred during process execution! Exit code: ' + str(std_exit))
         return False
 # -------------------------------------------------------------------------------------
@@ -0,0 +1,387 @@
+"""
+Library Features:
+
+Name:          lib_utils_regrid
+Author(s):     Fabio Delogu (fabio.delogu@cimafoundation.org)
+Date:          '20261018'
+Version:       '3.1.6'
+"""
+
+#######################################################################################
+# Library
+import logging
+import os
+import hashlib
+import threading
+
+from collections import OrderedDict
+
+import numpy as np
+
+from hmc.algorithm.default.lib_default_args import logger_name
+from hmc.algorithm.utils.lib_utils_import import import_lazy
+
+# Lazy module(s) (imported at the first use)
+sparse = import_lazy('scipy.sparse')
+
+# Logging
+log_stream = logging.getLogger(logger_name)
+
+# Regrid index settings (index is stored in memory for the last grids and in the ancillary folder with the grids
+# signature)
+regrid_file_template = 'hmc_regrid_{method}_{key}.npz'
+regrid_key_length = 16
+regrid_obj_cache = OrderedDict()
+regrid_obj_cache_size = 8
+regrid_obj_lock = threading.Lock()
+regrid_method_list = ['nearest', 'bilinear', 'conservative']
+regrid_weights_tags = ['weights_data', 'weights_indices', 'weights_indptr', 'weights_shape']
+
+# Debug
+# import matplotlib.pylab as plt
+#######################################################################################
+
+
+# -------------------------------------------------------------------------------------
+# Method to get the 1d coordinates of a grid (2d coordinates are defined by rows and columns)
+def get_regrid_coords(geo_x, geo_y):
+
+    geo_x, geo_y = np.asarray(geo_x), np.asarray(geo_y)
+    if geo_x.ndim == 2:
+        geo_x = geo_x[0, :]
+    if geo_y.ndim == 2:
+        geo_y = geo_y[:, 0]
+
+    return geo_x.astype(np.float64), geo_y.astype(np.float64)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to compute the signature of source and destination grids
+def compute_regrid_key(src_geo_x, src_geo_y, dst_geo_x, dst_geo_y, regrid_method='nearest'):
+
+    regrid_hash = hashlib.sha1(regrid_method.encode('utf-8'))
+    for geo_values in [src_geo_x, src_geo_y, dst_geo_x, dst_geo_y]:
+        geo_values = np.ascontiguousarray(geo_values, dtype=np.float64)
+        regrid_hash.update(str(geo_values.shape).encode('utf-8'))
+        regrid_hash.update(geo_values.tobytes())
+
+    return regrid_hash.hexdigest()
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to compute the nearest index of destination values over source values along one axis
+# (ties are assigned to the lower source value; values outside the source range are not valid)
+def compute_nearest_index(src_values, dst_values):
+
+    src_order = np.argsort(src_values, kind='stable')
+    src_sorted = src_values[src_order]
+
+    src_n = src_sorted.shape[0]
+    if src_n == 1:
+        idx_nearest = np.zeros(dst_values.shape, dtype=np.int64)
+        idx_valid = dst_values == src_sorted[0]
+        return src_order[idx_nearest], idx_valid
+
+    idx_lower = np.clip(np.searchsorted(src_sorted, dst_values, side='left') - 1, 0, src_n - 2)
+    src_lower, src_upper = src_sorted[idx_lower], src_sorted[idx_lower + 1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dst_norm = (dst_values - src_lower) / (src_upper - src_lower)
+    idx_nearest = np.where(dst_norm <= 0.5, idx_lower, idx_lower + 1)
+
+    idx_valid = np.isfinite(dst_values) & (dst_values >= src_sorted[0]) & (dst_values <= src_sorted[-1])
+
+    return src_order[idx_nearest], idx_valid
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to compute the nearest regrid index from source grid to destination grid
+def compute_regrid_nearest(src_geo_x, src_geo_y, dst_geo_x, dst_geo_y):
+
+    index_x, valid_x = compute_nearest_index(src_geo_x, dst_geo_x)
+    index_y, valid_y = compute_nearest_index(src_geo_y, dst_geo_y)
+
+    regrid_obj = {'method': 'nearest',
+                  'index_x': index_x, 'index_y': index_y, 'valid_x': valid_x, 'valid_y': valid_y,
+                  'src_shape': np.array([src_geo_y.shape[0], src_geo_x.shape[0]]),
+                  'dst_shape': np.array([dst_geo_y.shape[0], dst_geo_x.shape[0]])}
+
+    return regrid_obj
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to compute the edges of the cells along one axis (defined by the centers; first and last cells are
+# extended by half step)
+def compute_cell_edges(geo_values):
+
+    geo_n = geo_values.shape[0]
+    if geo_n == 1:
+        return np.array([geo_values[0] - 0.5, geo_values[0] + 0.5]), np.array([geo_values[0] + 0.5])
+
+    geo_mid = 0.5 * (geo_values[:-1] + geo_values[1:])
+    geo_edges = np.concatenate([[geo_values[0] - (geo_mid[0] - geo_values[0])], geo_mid,
+                                [geo_values[-1] + (geo_values[-1] - geo_mid[-1])]])
+
+    geo_lower = np.minimum(geo_edges[:-1], geo_edges[1:])
+    geo_upper = np.maximum(geo_edges[:-1], geo_edges[1:])
+
+    return geo_lower, geo_upper
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to compute the bilinear weights along one axis [dst_n, src_n] (two source values for each destination
+# value; values outside the source range have no weights)
+def compute_bilinear_weights(src_values, dst_values):
+
+    src_order = np.argsort(src_values, kind='stable')
+    src_sorted = src_values[src_order]
+
+    src_n, dst_n = src_sorted.shape[0], dst_values.shape[0]
+    dst_idx = np.arange(dst_n)
+    dst_valid = np.isfinite(dst_values) & (dst_values >= src_sorted[0]) & (dst_values <= src_sorted[-1])
+
+    if src_n == 1:
+        return sparse.csr_matrix((dst_valid.astype(np.float64), (dst_idx, np.zeros(dst_n, dtype=np.int64))),
+                                 shape=(dst_n, src_n))
+
+    idx_lower = np.clip(np.searchsorted(src_sorted, dst_values, side='right') - 1, 0, src_n - 2)
+    src_lower, src_upper = src_sorted[idx_lower], src_sorted[idx_lower + 1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weight_upper = np.clip((dst_values - src_lower) / (src_upper - src_lower), 0.0, 1.0)
+    weight_lower = 1.0 - weight_upper
+
+    rows = np.concatenate([dst_idx[dst_valid], dst_idx[dst_valid]])
+    cols = np.concatenate([src_order[idx_lower[dst_valid]], src_order[idx_lower[dst_valid] + 1]])
+    weights = np.concatenate([weight_lower[dst_valid], weight_upper[dst_valid]])
+
+    axis_weights = sparse.csr_matrix((weights, (rows, cols)), shape=(dst_n, src_n))
+    axis_weights.eliminate_zeros()
+
+    return axis_weights
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to compute the first-order conservative weights along one axis [dst_n, src_n] (fraction of each
+# destination cell covered by the source cells)
+def compute_conservative_weights(src_values, dst_values, geo_transform=None):
+
+    src_lower, src_upper = compute_cell_edges(src_values)
+    dst_lower, dst_upper = compute_cell_edges(dst_values)
+    if geo_transform is not None:
+        src_lower, src_upper = geo_transform(src_lower), geo_transform(src_upper)
+        dst_lower, dst_upper = geo_transform(dst_lower), geo_transform(dst_upper)
+
+    src_order = np.argsort(src_lower, kind='stable')
+    src_lower, src_upper = src_lower[src_order], src_upper[src_order]
+
+    src_n, dst_n = src_values.shape[0], dst_values.shape[0]
+
+    # range of overlapping source cells for each destination cell
+    idx_start = np.searchsorted(src_upper, dst_lower, side='right')
+    idx_stop = np.searchsorted(src_lower, dst_upper, side='left')
+    idx_count = np.maximum(idx_stop - idx_start, 0)
+
+    rows = np.repeat(np.arange(dst_n), idx_count)
+    cols = np.repeat(idx_start, idx_count) + \
+        (np.arange(idx_count.sum()) - np.repeat(np.cumsum(idx_count) - idx_count, idx_count))
+
+    overlap = np.minimum(src_upper[cols], dst_upper[rows]) - np.maximum(src_lower[cols], dst_lower[rows])
+    weights = np.clip(overlap, 0.0, None) / (dst_upper - dst_lower)[rows]
+
+    axis_weights = sparse.csr_matrix((weights, (rows, src_order[cols])), shape=(dst_n, src_n))
+    axis_weights.eliminate_zeros()
+
+    return axis_weights
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to compute the weights regrid object (sparse matrix [dst_y * dst_x, src_y * src_x] in row-major order)
+def compute_regrid_weights(src_geo_x, src_geo_y, dst_geo_x, dst_geo_y, regrid_method='bilinear'):
+
+    if regrid_method == 'bilinear':
+        weights_x = compute_bilinear_weights(src_geo_x, dst_geo_x)
+        weights_y = compute_bilinear_weights(src_geo_y, dst_geo_y)
+    elif regrid_method == 'conservative':
+        # geographical grids are weighted by the cell area (sine of latitude along the y axis)
+        geo_transform_y = None
+        if (np.abs(src_geo_y).max() <= 90.0) and (np.abs(dst_geo_y).max() <= 90.0):
+            geo_transform_y = lambda geo_values: np.sin(np.deg2rad(np.clip(geo_values, -90.0, 90.0)))
+        weights_x = compute_conservative_weights(src_geo_x, dst_geo_x)
+        weights_y = compute_conservative_weights(src_geo_y, dst_geo_y, geo_transform=geo_transform_y)
+    else:
+        log_stream.error(' ===> Regrid method "' + regrid_method + '" is not available')
+        raise NotImplementedError('Case not implemented yet')
+
+    weights = sparse.kron(weights_y, weights_x, format='csr')
+    weights.eliminate_zeros()
+
+    regrid_obj = {'method': regrid_method, 'weights': weights,
+                  'weights_sum': np.asarray(weights.sum(axis=1)).ravel(),
+                  'src_shape': np.array([src_geo_y.shape[0], src_geo_x.shape[0]]),
+                  'dst_shape': np.array([dst_geo_y.shape[0], dst_geo_x.shape[0]])}
+
+    return regrid_obj
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to pack the regrid object in arrays (sparse weights are split in their csr components)
+def pack_regrid_obj(regrid_obj):
+
+    regrid_data = {regrid_name: regrid_value for regrid_name, regrid_value in regrid_obj.items()
+                   if regrid_name != 'weights'}
+    if 'weights' in regrid_obj:
+        weights = regrid_obj['weights']
+        regrid_data['weights_data'] = weights.data
+        regrid_data['weights_indices'] = weights.indices
+        regrid_data['weights_indptr'] = weights.indptr
+        regrid_data['weights_shape'] = np.array(weights.shape)
+
+    return regrid_data
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to unpack the regrid object from arrays
+def unpack_regrid_obj(regrid_data):
+
+    regrid_obj = {regrid_name: regrid_value for regrid_name, regrid_value in regrid_data.items()
+                  if regrid_name not in regrid_weights_tags}
+    regrid_obj['method'] = str(regrid_obj['method'])
+    if 'weights_data' in regrid_data:
+        regrid_obj['weights'] = sparse.csr_matrix(
+            (regrid_data['weights_data'], regrid_data['weights_indices'], regrid_data['weights_indptr']),
+            shape=tuple(regrid_data['weights_shape']))
+
+    return regrid_obj
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to get the regrid index or weights (from memory, from the ancillary folder or computed and stored)
+def get_regrid_index(src_geo_x, src_geo_y, dst_geo_x, dst_geo_y, regrid_method='nearest', regrid_path=None):
+
+    src_geo_x, src_geo_y = get_regrid_coords(src_geo_x, src_geo_y)
+    dst_geo_x, dst_geo_y = get_regrid_coords(dst_geo_x, dst_geo_y)
+
+    regrid_key = compute_regrid_key(src_geo_x, src_geo_y, dst_geo_x, dst_geo_y, regrid_method=regrid_method)
+
+    with regrid_obj_lock:
+        if regrid_key in regrid_obj_cache:
+            regrid_obj_cache.move_to_end(regrid_key)
+            return regrid_obj_cache[regrid_key]
+
+    regrid_file = None
+    if regrid_path is not None:
+        regrid_file = os.path.join(regrid_path, regrid_file_template.format(
+            method=regrid_method, key=regrid_key[:regrid_key_length]))
+
+    regrid_obj = None
+    if (regrid_file is not None) and os.path.exists(regrid_file):
+        try:
+            with np.load(regrid_file, allow_pickle=False) as regrid_data:
+                regrid_obj = unpack_regrid_obj(
+                    {regrid_name: regrid_data[regrid_name] for regrid_name in regrid_data.files})
+        except (OSError, ValueError, KeyError) as regrid_error:
+            log_stream.warning(' ===> Regrid index ' + regrid_file + ' is not readable [' + str(regrid_error) +
+                               ']. Index will be computed')
+            regrid_obj = None
+
+    if regrid_obj is None:
+        if regrid_method == 'nearest':
+            regrid_obj = compute_regrid_nearest(src_geo_x, src_geo_y, dst_geo_x, dst_geo_y)
+        elif regrid_method in ['bilinear', 'conservative']:
+            regrid_obj = compute_regrid_weights(src_geo_x, src_geo_y, dst_geo_x, dst_geo_y,
+                                                regrid_method=regrid_method)
+        else:
+            log_stream.error(' ===> Regrid method "' + regrid_method + '" is not available')
+            raise NotImplementedError('Case not implemented yet')
+
+        if regrid_file is not None:
+            os.makedirs(regrid_path, exist_ok=True)
+            regrid_file_tmp = regrid_file + '.' + str(os.getpid()) + '.tmp.npz'
+            np.savez(regrid_file_tmp, **pack_regrid_obj(regrid_obj))
+            os.replace(regrid_file_tmp, regrid_file)
+
+    # Store the index in memory (least recently used grids are removed; they are reloaded from the ancillary folder)
+    with regrid_obj_lock:
+        regrid_obj_cache[regrid_key] = regrid_obj
+        regrid_obj_cache.move_to_end(regrid_key)
+        while regrid_obj_cache.__len__() > regrid_obj_cache_size:
+            regrid_obj_cache.popitem(last=False)
+
+    return regrid_obj
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to apply the nearest regrid index to values with (y, x, ...) dimensions
+def apply_regrid_nearest(src_values, regrid_obj, no_data=np.nan):
+
+    src_values = np.asarray(src_values)
+    if src_values.dtype.kind != 'f':
+        src_values = src_values.astype(np.float32)
+
+    index_y, index_x = regrid_obj['index_y'], regrid_obj['index_x']
+
+    # single gather over the (y, x, time) cube
+    dst_values = src_values[index_y[:, np.newaxis], index_x[np.newaxis, :], ...]
+
+    dst_valid = regrid_obj['valid_y'][:, np.newaxis] & regrid_obj['valid_x'][np.newaxis, :]
+    if not dst_valid.all():
+        dst_values[~dst_valid, ...] = no_data
+
+    return dst_values
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to apply the regrid weights to values with (y, x, ...) dimensions (one sparse product for all the steps;
+# no data values are excluded and weights are normalized over the valid source cells)
+def apply_regrid_weights(src_values, regrid_obj, no_data=np.nan, weight_min=1e-6):
+
+    src_values = np.asarray(src_values)
+    values_dtype = src_values.dtype if src_values.dtype.kind == 'f' else np.float32
+
+    src_shape, dst_shape = tuple(regrid_obj['src_shape']), tuple(regrid_obj['dst_shape'])
+    steps_shape = src_values.shape[2:]
+
+    src_values = src_values.reshape(src_shape[0] * src_shape[1], -1).astype(np.float64, copy=False)
+    weights = regrid_obj['weights']
+
+    src_valid = np.isfinite(src_values)
+    if src_valid.all():
+        dst_values = weights.dot(src_values)
+        dst_weights = np.broadcast_to(regrid_obj['weights_sum'][:, np.newaxis], dst_values.shape)
+    else:
+        dst_values = weights.dot(np.where(src_valid, src_values, 0.0))
+        dst_weights = weights.dot(src_valid.astype(np.float64))
+
+    dst_valid = dst_weights > weight_min
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dst_values = np.where(dst_valid, dst_values / dst_weights, no_data)
+
+    return dst_values.astype(values_dtype, copy=False).reshape(dst_shape + steps_shape)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to apply the regrid object to values with (y, x, ...) dimensions
+def apply_regrid(src_values, regrid_obj, no_data=np.nan):
+
+    if regrid_obj['method'] == 'nearest':
+        dst_values = apply_regrid_nearest(src_values, regrid_obj, no_data=no_data)
+    elif regrid_obj['method'] in ['bilinear', 'conservative']:
+        dst_values = apply_regrid_weights(src_values, regrid_obj, no_data=no_data)
+    else:
+        log_stream.error(' ===> Regrid method "' + regrid_obj['method'] + '" is not available')
+        raise NotImplementedError('Case not implemented yet')
+
+    return dst_values
+# -------------------------------------------------------------------------------------
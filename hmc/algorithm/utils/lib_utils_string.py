@@ -13,13 +13,17 @@ import logging
 import re
 
 from datetime import datetime
-from copy import deepcopy
+from functools import lru_cache
 
 from hmc.algorithm.default.lib_default_args import logger_name
 
 # Logging
 log_stream = logging.getLogger(logger_name)
 
+# Template settings (compiled templates and formatted times are memoized)
+template_cache_size = 4096
+template_time_cache_size = 65536
+
 # Debug
 # import matplotlib.pylab as plt
 #######################################################################################
@@ -81,70 +85,175 @@ def parse_row2string(row_obj, row_delimiter='#'):
 
 
 # -------------------------------------------------------------------------------------
-# Method to add time in a unfilled string (path or filename)
-def fill_tags2string(string_raw, tags_format=None, tags_filling=None):
+# Method to format a time using a format string (memoized by time and format)
+@lru_cache(maxsize=template_time_cache_size)
+def format_time2string(time_value, time_format):
+    return time_value.strftime(time_format)
+# -------------------------------------------------------------------------------------
 
-    apply_tags = False
-    if string_raw is not None:
-        for tag in list(tags_format.keys()):
-            if tag in string_raw:
-                apply_tags = True
-                break
 
-    if apply_tags:
+# -------------------------------------------------------------------------------------
+# Method to format a tag value using the tag format string
+def format_tag2string(tag_value, tag_format):
+    if isinstance(tag_value, datetime):
+        return format_time2string(tag_value, tag_format)
+    if isinstance(tag_value, (float, int)):
+        return tag_format.format(tag_value)
+    return tag_value
+# -------------------------------------------------------------------------------------
 
-        tags_format_tmp = deepcopy(tags_format)
-        for tag_key, tag_value in tags_format.items():
-            tag_key_tmp = '{' + tag_key + '}'
-            if tag_value is not None:
-                if tag_key_tmp in string_raw:
-                    string_filled = string_raw.replace(tag_key_tmp, tag_value)
-                    string_raw = string_filled
-                else:
-                    tags_format_tmp.pop(tag_key, None)
 
-        dim_max = 1
-        for tags_filling_values_tmp in tags_filling.values():
-            if isinstance(tags_filling_values_tmp, list):
-                dim_tmp = tags_filling_values_tmp.__len__()
-                if dim_tmp > dim_max:
-                    dim_max = dim_tmp
+# -------------------------------------------------------------------------------------
+# Method to compile a template string in literal parts and tag slots
+# (each slot is defined by its format and by the tags that could fill it, in order of priority)
+@lru_cache(maxsize=template_cache_size)
+def compile_tags2string_cached(string_raw, tags_format_items):
+
+    if not any(tag_key in string_raw for tag_key, tag_value in tags_format_items):
+        return None
+
+    # replace the tags with their format
+    tags_active = []
+    for tag_key, tag_value in tags_format_items:
+        if tag_value is None:
+            continue
+        tag_key_tmp = '{' + tag_key + '}'
+        if tag_key_tmp in string_raw:
+            string_raw = string_raw.replace(tag_key_tmp, tag_value)
+            tags_active.append((tag_key, tag_value))
+
+    # split the string by the formats (ordered as the tags)
+    string_parts = [string_raw]
+    for tag_key, tag_format in tags_active:
+        string_parts_tmp = []
+        for string_part in string_parts:
+            if isinstance(string_part, tuple) or tag_format not in string_part:
+                string_parts_tmp.append(string_part)
+                continue
+            string_splits = string_part.split(tag_format)
+            for split_id, string_split in enumerate(string_splits):
+                if split_id > 0:
+                    string_parts_tmp.append((tag_format, ))
+                if string_split:
+                    string_parts_tmp.append(string_split)
+        string_parts = string_parts_tmp
+
+    # define the tags that could fill each format (first tag with a defined value is used)
+    string_compiled = []
+    for string_part in string_parts:
+        if isinstance(string_part, tuple):
+            tag_format = string_part[0]
+            tag_keys = tuple([tag_key for tag_key, tag_value in tags_active if tag_value == tag_format])
+            string_compiled.append((tag_format, tag_keys))
+        else:
+            string_compiled.append(string_part)
 
-        string_filled_list = [string_filled] * dim_max
+    return tuple(string_compiled)
+# -------------------------------------------------------------------------------------
 
-        string_filled_def = []
-        for string_id, string_filled_step in enumerate(string_filled_list):
-            for tag_format_name, tag_format_value in list(tags_format_tmp.items()):
 
-                if tag_format_name in list(tags_filling.keys()):
-                    tag_filling_value = tags_filling[tag_format_name]
+# -------------------------------------------------------------------------------------
+# Method to compile a template string (None if the string has no tags)
+def compile_tags2string(string_raw, tags_format=None):
 
-                    if isinstance(tag_filling_value, list):
-                        tag_filling_step = tag_filling_value[string_id]
-                    else:
-                        tag_filling_step = tag_filling_value
+    if string_raw is None:
+        return None
+    if tags_format is None:
+        tags_format = {}
 
-                    if tag_filling_step is not None:
+    tags_format_items = tuple(tags_format.items())
+    try:
+        string_compiled = compile_tags2string_cached(string_raw, tags_format_items)
+    except TypeError:
+        string_compiled = compile_tags2string_cached.__wrapped__(string_raw, tags_format_items)
 
-                        if isinstance(tag_filling_step, datetime):
-                            tag_filling_step = tag_filling_step.strftime(tag_format_value)
+    return string_compiled
+# -------------------------------------------------------------------------------------
 
-                        if isinstance(tag_filling_step, (float, int)):
-                            tag_filling_step = tag_format_value.format(tag_filling_step)
 
-                        string_filled_step = string_filled_step.replace(tag_format_value, tag_filling_step)
+# -------------------------------------------------------------------------------------
+# Method to render a compiled template string for one step of the filling values
+def render_tags2string_step(string_compiled, tags_filling, string_id=0):
+
+    string_parts = []
+    for string_part in string_compiled:
+        if isinstance(string_part, str):
+            string_parts.append(string_part)
+            continue
+
+        tag_format, tag_keys = string_part
+        tag_string = tag_format
+        for tag_key in tag_keys:
+            if tag_key in tags_filling:
+                tag_filling_value = tags_filling[tag_key]
+                if isinstance(tag_filling_value, list):
+                    tag_filling_value = tag_filling_value[string_id]
+                if tag_filling_value is not None:
+                    tag_string = format_tag2string(tag_filling_value, tag_format)
+                    break
+        string_parts.append(tag_string)
+
+    return ''.join(string_parts).replace('//', '/')
+# -------------------------------------------------------------------------------------
 
-            string_filled_def.append(string_filled_step)
 
-        if dim_max == 1:
-            string_filled_out = string_filled_def[0].replace('//', '/')
-        else:
-            string_filled_out = []
-            for string_filled_tmp in string_filled_def:
-                string_filled_out.append(string_filled_tmp.replace('//', '/'))
+# -------------------------------------------------------------------------------------
+# Method to add time in a unfilled string (path or filename)
+def fill_tags2string(string_raw, tags_format=None, tags_filling=None):
 
-        return string_filled_out
-    else:
+    string_compiled = compile_tags2string(string_raw, tags_format)
+    if string_compiled is None:
         return string_raw
+    if tags_filling is None:
+        tags_filling = {}
+
+    dim_max = 1
+    for tags_filling_values_tmp in tags_filling.values():
+        if isinstance(tags_filling_values_tmp, list):
+            dim_max = max(dim_max, tags_filling_values_tmp.__len__())
+
+    if dim_max == 1:
+        string_filled_out = render_tags2string_step(string_compiled, tags_filling)
+    else:
+        string_filled_out = [render_tags2string_step(string_compiled, tags_filling, string_id)
+                             for string_id in range(dim_max)]
+
+    return string_filled_out
 # -------------------------------------------------------------------------------------
 
+
+# -------------------------------------------------------------------------------------
+# Method to fill a string for all the times of a period (template is compiled once; the time tags are filled with
+# each time of the period and the other tags are constant)
+def fill_tags2string_period(string_raw, tags_format=None, tags_filling=None, time_period=None, time_tags=None):
+
+    if tags_filling is None:
+        tags_filling = {}
+    if time_tags is None:
+        time_tags = []
+    if time_period is None:
+        time_period = []
+
+    string_compiled = compile_tags2string(string_raw, tags_format)
+    if string_compiled is None:
+        return [string_raw] * time_period.__len__()
+
+    tags_filling_step = {tag_key: tag_value for tag_key, tag_value in tags_filling.items() if tag_key not in time_tags}
+
+    dim_max = 1
+    for tags_filling_values_tmp in tags_filling_step.values():
+        if isinstance(tags_filling_values_tmp, list):
+            dim_max = max(dim_max, tags_filling_values_tmp.__len__())
+
+    string_filled_period = []
+    for time_step in time_period:
+        for time_tag in time_tags:
+            tags_filling_step[time_tag] = time_step
+        if dim_max == 1:
+            string_filled_period.append(render_tags2string_step(string_compiled, tags_filling_step))
+        else:
+            string_filled_period.append([render_tags2string_step(string_compiled, tags_filling_step, string_id)
+                                         for string_id in range(dim_max)])
+
+    return string_filled_period
+# -------------------------------------------------------------------------------------
@@ -11,6 +11,7 @@ Version:       '3.0.0'
 # Library
 import logging
 
+import numpy as np
 import pandas as pd
 
 from hmc.algorithm.default.lib_default_args import logger_name
@@ -71,3 +72,46 @@ def convert_freqstr_to_freqsecs(time_frequency_digits, time_frequency_alphabetic
     time_frequency_seconds = int(pd.Timedelta(time_frequency_string).total_seconds())
     return time_frequency_seconds
 # -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to convert time values (datetime64 or strings) to a datetime index in one call (with optional rounding)
+def convert_time_values(time_values, time_format='%Y-%m-%d_%H:%M:%S', time_rounding='H'):
+
+    time_values = np.ravel(np.asarray(time_values))
+    if time_values.dtype.kind == 'M':
+        time_idx = pd.DatetimeIndex(time_values)
+    else:
+        time_idx = pd.DatetimeIndex(pd.to_datetime(time_values, format=time_format))
+
+    if time_rounding is not None:
+        time_idx = time_idx.round(time_rounding)
+
+    return time_idx
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to align values on the expected time index (one scatter in a preallocated array along the time axis;
+# source steps not available in the expected index are dropped)
+def align_time_values(values_src, time_src, time_dst, time_axis=-1, values_dtype=np.float32, no_data=np.nan):
+
+    values_src = np.asarray(values_src)
+    time_axis = time_axis % values_src.ndim
+
+    time_idx = pd.DatetimeIndex(time_dst).get_indexer(pd.DatetimeIndex(time_src))
+    time_valid = time_idx >= 0
+    if not time_valid.all():
+        log_stream.warning(' ===> ' + str(int((~time_valid).sum())) +
+                           ' time step(s) are not in the expected period and will be skipped')
+
+    values_shape = list(values_src.shape)
+    values_shape[time_axis] = time_dst.__len__()
+    values_dst = np.full(values_shape, no_data, dtype=values_dtype)
+
+    values_dst_view = np.moveaxis(values_dst, time_axis, 0)
+    values_src_view = np.moveaxis(values_src, time_axis, 0)
+    values_dst_view[time_idx[time_valid], ...] = values_src_view[time_valid, ...]
+
+    return values_dst
+# -------------------------------------------------------------------------------------
@@ -13,7 +13,9 @@ import logging
 import os
 
 from hmc.algorithm.default.lib_default_args import logger_name
-from hmc.algorithm.debug.lib_debug import read_workspace_obj, write_workspace_obj
+from hmc.algorithm.utils.lib_utils_cache import compute_cache_key, collect_cache_files, get_cache_key, \
+    get_cache_settings, read_cache_obj, write_cache_obj, remove_cache_obj, clean_cache_obj
+from hmc.algorithm.utils.lib_utils_monitor import monitor_method
 
 from hmc.driver.dataset.drv_dataset_hmc_base_source import ModelSource
 
@@ -50,6 +52,7 @@ class ModelBuilder:
             template_run_ref=self.obj_args.obj_template_run_ref,
             template_run_path=self.obj_run.obj_run_path,
             template_analysis_def=self.obj_run.obj_template_analysis_filled,
+            template_io_def=self.obj_run.obj_template_io_filled,
             template_static=self.obj_args.obj_template_dset_static_ref,
             template_dynamic=self.obj_args.obj_template_dset_dynamic_ref,
             time_run=self.obj_time_run)
@@ -57,12 +60,15 @@ class ModelBuilder:
         self.flag_cleaning_static = self.obj_args.obj_datasets['Flags']['cleaning_ancillary_data_static']
         self.flag_cleaning_dynamic_source = self.obj_args.obj_datasets['Flags']['cleaning_ancillary_data_dynamic_source']
 
+        self.cache_age_max, self.cache_size_max = get_cache_settings(self.obj_args.obj_datasets['Flags'])
+
         # -------------------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------------------
     # Method to configure static datasets
+    @monitor_method('builder.configure_static_datasets', 'coupler')
     def configure_static_datasets(self, ancillary_datasets_collections, ancillary_tag_type='static'):
 
         # Starting info
@@ -70,47 +76,55 @@ class ModelBuilder:
 
         file_path_ancillary = ancillary_datasets_collections[ancillary_tag_type]
         if self.flag_cleaning_static:
-            if os.path.exists(file_path_ancillary):
-                os.remove(file_path_ancillary)
+            remove_cache_obj(file_path_ancillary)
+        clean_cache_obj(os.path.dirname(file_path_ancillary),
+                        cache_age_max=self.cache_age_max, cache_size_max=self.cache_size_max)
 
-        if not os.path.exists(file_path_ancillary):
+        # Get template variable(s)
+        template_run = self.obj_run.obj_template_run_filled
+        # Get the template using the first run (deterministic or probabilistic)
+        template_def = list(template_run.values())[0]
 
-            # Get template variable(s)
-            template_run = self.obj_run.obj_template_run_filled
-            template_path = self.obj_run.obj_run_path
-            # Get the template using the first run (deterministic or probabilistic)
-            template_def = list(template_run.values())[0]
+        # Method to organize static datasets
+        static_datasets_obj = self.driver_io_source.organize_data_static(template_def)
 
-            # Method to organize static datasets
-            static_datasets_obj = self.driver_io_source.organize_data_static(template_def)
+        # Compute the cache key using settings and status of the static file(s)
+        cache_key = compute_cache_key(
+            {'template_run': template_def, 'data_geo': self.obj_args.obj_datasets['DataGeo'],
+             'info_hmc': self.obj_args.obj_hmc_info_ref, 'info_geosystem': self.obj_args.obj_geosystem_info_ref,
+             'info_analysis': self.obj_run.obj_template_analysis_filled,
+             'datasets': static_datasets_obj},
+            cache_files=collect_cache_files(static_datasets_obj))
 
-            # Method to analyze and collect static datasets
-            static_datasets_collections = self.driver_io_source.analyze_data_static(static_datasets_obj)
+        # Method to read static datasets collections
+        static_datasets_collections = read_cache_obj(file_path_ancillary, cache_key)
 
-            # Method to write static datasets collections
-            write_workspace_obj(file_path_ancillary, static_datasets_collections)
+        if static_datasets_collections is None:
 
-            # Ending info
-            log_stream.info(' #### Configure static datasets ... DONE')
+            # Set the folder of the section labels using the static ancillary folder
+            self.driver_io_source.set_mask_path(os.path.dirname(file_path_ancillary))
 
-        elif os.path.exists(file_path_ancillary):
+            # Method to analyze and collect static datasets
+            static_datasets_collections = self.driver_io_source.analyze_data_static(static_datasets_obj)
 
-            # Method to read static datasets collections
-            static_datasets_collections = read_workspace_obj(file_path_ancillary)
+            # Method to write static datasets collections
+            file_path_cache = write_cache_obj(file_path_ancillary, cache_key, static_datasets_collections)
 
             # Ending info
-            log_stream.info(' #### Configure static datasets ... LOADED. Restore file: ' + file_path_ancillary)
+            log_stream.info(' #### Configure static datasets ... DONE. Cache file: ' + file_path_cache)
 
         else:
 
-            log_stream.error(' ===> Ancillary file for static datasets collections is not correctly defined')
-            raise RuntimeError('Bad definition of ancillary static file')
+            # Ending info
+            log_stream.info(' #### Configure static datasets ... LOADED. Restore file: ' + file_path_ancillary +
+                            ' [key: ' + cache_key + ']')
 
         return static_datasets_collections
     # -------------------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------------------
     # Method to configure dynamic datasets
+    @monitor_method('builder.configure_dynamic_datasets', 'coupler')
     def configure_dynamic_datasets(self, time_series_collections, time_info_collections,
                                    static_datasets_collections, ancillary_datasets_collections,
                                    ancillary_tag_type='dynamic_source'):
@@ -120,29 +134,58 @@ class ModelBuilder:
 
         file_path_ancillary = ancillary_datasets_collections[ancillary_tag_type]
         if self.flag_cleaning_dynamic_source:
-            if os.path.exists(file_path_ancillary):
-                os.remove(file_path_ancillary)
-
-        if not os.path.exists(file_path_ancillary):
-
-            # Get template variable(s)
-            template_run_filled = self.obj_run.obj_template_run_filled
-            template_path = self.obj_run.obj_run_path
-
-            # Method to organize dynamic restart datasets
-            restart_datasets_obj = self.driver_io_source.organize_data_dynamic(
-                time_series_collections, template_run_filled, template_run_path=template_path,
-                static_datasets_collections=None, tag_datadriver='restart')
-
-            # Method to organize dynamic forcing datasets
-            dynamic_forcing_datasets_obj = self.driver_io_source.organize_data_dynamic(
-                time_series_collections, template_run_filled, template_run_path=template_path,
-                static_datasets_collections=static_datasets_collections, tag_datadriver='forcing')
-
-            # Method to organize dynamic updating datasets
-            dynamic_updating_datasets_obj = self.driver_io_source.organize_data_dynamic(
-                time_series_collections, template_run_filled, template_run_path=template_path,
-                static_datasets_collections=static_datasets_collections, tag_datadriver='updating')
+            remove_cache_obj(file_path_ancillary)
+        clean_cache_obj(os.path.dirname(file_path_ancillary),
+                        cache_age_max=self.cache_age_max, cache_size_max=self.cache_size_max)
+
+        # Get template variable(s)
+        template_run_filled = self.obj_run.obj_template_run_filled
+        template_path = self.obj_run.obj_run_path
+
+        # Set the folder of the regrid index(es) using the static ancillary folder
+        self.driver_io_source.set_regrid_path(os.path.dirname(ancillary_datasets_collections['static']))
+        # Set the file of the datasets catalog using the static ancillary folder
+        self.driver_io_source.set_catalog_file(os.path.join(
+            os.path.dirname(ancillary_datasets_collections['static']), 'hmc_datasets.catalog'))
+
+        # Method to organize dynamic restart datasets
+        restart_datasets_obj = self.driver_io_source.organize_data_dynamic(
+            time_series_collections, template_run_filled, template_run_path=template_path,
+            static_datasets_collections=None, tag_datadriver='restart')
+
+        # Method to organize dynamic forcing datasets
+        dynamic_forcing_datasets_obj = self.driver_io_source.organize_data_dynamic(
+            time_series_collections, template_run_filled, template_run_path=template_path,
+            static_datasets_collections=static_datasets_collections, tag_datadriver='forcing')
+
+        # Method to organize dynamic updating datasets
+        dynamic_updating_datasets_obj = self.driver_io_source.organize_data_dynamic(
+            time_series_collections, template_run_filled, template_run_path=template_path,
+            static_datasets_collections=static_datasets_collections, tag_datadriver='updating')
+
+        # Compute the cache key using settings, status of the source file(s) and key of the static datasets
+        # (only the source side of the datasets is checked; the model side is written by this stage)
+        source_datasets_obj = {}
+        for tag_datadriver, obj_datadriver in zip(
+                ['restart', 'forcing', 'updating'],
+                [restart_datasets_obj, dynamic_forcing_datasets_obj, dynamic_updating_datasets_obj]):
+            source_datasets_obj[tag_datadriver] = {
+                run_key: run_obj[self.driver_io_source.tag_datasets] for run_key, run_obj in obj_datadriver.items()}
+
+        cache_key = compute_cache_key(
+            {'template_run': template_run_filled, 'template_path': template_path,
+             'time_series': time_series_collections, 'time_info': time_info_collections,
+             'data_settings': {dset_key: dset_value for dset_key, dset_value in
+                               self.obj_args.obj_datasets.items() if dset_key != 'Flags'},
+             'info_analysis': self.obj_run.obj_template_analysis_filled,
+             'datasets': source_datasets_obj},
+            cache_files=collect_cache_files(source_datasets_obj),
+            cache_parents=[get_cache_key(ancillary_datasets_collections['static'])])
+
+        # Method to read dynamic datasets collections
+        dynamic_datasets_collections = read_cache_obj(file_path_ancillary, cache_key)
+
+        if dynamic_datasets_collections is None:
 
             # Method to analyze dynamic restart datasets
             self.driver_io_source.analyze_data_dynamic_restart(
@@ -177,25 +220,26 @@ class ModelBuilder:
             # Retrieve dynamic collections
             dynamic_datasets_collections = self.driver_io_source.dset_collections_dynamic
 
-            # Method to write static datasets collections
-            write_workspace_obj(file_path_ancillary, dynamic_datasets_collections)
-
-            # Ending info
-            log_stream.info(' #### Configure dynamic source datasets ... DONE')
-
-        elif os.path.exists(file_path_ancillary):
+            # Method to write dynamic datasets collections (with the status of the model file(s) written by the
+            # stage; the entry is not valid if they are removed, e.g. by the cleaning of the run folders)
+            model_datasets_obj = {}
+            for tag_datadriver, obj_datadriver in zip(
+                    ['restart', 'forcing', 'updating'],
+                    [restart_datasets_obj, dynamic_forcing_datasets_obj, dynamic_updating_datasets_obj]):
+                model_datasets_obj[tag_datadriver] = {
+                    run_key: run_obj[self.driver_io_source.tag_model] for run_key, run_obj in obj_datadriver.items()}
 
-            # Method to read static datasets collections
-            dynamic_datasets_collections = read_workspace_obj(file_path_ancillary)
+            file_path_cache = write_cache_obj(file_path_ancillary, cache_key, dynamic_datasets_collections,
+                                              cache_outputs=collect_cache_files(model_datasets_obj))
 
             # Ending info
-            log_stream.info(' #### Configure dynamic source datasets ... LOADED. Restore file:' + file_path_ancillary)
+            log_stream.info(' #### Configure dynamic source datasets ... DONE. Cache file: ' + file_path_cache)
 
         else:
-            # Error in ancillary file
-            log_stream.info(' #### Configure dynamic source datasets ... FAILED')
-            log_stream.error(' ===> Ancillary file for dynamic source datasets collections is not correctly defined')
-            raise RuntimeError('Bad definition of ancillary dynamic file')
+
+            # Ending info
+            log_stream.info(' #### Configure dynamic source datasets ... LOADED. Restore file: ' +
+                            file_path_ancillary + ' [key: ' + cache_key + ']')
 
         return dynamic_datasets_collections
 
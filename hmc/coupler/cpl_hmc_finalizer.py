@@ -12,8 +12,13 @@ Version:       '3.0.0'
 import logging
 import os
 
+from concurrent.futures import ThreadPoolExecutor
+
 from hmc.algorithm.default.lib_default_args import logger_name
-from hmc.algorithm.debug.lib_debug import read_workspace_obj, write_workspace_obj
+from hmc.algorithm.utils.lib_utils_cache import compute_cache_key, collect_cache_files, get_cache_key, \
+    get_cache_settings, read_cache_obj, write_cache_obj, remove_cache_obj, clean_cache_obj
+from hmc.algorithm.utils.lib_utils_monitor import monitor_method
+from hmc.algorithm.utils.lib_utils_import import import_load
 
 from hmc.driver.dataset.drv_dataset_hmc_base_destination import ModelDestination
 
@@ -52,6 +57,7 @@ class ModelFinalizer:
             template_run_def=self.obj_run.obj_template_run_filled,
             template_run_ref=self.obj_args.obj_template_run_ref,
             template_analysis_def=self.obj_run.obj_template_analysis_filled,
+            template_io_def=self.obj_run.obj_template_io_filled,
             template_static=self.obj_args.obj_template_dset_static_ref,
             template_outcome=self.obj_args.obj_template_dset_outcome_ref,
             time_run=self.obj_time_run)
@@ -59,76 +65,275 @@ class ModelFinalizer:
         self.flag_cleaning_dynamic_outcome = self.obj_args.obj_datasets['Flags'][
             'cleaning_ancillary_data_dynamic_outcome']
 
+        self.cache_age_max, self.cache_size_max = get_cache_settings(self.obj_args.obj_datasets['Flags'])
+
+        # pipeline of outcome datasets (analysis of each run as soon as the run is completed)
+        self.analysis_pipeline = self.obj_run.obj_template_analysis_filled['analysis_pipeline']
+        self.analysis_pipeline_cpu = self.obj_run.obj_template_analysis_filled['analysis_pipeline_cpu']
+        self.pipeline_obj = None
+
     # -------------------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------------------
     # Method to configure outcome datasets
+    @monitor_method('finalizer.configure_dynamic_datasets', 'coupler')
     def configure_dynamic_datasets(self, time_series_collections, time_info_collections,
                                    static_datasets_collections, ancillary_datasets_collections,
-                                   ancillary_tag_type='dynamic_outcome'):
+                                   ancillary_tag_type='dynamic_outcome', ancillary_run_tag_type='dynamic_execution'):
 
         # Starting info
         log_stream.info(' #### Configure dynamic outcome datasets ... ')
 
         file_path_ancillary = ancillary_datasets_collections[ancillary_tag_type]
-        if self.flag_cleaning_dynamic_outcome:
-            if os.path.exists(file_path_ancillary):
-                os.remove(file_path_ancillary)
-
-        if not os.path.exists(file_path_ancillary):
+        self.clean_dynamic_datasets(file_path_ancillary)
 
-            # Get template variable(s)
-            template_run_filled = self.obj_run.obj_template_run_filled
+        # Method to organize outcome and state datasets
+        outcome_datasets_obj, state_datasets_obj = self.organize_dynamic_datasets(
+            time_series_collections, static_datasets_collections)
 
-            # Method to organize outcome datasets
-            outcome_datasets_obj = self.driver_io_destination.organize_data_dynamic(
-                time_series_collections, static_datasets_collections, template_run_filled,
-                tag_exectype='SIM', tag_datadriver='outcome')
+        # Compute the cache key using settings, status of the model file(s) and key of the execution
+        cache_key = self.compute_dynamic_key(
+            time_series_collections, time_info_collections, outcome_datasets_obj, state_datasets_obj,
+            ancillary_datasets_collections[ancillary_run_tag_type])
 
-            # Method to analyze outcome datasets
-            self.driver_io_destination.analyze_data_dynamic(
-                time_series_collections, time_info_collections, static_datasets_collections, outcome_datasets_obj,
-                tag_exectype='SIM', tag_datatype='ARCHIVE', tag_datadriver='outcome')
+        # Method to read dynamic datasets collections
+        dynamic_datasets_collections = read_cache_obj(file_path_ancillary, cache_key)
 
-            # Method to organize state datasets
-            state_datasets_obj = self.driver_io_destination.organize_data_dynamic(
-                time_series_collections, static_datasets_collections, template_run_filled,
-                tag_exectype='SIM', tag_datadriver='state')
+        if dynamic_datasets_collections is None:
 
-            # Method to analyze state datasets
-            self.driver_io_destination.analyze_data_dynamic(
-                time_series_collections, time_info_collections, static_datasets_collections, state_datasets_obj,
-                tag_exectype='SIM', tag_datatype='ARCHIVE', tag_datadriver='state')
+            # Method to analyze outcome and state datasets
+            self.analyze_dynamic_datasets(
+                time_series_collections, time_info_collections, static_datasets_collections,
+                outcome_datasets_obj, state_datasets_obj)
 
             # Retrieve dynamic collections
             dynamic_datasets_collections = self.driver_io_destination.dset_collections_dynamic
 
-            # Method to write static datasets collections
-            write_workspace_obj(file_path_ancillary, dynamic_datasets_collections)
+            # Method to write dynamic datasets collections
+            file_path_cache = write_cache_obj(file_path_ancillary, cache_key, dynamic_datasets_collections)
 
             # Ending info
-            log_stream.info(' #### Configure dynamic outcome datasets ... DONE')
+            log_stream.info(' #### Configure dynamic outcome datasets ... DONE. Cache file: ' + file_path_cache)
 
-        elif os.path.exists(file_path_ancillary):
-
-            # Method to read static datasets collections
-            dynamic_datasets_collections = read_workspace_obj(file_path_ancillary)
+        else:
 
             # Ending info
-            log_stream.info(' #### Configure dynamic outcome datasets ... LOADED. Restore file: ' + file_path_ancillary)
+            log_stream.info(' #### Configure dynamic outcome datasets ... LOADED. Restore file: ' +
+                            file_path_ancillary + ' [key: ' + cache_key + ']')
 
-        else:
-            # Error in ancillary file
-            log_stream.info(' #### Configure dynamic outcome datasets ... FAILED')
-            log_stream.error(' ===> Ancillary file for dynamic outcome datasets collections is not correctly defined')
-            raise RuntimeError('Bad definition of ancillary dynamic file')
+        return dynamic_datasets_collections
+
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Method to open the pipeline of outcome datasets (runs are analyzed as soon as they are completed)
+    @monitor_method('finalizer.open_dynamic_pipeline', 'coupler')
+    def open_dynamic_pipeline(self, time_series_collections, time_info_collections,
+                              static_datasets_collections, ancillary_datasets_collections,
+                              ancillary_tag_type='dynamic_outcome'):
+
+        # Starting info
+        log_stream.info(' #### Open dynamic outcome pipeline ... ')
+
+        file_path_ancillary = ancillary_datasets_collections[ancillary_tag_type]
+        self.clean_dynamic_datasets(file_path_ancillary)
+
+        # Method to organize outcome and state datasets
+        outcome_datasets_obj, state_datasets_obj = self.organize_dynamic_datasets(
+            time_series_collections, static_datasets_collections)
+
+        # Initialize the collections shared by the pipeline workers
+        if self.driver_io_destination.dset_collections_dynamic is None:
+            self.driver_io_destination.dset_collections_dynamic = {}
+
+        # Set the analysis of the workers (serial catchment mean and catchment weights computed once)
+        self.driver_io_destination.writer_outcome.set_analysis_pipeline(static_datasets_collections)
+        self.driver_io_destination.writer_state.set_analysis_pipeline(static_datasets_collections)
+
+        # Load the lazy reader module(s) before the workers (the first access is not thread-safe)
+        import_load(['rasterio', 'netCDF4', 'scipy.sparse'])
+
+        # Analysis worker(s) (the queued runs hold only the run key; datasets are shared by the workers)
+        self.pipeline_obj = {
+            'time_series': time_series_collections, 'time_info': time_info_collections,
+            'static_datasets': static_datasets_collections,
+            'outcome_datasets': outcome_datasets_obj, 'state_datasets': state_datasets_obj,
+            'executor': ThreadPoolExecutor(max_workers=self.analysis_pipeline_cpu),
+            'futures': {}}
+
+        # Ending info
+        log_stream.info(' #### Open dynamic outcome pipeline ... DONE. Workers: ' + str(self.analysis_pipeline_cpu))
+
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Method to submit a completed run to the pipeline of outcome datasets (used as callback of the runner)
+    @monitor_method('finalizer.submit_dynamic_pipeline', 'coupler')
+    def submit_dynamic_pipeline(self, run_key, run_response=None):
+
+        if self.pipeline_obj is None:
+            log_stream.error(' ===> Dynamic outcome pipeline is not opened')
+            raise RuntimeError('Open the pipeline before submitting the run(s)')
+
+        # Check the completed analysis (stop as soon as an analysis is failed)
+        for future_step in self.pipeline_obj['futures'].values():
+            if future_step.done() and (future_step.exception() is not None):
+                raise future_step.exception()
+
+        log_stream.info(' ----> Submit run ' + run_key + ' to the outcome pipeline ... ')
+
+        # Submit without waiting (the callback runs in the scheduler of the runner; runs are queued by the executor)
+        future_step = self.pipeline_obj['executor'].submit(
+            self.analyze_dynamic_datasets,
+            self.pipeline_obj['time_series'], self.pipeline_obj['time_info'], self.pipeline_obj['static_datasets'],
+            self.pipeline_obj['outcome_datasets'], self.pipeline_obj['state_datasets'], run_key_list=[run_key])
+
+        self.pipeline_obj['futures'][run_key] = future_step
+
+        log_stream.info(' ----> Submit run ' + run_key + ' to the outcome pipeline ... DONE')
+
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Method to close the pipeline of outcome datasets
+    @monitor_method('finalizer.close_dynamic_pipeline', 'coupler')
+    def close_dynamic_pipeline(self, time_series_collections, time_info_collections,
+                               static_datasets_collections, ancillary_datasets_collections,
+                               ancillary_tag_type='dynamic_outcome', ancillary_run_tag_type='dynamic_execution'):
+
+        # Starting info
+        log_stream.info(' #### Close dynamic outcome pipeline ... ')
+
+        if self.pipeline_obj is None:
+            log_stream.error(' ===> Dynamic outcome pipeline is not opened')
+            raise RuntimeError('Open the pipeline before closing it')
+
+        pipeline_obj, self.pipeline_obj = self.pipeline_obj, None
+
+        # Wait for the submitted analysis (errors are raised here)
+        pipeline_obj['executor'].shutdown(wait=True)
+        self.driver_io_destination.writer_outcome.set_analysis_pipeline(pipeline_active=False)
+        self.driver_io_destination.writer_state.set_analysis_pipeline(pipeline_active=False)
+        for future_step in pipeline_obj['futures'].values():
+            future_step.result()
+
+        # Compute the cache key (model file(s) are completed at this point)
+        file_path_ancillary = ancillary_datasets_collections[ancillary_tag_type]
+        cache_key = self.compute_dynamic_key(
+            time_series_collections, time_info_collections,
+            pipeline_obj['outcome_datasets'], pipeline_obj['state_datasets'],
+            ancillary_datasets_collections[ancillary_run_tag_type])
+
+        if not pipeline_obj['futures']:
+
+            # No runs submitted (execution restored from the cache): restore the analysis from the cache
+            dynamic_datasets_collections = read_cache_obj(file_path_ancillary, cache_key)
+            if dynamic_datasets_collections is not None:
+
+                self.driver_io_destination.dset_collections_dynamic = dynamic_datasets_collections
+
+                # Ending info
+                log_stream.info(' #### Close dynamic outcome pipeline ... LOADED. Restore file: ' +
+                                file_path_ancillary + ' [key: ' + cache_key + ']')
+
+                return dynamic_datasets_collections
+
+            # Analysis not available in the cache: analyze all the runs using the organized datasets
+            self.analyze_dynamic_datasets(
+                time_series_collections, time_info_collections, static_datasets_collections,
+                pipeline_obj['outcome_datasets'], pipeline_obj['state_datasets'])
+
+        # Retrieve dynamic collections (ordered using the runs)
+        dynamic_datasets_collections = self.driver_io_destination.dset_collections_dynamic
+        dynamic_datasets_collections = {
+            **{run_key: dynamic_datasets_collections[run_key] for run_key in time_series_collections.keys()
+               if run_key in dynamic_datasets_collections},
+            **dynamic_datasets_collections}
+        self.driver_io_destination.dset_collections_dynamic = dynamic_datasets_collections
+
+        # Method to write dynamic datasets collections
+        file_path_cache = write_cache_obj(file_path_ancillary, cache_key, dynamic_datasets_collections)
+
+        # Ending info
+        log_stream.info(' #### Close dynamic outcome pipeline ... DONE. Cache file: ' + file_path_cache)
 
         return dynamic_datasets_collections
 
     # -------------------------------------------------------------------------------------
 
+    # -------------------------------------------------------------------------------------
+    # Method to clean outcome ancillary datasets
+    def clean_dynamic_datasets(self, file_path_ancillary):
+        if self.flag_cleaning_dynamic_outcome:
+            remove_cache_obj(file_path_ancillary)
+        clean_cache_obj(os.path.dirname(file_path_ancillary),
+                        cache_age_max=self.cache_age_max, cache_size_max=self.cache_size_max)
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Method to organize outcome and state datasets
+    def organize_dynamic_datasets(self, time_series_collections, static_datasets_collections):
+
+        # Get template variable(s)
+        template_run_filled = self.obj_run.obj_template_run_filled
+
+        # Method to organize outcome datasets
+        outcome_datasets_obj = self.driver_io_destination.organize_data_dynamic(
+            time_series_collections, static_datasets_collections, template_run_filled,
+            tag_exectype='SIM', tag_datadriver='outcome')
+
+        # Method to organize state datasets
+        state_datasets_obj = self.driver_io_destination.organize_data_dynamic(
+            time_series_collections, static_datasets_collections, template_run_filled,
+            tag_exectype='SIM', tag_datadriver='state')
+
+        return outcome_datasets_obj, state_datasets_obj
+
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Method to analyze outcome and state datasets (all runs or the selected runs)
+    def analyze_dynamic_datasets(self, time_series_collections, time_info_collections, static_datasets_collections,
+                                 outcome_datasets_obj, state_datasets_obj, run_key_list=None):
+
+        # Method to analyze outcome datasets
+        self.driver_io_destination.analyze_data_dynamic(
+            time_series_collections, time_info_collections, static_datasets_collections, outcome_datasets_obj,
+            tag_exectype='SIM', tag_datatype='ARCHIVE', tag_datadriver='outcome', run_key_list=run_key_list)
+
+        # Method to analyze state datasets
+        self.driver_io_destination.analyze_data_dynamic(
+            time_series_collections, time_info_collections, static_datasets_collections, state_datasets_obj,
+            tag_exectype='SIM', tag_datatype='ARCHIVE', tag_datadriver='state', run_key_list=run_key_list)
+
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Method to compute the cache key of outcome datasets
+    # (only the model side of the datasets is checked; the destination side is written by this stage)
+    def compute_dynamic_key(self, time_series_collections, time_info_collections,
+                            outcome_datasets_obj, state_datasets_obj, file_path_run_ancillary):
+
+        model_datasets_obj = {}
+        for tag_datadriver, obj_datadriver in zip(['outcome', 'state'], [outcome_datasets_obj, state_datasets_obj]):
+            model_datasets_obj[tag_datadriver] = {
+                run_key: run_obj[self.driver_io_destination.tag_model] for run_key, run_obj in obj_datadriver.items()}
+
+        cache_key = compute_cache_key(
+            {'template_run': self.obj_run.obj_template_run_filled,
+             'time_series': time_series_collections, 'time_info': time_info_collections,
+             'data_settings': {dset_key: dset_value for dset_key, dset_value in
+                               self.obj_args.obj_datasets.items() if dset_key != 'Flags'},
+             'info_analysis': self.obj_run.obj_template_analysis_filled,
+             'datasets': model_datasets_obj},
+            cache_files=collect_cache_files(model_datasets_obj),
+            cache_parents=[get_cache_key(file_path_run_ancillary)])
+
+        return cache_key
+
     # -------------------------------------------------------------------------------------
     # Method to configure summary datasets
+    @monitor_method('finalizer.configure_summary_datasets', 'coupler')
     def configure_summary_datasets(self, time_series_collections, time_info_collections,
                                    static_datasets_collections, outcome_datasets_collections):
 
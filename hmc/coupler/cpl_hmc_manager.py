@@ -16,6 +16,8 @@ from hmc.algorithm.io.lib_data_geo_ascii import read_data_grid, read_data_raster
 from hmc.algorithm.utils.lib_utils_dict import get_dict_nested_value, get_dict_value
 from hmc.algorithm.utils.lib_utils_string import fill_tags2string
 from hmc.algorithm.utils.lib_utils_system import delete_folder
+from hmc.algorithm.utils.lib_utils_cache import remove_cache_obj
+from hmc.algorithm.utils.lib_utils_monitor import monitor_method
 
 from hmc.algorithm.default.lib_default_args import logger_name
 
@@ -40,6 +42,7 @@ class ModelInitializer:
 
     # -------------------------------------------------------------------------------------
     # Method time info
+    @monitor_method('initializer.configure_settings', 'coupler')
     def __init__(self, file_algorithm=None, file_datasets=None, time=None):
 
         # -------------------------------------------------------------------------------------
@@ -112,6 +115,7 @@ class ModelInitializer:
 
     # -------------------------------------------------------------------------------------
     # Method to configure algorithm
+    @monitor_method('initializer.configure_algorithm', 'coupler')
     def configure_algorithm(self):
 
         # Starting info
@@ -144,6 +148,7 @@ class ModelInitializer:
 
     # -------------------------------------------------------------------------------------
     # Method to configure ancillary datasets
+    @monitor_method('initializer.configure_ancillary_datasets', 'coupler')
     def configure_ancillary_datasets(self, time_info_collections):
 
         # Starting info
@@ -211,6 +216,7 @@ class ModelCleaner:
 
     # -------------------------------------------------------------------------------------
     # Method to clean tmp datasets
+    @monitor_method('cleaner.configure_cleaner', 'coupler')
     def configure_cleaner(self):
 
         # Starting info
@@ -242,10 +248,10 @@ class ModelCleaner:
 
             collection_path_tmp = []
             for collection_key, collection_filepath in collection_ancillary.items():
-                if os.path.exists(collection_filepath):
-                    collection_path_root = os.path.split(collection_filepath)[0]
+                collection_path_root = os.path.split(collection_filepath)[0]
+                if os.path.exists(collection_path_root):
                     collection_path_tmp.append(collection_path_root)
-                    os.remove(collection_filepath)
+                    remove_cache_obj(collection_filepath)
 
             collection_path_tmp = list(set(collection_path_tmp))
             for collection_path_step in collection_path_tmp:
@@ -11,15 +11,20 @@ Version:       '3.0.0'
 # Library
 import logging
 import os
-from multiprocessing import Pool, cpu_count
+import time
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import cpu_count
 
 from hmc.algorithm.default.lib_default_args import logger_name
 
 from hmc.algorithm.utils.lib_utils_dict import get_dict_value
-from hmc.algorithm.utils.lib_utils_process import exec_process
-from hmc.algorithm.utils.lib_utils_string import convert_bytes2string
+from hmc.algorithm.utils.lib_utils_process import exec_process, create_process_registry, \
+    terminate_process_registry, ProcessTransientError
 
-from hmc.algorithm.debug.lib_debug import read_workspace_obj, write_workspace_obj
+from hmc.algorithm.utils.lib_utils_cache import compute_cache_key, get_cache_key, get_cache_settings, \
+    read_cache_obj, write_cache_obj, remove_cache_obj, clean_cache_obj
+from hmc.algorithm.utils.lib_utils_monitor import monitor_method
 
 # Log
 log_stream = logging.getLogger(logger_name)
@@ -41,7 +46,9 @@ class ModelRunner:
     def __init__(self, time_info=None, run_info=None, command_line_info=None,
                  obj_args=None, obj_ancillary=None,
                  tag_run_mp='run_mp', tag_run_cpu='run_cpu', tag_run_deps='dependencies',
-                 tag_run_response='run_response'):
+                 tag_run_timeout='run_timeout', tag_run_retry='run_retry', tag_run_memory='run_memory',
+                 tag_run_stream='hmc_stream_{run_key}.log',
+                 tag_run_response='run_response', tag_run_deps_info='run_deps', run_deps_info=None):
 
         self.time_info = time_info
         self.run_info = run_info
@@ -62,13 +69,28 @@ class ModelRunner:
             log_stream.warning(' ===> Run CPUs flag is not unique.')
         self.run_cpu = run_cpu_unique[0]
 
+        self.run_timeout = self.set_run_value(self.run_info, tag_run_timeout, value_default=None)
+        self.run_retry = self.set_run_value(self.run_info, tag_run_retry, value_default=0)
+        self.run_memory = self.set_run_value(self.run_info, tag_run_memory, value_default=None)
+        self.run_retry_wait = 5
+        # grace period [seconds] between terminate and kill of the running members if the execution is aborted
+        self.run_kill_grace = 10
+        self.tag_run_stream = tag_run_stream
+
         run_deps_tmp = get_dict_value(self.run_info, tag_run_deps, [])
         run_deps_unique = list(set(run_deps_tmp))
         for model_dep in run_deps_unique:
             os.environ['LD_LIBRARY_PATH'] = 'LD_LIBRARY_PATH:' + model_dep
 
+        # Run dependencies from the algorithm settings (Run_Info:run_type:run_deps --> {run_key: [run_key_parent]})
+        if run_deps_info is None:
+            run_type_info = self.obj_args.obj_run_info_ref['run_type'] \
+                if 'run_type' in self.obj_args.obj_run_info_ref else {}
+            run_deps_info = run_type_info[tag_run_deps_info] if tag_run_deps_info in run_type_info else None
+
         self.run_list = list(self.run_info.keys())
         self.run_cpu = self.set_cpu(self.run_cpu)
+        self.run_deps_info = self.set_run_deps(self.run_list, run_deps_info)
 
         self.tag_run_response = tag_run_response
         self.run_info_collections = {'time_info' : self.time_info, 'run_info': self.run_info,
@@ -79,6 +101,83 @@ class ModelRunner:
         self.flag_cleaning_dynamic_outcome = self.obj_args.obj_datasets['Flags'][
             'cleaning_ancillary_data_dynamic_outcome']
 
+        self.cache_age_max, self.cache_size_max = get_cache_settings(self.obj_args.obj_datasets['Flags'])
+
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Method to get an unique run value
+    @staticmethod
+    def set_run_value(run_info, tag_run, value_default=None):
+        run_value_tmp = get_dict_value(run_info, tag_run, [])
+        run_value_unique = list(set(run_value_tmp))
+        if run_value_unique.__len__() > 1:
+            log_stream.warning(' ===> Run ' + tag_run + ' flag is not unique. Use the first value')
+        if run_value_unique:
+            run_value = run_value_unique[0]
+        else:
+            run_value = value_default
+        if run_value is None:
+            run_value = value_default
+        return run_value
+
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Method to set the run dependencies (runs executed only after the completion of the parent runs)
+    @staticmethod
+    def set_run_deps(run_list, run_deps_info=None):
+
+        run_deps_obj = {run_key: [] for run_key in run_list}
+        if run_deps_info is not None:
+            for run_key, run_deps in run_deps_info.items():
+                if run_key not in run_deps_obj:
+                    log_stream.error(' ===> Run "' + run_key + '" in the dependencies is not defined')
+                    raise RuntimeError('Bad definition of run dependencies')
+                if isinstance(run_deps, str):
+                    run_deps = [run_deps]
+                for run_dep in run_deps:
+                    if run_dep not in run_deps_obj:
+                        log_stream.error(' ===> Run dependency "' + run_dep + '" is not defined')
+                        raise RuntimeError('Bad definition of run dependencies')
+                run_deps_obj[run_key] = list(run_deps)
+
+        # check cycles in the dependencies graph
+        run_checked, run_visiting = set(), set()
+
+        def _visit(run_step):
+            if run_step in run_checked:
+                return
+            if run_step in run_visiting:
+                log_stream.error(' ===> Run dependencies have a cycle on run "' + run_step + '"')
+                raise RuntimeError('Bad definition of run dependencies')
+            run_visiting.add(run_step)
+            for run_parent in run_deps_obj[run_step]:
+                _visit(run_parent)
+            run_visiting.remove(run_step)
+            run_checked.add(run_step)
+
+        for run_key in run_list:
+            _visit(run_key)
+
+        return run_deps_obj
+
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Method to get the available memory [MB]
+    @staticmethod
+    def get_memory_available(file_meminfo='/proc/meminfo'):
+        if os.path.exists(file_meminfo):
+            with open(file_meminfo, 'r') as file_handle:
+                for file_line in file_handle:
+                    if file_line.startswith('MemAvailable:'):
+                        return float(file_line.split()[1]) / 1024.0
+        try:
+            return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / (1024.0 * 1024.0)
+        except (ValueError, OSError, AttributeError):
+            return None
+
     # -------------------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------------------
@@ -86,7 +185,7 @@ class ModelRunner:
     @staticmethod
     def set_cpu(run_cpu_usr):
 
-        run_cpu_max = cpu_count() - 2
+        run_cpu_max = cpu_count()
         if run_cpu_max <= 0:
             run_cpu_max = 1
 
@@ -101,120 +200,71 @@ class ModelRunner:
 
     # -------------------------------------------------------------------------------------
     # Method to configure execution
+    @monitor_method('runner.configure_execution', 'coupler')
     def configure_execution(self, ancillary_datasets_collections,
-                            ancillary_run_tag_type='dynamic_execution', ancillary_outcome_tag_type='dynamic_outcome'):
+                            ancillary_run_tag_type='dynamic_execution', ancillary_outcome_tag_type='dynamic_outcome',
+                            ancillary_source_tag_type='dynamic_source', callback_run=None):
 
         log_stream.info(' #### Configure execution ... ')
 
         file_path_outcome_ancillary = ancillary_datasets_collections[ancillary_outcome_tag_type]
         if self.flag_cleaning_dynamic_outcome:
-            if os.path.exists(file_path_outcome_ancillary):
-                os.remove(file_path_outcome_ancillary)
+            remove_cache_obj(file_path_outcome_ancillary)
 
         file_path_run_ancillary = ancillary_datasets_collections[ancillary_run_tag_type]
         if self.flag_cleaning_dynamic_execution:
-            if os.path.exists(file_path_run_ancillary):
-                os.remove(file_path_run_ancillary)
+            remove_cache_obj(file_path_run_ancillary)
+        clean_cache_obj(os.path.dirname(file_path_run_ancillary),
+                        cache_age_max=self.cache_age_max, cache_size_max=self.cache_size_max)
 
-        if (not os.path.exists(file_path_outcome_ancillary)) and (not os.path.exists(file_path_run_ancillary)):
+        # Compute the cache key using run settings, model executable(s) and key of the source datasets
+        # (namelist file(s) are rewritten at each run; their contents are defined by the settings)
+        run_exec_list = [run_cline.split()[0] for run_cline in self.command_line_info.values() if run_cline.split()]
+        cache_key = compute_cache_key(
+            {'time_info': self.time_info, 'run_info': self.run_info, 'cmd_info': self.command_line_info},
+            cache_files=run_exec_list,
+            cache_parents=[get_cache_key(ancillary_datasets_collections[ancillary_source_tag_type])])
+
+        # Method to read run info collections
+        run_info_collections = read_cache_obj(file_path_run_ancillary, cache_key)
+
+        if run_info_collections is None:
 
             # Configure sequential or multiprocessing execution mode
             if self.run_mp:
-                worker_response = self.worker_mp(process_n=self.run_cpu)
-                worker_response = worker_response[0]
+                process_n = self.run_cpu
             else:
-                worker_response = self.worker_seq()
+                process_n = 1
 
-            # Example of worker response
-            # worker_response = [[None, None, 0], [None, None, 0], [None, None, 0]]
-            # worker_response = [[None, b'STOP Stopped\n', 0]]
-
-            # Iterate over execution stream(s)
+            # Iterate over execution stream(s) (as soon as each run is completed)
             run_response = {}
-            for run_step, worker_step in zip(self.run_list, worker_response):
-
-                if worker_step[0] is not None:
-                    worker_step[0] = str(worker_step[0])
-                if worker_step[1] is not None:
-                    worker_step[1] = convert_bytes2string(worker_step[1])
-                if worker_step[2] is not None:
-                    worker_step[2] = str(worker_step[2])
-                
-                # Check of the standard stream(s) for each run
-                log_stream.info(' ----> Analyze run ' + run_step + ' ... ')
-                log_stream.info(' -----> StdOut: ' + str(worker_step[0]))
-                log_stream.info(' -----> StdErr: ' + str(worker_step[1]))
-                
-                # Check for StdErr valid flag(s)
-                if worker_step[1] is not None:
-                    log_stream.info(' ------> Check StdErr for finding error derived by valid StdErr flags ... ')
-                    for valid_flag_step in valid_flag_stderror_list:
-                        log_stream.info(' -------> Control the ' + valid_flag_step + ' return code in the StdErr ... ')
-                        check_response = worker_step[1].find(valid_flag_step)
-                        if check_response >= 0:
-                            worker_step[1] = None
-                            log_stream.info(' -------> Control the ' + valid_flag_step +
-                                            ' return code in the StdErr ... FOUND; StdError for run ' + run_step +
-                                            ' is set to "None"')
-                            break
-                        else:
-                            log_stream.info(' -------> Control the ' + valid_flag_step +
-                                            ' return code in the StdErr ... NOT FOUND')
-                            
-                    log_stream.info(' ------> Check StdErr for finding error derived by valid StdErr flags ... DONE')
-                    
-                log_stream.info(' -----> StdExit: ' + str(worker_step[2]))
-                
-                # Check of standard error messages
-                if worker_step[1] is not None:
-                    log_stream.info(' ----> Analyze run ' + run_step + ' ... FAILED')
-                    log_stream.info(' #### Configure execution ... FAILED')
-                    log_stream.error(' ===> Execution failed with "' + str(worker_step[1]) + '" message.')
-                    raise RuntimeError('Error found in running hmc model. Check your settings and datasets!')
-                else:
-                    log_stream.info(' ----> Analyze run ' + run_step + ' ... DONE')
-                    run_response[run_step] = worker_step
+            for run_step, worker_step in self.worker_scheduler(process_n=process_n):
+
+                run_response[run_step] = self.analyze_execution(run_step, worker_step)
+
+                # Execute the run callback (if defined)
+                if callback_run is not None:
+                    callback_run(run_step, run_response[run_step])
+
+            # Order execution(s) info using the run list
+            run_response = {run_step: run_response[run_step] for run_step in self.run_list if run_step in run_response}
 
             # Freeze execution(s) info
             run_info_collections = self.freeze_execution(run_response)
-            # Dump run info collections
-            write_workspace_obj(file_path_run_ancillary, run_info_collections)
+            # Dump run info collections (with the status of the stream file(s) written by the runs; the entry is
+            # not valid if the run folders are cleaned)
+            run_stream_list = [self.set_process_args(run_key, self.command_line_info[run_key])['file_stream']
+                               for run_key in run_response.keys()]
+            write_cache_obj(file_path_run_ancillary, cache_key, run_info_collections, cache_outputs=run_stream_list)
 
             # Ending info
             log_stream.info(' #### Configure execution ... DONE')
 
-        elif os.path.exists(file_path_outcome_ancillary) and os.path.exists(file_path_run_ancillary):
-
-            # Ending info
-            log_stream.info(' #### Configure execution ... SKIPPED. Run datasets always stored in ' +
-                            file_path_run_ancillary + ' and Outcome datasets always stored in: ' +
-                            file_path_outcome_ancillary)
-            # Collect run info collections
-            run_info_collections = read_workspace_obj(file_path_run_ancillary)
-
-        elif not os.path.exists(file_path_outcome_ancillary) and os.path.exists(file_path_run_ancillary):
+        else:
 
             # Ending info
             log_stream.info(' #### Configure execution ... SKIPPED. Run datasets always stored in ' +
-                            file_path_run_ancillary + ' but Outcome datasets will be computed')
-            # Collect run info collections
-            run_info_collections = read_workspace_obj(file_path_run_ancillary)
-
-        elif os.path.exists(file_path_outcome_ancillary) and not os.path.exists(file_path_run_ancillary):
-
-            # Ending info
-            log_stream.info(' #### Configure execution ... SKIPPED. Outcome datasets always stored in: ' +
-                            file_path_outcome_ancillary + ' but Run datasets are not available')
-            log_stream.warning(
-                ' ===> Run datasets not available; your outcome datasets could be not produced by this model instance.')
-            # Run info collections are null
-            run_info_collections = None
-
-        else:
-            # Error in ancillary file
-            log_stream.info(' #### Configure execution ... FAILED')
-            log_stream.error(' ===> Ancillary file for outcome datasets collections is not correctly defined')
-            raise RuntimeError('Bad definition of ancillary dynamic file')
+                            file_path_run_ancillary + ' [key: ' + cache_key + ']')
 
         return run_info_collections
     # -------------------------------------------------------------------------------------
@@ -228,38 +278,171 @@ class ModelRunner:
     # -------------------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------------------
-    # Method to run model in sequential mode
-    def worker_seq(self):
+    # Method to define the process settings of a run
+    def set_process_args(self, run_key, run_cline):
+
+        run_exec = run_cline.split()[0]
+        file_stream = os.path.join(os.path.dirname(run_exec), self.tag_run_stream.format(run_key=run_key))
+
+        process_args = {'command_line': run_cline, 'time_out': self.run_timeout, 'file_stream': file_stream}
+
+        return process_args
+
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Method to analyze the execution of a run
+    @staticmethod
+    def analyze_execution(run_step, worker_step):
+
+        # Example of worker response
+        # worker_step = {'exit_code': 0, 'time_elapsed': 120.4, 'memory_peak': 512.3,
+        #                'stdout_tail': '...', 'stderr_tail': None, 'run_attempts': 1, ...}
+
+        # Check of the standard stream(s) for each run
+        log_stream.info(' ----> Analyze run ' + run_step + ' ... ')
+        log_stream.info(' -----> StdOut (tail): ' + str(worker_step['stdout_tail']))
+        log_stream.info(' -----> StdErr (tail): ' + str(worker_step['stderr_tail']))
+        log_stream.info(' -----> Time elapsed: ' + str(worker_step['time_elapsed']) +
+                        ' seconds - Memory peak: ' + str(worker_step['memory_peak']) + ' MB')
+
+        # Check for StdErr valid flag(s)
+        if worker_step['stderr_tail'] is not None:
+            log_stream.info(' ------> Check StdErr for finding error derived by valid StdErr flags ... ')
+            for valid_flag_step in valid_flag_stderror_list:
+                log_stream.info(' -------> Control the ' + valid_flag_step + ' return code in the StdErr ... ')
+                check_response = worker_step['stderr_tail'].find(valid_flag_step)
+                if check_response >= 0:
+                    worker_step['stderr_tail'] = None
+                    log_stream.info(' -------> Control the ' + valid_flag_step +
+                                    ' return code in the StdErr ... FOUND; StdError for run ' + run_step +
+                                    ' is set to "None"')
+                    break
+                else:
+                    log_stream.info(' -------> Control the ' + valid_flag_step +
+                                    ' return code in the StdErr ... NOT FOUND')
+
+            log_stream.info(' ------> Check StdErr for finding error derived by valid StdErr flags ... DONE')
+
+        log_stream.info(' -----> StdExit: ' + str(worker_step['exit_code']))
+
+        # Check of standard error messages
+        if worker_step['stderr_tail'] is not None:
+            log_stream.info(' ----> Analyze run ' + run_step + ' ... FAILED')
+            log_stream.info(' #### Configure execution ... FAILED')
+            log_stream.error(' ===> Execution failed with "' + str(worker_step['stderr_tail']) + '" message.')
+            raise RuntimeError('Error found in running hmc model. Check your settings and datasets!')
+
+        log_stream.info(' ----> Analyze run ' + run_step + ' ... DONE')
+
+        return worker_step
+
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Method to check if the memory is enough to start a new run
+    def check_memory(self, run_memory_peaks):
 
-        exec_response_list = []
-        for run_key, run_cline in self.command_line_info.items():
-            exec_response = exec_process(run_cline)
-            exec_response_list.append(exec_response)
-        return exec_response_list
+        if self.run_memory is not None:
+            run_memory_expected = self.run_memory
+        elif run_memory_peaks:
+            run_memory_expected = max(run_memory_peaks)
+        else:
+            return True
+
+        run_memory_available = self.get_memory_available()
+        if run_memory_available is None:
+            return True
+
+        return run_memory_available >= run_memory_expected
 
     # -------------------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------------------
-    # Method to run model in multiprocessing mode
-    def worker_mp(self, process_n=2):
-
-        run_cline_list = []
-        for run_key, run_cline in self.command_line_info.items():
-            run_cline_list.append(run_cline)
-
-        log_stream.info(' -----> Pooling requests ... ')
-        exec_response_list = []
-        if run_cline_list:
-            with Pool(processes=process_n, maxtasksperchild=1) as process_pool:
-                exec_response = process_pool.map(exec_process, run_cline_list, chunksize=1)
-                process_pool.close()
-                process_pool.join()
-                exec_response_list.append(exec_response)
-            log_stream.info(' -----> Pooling requests ... DONE')
+    # Method to schedule the runs (yield the responses as soon as each run is completed)
+    def worker_scheduler(self, process_n=1, time_poll=1.0):
+
+        run_pending = [run_key for run_key in self.run_list if run_key in self.command_line_info]
+        run_completed, run_running = set(), {}
+        run_attempts = {run_key: 0 for run_key in run_pending}
+        run_time_ready = {run_key: 0.0 for run_key in run_pending}
+        run_memory_peaks = []
+
+        log_stream.info(' -----> Scheduling runs [processes: ' + str(process_n) + ' - runs: ' +
+                        str(run_pending.__len__()) + '] ... ')
+
+        exec_pool = ThreadPoolExecutor(max_workers=max(1, process_n))
+        exec_registry = create_process_registry()
+        try:
+            while run_pending or run_running:
+
+                # Submit the ready runs (dependencies completed, retry wait elapsed, cpus and memory available)
+                for run_key in list(run_pending):
+                    if run_running.__len__() >= process_n:
+                        break
+                    if any([run_dep not in run_completed for run_dep in self.run_deps_info[run_key]]):
+                        continue
+                    if run_time_ready[run_key] > time.time():
+                        continue
+                    if run_running and (not self.check_memory(run_memory_peaks)):
+                        log_stream.info(' ------> Run ' + run_key + ' ... WAITING. Memory is not enough')
+                        break
+
+                    run_attempts[run_key] += 1
+                    run_pending.remove(run_key)
+                    run_future = exec_pool.submit(
+                        exec_process, process_registry=exec_registry,
+                        **self.set_process_args(run_key, self.command_line_info[run_key]))
+                    run_running[run_future] = run_key
+
+                    log_stream.info(' ------> Run ' + run_key + ' ... STARTED [attempt: ' +
+                                    str(run_attempts[run_key]) + ']')
+
+                if not run_running:
+                    time.sleep(min(time_poll, max(0.0, min(
+                        [run_time_ready[run_key] for run_key in run_pending]) - time.time())))
+                    continue
+
+                # Collect the completed runs
+                run_done, run_not_done = wait(list(run_running.keys()), timeout=time_poll,
+                                              return_when=FIRST_COMPLETED)
+                for run_future in run_done:
+                    run_key = run_running.pop(run_future)
+                    try:
+                        run_response = run_future.result()
+                    except ProcessTransientError as run_error:
+                        # Only time-out and killed runs are retried (settings or executable errors are not)
+                        if run_attempts[run_key] <= self.run_retry:
+                            log_stream.warning(' ===> Run ' + run_key + ' failed [' + str(run_error) +
+                                               ']. Retry in ' + str(self.run_retry_wait) + ' seconds')
+                            run_time_ready[run_key] = time.time() + self.run_retry_wait
+                            run_pending.insert(0, run_key)
+                            continue
+                        log_stream.error(' ===> Run ' + run_key + ' failed after ' +
+                                         str(run_attempts[run_key]) + ' attempt(s)')
+                        raise
+
+                    run_response['run_attempts'] = run_attempts[run_key]
+                    if run_response['memory_peak'] is not None:
+                        run_memory_peaks.append(run_response['memory_peak'])
+                    run_completed.add(run_key)
+
+                    log_stream.info(' ------> Run ' + run_key + ' ... COMPLETED [' +
+                                    str(run_completed.__len__()) + '/' + str(run_attempts.__len__()) + ']')
+
+                    yield run_key, run_response
+
+        except BaseException:
+            # Cancel the runs not started, stop the running ones and report the failure
+            exec_pool.shutdown(wait=False, cancel_futures=True)
+            terminate_process_registry(exec_registry, time_grace=self.run_kill_grace)
+            raise
         else:
-            log_stream.info(' -----> Pooling requests ... SKIPPED. PREVIOUSLY DONE')
+            exec_pool.shutdown(wait=True)
+
+        log_stream.info(' -----> Scheduling runs [processes: ' + str(process_n) + ' - runs: ' +
+                        str(run_attempts.__len__()) + '] ... DONE')
 
-        return exec_response_list
     # -------------------------------------------------------------------------------------
 
 # -------------------------------------------------------------------------------------
@@ -0,0 +1,130 @@
+"""
+Class Features
+
+Name:          drv_configuration_hmc_monitor
+Author(s):     Fabio Delogu (fabio.delogu@cimafoundation.org)
+Date:          '20261018'
+Version:       '3.1.6'
+"""
+
+#######################################################################################
+# Library
+import logging
+import os
+
+from hmc.algorithm.io.lib_data_io_json import read_file_json
+from hmc.algorithm.utils.lib_utils_dict import get_dict_nested_value
+from hmc.algorithm.utils.lib_utils_string import fill_tags2string
+from hmc.algorithm.utils.lib_utils_monitor import set_monitor, check_monitor, get_monitor_report, \
+    write_monitor_report, write_monitor_trace
+
+from hmc.algorithm.default.lib_default_args import logger_name
+
+# Log
+log_stream = logging.getLogger(logger_name)
+
+# Debug
+# import matplotlib.pylab as plt
+#######################################################################################
+
+
+# -------------------------------------------------------------------------------------
+# Class Monitor
+class ModelMonitor:
+
+    # -------------------------------------------------------------------------------------
+    # Method class initialization
+    def __init__(self, file_algorithm, tag_monitor_file=None, tag_run_name=None, tag_run_domain=None,
+                 tag_template_monitor=None):
+
+        # -------------------------------------------------------------------------------------
+        # Store information in global workspace
+        self.file_algorithm = file_algorithm
+        self.file_handle = read_file_json(file_algorithm)
+
+        if tag_monitor_file is None:
+            tag_monitor_file = ['Run_Info', 'run_location', 'monitor']
+        if tag_run_name is None:
+            tag_run_name = ['Run_Info', 'run_type', 'run_name']
+        if tag_run_domain is None:
+            tag_run_domain = ['Run_Info', 'run_type', 'run_domain']
+        if tag_template_monitor is None:
+            tag_template_monitor = ['Template', 'run']
+
+        self.file_monitor = get_dict_nested_value(self.file_handle, tag_monitor_file)
+        self.run_name = get_dict_nested_value(self.file_handle, tag_run_name)
+        self.run_domain = get_dict_nested_value(self.file_handle, tag_run_domain)
+
+        self.template_monitor_ref = get_dict_nested_value(self.file_handle, tag_template_monitor)
+        self.template_monitor_def = {'run_domain': self.run_domain, 'run_name': self.run_name}
+
+        self.tag_folder = 'file_folder'
+        self.tag_filename = 'file_name'
+        self.tag_trace = 'file_trace'
+        # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Method to define the monitor file path(s)
+    def define_filename(self, tag_file):
+
+        if (self.file_monitor is None) or (tag_file not in self.file_monitor):
+            return None
+        file_name_raw = self.file_monitor[tag_file]
+        folder_name_raw = self.file_monitor[self.tag_folder] if self.tag_folder in self.file_monitor else None
+        if (file_name_raw is None) or (folder_name_raw is None):
+            return None
+
+        file_name_def = fill_tags2string(file_name_raw, self.template_monitor_ref, self.template_monitor_def)
+        folder_name_def = fill_tags2string(folder_name_raw, self.template_monitor_ref, self.template_monitor_def)
+
+        return os.path.join(folder_name_def, file_name_def)
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Method to configure the monitor (active only if the report file is defined)
+    def configure_monitor(self):
+
+        file_report = self.define_filename(self.tag_filename)
+        if file_report is not None:
+            set_monitor(monitor_active=True)
+        else:
+            set_monitor(monitor_active=False)
+
+        return check_monitor()
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Method to dump the monitor report (json) and the trace-event file (optional)
+    def dump_monitor(self, report_info=None, span_group='coupler'):
+
+        if not check_monitor():
+            return None
+
+        log_stream.info(' ----> Dump monitor report ... ')
+
+        report_obj = get_monitor_report(report_info=report_info)
+
+        for span_name, span_summary in report_obj['summary'].items():
+            if span_summary['group'] == span_group:
+                log_stream.info(' -----> Stage "' + span_name + '" - Time elapsed: ' +
+                                str(span_summary['time_elapsed']) + ' seconds - Time cpu: ' +
+                                str(span_summary['time_cpu']) + ' seconds - Peak rss delta: ' +
+                                str(span_summary['rss_peak_delta']) + ' MB')
+
+        file_report = self.define_filename(self.tag_filename)
+        write_monitor_report(file_report, report_obj)
+        log_stream.info(' -----> Report: ' + file_report)
+
+        file_trace = self.define_filename(self.tag_trace)
+        if file_trace is not None:
+            write_monitor_trace(file_trace, report_obj)
+            log_stream.info(' -----> Trace: ' + file_trace)
+
+        log_stream.info(' ----> Dump monitor report ... DONE')
+
+        return report_obj
+    # -------------------------------------------------------------------------------------
+
+# -------------------------------------------------------------------------------------
@@ -68,6 +68,7 @@ class ModelRun:
         self.obj_run_info_filled, self.obj_run_args = self.set_run_arguments()
 
         self.obj_template_analysis_filled = self.set_run_analysis()
+        self.obj_template_io_filled = self.set_run_io()
 
         self.line_indent = 4 * ' '
 
@@ -287,6 +288,16 @@ class ModelRun:
                 log_stream.warning(' ===> "Analysis catchments" is not callable! Catchments analysis will be disabled')
                 analysis_catchment = False
 
+            if 'analysis_pipeline' in obj_type:
+                analysis_pipeline = obj_type['analysis_pipeline']
+            else:
+                analysis_pipeline = False
+
+            if 'analysis_pipeline_cpu' in obj_type:
+                analysis_pipeline_cpu = obj_type['analysis_pipeline_cpu']
+            else:
+                analysis_pipeline_cpu = 1
+
         else:
             log_stream.warning(' ===> "Analysis settings" are not defined in the algorithm file. Use constants settings.')
             log_stream.warning(' ===> Users are strongly invited to define "Analysis settings" dictionary \n'
@@ -297,18 +308,136 @@ class ModelRun:
             analysis_cpu = 1
             analysis_mp = False
             analysis_catchment = False
+            analysis_pipeline = False
+            analysis_pipeline_cpu = 1
 
         if not analysis_mp:
             analysis_cpu = 1
+        if (not analysis_pipeline) or (analysis_pipeline_cpu < 1):
+            analysis_pipeline_cpu = 1
 
         analysis_obj['analysis_catchment'] = analysis_catchment
         analysis_obj['analysis_cpu'] = analysis_cpu
         analysis_obj['analysis_mp'] = analysis_mp
+        analysis_obj['analysis_pipeline'] = analysis_pipeline
+        analysis_obj['analysis_pipeline_cpu'] = analysis_pipeline_cpu
 
         return analysis_obj
 
     # -------------------------------------------------------------------------------------
 
+    # -------------------------------------------------------------------------------------
+    # Method to set run i/o
+    def set_run_io(self, tag_type='run_io'):
+
+        io_obj = {}
+
+        if tag_type in list(self.obj_run_info_ref.keys()):
+            obj_type = self.obj_run_info_ref[tag_type]
+
+            if 'io_mp' in obj_type:
+                io_mp = obj_type['io_mp']
+            else:
+                log_stream.warning(' ===> "IO multiprocessing" is not set. Default configuration is false')
+                io_mp = False
+
+            if 'io_cpu' in obj_type:
+                io_cpu = obj_type['io_cpu']
+            else:
+                log_stream.warning(' ===> "IO CPU" is not callable! Workers used by i/o will be 1')
+                io_cpu = 1
+
+            if 'io_mode' in obj_type:
+                io_mode = obj_type['io_mode']
+            else:
+                log_stream.warning(' ===> "IO mode" is not callable! Default executor is "thread"')
+                io_mode = 'thread'
+
+            if 'io_unzip_cache' in obj_type:
+                io_unzip_cache = obj_type['io_unzip_cache']
+            else:
+                io_unzip_cache = None
+
+            # size of the gzip members in MB (multi-member files are compressed and decompressed in parallel)
+            if 'io_zip_member' in obj_type:
+                io_zip_member = obj_type['io_zip_member']
+            else:
+                io_zip_member = None
+
+            # method to regrid forcing datasets over the terrain grid (nearest, bilinear or conservative)
+            if 'io_regrid_method' in obj_type:
+                io_regrid_method = obj_type['io_regrid_method']
+            else:
+                io_regrid_method = 'nearest'
+
+            # read only the window of the forcing datasets over the terrain bounding box (margin in cells)
+            if 'io_bbox' in obj_type:
+                io_bbox = obj_type['io_bbox']
+            else:
+                io_bbox = False
+            if 'io_bbox_margin' in obj_type:
+                io_bbox_margin = obj_type['io_bbox_margin']
+            else:
+                io_bbox_margin = 2
+
+            # check the availability of the forcing datasets using a catalog of the archive folders
+            if 'io_catalog' in obj_type:
+                io_catalog = obj_type['io_catalog']
+            else:
+                io_catalog = False
+
+            # read the forcing tiff datasets using the overview level (null to read the full resolution)
+            if 'io_overview' in obj_type:
+                io_overview = obj_type['io_overview']
+            else:
+                io_overview = None
+
+        else:
+            log_stream.warning(' ===> "IO settings" are not defined in the algorithm file. Use constants settings.')
+            io_cpu = 1
+            io_mp = False
+            io_mode = 'thread'
+            io_unzip_cache = None
+            io_zip_member = None
+            io_regrid_method = 'nearest'
+            io_bbox = False
+            io_bbox_margin = 2
+            io_catalog = False
+            io_overview = None
+
+        if io_mode not in ['thread', 'process']:
+            log_stream.warning(' ===> "IO mode" ' + str(io_mode) + ' is not allowed. Default executor is "thread"')
+            io_mode = 'thread'
+
+        if io_regrid_method not in ['nearest', 'bilinear', 'conservative']:
+            log_stream.warning(' ===> "IO regrid method" ' + str(io_regrid_method) +
+                               ' is not allowed. Default method is "nearest"')
+            io_regrid_method = 'nearest'
+
+        if not io_mp:
+            io_cpu = 1
+
+        io_obj['io_mp'] = io_mp
+        io_obj['io_cpu'] = io_cpu
+        io_obj['io_mode'] = io_mode
+        io_obj['io_unzip_cache'] = io_unzip_cache
+        if io_zip_member is not None:
+            io_obj['io_zip_member'] = int(io_zip_member * 1024 * 1024)
+        else:
+            io_obj['io_zip_member'] = None
+        io_obj['io_regrid_method'] = io_regrid_method
+        io_obj['io_bbox'] = io_bbox
+        io_obj['io_bbox_margin'] = int(io_bbox_margin)
+        io_obj['io_catalog'] = io_catalog
+        if io_overview is not None:
+            io_obj['io_overview'] = int(io_overview)
+        else:
+            io_obj['io_overview'] = None
+
+        return io_obj
+
+    # -------------------------------------------------------------------------------------
+
     # -------------------------------------------------------------------------------------
     # Method to set run mode
     def set_run_mode(self, tag_type='run_type', tag_location='run_location'):
@@ -393,6 +522,9 @@ class ModelRun:
         for obj_key, obj_value in obj_type.items():
             if obj_key == 'run_mode':
                 obj_type_upd['run_mode'] = run_mode
+            elif obj_key == 'run_deps':
+                # dependencies between runs are used by the runner (not a template value of the single run)
+                continue
             else:
                 obj_type_upd[obj_key] = [obj_value] * run_mode.__len__()
         obj_type_upd['run_var'] = run_var
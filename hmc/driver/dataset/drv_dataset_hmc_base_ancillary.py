@@ -16,6 +16,7 @@ from hmc.algorithm.utils.lib_utils_system import create_folder
 from hmc.algorithm.utils.lib_utils_string import fill_tags2string
 from hmc.algorithm.utils.lib_utils_dict import get_dict_all_items
 from hmc.algorithm.utils.lib_utils_string import remove_string_parts
+from hmc.algorithm.utils.lib_utils_monitor import monitor_method
 
 from hmc.algorithm.default.lib_default_args import logger_name
 
@@ -80,6 +81,7 @@ class ModelAncillary:
 
     # -------------------------------------------------------------------------------------
     # Method to organize data ancillary
+    @monitor_method('ancillary.organize_data_ancillary', 'driver')
     def organize_data_ancillary(self, time_collections_obj):
 
         # Starting information
@@ -15,6 +15,7 @@ import pandas as pd
 
 from copy import deepcopy
 
+from hmc.algorithm.utils.lib_utils_monitor import monitor_method
 from hmc.algorithm.default.lib_default_args import logger_name
 
 from hmc.driver.dataset.drv_dataset_hmc_io_dynamic_outcome import DSetManager as DSetManager_Outcome
@@ -45,6 +46,7 @@ class ModelDestination:
                  template_run_def=None,
                  template_run_ref=None,
                  template_analysis_def=None,
+                 template_io_def=None,
                  template_static=None,
                  template_outcome=None,
                  **kwargs):
@@ -63,6 +65,7 @@ class ModelDestination:
         self.obj_template_run_def = template_run_def
         self.obj_template_run_ref = template_run_ref
         self.obj_template_analysis_def = template_analysis_def
+        self.obj_template_io_def = template_io_def
         self.obj_template_dset_static_ref = template_static
         self.obj_template_dset_outcome_ref = template_outcome
 
@@ -83,6 +86,7 @@ class ModelDestination:
             dset_list_type=['ARCHIVE'],
             model_tag=self.tag_model, datasets_tag=self.tag_datasets,
             template_time=self.obj_template_time, template_analysis_def=self.obj_template_analysis_def,
+            template_io_def=self.obj_template_io_def,
             file_compression_mode=True)
 
         self.vars_outcome_analysis = {'Gridded': ['ET', 'ETCum', 'ETPotCum', 'LST', 'SM'],
@@ -98,6 +102,7 @@ class ModelDestination:
             terrain_transform=self.geo_obj['transform'],
             dset_list_type=['ARCHIVE'],
             model_tag=self.tag_model, datasets_tag=self.tag_datasets, template_time=self.obj_template_time,
+            template_io_def=self.obj_template_io_def,
             file_compression_mode=True)
 
         self.vars_state_analysis = {'Gridded': None, 'Point': None}
@@ -121,8 +126,10 @@ class ModelDestination:
 
     # -------------------------------------------------------------------------------------
     # Method to analyze dynamic outcome/state datasets and model
+    @monitor_method('destination.analyze_data_dynamic', 'driver')
     def analyze_data_dynamic(self, obj_time_series, obj_time_info, obj_static_datasets,
-                             obj_dynamic_datasets, tag_exectype='SIM', tag_datatype='ARCHIVE', tag_datadriver='outcome'):
+                             obj_dynamic_datasets, tag_exectype='SIM', tag_datatype='ARCHIVE', tag_datadriver='outcome',
+                             run_key_list=None):
 
         # Starting info
         log_stream.info(' ----> Analyze ' + tag_datadriver + ' datasets for datatype ' + tag_datatype + ' ... ')
@@ -143,6 +150,11 @@ class ModelDestination:
         for (run_key, obj_ts_step), obj_ti_step, obj_dset_step in zip(obj_time_series.items(),
                                                                       obj_time_info.values(),
                                                                       obj_dynamic_datasets.values()):
+
+            # Skip run(s) not selected (if a list of runs is defined)
+            if (run_key_list is not None) and (run_key not in run_key_list):
+                continue
+
             # info
             log_stream.info(' -----> Run ' + run_key + ' ... ')
 
@@ -281,6 +293,7 @@ class ModelDestination:
 
     # -------------------------------------------------------------------------------------
     # Method to organize dynamic outcome/state model and datasets
+    @monitor_method('destination.organize_data_dynamic', 'driver')
     def organize_data_dynamic(self, time_series_collections, static_datasets_collections, template_run_filled,
                               tag_exectype='SIM', tag_datadriver='outcome'):
 
@@ -323,6 +336,7 @@ class ModelDestination:
 
     # -------------------------------------------------------------------------------------
     # Method to analyze dynamic outcome/state datasets and model
+    @monitor_method('destination.analyze_data_summary', 'driver')
     def analyze_data_summary(self, obj_outcome_datasets, obj_time_series, obj_time_info, obj_static_datasets,
                              obj_dynamic_datasets, obj_dynamic_run, tag_exectype='POST_PROCESSING',
                              tag_datadriver='summary'):
@@ -412,6 +426,7 @@ class ModelDestination:
 
     # -------------------------------------------------------------------------------------
     # Method to organize summary datasets
+    @monitor_method('destination.organize_data_summary', 'driver')
     def organize_data_summary(self, time_series_collections, static_datasets_collections, template_run_filled,
                               tag_exectype='POST_PROCESSING', tag_datadriver='summary'):
 
@@ -17,6 +17,7 @@ from copy import deepcopy
 
 from hmc.algorithm.utils.lib_utils_dict import set_dict_values, lookup_dict_keys
 from hmc.algorithm.utils.lib_utils_geo import compute_section_mask
+from hmc.algorithm.utils.lib_utils_monitor import monitor_method
 from hmc.algorithm.default.lib_default_args import logger_name
 
 from hmc.driver.dataset.drv_dataset_hmc_io_static import DSetManager as DSetManager_Static
@@ -47,6 +48,7 @@ class ModelSource:
                  template_run_path=None,
                  template_run_def=None,
                  template_analysis_def=None,
+                 template_io_def=None,
                  template_static=None, template_dynamic=None, **kwargs):
 
         self.dset_obj = datasets_obj
@@ -71,6 +73,7 @@ class ModelSource:
         self.obj_template_run_ref = template_run_ref
         self.obj_template_run_path = template_run_path
         self.obj_template_analysis_def = template_analysis_def
+        self.obj_template_io_def = template_io_def
         self.obj_template_dset_static_ref = template_static
         self.obj_template_dset_dynamic_ref = template_dynamic
 
@@ -127,6 +130,7 @@ class ModelSource:
             dset_list_type=['OBS', 'FOR'],
             model_tag=self.tag_model, datasets_tag=self.tag_datasets,
             template_time=self.obj_template_time, template_analysis_def=self.obj_template_analysis_def,
+            template_io_def=self.obj_template_io_def,
             file_compression_mode=True)
 
         self.vars_forcing_analysis = {
@@ -162,10 +166,31 @@ class ModelSource:
         self.dset_collections_static = None
         self.dset_collections_dynamic = None
 
+        self.mask_path = None
+
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Method to set the folder of the regrid index(es) (stored with the static ancillary datasets)
+    def set_regrid_path(self, regrid_path):
+        self.reader_forcing.regrid_path = regrid_path
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Method to set the folder of the section labels (stored with the static ancillary datasets)
+    def set_mask_path(self, mask_path):
+        self.mask_path = mask_path
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Method to set the file of the datasets catalog (stored with the static ancillary datasets)
+    def set_catalog_file(self, catalog_file):
+        self.reader_forcing.catalog_file = catalog_file
     # -------------------------------------------------------------------------------------
 
     # -------------------------------------------------------------------------------------
     # Method to analyze static datasets and model
+    @monitor_method('source.analyze_data_static', 'driver')
     def analyze_data_static(self, obj_static_datasets, tag_datatype='LAND', tag_datadriver='static'):
 
         # Start info
@@ -320,7 +345,8 @@ class ModelSource:
             section_reference = dset_collections_static['Section']
             geo_reference = self.reader_geo.dset_static_ref
 
-            mask_obj = compute_section_mask(geo_fdir_values, geo_reference=geo_reference, section_reference=section_reference)
+            mask_obj = compute_section_mask(geo_fdir_values, geo_reference=geo_reference,
+                                            section_reference=section_reference, mask_path=self.mask_path)
 
         else:
             mask_obj = None
@@ -354,6 +380,7 @@ class ModelSource:
 
     # -------------------------------------------------------------------------------------
     # Method to analyze restart datasets and model
+    @monitor_method('source.analyze_data_dynamic_restart', 'driver')
     def analyze_data_dynamic_restart(self, obj_time_series, obj_time_info,
                                      obj_static_datasets, obj_dynamic_datasets,
                                      obj_run_settings, obj_run_path,
@@ -492,6 +519,7 @@ class ModelSource:
 
     # -------------------------------------------------------------------------------------
     # Method to analyze dynamic forcing datasets and model
+    @monitor_method('source.analyze_data_dynamic_forcing', 'driver')
     def analyze_data_dynamic_forcing(self, obj_time_series, obj_time_info,
                                      obj_static_datasets, obj_dynamic_datasets,
                                      obj_run_settings, obj_run_path,
@@ -645,6 +673,7 @@ class ModelSource:
 
     # -------------------------------------------------------------------------------------
     # Method to analyze dynamic updating datasets and model
+    @monitor_method('source.analyze_data_dynamic_updating', 'driver')
     def analyze_data_dynamic_updating(self, obj_time_series, obj_time_info,
                                       obj_static_datasets, obj_dynamic_datasets,
                                       obj_run_settings, obj_run_path,
@@ -797,6 +826,7 @@ class ModelSource:
 
     # -------------------------------------------------------------------------------------
     # Method to organize dynamic datasets and model
+    @monitor_method('source.organize_data_dynamic', 'driver')
     def organize_data_dynamic(self, time_series_collections, template_run_filled, template_run_path,
                               static_datasets_collections=None, tag_datadriver='forcing'):
 
@@ -847,6 +877,7 @@ class ModelSource:
 
     # -------------------------------------------------------------------------------------
     # Method to organize restart datasets and model
+    @monitor_method('source.organize_data_restart', 'driver')
     def organize_data_restart(self, time_series_collections, template_run_filled):
 
         # Starting information
@@ -886,6 +917,7 @@ class ModelSource:
 
     # -------------------------------------------------------------------------------------
     # Method to organize dynamic datasets and model
+    @monitor_method('source.organize_data_static', 'driver')
     def organize_data_static(self, template_filled):
 
         # Starting information
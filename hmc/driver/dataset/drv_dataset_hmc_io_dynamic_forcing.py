@@ -20,17 +20,24 @@ import pandas as pd
 import xarray as xr
 
 from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 from hmc.algorithm.io.lib_data_io_generic import swap_darray_dims_xy, create_darray_3d, create_darray_2d, \
     write_dset, create_dset
-from hmc.algorithm.io.lib_data_zip_gzip import zip_filename
+from hmc.algorithm.io.lib_data_zip_gzip import zip_filename_step
 
 from hmc.algorithm.utils.lib_utils_analysis import compute_domain_mean, \
-    compute_catchment_mean_serial, compute_catchment_mean_parallel_sync, compute_catchment_mean_parallel_async
+    compute_catchment_mean_serial, compute_catchment_mean_parallel_sync, compute_catchment_mean_parallel_async, \
+    compute_catchment_weights
 from hmc.algorithm.utils.lib_utils_system import split_path, create_folder, copy_file
-from hmc.algorithm.utils.lib_utils_string import fill_tags2string
+from hmc.algorithm.utils.lib_utils_string import fill_tags2string, fill_tags2string_period
 from hmc.algorithm.utils.lib_utils_list import flat_list
 from hmc.algorithm.utils.lib_utils_zip import add_zip_extension
+from hmc.algorithm.utils.lib_utils_regrid import get_regrid_index, apply_regrid, regrid_method_list
+from hmc.algorithm.utils.lib_utils_time import convert_time_values, align_time_values
+from hmc.algorithm.utils.lib_utils_catalog import set_catalog, add_catalog_root, check_catalog_file, write_catalog
+from hmc.algorithm.utils.lib_utils_monitor import monitor_method, monitor_span
+from hmc.algorithm.utils.lib_utils_import import import_load
 
 from hmc.algorithm.default.lib_default_variables import variable_default_fields as dset_default_base
 from hmc.algorithm.default.lib_default_args import logger_name, time_format_algorithm, time_format_datasets
@@ -56,7 +63,7 @@ class DSetManager:
                  dset_list_format=None,
                  dset_list_type=None,
                  dset_list_group=None,
-                 template_time=None, template_analysis_def=None,
+                 template_time=None, template_analysis_def=None, template_io_def=None,
                  model_tag='hmc', datasets_tag='datasets',
                  coord_name_geo_x='Longitude', coord_name_geo_y='Latitude', coord_name_time='time',
                  dim_name_geo_x='west_east', dim_name_geo_y='south_north', dim_name_time='time',
@@ -201,6 +208,8 @@ class DSetManager:
         self.template_time = template_time
 
         self.var_interp = 'nearest'
+        self.regrid_path = None
+        self.catalog_file = None
 
         self.dset_write_engine = dset_write_engine
         self.dset_write_compression_level = dset_write_compression_level
@@ -259,6 +268,70 @@ class DSetManager:
             self.flag_analysis_ts_catchment_mode = False
             self.flag_analysis_ts_catchment_cpu = 1
 
+        self.mask_weights_obj = None
+
+        self.template_io_def = template_io_def
+        if self.template_io_def is not None:
+
+            if 'io_mp' in list(self.template_io_def.keys()):
+                self.flag_io_mp = self.template_io_def['io_mp']
+            else:
+                self.flag_io_mp = False
+
+            if 'io_cpu' in list(self.template_io_def.keys()):
+                self.flag_io_cpu = self.template_io_def['io_cpu']
+            else:
+                self.flag_io_cpu = 1
+
+            if 'io_mode' in list(self.template_io_def.keys()):
+                self.flag_io_mode = self.template_io_def['io_mode']
+            else:
+                self.flag_io_mode = 'thread'
+
+            if 'io_unzip_cache' in list(self.template_io_def.keys()):
+                self.flag_io_unzip_cache = self.template_io_def['io_unzip_cache']
+            else:
+                self.flag_io_unzip_cache = None
+
+            if 'io_zip_member' in list(self.template_io_def.keys()):
+                self.flag_io_zip_member = self.template_io_def['io_zip_member']
+            else:
+                self.flag_io_zip_member = None
+
+            if 'io_regrid_method' in list(self.template_io_def.keys()):
+                self.var_interp = self.template_io_def['io_regrid_method']
+
+            if 'io_bbox' in list(self.template_io_def.keys()):
+                self.flag_io_bbox = self.template_io_def['io_bbox']
+            else:
+                self.flag_io_bbox = False
+
+            if 'io_bbox_margin' in list(self.template_io_def.keys()):
+                self.flag_io_bbox_margin = self.template_io_def['io_bbox_margin']
+            else:
+                self.flag_io_bbox_margin = 2
+
+            if 'io_overview' in list(self.template_io_def.keys()):
+                self.flag_io_overview = self.template_io_def['io_overview']
+            else:
+                self.flag_io_overview = None
+
+            if 'io_catalog' in list(self.template_io_def.keys()):
+                self.flag_io_catalog = self.template_io_def['io_catalog']
+            else:
+                self.flag_io_catalog = False
+
+        else:
+            self.flag_io_mp = False
+            self.flag_io_cpu = 1
+            self.flag_io_mode = 'thread'
+            self.flag_io_unzip_cache = None
+            self.flag_io_zip_member = None
+            self.flag_io_bbox = False
+            self.flag_io_bbox_margin = 2
+            self.flag_io_overview = None
+            self.flag_io_catalog = False
+
     @staticmethod
     def validate_flag(data_name, data_flag, flag_key_expected=None, flag_values_expected=None):
 
@@ -300,6 +373,7 @@ class DSetManager:
 
         return file_path_def
 
+    @monitor_method('source.copy_data', 'driver')
     def copy_data(self, dset_model_dyn, dset_source_dyn, columns_excluded=None, vars_selected=None):
 
         # Starting info
@@ -399,7 +473,7 @@ class DSetManager:
                         folder_name_source_step, file_name_source_step = split_path(file_path_source_step)
                         folder_name_dest_step, file_name_dest_step = split_path(file_path_dest_step)
 
-                        if os.path.exists(file_path_source_step):
+                        if check_catalog_file(file_path_source_step):
 
                             if var_source_step in vars_selected:
 
@@ -430,6 +504,7 @@ class DSetManager:
         # Ending info
         log_stream.info(' -------> Copy data ... DONE')
 
+    @monitor_method('source.freeze_data', 'driver')
     def freeze_data(self, dset_expected, dset_def, dset_key_delimiter=':', dset_key_excluded=None):
 
         # Starting info
@@ -485,11 +560,7 @@ class DSetManager:
                                     log_stream.error(' ===> Freeze time array is not defined for variables')
                                     raise NotImplementedError('Time array is unknown for freezing data')
 
-                            time_stamp_list = []
-                            for time_step in time_array:
-                                time_stamp = pd.to_datetime(time_step, format='%Y-%m-%d_%H:%M:%S')
-                                time_stamp_list.append(time_stamp)
-                            dset_idx = pd.DatetimeIndex(time_stamp_list)
+                            dset_idx = convert_time_values(time_array, time_rounding=None)
                             dset_values = dset_def[dset_var_step].values
 
                             dset_expected.loc[dset_idx, dset_var_step] = dset_values
@@ -514,11 +585,7 @@ class DSetManager:
                     if dset_check:
 
                         time_array = dset_def[dset_var_step].time.values
-                        time_stamp_list = []
-                        for time_step in time_array:
-                            time_stamp = pd.to_datetime(time_step, format='%Y-%m-%d_%H:%M:%S')
-                            time_stamp_list.append(time_stamp)
-                        dset_idx = pd.DatetimeIndex(time_stamp_list)
+                        dset_idx = convert_time_values(time_array, time_rounding=None)
                         dset_values = dset_def[dset_var_step].values
 
                     elif dframe_check:
@@ -539,14 +606,21 @@ class DSetManager:
 
         return dset_expected
 
+    @monitor_method('source.dump_data', 'driver')
     def dump_data(self, dset_model, dset_time, dset_source):
 
         # Starting info
         log_stream.info(' -------> Dump data ... ')
 
+        # Compression worker(s) (the compression of a step overlaps the writing of the next steps)
+        zip_process_n = max(self.flag_io_cpu, 1)
+        zip_member_size = self.flag_io_zip_member
+        zip_executor = None
+
         dump_status_list = []
         file_path_list_unzip = []
         file_path_list_zip = []
+        file_zip_list = []
         for time_step in dset_time:
 
             log_stream.info(' --------> TimeStep ' + str(time_step)  + ' ... ')
@@ -606,6 +680,15 @@ class DSetManager:
                 file_path_list_unzip.append(dset_file_path_step_unzip)
                 file_path_list_zip.append(dset_file_path_step_zip)
 
+                if self.file_compression_mode and (dset_file_path_step_zip != dset_file_path_step_unzip):
+                    if zip_executor is None:
+                        zip_executor = ThreadPoolExecutor(max_workers=zip_process_n)
+                    file_zip_list.append(zip_executor.submit(
+                        zip_filename_step, dset_file_path_step_unzip, dset_file_path_step_zip,
+                        member_size=zip_member_size, process_n=zip_process_n))
+                else:
+                    file_zip_list.append(None)
+
                 dump_status_list.append(True)
                 log_stream.info(' --------> TimeStep ' + str(time_step) + ' ... DONE')
             else:
@@ -615,39 +698,42 @@ class DSetManager:
         # Ending info
         log_stream.info(' -------> Dump data ... DONE')
 
-        # Starting info
-        log_stream.info(' -------> Zip data ... ')
+        # Wait the compression worker(s) (time not overlapped with the writing of the steps)
+        with monitor_span('source.zip_data', 'driver'):
+            # Starting info
+            log_stream.info(' -------> Zip data ... ')
 
-        file_compression_mode = self.file_compression_mode
-        if file_compression_mode:
-            for file_path_unzip, file_path_zip, dump_status in zip(file_path_list_unzip, file_path_list_zip,
-                                                                   dump_status_list):
+            file_compression_mode = self.file_compression_mode
+            if file_compression_mode:
+                for file_path_unzip, file_path_zip, file_zip, dump_status in zip(
+                        file_path_list_unzip, file_path_list_zip, file_zip_list, dump_status_list):
 
-                if dump_status:
+                    if dump_status:
 
-                    if os.path.exists(file_path_zip):
-                        os.remove(file_path_zip)
+                        if file_zip is None:
+                            # Ending info (filename without zip extension)
+                            log_stream.warning(' -------> Zip data ... SKIPPED. File ' + file_path_unzip +
+                                               ' has not the zip extension')
+                        elif not file_zip.result():
+                            # Ending info
+                            log_stream.warning(' -------> Zip data ... SKIPPED. File ' + file_path_unzip +
+                                               ' not available')
 
-                    if os.path.exists(file_path_unzip):
-                        zip_filename(file_path_unzip, file_path_zip)
                     else:
                         # Ending info
-                        log_stream.warning(' -------> Zip data ... SKIPPED. File ' + file_path_unzip + ' not available')
+                        log_stream.warning(' -------> Zip data ... SKIPPED. File' + file_path_unzip + ' not saved')
 
-                    if os.path.exists(file_path_zip) and os.path.exists(file_path_unzip):
-                        os.remove(file_path_unzip)
+                # Ending info
+                log_stream.info(' -------> Zip data ... DONE')
 
-                else:
-                    # Ending info
-                    log_stream.warning(' -------> Zip data ... SKIPPED. File' + file_path_unzip + ' not saved')
-
-            # Ending info
-            log_stream.info(' -------> Zip data ... DONE')
+            else:
+                # Ending info
+                log_stream.info(' -------> Zip data ... SKIPPED. Zip not activated')
 
-        else:
-            # Ending info
-            log_stream.info(' -------> Zip data ... SKIPPED. Zip not activated')
+            if zip_executor is not None:
+                zip_executor.shutdown(wait=True)
 
+    @monitor_method('source.organize_data', 'driver')
     def organize_data(self, dset_time, dset_source, dset_static=None, dset_variable_selected='ALL'):
 
         # Get variable(s)
@@ -695,22 +781,8 @@ class DSetManager:
                                 dims_list = list(var_da_step.dims)
 
                                 if 'time' in dims_list:
-                                    time_stamp_period = []
-                                    for time_step in var_da_step['time'].values:
-                                        timestamp_step = pd.to_datetime(time_step, format='%Y-%m-%d_%H:%M:%S')
-
-                                        if isinstance(timestamp_step, pd.DatetimeIndex):
-                                            timestamp_step = timestamp_step[0]
-                                        elif isinstance(timestamp_step, pd.Timestamp):
-                                            pass
-                                        else:
-                                            log_stream.error(' ===> Time type is not allowed')
-                                            raise NotImplementedError('Case not implemented yet')
-
-                                        timestamp_step = timestamp_step.round('H')
-                                        time_stamp_period.append(timestamp_step)
-
-                                    dset_time_step = pd.DatetimeIndex(time_stamp_period)
+                                    # convert and round the time values in one call
+                                    dset_time_step = convert_time_values(var_da_step['time'].values, time_rounding='H')
 
                                     if isinstance(dset_time, pd.Timestamp):
                                         dset_time = pd.DatetimeIndex([dset_time])
@@ -773,15 +845,15 @@ class DSetManager:
                                         raise IOError('Check netcdf datasets for dims definition')
 
                                     # Get variable, data, time and attributes of expected data
-                                    var_data_expected = np.zeros(
+                                    var_data_expected = np.full(
                                         [var_da_step.shape[dim_idx_geo_y], var_da_step.shape[dim_idx_geo_x],
-                                         dset_time.shape[0]])
+                                         dset_time.shape[0]], np.nan, dtype=np.float32)
 
                                     # Check datasets dimensions and in case of mismatching try to correct
                                     if (var_data_expected.shape[0] == da_terrain.shape[1]) and (
                                             var_data_expected.shape[1] == da_terrain.shape[0]):
-                                        var_data_expected = np.zeros([da_terrain.shape[0], da_terrain.shape[1],
-                                                                      dset_time.shape[0]])
+                                        var_data_expected = np.full([da_terrain.shape[0], da_terrain.shape[1],
+                                                                     dset_time.shape[0]], np.nan, dtype=np.float32)
                                         log_stream.info(' --------> ' + var_name_step +
                                                         ' datasets and terrain datasets have the same dimensions'
                                                         ' in different order found by using the automatic detection')
@@ -789,8 +861,8 @@ class DSetManager:
                                         active_interp_method = True
 
                                     elif var_data_expected.shape[:2] != da_terrain.shape:
-                                        var_data_expected = np.zeros([geo_x_values.shape[0], geo_y_values.shape[1],
-                                                                     dset_time.shape[0]])
+                                        var_data_expected = np.full([geo_x_values.shape[0], geo_y_values.shape[1],
+                                                                     dset_time.shape[0]], np.nan, dtype=np.float32)
                                         log_stream.info(' --------> ' + var_name_step +
                                                         ' datasets and terrain datasets have not the same dimensions'
                                                         ' found by using the automatic detection')
@@ -809,8 +881,6 @@ class DSetManager:
                                                          ' by using the automatic detection')
                                         raise IOError('Check your static and forcing datasets')
 
-                                    var_data_expected[:, :, :] = np.nan
-
                                     # Get variable, data, time and attributes of expected data
                                     var_da_expected = create_darray_3d(
                                         var_data_expected, dset_time, geo_x_values, geo_y_values,
@@ -863,14 +933,19 @@ class DSetManager:
                                             dim_name_x='Longitude', dim_name_y='Latitude',
                                             dims_order=['Latitude', 'Longitude', self.dim_name_time])
 
-                                        if self.var_interp == 'nearest':
+                                        if self.var_interp in regrid_method_list:
                                             # Interpolation method info start
                                             log_stream.info(' ----------> Apply ' + self.var_interp + ' method ... ')
 
-                                            # Apply the interpolation method
-                                            var_da_interp_tmp = var_da_selected_tmp.interp(
-                                                Latitude=self.da_terrain['Latitude'],
-                                                Longitude=self.da_terrain['Longitude'], method='nearest')
+                                            # Apply the interpolation method (index or weights are computed once for each grid)
+                                            regrid_obj = get_regrid_index(
+                                                var_da_selected_tmp['Longitude'].values,
+                                                var_da_selected_tmp['Latitude'].values,
+                                                self.da_terrain['Longitude'].values,
+                                                self.da_terrain['Latitude'].values,
+                                                regrid_method=self.var_interp, regrid_path=self.regrid_path)
+                                            var_da_interp_tmp = apply_regrid(
+                                                var_da_selected_tmp.values, regrid_obj)
 
                                             # Interpolation method info end
                                             log_stream.info(' ----------> Apply method ' + self.var_interp + ' ... DONE')
@@ -878,11 +953,11 @@ class DSetManager:
                                             # Ending info for undefined function
                                             log_stream.error(' ===> Interpolation method ' +
                                                              self.var_interp + ' not available')
-                                            raise NotImplemented('Interpolation method not implemented yet')
+                                            raise NotImplementedError('Interpolation method not implemented yet')
 
                                         # Configure the data array with west_east/south_north coordinates
                                         var_da_interp = create_darray_3d(
-                                            var_da_interp_tmp.values, dset_time,
+                                            var_da_interp_tmp, dset_time,
                                             self.da_terrain['Longitude'].values, self.da_terrain['Latitude'].values,
                                             coord_name_time=self.coord_name_time,
                                             coord_name_x=self.coord_name_geo_x, coord_name_y=self.coord_name_geo_y,
@@ -989,21 +1064,27 @@ class DSetManager:
                         if mask_name_obj is not None:
 
                             if not self.flag_analysis_ts_catchment_mode:
+                                if self.mask_weights_obj is None:
+                                    self.mask_weights_obj = compute_catchment_weights(mask_name_obj)
                                 var_dset_ts_catchment = compute_catchment_mean_serial(
                                     var_dset_out, mask_name_obj,
                                     variable_domain_fields=self.tag_variable_fields,
-                                    variable_selected_list=self.list_variable_selected)
+                                    variable_selected_list=self.list_variable_selected,
+                                    mask_weights_obj=self.mask_weights_obj)
                             elif self.flag_analysis_ts_catchment_mode:
                                 # var_dset_ts_catchment = compute_catchment_mean_parallel_sync(
                                 #    var_dset_out, mask_name_obj,
                                 #    cpu_n=self.flag_analysis_ts_catchment_cpu,
                                 #    variable_domain_fields=self.tag_variable_fields,
                                 #    variable_selected_list=self.list_variable_selected)
+                                if self.mask_weights_obj is None:
+                                    self.mask_weights_obj = compute_catchment_weights(mask_name_obj)
                                 var_dset_ts_catchment = compute_catchment_mean_parallel_async(
                                     var_dset_out, mask_name_obj,
                                     cpu_n=self.flag_analysis_ts_catchment_cpu,
                                     variable_domain_fields=self.tag_variable_fields,
-                                    variable_selected_list=self.list_variable_selected)
+                                    variable_selected_list=self.list_variable_selected,
+                                    mask_weights_obj=self.mask_weights_obj)
                             else:
                                 log_stream.error(' ===> Catchments analysis mode not allowed')
                                 raise RuntimeError('Unexpected catchments analysis condition')
@@ -1079,6 +1160,7 @@ class DSetManager:
 
         return var_dset_out, var_dset_collections
 
+    @monitor_method('source.collect_data', 'driver')
     def collect_data(self, dset_model_dyn, dset_source_dyn, dset_source_base,
                      dset_static_info=None,
                      columns_excluded=None, dset_time_info=None,
@@ -1096,6 +1178,8 @@ class DSetManager:
             var_args['lake_name_list'] = kwargs['lake_name_list']
         if 'path_tmp' in kwargs:
             path_tmp = kwargs['path_tmp']
+        else:
+            path_tmp = None
         if 'clean_tmp' in kwargs:
             clean_tmp = kwargs['clean_tmp']
         else:
@@ -1106,227 +1190,111 @@ class DSetManager:
         else:
             flag_data_mandatory = False
 
-        da_terrain = self.da_terrain
-
         file_source_vars_tmp = list(dset_source_dyn.columns)
         file_source_vars_def = [elem for elem in file_source_vars_tmp if elem not in columns_excluded]
 
-        var_frame = {}
-        dset_source = None
-        for var_name in file_source_vars_def:
-
-            log_stream.info(' -------> Collect ' + var_name + ' source datasets ... ')
-
-            if dset_source_base is not None:
-
-                if var_name in list(dset_source_base.keys()):
-
-                    dset_source_var_base = dset_source_base[var_name]
-                    dset_source_var_dyn = dset_source_dyn[var_name]
-
-                    if var_name in list(dset_default_base.keys()):
-                        dset_default_var_base = dset_default_base[var_name]
-                    else:
-                        dset_default_var_base = None
-
-                    dset_datetime_idx = dset_source_var_dyn.index
-                    dset_filename = dset_source_var_dyn.values
-
-                    if 'format' in dset_source_base:
-                        dset_format = dset_source_base['format']
-                    else:
-                        dset_format = None
-
-                    if dset_static_info is not None:
-                        if var_name == 'Discharge':
-                            var_static_info = dset_static_info['outlet_name_list']
-                        elif (var_name == 'DamV') or (var_name == 'DamL'):
-                            var_static_info = dset_static_info['dam_name_list']
-                        elif (var_name == 'IntakeQ'):                                               #add20210607
-                            var_static_info = dset_static_info['plant_name_list']                   #add20210607
-                        elif var_name == 'VarAnalysis':
-                            var_static_info = None
-                        else:
-                            var_static_info = None
-                    else:
-                        var_static_info = None
-
-                    # create the data reader obj
-                    driver_hmc_parser = DSetReader(dset_filename, dset_source_var_base, dset_datetime_idx,
-                                                   dset_time_info,
-                                                   file_tmp_path=path_tmp, file_tmp_clean=clean_tmp,
-                                                   dset_var_format=dset_format,
-                                                   file_src_mandatory=flag_data_mandatory)
-
-                    # get the data reader datasets
-                    obj_var, da_time, geo_x, geo_y = driver_hmc_parser.read_filename_dynamic(
-                        var_name, var_args, var_time_start=dset_time_start, var_time_end=dset_time_end,
-                        var_static_info=var_static_info)
-
-                    if obj_var is not None:
-                        if isinstance(obj_var, xr.Dataset):
-
-                            # Organize datasets name
-                            log_stream.info(' --------> Organize ' + var_name + ' dataset name ... ')
-                            obj_var_name_list = list(obj_var.data_vars)
-                            if obj_var_name_list.__len__() == 1:
-
-                                log_stream.info(' ---------> Variable list: ' + str(obj_var_name_list) +
-                                                ' with 1 item')
-
-                                obj_var_name = obj_var_name_list[0]
-
-                                if obj_var_name != var_name:
-                                    obj_var = obj_var.rename_vars({obj_var_name: var_name})
-                                    log_stream.warning(' ===> Switch variable name in dataset from "' +
-                                                       obj_var_name + '" to "' + var_name + '"')
-
-                            else:
-                                log_stream.info(' ---------> Variable list: ' + str(obj_var_name_list) +
-                                                ' with ' + str(obj_var_name_list.__len__()) + ' items')
-
-                            log_stream.info(' --------> Organize ' + var_name + ' dataset name ... DONE')
-
-                            # Organize datasets units
-                            log_stream.info(' --------> Organize ' + var_name + ' dataset units ... ')
-
-                            driver_hmc_composer = DSetComposer(dset_filename, dset_source_var_base,
-                                                               dset_datetime_idx,
-                                                               file_tmp_path=path_tmp, file_tmp_clean=clean_tmp,
-                                                               time_dst_info=dset_time_info)
-                            obj_var = driver_hmc_composer.validate_data_units(var_name, obj_var, dset_default_var_base)
-
-                            log_stream.info(' --------> Organize ' + var_name + ' dataset units ... DONE')
-
-                            # Organize datasets geographical domain
-                            log_stream.info(' --------> Organize ' + var_name + ' dataset geographical domain  ... ')
-                            if ((obj_var['west_east'].shape[0] != da_terrain['west_east'].shape[0]) or
-                                    (obj_var['south_north'].shape[0] != da_terrain['south_north'].shape[0])):
-
-                                # Interpolation info start
-                                log_stream.info(' ---------> Interpolate ' + var_name + ' datasets ... ')
-
-                                # Configure data array with longitude/latitude coordinates
-                                var_da_src = create_darray_3d(
-                                    obj_var[var_name].values, da_time, geo_x, geo_y,
-                                    coord_name_time=self.coord_name_time,
-                                    coord_name_x='Longitude', coord_name_y='Latitude',
-                                    dim_name_time=self.dim_name_time,
-                                    dim_name_x='Longitude', dim_name_y='Latitude',
-                                    dims_order=['Latitude', 'Longitude', self.dim_name_time])
-
-                                if self.var_interp == 'nearest':
-                                    # Interpolation method info start
-                                    log_stream.info(' -----------> Apply ' + self.var_interp + ' method ... ')
-
-                                    # Apply the interpolation method
-                                    var_da_interp_tmp = var_da_src.interp(
-                                        Latitude=da_terrain['Latitude'],
-                                        Longitude=da_terrain['Longitude'], method='nearest')
-
-                                    # Interpolation method info end
-                                    log_stream.info(' -----------> Apply ' + self.var_interp + ' method ... DONE')
-                                else:
-                                    # Ending info for undefined function
-                                    log_stream.error(' ===> Interpolation method ' +
-                                                     self.var_interp + ' not available')
-                                    raise NotImplemented('Interpolation method not implemented yet')
-
-                                # Configure the data array with west_east/south_north coordinates
-                                var_da_interp = create_darray_3d(
-                                    var_da_interp_tmp, da_time,
-                                    da_terrain['Longitude'].values, da_terrain['Latitude'].values,
-                                    coord_name_time=self.coord_name_time,
-                                    coord_name_x=self.coord_name_geo_x, coord_name_y=self.coord_name_geo_y,
-                                    dim_name_time=self.dim_name_time,
-                                    dim_name_x=self.dim_name_geo_x, dim_name_y=self.dim_name_geo_y,
-                                    dims_order=[self.dim_name_geo_y, self.dim_name_geo_x,
-                                                self.dim_name_time])
-
-                                var_da_masked = var_da_interp.where((da_terrain != -9999))
-
-                                obj_var = var_da_masked.to_dataset(name=var_name)
-                                geo_x = da_terrain['Longitude'].values
-                                geo_y = da_terrain['Latitude'].values
-
-                                # Interpolation info end
-                                log_stream.info(' ---------> Interpolate ' + var_name + ' datasets ... DONE')
-
-                            log_stream.info(' --------> Organize ' + var_name + ' dataset geographical domain  ... DONE')
-
-                            log_stream.info(' --------> Organize ' + var_name + ' dataset time period  ... ')
-                            if obj_var[self.coord_name_time].shape[0] < dset_datetime_idx.shape[0]:
-
-                                if var_name != 'ALL':
-
-                                    log_stream.info(' ---------> Fill expected datasets with dynamic values  ... ')
-
-                                    var_x_tmp = da_terrain['Longitude'].values.shape[0]
-                                    var_y_tmp = da_terrain['Latitude'].values.shape[0]
-                                    var_time_tmp = dset_datetime_idx.shape[0]
+        # Arguments of the variable worker (the manager is not passed to avoid to pickle it in process mode)
+        var_collect_args = {'dset_source_base': dset_source_base, 'da_terrain': self.da_terrain,
+                            'dset_static_info': dset_static_info, 'dset_time_info': dset_time_info,
+                            'dset_time_start': dset_time_start, 'dset_time_end': dset_time_end,
+                            'var_args': var_args, 'path_tmp': path_tmp, 'clean_tmp': clean_tmp,
+                            'flag_data_mandatory': flag_data_mandatory,
+                            'var_interp': self.var_interp, 'regrid_path': self.regrid_path,
+                            'coord_args': {'coord_name_time': self.coord_name_time,
+                                           'coord_name_geo_x': self.coord_name_geo_x,
+                                           'coord_name_geo_y': self.coord_name_geo_y,
+                                           'dim_name_time': self.dim_name_time,
+                                           'dim_name_geo_x': self.dim_name_geo_x,
+                                           'dim_name_geo_y': self.dim_name_geo_y},
+                            'io_args': {'io_cpu': self.flag_io_cpu, 'io_unzip_cache': self.flag_io_unzip_cache,
+                                        'io_bbox': self.flag_io_bbox, 'io_bbox_obj': self.terrain_bbox,
+                                        'io_bbox_margin': self.flag_io_bbox_margin,
+                                        'io_overview': self.flag_io_overview}}
+
+        # Collect variable(s) in concurrent or sequential mode
+        var_collections = []
+        if self.flag_io_mp and (file_source_vars_def.__len__() > 1):
+
+            io_cpu = min(self.flag_io_cpu, file_source_vars_def.__len__())
+            log_stream.info(' -------> Collect source datasets in concurrent mode [workers: ' + str(io_cpu) +
+                            ' - executor: ' + self.flag_io_mode + '] ... ')
+
+            if self.flag_io_mode == 'thread':
+                exec_pool_type = ThreadPoolExecutor
+            elif self.flag_io_mode == 'process':
+                exec_pool_type = ProcessPoolExecutor
+            else:
+                log_stream.error(' ===> Collect mode "' + str(self.flag_io_mode) + '" is not allowed')
+                raise NotImplementedError('Case not implemented yet')
 
-                                    var_values_period = obj_var[var_name].values
-                                    var_time_period = da_time.values
+            # Load the lazy reader module(s) before the workers (the first access is not thread-safe)
+            import_load(['rasterio', 'netCDF4', 'scipy.sparse'])
 
-                                    var_values_tmp = np.zeros([var_y_tmp, var_x_tmp, var_time_tmp])
-                                    var_values_tmp[:, :, :] = np.nan
-                                    for var_time_i, var_time_step in enumerate(var_time_period):
-                                        var_time_idx = dset_datetime_idx.indexer_at_time(pd.Timestamp(var_time_step))[0]
-                                        var_values_step = var_values_period[:, :, var_time_i]
-                                        var_values_tmp[:, :, var_time_idx] = var_values_step
+            with exec_pool_type(max_workers=io_cpu) as exec_pool:
+                exec_futures = [exec_pool.submit(collect_variable, var_name, dset_source_dyn[[var_name]],
+                                                 **var_collect_args)
+                                for var_name in file_source_vars_def]
+                for exec_future in exec_futures:
+                    var_collections.append(exec_future.result())
 
-                                    var_da_tmp = create_darray_3d(
-                                        var_values_tmp, dset_datetime_idx, geo_x, geo_y,
-                                        coord_name_time=self.coord_name_time,
-                                        coord_name_x=self.coord_name_geo_x, coord_name_y=self.coord_name_geo_y,
-                                        dim_name_time=self.dim_name_time,
-                                        dim_name_x=self.dim_name_geo_x, dim_name_y=self.dim_name_geo_y,
-                                        dims_order=[self.dim_name_geo_y, self.dim_name_geo_x, self.dim_name_time])
+            log_stream.info(' -------> Collect source datasets in concurrent mode [workers: ' + str(io_cpu) +
+                            ' - executor: ' + self.flag_io_mode + '] ... DONE')
 
-                                    obj_var = var_da_tmp.to_dataset(name=var_name)
-                                    log_stream.info(' ---------> Fill expected datasets with dynamic values  ... DONE')
+        else:
+            for var_name in file_source_vars_def:
+                var_collections.append(collect_variable(var_name, dset_source_dyn[[var_name]],
+                                                        **var_collect_args))
 
-                            log_stream.info(' --------> Organize ' + var_name + ' dataset time period  ... DONE')
+        # Organize a common dataset for all variable(s)
+        var_frame = {}
+        dset_source = None
+        dset_source_list = []
+        for var_name, obj_var, geo_x, geo_y in var_collections:
 
-                            # Organize a common dataset for all variable(s)
-                            log_stream.info(' --------> Organize ' + var_name + ' dataset in a common dataset ... ')
-                            if self.coord_name_geo_x not in list(var_frame.keys()):
-                                var_frame[self.coord_name_geo_x] = geo_x
-                            if self.coord_name_geo_y not in list(var_frame.keys()):
-                                var_frame[self.coord_name_geo_y] = geo_y
+            if obj_var is None:
+                continue
 
-                            if dset_source is None:
-                                dset_source = obj_var
-                            else:
-                                dset_source = dset_source.combine_first(obj_var)
-                            log_stream.info(' --------> Organize ' + var_name + ' dataset in a common dataset ... DONE')
+            if isinstance(obj_var, xr.Dataset):
 
-                        elif isinstance(obj_var, dict):
-                            if dset_source is None:
-                                dset_source = {}
+                if self.coord_name_geo_x not in list(var_frame.keys()):
+                    var_frame[self.coord_name_geo_x] = geo_x
+                if self.coord_name_geo_y not in list(var_frame.keys()):
+                    var_frame[self.coord_name_geo_y] = geo_y
 
-                            if var_name == 'ALL':
-                                if isinstance(obj_var, dict):
-                                    obj_tmp = list(obj_var.values())[0]
-                                    var_name = obj_tmp.name
+                dset_source_list.append(obj_var)
 
-                            dset_source[var_name] = obj_var
-                        else:
-                            log_stream.error(' ===> Data dynamic object is not allowed')
-                            raise NotImplementedError('Object dynamic type is not valid')
+            elif isinstance(obj_var, dict):
+                if dset_source is None:
+                    dset_source = {}
+                dset_source[var_name] = obj_var
 
-                    log_stream.info(' -------> Collect ' + var_name + ' source datasets ... DONE')
-                else:
-                    log_stream.warning(' ===> Variable is not available in the datasets')
-                    log_stream.info(' -------> Collect ' + var_name + ' source datasets ... FAILED')
+        if dset_source_list:
+            log_stream.info(' -------> Organize source datasets in a common dataset ... ')
+            # Merge the variable(s) in a single step (same way for the sequential and the concurrent modes)
+            if dset_source_list.__len__() == 1:
+                dset_source = dset_source_list[0]
             else:
-                log_stream.warning(' ===> Type datasets is not defined')
-                log_stream.info(' -------> Collect ' + var_name + ' source datasets ... FAILED')
+                dset_source = xr.merge(dset_source_list, compat='override', join='outer')
+            log_stream.info(' -------> Organize source datasets in a common dataset ... DONE')
 
         var_frame[self.datasets_tag] = dset_source
 
         return var_frame
 
+    # Method to collect the folder templates of the source datasets (used as roots of the catalog)
+    def collect_folder_root(self, dset_obj):
+
+        folder_name_list = []
+        for dset_format, dset_workspace in dset_obj.items():
+            dset_item = dset_workspace[self.datasets_tag]
+            for dset_step_type in self.dset_list_type:
+                dset_type = dset_item[dset_step_type] if dset_step_type in dset_item else None
+                if dset_type is not None:
+                    for dset_key, dset_value in dset_type.items():
+                        folder_name_list.append(dset_value[self.folder_name_tag])
+
+        return folder_name_list
+
     # Method to define filename of datasets
     def collect_filename(self, time_series, template_run_ref, template_run_filled, template_run_path,
                          extra_dict=None):
@@ -1351,6 +1319,11 @@ class DSetManager:
             template_run_extra = None
             template_keys_extra = None
 
+        # Activate the catalog of the datasets folders (file(s) availability is checked by folder listings)
+        if self.flag_io_catalog:
+            set_catalog(catalog_active=True, catalog_file=self.catalog_file)
+            add_catalog_root(self.collect_folder_root(dset_obj))
+
         ws_vars = {}
         dset_vars = {}
         dset_time = {}
@@ -1443,8 +1416,8 @@ class DSetManager:
 
                                 datetime_eta_step = pd.Timestamp(eta_list_tmp).to_pydatetime()
 
-                                template_run_ref_step = deepcopy(template_run_ref)
-                                template_run_filled_step = deepcopy(template_run_filled)
+                                template_run_ref_step = template_run_ref
+                                template_run_filled_step = template_run_filled
 
                                 if dset_format == 'TimeSeries':
                                     if template_run_extra is not None:
@@ -1470,7 +1443,7 @@ class DSetManager:
 
                                 if isinstance(folder_name_tmp, list) and isinstance(file_name_tmp, list):
                                     for folder_name_tmp_step, file_name_tmp_step in zip(folder_name_tmp, file_name_tmp):
-                                        if os.path.exists(os.path.join(folder_name_tmp_step, file_name_tmp_step)):
+                                        if check_catalog_file(os.path.join(folder_name_tmp_step, file_name_tmp_step)):
                                             if folder_name_sel is None:
                                                 folder_name_sel = folder_name_tmp
                                             if file_name_sel is None:
@@ -1484,7 +1457,7 @@ class DSetManager:
                                     file_time_sel = datetime_step
 
                                     if eta_list_step.__len__() > 1:
-                                        if os.path.exists(os.path.join(folder_name_sel, file_name_sel)):
+                                        if check_catalog_file(os.path.join(folder_name_sel, file_name_sel)):
                                             break
                                         else:
                                             folder_name_sel = None
@@ -1618,32 +1591,37 @@ class DSetManager:
                     datetime_idx_period_tmp.append(datetime_idx_period[filegroup_idx_step])
                     filetype_idx_period_tmp.append(filetype_idx_period[filegroup_idx_step])
 
-            file_path_list = []
-            file_time_list = []
-            file_path_merged = []
-            for datetime_idx_step in datetime_idx_period_tmp:
-                datetime_step = datetime_idx_step.to_pydatetime()
-
-                template_run_ref_step = deepcopy(template_run_ref)
-                template_run_filled_step = deepcopy(template_run_filled)
+            # Define the constant and the time tags (templates are compiled once and filled for all the period)
+            template_merge_ref = {**template_run_ref, **self.template_time}
+            template_merge_filled = dict(template_run_filled)
+            template_time_tags = list(self.template_time.keys())
 
-                template_time_filled = dict.fromkeys(list(self.template_time.keys()), datetime_step)
-                template_merge_filled = {**template_run_filled_step, **template_time_filled}
+            if dset_format == 'Point':
+                template_merge_filled['dset_var_name_forcing_point'] = file_var_lut
+                if template_keys_extra is not None:
+                    for template_key_extra in template_keys_extra:
+                        template_merge_filled[template_key_extra] = None
+                    template_time_tags = [template_key for template_key in template_time_tags
+                                          if template_key not in template_keys_extra]
 
-                template_merge_ref = {**template_run_ref_step, **self.template_time}
-
-                if dset_format == 'Point':
-                    template_merge_filled['dset_var_name_forcing_point'] = file_var_lut
-                    if template_keys_extra is not None:
-                        for template_key_extra in template_keys_extra:
-                            template_merge_filled[template_key_extra] = None
-
-                if dset_format == 'TimeSeries':
-                    if template_run_extra is not None:
-                        template_merge_filled = {**template_merge_filled, **template_run_extra}
+            if dset_format == 'TimeSeries':
+                if template_run_extra is not None:
+                    template_merge_filled = {**template_merge_filled, **template_run_extra}
+                    template_time_tags = [template_key for template_key in template_time_tags
+                                          if template_key not in list(template_run_extra.keys())]
+
+            folder_name_period = fill_tags2string_period(
+                folder_name_raw, template_merge_ref, template_merge_filled,
+                time_period=datetime_idx_period_tmp, time_tags=template_time_tags)
+            file_name_period = fill_tags2string_period(
+                file_name_raw, template_merge_ref, template_merge_filled,
+                time_period=datetime_idx_period_tmp, time_tags=template_time_tags)
 
-                folder_name_tmp = fill_tags2string(folder_name_raw, template_merge_ref, template_merge_filled)
-                file_name_tmp = fill_tags2string(file_name_raw, template_merge_ref, template_merge_filled)
+            file_path_list = []
+            file_time_list = []
+            file_path_merged = []
+            for datetime_idx_step, folder_name_tmp, file_name_tmp in zip(
+                    datetime_idx_period_tmp, folder_name_period, file_name_period):
 
                 if isinstance(folder_name_tmp, list) and isinstance(file_name_tmp, list):
                     for folder_name_tmp_step, file_name_tmp_step in zip(folder_name_tmp, file_name_tmp):
@@ -1712,5 +1690,228 @@ class DSetManager:
 
             log_stream.info(' ------> Collect ' + dset_format + ' model filename(s) ... DONE')
 
+        # Store the catalog of the datasets folders (listings are reused while folders are not changed)
+        if self.flag_io_catalog:
+            write_catalog()
+
         return ws_vars, ws_model
 # -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to collect the datasets of a single variable (read, validate, interpolate and fill the time period)
+# (module-level worker: only the needed arguments are passed to the thread or process executor)
+def collect_variable(var_name, dset_source_dyn, dset_source_base, da_terrain,
+                     dset_static_info=None, dset_time_info=None,
+                     dset_time_start=None, dset_time_end=None,
+                     var_args=None, path_tmp=None, clean_tmp=False, flag_data_mandatory=False,
+                     var_interp='nearest', regrid_path=None, coord_args=None, io_args=None):
+
+    if var_args is None:
+        var_args = {}
+    if io_args is None:
+        io_args = {}
+
+    coord_name_time, dim_name_time = coord_args['coord_name_time'], coord_args['dim_name_time']
+    coord_name_geo_x, dim_name_geo_x = coord_args['coord_name_geo_x'], coord_args['dim_name_geo_x']
+    coord_name_geo_y, dim_name_geo_y = coord_args['coord_name_geo_y'], coord_args['dim_name_geo_y']
+
+    obj_var, geo_x, geo_y = None, None, None
+
+    log_stream.info(' -------> Collect ' + var_name + ' source datasets ... ')
+    if dset_source_base is not None:
+
+        if var_name in list(dset_source_base.keys()):
+
+            dset_source_var_base = dset_source_base[var_name]
+            dset_source_var_dyn = dset_source_dyn[var_name]
+
+            if var_name in list(dset_default_base.keys()):
+                dset_default_var_base = dset_default_base[var_name]
+            else:
+                dset_default_var_base = None
+
+            dset_datetime_idx = dset_source_var_dyn.index
+            dset_filename = dset_source_var_dyn.values
+
+            if 'format' in dset_source_base:
+                dset_format = dset_source_base['format']
+            else:
+                dset_format = None
+
+            if dset_static_info is not None:
+                if var_name == 'Discharge':
+                    var_static_info = dset_static_info['outlet_name_list']
+                elif (var_name == 'DamV') or (var_name == 'DamL'):
+                    var_static_info = dset_static_info['dam_name_list']
+                elif (var_name == 'IntakeQ'):                                               #add20210607
+                    var_static_info = dset_static_info['plant_name_list']                   #add20210607
+                elif var_name == 'VarAnalysis':
+                    var_static_info = None
+                else:
+                    var_static_info = None
+            else:
+                var_static_info = None
+
+            # get the bounding box of the terrain to read only the needed window of the source datasets
+            if io_args.get('io_bbox', False):
+                dset_bbox = io_args.get('io_bbox_obj', None)
+            else:
+                dset_bbox = None
+
+            # create the data reader obj
+            driver_hmc_parser = DSetReader(dset_filename, dset_source_var_base, dset_datetime_idx,
+                                           dset_time_info,
+                                           file_tmp_path=path_tmp, file_tmp_clean=clean_tmp,
+                                           dset_var_format=dset_format,
+                                           file_src_mandatory=flag_data_mandatory,
+                                           file_unzip_cpu=io_args.get('io_cpu', 1),
+                                           file_unzip_cache=io_args.get('io_unzip_cache', None),
+                                           file_src_bbox=dset_bbox,
+                                           file_src_bbox_margin=io_args.get('io_bbox_margin', 2),
+                                           file_src_cpu=io_args.get('io_cpu', 1),
+                                           file_src_overview=io_args.get('io_overview', None))
+
+            # get the data reader datasets
+            obj_var, da_time, geo_x, geo_y = driver_hmc_parser.read_filename_dynamic(
+                var_name, var_args, var_time_start=dset_time_start, var_time_end=dset_time_end,
+                var_static_info=var_static_info)
+
+            if obj_var is not None:
+                if isinstance(obj_var, xr.Dataset):
+
+                    # Organize datasets name
+                    log_stream.info(' --------> Organize ' + var_name + ' dataset name ... ')
+                    obj_var_name_list = list(obj_var.data_vars)
+                    if obj_var_name_list.__len__() == 1:
+
+                        log_stream.info(' ---------> Variable list: ' + str(obj_var_name_list) +
+                                        ' with 1 item')
+
+                        obj_var_name = obj_var_name_list[0]
+
+                        if obj_var_name != var_name:
+                            obj_var = obj_var.rename_vars({obj_var_name: var_name})
+                            log_stream.warning(' ===> Switch variable name in dataset from "' +
+                                               obj_var_name + '" to "' + var_name + '"')
+
+                    else:
+                        log_stream.info(' ---------> Variable list: ' + str(obj_var_name_list) +
+                                        ' with ' + str(obj_var_name_list.__len__()) + ' items')
+
+                    log_stream.info(' --------> Organize ' + var_name + ' dataset name ... DONE')
+
+                    # Organize datasets units
+                    log_stream.info(' --------> Organize ' + var_name + ' dataset units ... ')
+
+                    driver_hmc_composer = DSetComposer(dset_filename, dset_source_var_base,
+                                                       dset_datetime_idx,
+                                                       file_tmp_path=path_tmp, file_tmp_clean=clean_tmp,
+                                                       time_dst_info=dset_time_info)
+                    obj_var = driver_hmc_composer.validate_data_units(var_name, obj_var, dset_default_var_base)
+
+                    log_stream.info(' --------> Organize ' + var_name + ' dataset units ... DONE')
+
+                    # Organize datasets geographical domain
+                    log_stream.info(' --------> Organize ' + var_name + ' dataset geographical domain  ... ')
+                    if ((obj_var['west_east'].shape[0] != da_terrain['west_east'].shape[0]) or
+                            (obj_var['south_north'].shape[0] != da_terrain['south_north'].shape[0])):
+
+                        # Interpolation info start
+                        log_stream.info(' ---------> Interpolate ' + var_name + ' datasets ... ')
+
+                        # Configure data array with longitude/latitude coordinates
+                        var_da_src = create_darray_3d(
+                            obj_var[var_name].values, da_time, geo_x, geo_y,
+                            coord_name_time=coord_name_time,
+                            coord_name_x='Longitude', coord_name_y='Latitude',
+                            dim_name_time=dim_name_time,
+                            dim_name_x='Longitude', dim_name_y='Latitude',
+                            dims_order=['Latitude', 'Longitude', dim_name_time])
+
+                        if var_interp in regrid_method_list:
+                            # Interpolation method info start
+                            log_stream.info(' -----------> Apply ' + var_interp + ' method ... ')
+
+                            # Apply the interpolation method (index or weights are computed once for each grid)
+                            regrid_obj = get_regrid_index(
+                                var_da_src['Longitude'].values, var_da_src['Latitude'].values,
+                                da_terrain['Longitude'].values, da_terrain['Latitude'].values,
+                                regrid_method=var_interp, regrid_path=regrid_path)
+                            var_da_interp_tmp = apply_regrid(var_da_src.values, regrid_obj)
+
+                            # Interpolation method info end
+                            log_stream.info(' -----------> Apply ' + var_interp + ' method ... DONE')
+                        else:
+                            # Ending info for undefined function
+                            log_stream.error(' ===> Interpolation method ' +
+                                             var_interp + ' not available')
+                            raise NotImplementedError('Interpolation method not implemented yet')
+
+                        # Configure the data array with west_east/south_north coordinates
+                        var_da_interp = create_darray_3d(
+                            var_da_interp_tmp, da_time,
+                            da_terrain['Longitude'].values, da_terrain['Latitude'].values,
+                            coord_name_time=coord_name_time,
+                            coord_name_x=coord_name_geo_x, coord_name_y=coord_name_geo_y,
+                            dim_name_time=dim_name_time,
+                            dim_name_x=dim_name_geo_x, dim_name_y=dim_name_geo_y,
+                            dims_order=[dim_name_geo_y, dim_name_geo_x,
+                                        dim_name_time])
+
+                        var_da_masked = var_da_interp.where((da_terrain != -9999))
+
+                        obj_var = var_da_masked.to_dataset(name=var_name)
+                        geo_x = da_terrain['Longitude'].values
+                        geo_y = da_terrain['Latitude'].values
+
+                        # Interpolation info end
+                        log_stream.info(' ---------> Interpolate ' + var_name + ' datasets ... DONE')
+
+                    log_stream.info(' --------> Organize ' + var_name + ' dataset geographical domain  ... DONE')
+
+                    log_stream.info(' --------> Organize ' + var_name + ' dataset time period  ... ')
+                    if obj_var[coord_name_time].shape[0] < dset_datetime_idx.shape[0]:
+
+                        if var_name != 'ALL':
+
+                            log_stream.info(' ---------> Fill expected datasets with dynamic values  ... ')
+
+                            var_values_period = obj_var[var_name].values
+                            var_time_period = convert_time_values(da_time.values, time_rounding=None)
+
+                            # scatter the available steps in the expected period (matched by index)
+                            var_values_tmp = align_time_values(var_values_period, var_time_period,
+                                                               dset_datetime_idx, time_axis=2)
+
+                            var_da_tmp = create_darray_3d(
+                                var_values_tmp, dset_datetime_idx, geo_x, geo_y,
+                                coord_name_time=coord_name_time,
+                                coord_name_x=coord_name_geo_x, coord_name_y=coord_name_geo_y,
+                                dim_name_time=dim_name_time,
+                                dim_name_x=dim_name_geo_x, dim_name_y=dim_name_geo_y,
+                                dims_order=[dim_name_geo_y, dim_name_geo_x, dim_name_time])
+
+                            obj_var = var_da_tmp.to_dataset(name=var_name)
+                            log_stream.info(' ---------> Fill expected datasets with dynamic values  ... DONE')
+
+                    log_stream.info(' --------> Organize ' + var_name + ' dataset time period  ... DONE')
+
+                elif isinstance(obj_var, dict):
+                    if var_name == 'ALL':
+                        obj_tmp = list(obj_var.values())[0]
+                        var_name = obj_tmp.name
+                else:
+                    log_stream.error(' ===> Data dynamic object is not allowed')
+                    raise NotImplementedError('Object dynamic type is not valid')
+
+            log_stream.info(' -------> Collect ' + var_name + ' source datasets ... DONE')
+        else:
+            log_stream.warning(' ===> Variable is not available in the datasets')
+            log_stream.info(' -------> Collect ' + var_name + ' source datasets ... FAILED')
+    else:
+        log_stream.warning(' ===> Type datasets is not defined')
+        log_stream.info(' -------> Collect ' + var_name + ' source datasets ... FAILED')
+
+    return var_name, obj_var, geo_x, geo_y
+# -------------------------------------------------------------------------------------
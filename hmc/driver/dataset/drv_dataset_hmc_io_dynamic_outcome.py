@@ -18,18 +18,22 @@ import pandas as pd
 import xarray as xr
 
 from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 
 from hmc.algorithm.io.lib_data_io_generic import swap_darray_dims_time, swap_darray_dims_xy, \
     create_darray_3d, create_darray_2d, \
     write_dset, create_dset
-from hmc.algorithm.io.lib_data_zip_gzip import zip_filename
+from hmc.algorithm.io.lib_data_zip_gzip import zip_filename_step
 
 from hmc.algorithm.utils.lib_utils_analysis import compute_domain_mean, \
-    compute_catchment_mean_serial, compute_catchment_mean_parallel_sync, compute_catchment_mean_parallel_async
+    compute_catchment_mean_serial, compute_catchment_mean_parallel_sync, compute_catchment_mean_parallel_async, \
+    compute_catchment_weights
 from hmc.algorithm.utils.lib_utils_system import split_path, create_folder, copy_file
 from hmc.algorithm.utils.lib_utils_string import fill_tags2string
 from hmc.algorithm.utils.lib_utils_list import flat_list
 from hmc.algorithm.utils.lib_utils_zip import add_zip_extension
+from hmc.algorithm.utils.lib_utils_time import convert_time_values
+from hmc.algorithm.utils.lib_utils_monitor import monitor_method, monitor_span
 
 from hmc.algorithm.default.lib_default_args import logger_name
 
@@ -39,7 +43,7 @@ from hmc.driver.dataset.drv_dataset_hmc_io_type import DSetReader
 log_stream = logging.getLogger(logger_name)
 
 # Debug
-import matplotlib.pylab as plt
+# import matplotlib.pylab as plt
 #######################################################################################
 
 
@@ -54,7 +58,7 @@ class DSetManager:
                  dset_list_format=None,
                  dset_list_type=None,
                  dset_list_group=None,
-                 template_time=None, template_analysis_def=None,
+                 template_time=None, template_analysis_def=None, template_io_def=None,
                  model_tag='hmc', datasets_tag='datasets',
                  coord_name_geo_x='Longitude', coord_name_geo_y='Latitude', coord_name_time='time',
                  dim_name_geo_x='west_east', dim_name_geo_y='south_north', dim_name_time='time',
@@ -252,6 +256,44 @@ class DSetManager:
             self.flag_analysis_ts_catchment_mode = False
             self.flag_analysis_ts_catchment_cpu = 1
 
+        self.template_io_def = template_io_def
+        if self.template_io_def is not None:
+
+            if 'io_cpu' in list(self.template_io_def.keys()):
+                self.flag_io_cpu = self.template_io_def['io_cpu']
+            else:
+                self.flag_io_cpu = 1
+
+            if 'io_zip_member' in list(self.template_io_def.keys()):
+                self.flag_io_zip_member = self.template_io_def['io_zip_member']
+            else:
+                self.flag_io_zip_member = None
+
+        else:
+            self.flag_io_cpu = 1
+            self.flag_io_zip_member = None
+
+        self.mask_weights_obj = None
+        self.flag_analysis_ts_catchment_mode_ref = self.flag_analysis_ts_catchment_mode
+
+    # Method to set the analysis for the pipeline workers (threads must not create process pools)
+    def set_analysis_pipeline(self, dset_static=None, pipeline_active=True):
+
+        if pipeline_active:
+
+            if self.flag_analysis_ts_catchment_mode:
+                log_stream.warning(' ===> Catchments analysis in parallel mode is not allowed in the pipeline '
+                                   'workers. Serial mode is used')
+            self.flag_analysis_ts_catchment_mode = False
+
+            # Compute the catchment weights once (shared by the pipeline workers)
+            if self.flag_analysis_ts_catchment and (self.mask_weights_obj is None) and (dset_static is not None):
+                if 'mask_name_list' in list(dset_static.keys()):
+                    if dset_static['mask_name_list'] is not None:
+                        self.mask_weights_obj = compute_catchment_weights(dset_static['mask_name_list'])
+        else:
+            self.flag_analysis_ts_catchment_mode = self.flag_analysis_ts_catchment_mode_ref
+
     @staticmethod
     def filter_data(dset_static, dset_filter=None):
 
@@ -279,6 +321,7 @@ class DSetManager:
 
         return data_filters
 
+    @monitor_method('outcome.copy_data', 'driver')
     def copy_data(self, dset_model_dyn, dset_destination_dyn, columns_excluded=None, **extra_args):
 
         # Starting info
@@ -396,6 +439,7 @@ class DSetManager:
         # Starting info
         log_stream.info(' -------> Copy data ... DONE')
 
+    @monitor_method('outcome.freeze_data', 'driver')
     def freeze_data(self, dset_expected, dset_def, dset_key_delimiter=':', dset_key_excluded=None):
 
         # Starting info
@@ -452,11 +496,7 @@ class DSetManager:
                                     log_stream.error(' ===> Freeze time array is not defined for ALL variables')
                                     raise NotImplementedError('Time array is unknown for freezing data')
 
-                            time_stamp_list = []
-                            for time_step in time_array:
-                                time_stamp = pd.to_datetime(time_step, format='%Y-%m-%d_%H:%M:%S')
-                                time_stamp_list.append(time_stamp)
-                            dset_idx = pd.DatetimeIndex(time_stamp_list)
+                            dset_idx = convert_time_values(time_array, time_rounding=None)
                             dset_values = dset_def[dset_var_step].values
 
                             if dset_values.shape.__len__() == 0:
@@ -496,11 +536,7 @@ class DSetManager:
                                 log_stream.error(' ===> Freeze time array is not defined for variables')
                                 raise NotImplementedError('Time array is unknown for freezing data')
 
-                        time_stamp_list = []
-                        for time_step in time_array:
-                            time_stamp = pd.to_datetime(time_step, format='%Y-%m-%d_%H:%M:%S')
-                            time_stamp_list.append(time_stamp)
-                        dset_idx = pd.DatetimeIndex(time_stamp_list)
+                        dset_idx = convert_time_values(time_array, time_rounding=None)
                         dset_values = dset_def[dset_var_step].values
 
                         if dset_values.shape.__len__() == 0:
@@ -524,14 +560,21 @@ class DSetManager:
 
         return dset_expected
 
+    @monitor_method('outcome.dump_data', 'driver')
     def dump_data(self, dset_model, dset_time, dset_source):
 
         # Starting info
         log_stream.info(' -------> Dump data ... ')
 
+        # Compression worker(s) (the compression of a step overlaps the writing of the next steps)
+        zip_process_n = max(self.flag_io_cpu, 1)
+        zip_member_size = self.flag_io_zip_member
+        zip_executor = None
+
         dump_status_list = []
         file_path_list_unzip = []
         file_path_list_zip = []
+        file_zip_list = []
         for time_step in dset_time:
 
             dset_step = dset_source.sel(time=time_step)
@@ -571,44 +614,56 @@ class DSetManager:
             file_path_list_unzip.append(dset_file_path_step_unzip)
             file_path_list_zip.append(dset_file_path_step_zip)
 
+            if self.file_compression_mode and (dset_file_path_step_zip != dset_file_path_step_unzip):
+                if zip_executor is None:
+                    zip_executor = ThreadPoolExecutor(max_workers=zip_process_n)
+                file_zip_list.append(zip_executor.submit(
+                    zip_filename_step, dset_file_path_step_unzip, dset_file_path_step_zip,
+                    member_size=zip_member_size, process_n=zip_process_n))
+            else:
+                file_zip_list.append(None)
+
             dump_status_list.append(True)
 
         # Ending info
         log_stream.info(' -------> Dump data ... DONE')
 
-        # Starting info
-        log_stream.info(' -------> Zip data ... ')
+        # Wait the compression worker(s) (time not overlapped with the writing of the steps)
+        with monitor_span('outcome.zip_data', 'driver'):
+            # Starting info
+            log_stream.info(' -------> Zip data ... ')
 
-        file_compression_mode = self.file_compression_mode
-        if file_compression_mode:
-            for file_path_unzip, file_path_zip, dump_status in zip(file_path_list_unzip, file_path_list_zip,
-                                                                   dump_status_list):
+            file_compression_mode = self.file_compression_mode
+            if file_compression_mode:
+                for file_path_unzip, file_path_zip, file_zip, dump_status in zip(
+                        file_path_list_unzip, file_path_list_zip, file_zip_list, dump_status_list):
 
-                if dump_status:
+                    if dump_status:
 
-                    if os.path.exists(file_path_zip):
-                        os.remove(file_path_zip)
+                        if file_zip is None:
+                            # Ending info (filename without zip extension)
+                            log_stream.warning(' -------> Zip data ... SKIPPED. File ' + file_path_unzip +
+                                               ' has not the zip extension')
+                        elif not file_zip.result():
+                            # Ending info
+                            log_stream.warning(' -------> Zip data ... SKIPPED. File ' + file_path_unzip +
+                                               ' not available')
 
-                    if os.path.exists(file_path_unzip):
-                        zip_filename(file_path_unzip, file_path_zip)
                     else:
                         # Ending info
-                        log_stream.warning(' -------> Zip data ... SKIPPED. File ' + file_path_unzip + ' not available')
+                        log_stream.warning(' -------> Zip data ... SKIPPED. File' + file_path_unzip + ' not saved')
 
-                    if os.path.exists(file_path_zip) and os.path.exists(file_path_unzip):
-                        os.remove(file_path_unzip)
+                # Ending info
+                log_stream.info(' -------> Zip data ... DONE')
 
-                else:
-                    # Ending info
-                    log_stream.warning(' -------> Zip data ... SKIPPED. File' + file_path_unzip + ' not saved')
-
-            # Ending info
-            log_stream.info(' -------> Zip data ... DONE')
+            else:
+                # Ending info
+                log_stream.info(' -------> Zip data ... SKIPPED. Zip not activated')
 
-        else:
-            # Ending info
-            log_stream.info(' -------> Zip data ... SKIPPED. Zip not activated')
+            if zip_executor is not None:
+                zip_executor.shutdown(wait=True)
 
+    @monitor_method('outcome.organize_data', 'driver')
     def organize_data(self, dset_time, dset_source, dset_static=None, dset_variable_selected='ALL'):
 
         # Get variable(s)
@@ -656,21 +711,8 @@ class DSetManager:
                                 dims_list = list(var_da_step.dims)
 
                                 if 'time' in list(var_da_step.coords):
-                                    time_stamp_period = []
-                                    for time_step in var_da_step['time'].values:
-                                        timestamp_step = pd.to_datetime(time_step, format='%Y-%m-%d_%H:%M:%S')
-
-                                        if isinstance(timestamp_step, pd.DatetimeIndex):
-                                            timestamp_step = timestamp_step[0]
-                                        elif isinstance(timestamp_step, pd.Timestamp):
-                                            pass
-                                        else:
-                                            log_stream.error(' ===> Time type is not allowed')
-                                            raise NotImplementedError('Case not implemented yet')
-
-                                        timestamp_step = timestamp_step.round('H')
-                                        time_stamp_period.append(timestamp_step)
-                                    dset_time_step = pd.DatetimeIndex(time_stamp_period)
+                                    # convert and round the time values in one call
+                                    dset_time_step = convert_time_values(var_da_step['time'].values, time_rounding='H')
 
                                     if isinstance(dset_time, pd.Timestamp):
                                         dset_time = pd.DatetimeIndex([dset_time])
@@ -888,20 +930,26 @@ class DSetManager:
                     if mask_name_obj is not None:
 
                         if not self.flag_analysis_ts_catchment_mode:
+                            if self.mask_weights_obj is None:
+                                self.mask_weights_obj = compute_catchment_weights(mask_name_obj)
                             var_dset_ts_catchment = compute_catchment_mean_serial(
                                 var_dset_out, mask_name_obj,
                                 variable_domain_fields=self.tag_variable_fields,
-                                variable_selected_list=self.list_variable_selected)
+                                variable_selected_list=self.list_variable_selected,
+                                mask_weights_obj=self.mask_weights_obj)
                         elif self.flag_analysis_ts_catchment_mode:
                             # var_dset_ts_catchment = compute_catchment_mean_parallel_sync(
                             #    var_dset_out, mask_name_obj, cpu_n=self.flag_analysis_ts_catchment_cpu,
                             #    variable_domain_fields = self.tag_variable_fields,
                             #    variable_selected_list=self.list_variable_selected)
+                            if self.mask_weights_obj is None:
+                                self.mask_weights_obj = compute_catchment_weights(mask_name_obj)
                             var_dset_ts_catchment = compute_catchment_mean_parallel_async(
                                 var_dset_out, mask_name_obj,
                                 cpu_n=self.flag_analysis_ts_catchment_cpu,
                                 variable_domain_fields=self.tag_variable_fields,
-                                variable_selected_list=self.list_variable_selected)
+                                variable_selected_list=self.list_variable_selected,
+                                mask_weights_obj=self.mask_weights_obj)
                         else:
                             log_stream.error(' ===> Catchments analysis mode not allowed')
                             raise RuntimeError('Unexpected catchments analysis condition')
@@ -970,6 +1018,7 @@ class DSetManager:
 
         return var_dset_out, var_dset_collections
 
+    @monitor_method('outcome.collect_data', 'driver')
     def collect_data(self, dset_model_dyn, dset_destination_dyn, dset_model_base, dset_destination_subset_base,
                      dset_static_info=None,
                      columns_excluded=None, dset_time_info=None,
@@ -1118,8 +1167,8 @@ class DSetManager:
                             datestring_idx_step = pd.Timestamp(datetime_idx_step).to_pydatetime()
                             etastring_idx_step = pd.Timestamp(exec_eta_step).to_pydatetime()
 
-                            template_run_ref_step = deepcopy(template_run_ref)
-                            template_run_filled_step = deepcopy(template_run_filled)
+                            template_run_ref_step = template_run_ref
+                            template_run_filled_step = template_run_filled
 
                             template_time_filled = dict.fromkeys(list(self.template_time.keys()), datestring_idx_step)
                             template_time_filled['dset_sub_path_outcome'] = etastring_idx_step
@@ -1223,8 +1272,8 @@ class DSetManager:
                             datestring_idx_step = pd.Timestamp(datetime_idx_step).to_pydatetime()
                             etastring_idx_step = pd.Timestamp(exec_eta_step).to_pydatetime()
 
-                            template_run_ref_step = deepcopy(template_run_ref)
-                            template_run_filled_step = deepcopy(template_run_filled)
+                            template_run_ref_step = template_run_ref
+                            template_run_filled_step = template_run_filled
 
                             template_time_filled = dict.fromkeys(list(self.template_time.keys()),
                                                                  datestring_idx_step)
@@ -14,8 +14,6 @@ import os
 
 import pandas as pd
 
-from copy import deepcopy
-
 from hmc.algorithm.utils.lib_utils_analysis import compute_runoff_coefficient
 from hmc.algorithm.io.lib_data_io_generic import create_darray_2d
 from hmc.algorithm.io.lib_data_io_json import write_time_series
@@ -23,13 +21,14 @@ from hmc.algorithm.io.lib_data_io_nc import write_collections
 
 from hmc.algorithm.utils.lib_utils_system import create_folder
 from hmc.algorithm.utils.lib_utils_string import fill_tags2string
+from hmc.algorithm.utils.lib_utils_monitor import monitor_method
 from hmc.algorithm.default.lib_default_args import logger_name, time_format_algorithm
 
 # Log
 log_stream = logging.getLogger(logger_name)
 
 # Debug
-import matplotlib.pylab as plt
+# import matplotlib.pylab as plt
 #######################################################################################
 
 
@@ -202,6 +201,7 @@ class DSetManager:
         self.tag_level_dam_ts_sim = 'DamL:dam_level_sim:{:}'
 
     # Method to dump data
+    @monitor_method('summary.dump_data', 'driver')
     def dump_data(self, file_list, file_data, file_time, file_format=None,
                   obj_time=None, obj_static=None, obj_run=None, no_data=-9999.0, no_attr='NA'):
 
@@ -558,8 +558,8 @@ class DSetManager:
                     datestring_idx_step = pd.Timestamp(datetime_idx_step).to_pydatetime()
                     etastring_idx_step = pd.Timestamp(exec_eta_step).to_pydatetime()
 
-                    template_run_ref_step = deepcopy(template_run_ref)
-                    template_run_filled_step = deepcopy(template_run_filled)
+                    template_run_ref_step = template_run_ref
+                    template_run_filled_step = template_run_filled
 
                     template_time_filled = dict.fromkeys(list(self.template_time.keys()), datestring_idx_step)
                     # template_time_filled = dict.fromkeys(list(self.template_time.keys()), etastring_idx_step)
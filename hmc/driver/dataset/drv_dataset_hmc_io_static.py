@@ -20,6 +20,7 @@ from copy import deepcopy
 from hmc.algorithm.io.lib_data_geo_ascii import read_data_raster, read_data_grid
 from hmc.algorithm.utils.lib_utils_dict import get_dict_nested_value, get_dict_value, lookup_dict_keys
 from hmc.algorithm.utils.lib_utils_string import fill_tags2string
+from hmc.algorithm.utils.lib_utils_monitor import monitor_method
 
 from hmc.driver.dataset.drv_dataset_hmc_io_type import DSetReader, DSetWriter, DSetComposer
 
@@ -128,6 +129,7 @@ class DSetManager:
 
     # -------------------------------------------------------------------------------------
     # Method to collect datasets
+    @monitor_method('static.collect_data', 'driver')
     def collect_data(self, dset_source_static, data_source_static=None):
 
         # Starting information
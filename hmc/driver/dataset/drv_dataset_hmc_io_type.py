@@ -28,11 +28,12 @@ from hmc.algorithm.io.lib_data_geo_ascii import read_data_point_dam, read_data_p
     read_data_point_joint, read_data_point_lake, \
     read_data_point_section, write_data_point_section, write_data_point_undefined
 from hmc.algorithm.io.lib_data_geo_shapefile import read_data_shapefile_section
-from hmc.algorithm.io.lib_data_zip_gzip import unzip_filename
+from hmc.algorithm.io.lib_data_zip_gzip import unzip_filename_list
 
 from hmc.algorithm.utils.lib_utils_variable import convert_fx_interface
 from hmc.algorithm.utils.lib_utils_geo import compute_cell_area
 from hmc.algorithm.utils.lib_utils_system import delete_file
+from hmc.algorithm.utils.lib_utils_catalog import check_catalog_file
 
 from hmc.algorithm.utils.lib_utils_zip import remove_zip_extension
 from hmc.algorithm.default.lib_default_args import logger_name, zip_extension
@@ -62,6 +63,33 @@ class DSetReader:
         else:
             file_src_mandatory = False
 
+        if 'file_unzip_cpu' in kwargs:
+            self.file_unzip_cpu = kwargs['file_unzip_cpu']
+        else:
+            self.file_unzip_cpu = 1
+        if 'file_unzip_cache' in kwargs:
+            self.file_unzip_cache = kwargs['file_unzip_cache']
+        else:
+            self.file_unzip_cache = None
+        # bounding box [left, bottom, right, top] and margin [cells] used to read only the needed window
+        if 'file_src_bbox' in kwargs:
+            self.file_src_bbox = kwargs['file_src_bbox']
+        else:
+            self.file_src_bbox = None
+        if 'file_src_bbox_margin' in kwargs:
+            self.file_src_bbox_margin = kwargs['file_src_bbox_margin']
+        else:
+            self.file_src_bbox_margin = 2
+        # threads used to read the time steps and overview level used to read the decimated values (tiff)
+        if 'file_src_cpu' in kwargs:
+            self.file_src_cpu = kwargs['file_src_cpu']
+        else:
+            self.file_src_cpu = 1
+        if 'file_src_overview' in kwargs:
+            self.file_src_overview = kwargs['file_src_overview']
+        else:
+            self.file_src_overview = None
+
         file_src_tmp_raw = list(set(file_src_path))
 
         file_src_tmp_list = []
@@ -99,7 +127,11 @@ class DSetReader:
         if file_src_tmp_list.__len__() >= 1:
             if file_src_path[0].endswith(self.file_zip_extension):
                 self.file_unzip_op = True
-                self.file_unzip_delete = file_tmp_clean
+                # unzipped files are kept in the tmp folder when the cache is activated (removed by size)
+                if self.file_unzip_cache:
+                    self.file_unzip_delete = False
+                else:
+                    self.file_unzip_delete = file_tmp_clean
             else:
                 self.file_unzip_op = False
                 self.file_unzip_delete = False
@@ -176,7 +208,7 @@ class DSetReader:
         file_found_list, file_not_found_list = None, None
         for file_name_step in file_name_list:
             if file_name_step:
-                if os.path.exists(file_name_step):
+                if check_catalog_file(file_name_step):
                     if file_found_list is None:
                         file_found_list = []
                     file_found_list.append(file_name_step)
@@ -207,13 +239,8 @@ class DSetReader:
     # Method to unzip file name
     def unzip_filename(self):
 
-        unzip_message = False
-        for file_src_path_step, file_dest_path_step in zip(self.file_src_path, self.file_dest_path):
-            if os.path.exists(file_src_path_step):
-                if not os.path.exists(file_dest_path_step):
-                    unzip_filename(file_src_path_step, file_dest_path_step)
-            else:
-                unzip_message = True
+        unzip_message = unzip_filename_list(self.file_src_path, self.file_dest_path,
+                                            process_n=self.file_unzip_cpu, cache_size_max=self.file_unzip_cache)
         if unzip_message:
             log_stream.warning(' ===> Some/All filenames are not available! Unzipping failed!')
 
@@ -353,7 +380,8 @@ class DSetReader:
 
                 da_var, da_time, geo_x, geo_y = read_data_nc(
                     file_path, var_name=file_var_name, var_time_start=var_time_start, var_time_end=var_time_end,
-                    coord_name_time='time', coord_name_geo_x='Longitude', coord_name_geo_y='Latitude')
+                    coord_name_time='time', coord_name_geo_x='Longitude', coord_name_geo_y='Latitude',
+                    var_bbox=self.file_src_bbox, var_bbox_margin=self.file_src_bbox_margin)
 
                 if da_var is not None:
                     if var_name == 'ALL':
@@ -366,7 +394,11 @@ class DSetReader:
             elif self.file_src_format == 'tiff':
 
                 da_var, da_time, geo_x, geo_y = read_data_tiff(file_path, var_name=file_var_name,
-                                                               var_time_start=var_time_start, var_time_end=var_time_end)
+                                                               var_time_start=var_time_start, var_time_end=var_time_end,
+                                                               var_bbox=self.file_src_bbox,
+                                                               var_bbox_margin=self.file_src_bbox_margin,
+                                                               var_overview_level=self.file_src_overview,
+                                                               var_process_n=self.file_src_cpu)
 
                 if da_var is not None:
                     obj_var = da_var.to_dataset(name=file_var_name)
@@ -28,8 +28,40 @@ logging.basicConfig(level=logging.DEBUG, format=log_format)
 # Settings
 attrs_collections_excluded = ['dam_name', 'plant_name', 'dam_system_name',
                               'basin_name', 'section_name', 'outlet_name',
-                              'time_length', 'time_format']
+                              'time_length', 'time_format', 'Conventions', 'featureType']
 time_format_default = '%Y-%m-%d %H-%M'
+collections_sep = ':'
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to get the time of the collections (numeric time of the cf timeSeries layout or string times)
+def get_collections_time(file_dset, var_name='times'):
+    if ('featureType' in file_dset.attrs) and ('time' in file_dset.variables):
+        return pd.DatetimeIndex(file_dset['time'].values)
+    return pd.DatetimeIndex(file_dset[var_name].values)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to get a series of the collections ("var:component:station" variables or cf timeSeries layout, where the
+# series is selected by "station_name" in the "var:component" variable)
+def get_collections_var(file_dset, var_name):
+
+    if var_name in file_dset.variables:
+        return file_dset[var_name].values
+
+    var_parts = var_name.split(collections_sep, 2)
+    if (var_parts.__len__() == 3) and ('station_name' in file_dset.variables):
+        var_group, var_station = collections_sep.join(var_parts[:2]), var_parts[2]
+        if var_group in file_dset.variables:
+            station_list = [station_name.decode('utf-8') if isinstance(station_name, bytes) else str(station_name)
+                            for station_name in file_dset['station_name'].values]
+            if var_station in station_list:
+                return file_dset[var_group].isel(station=station_list.index(var_station)).values
+
+    log_stream.error(' ===> Variable "' + var_name + '" is not available in the collections file')
+    raise KeyError(var_name)
 # -------------------------------------------------------------------------------------
 
 
@@ -191,8 +223,7 @@ def organize_collections_ts(
                 if (var_key == 'time') and (ts_time is None):
 
                     var_name = file_vars_tmpl['time']
-                    ts_time = file_dset[var_name].values
-                    ts_time = pd.DatetimeIndex(ts_time)
+                    ts_time = get_collections_time(file_dset, var_name)
 
                     if ts_dict is None:
                         ts_dict = {var_key: ts_time}
@@ -202,7 +233,7 @@ def organize_collections_ts(
                 elif var_key != 'time':
 
                     var_name = var_name.format(**tags_obj)
-                    var_ts = file_dset[var_name].values
+                    var_ts = np.array(get_collections_var(file_dset, var_name), dtype=float)
                     var_attrs = file_dset.attrs
                     var_ts[var_ts < 0.0] = np.nan
 
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+
+"""
+HYDROLOGICAL MODEL CONTINUUM - Tool benchmark chain - Stand-in executable of the hmc model
+__date__ = '20261018'
+__version__ = '1.0.0'
+__author__ =
+        'Fabio Delogu' (fabio.delogu@cimafoundation.org',
+
+__library__ = 'hmc'
+
+General command line:
+python hmc_tool_benchmark_chain_executable.py {domain}.info.txt
+
+Notes:
+The executable reads the namelist written by the run manager and writes, for each step of the run, the outcome
+datasets in the same folders and names of the hmc model (gridded outcome in zipped netcdf format, discharge at the
+sections in ascii point format, hydrograph in ascii time-series format and the final state in zipped netcdf format).
+Values are synthetic; the time spent by each step is defined by the HMC_BENCHMARK_STEP_TIME environment variable.
+The executable uses only numpy and netCDF4 (the hmc package is not needed in the execution environment).
+
+Version(s):
+20261018 (1.0.0) --> Beta release
+"""
+# -------------------------------------------------------------------------------------
+
+# -------------------------------------------------------------------------------------
+# Library
+import os
+import sys
+import gzip
+import time
+import shutil
+import warnings
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import netCDF4
+# -------------------------------------------------------------------------------------
+
+# -------------------------------------------------------------------------------------
+# Algorithm information
+exec_env_step_time = 'HMC_BENCHMARK_STEP_TIME'
+exec_time_format = '%Y%m%d%H%M'
+exec_template_date = {'$yyyy': '%Y', '$mm': '%m', '$dd': '%d', '$HH': '%H', '$MM': '%M'}
+exec_var_gridded = ['Discharge', 'SM', 'ET', 'ETCum', 'ETPotCum', 'LST', 'VTot']
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Script Main
+def main():
+
+    # -------------------------------------------------------------------------------------
+    # Read the namelist
+    warnings.simplefilter('ignore')
+    if sys.argv.__len__() < 2:
+        print(' ===> Namelist file is not defined')
+        sys.exit(1)
+    namelist_obj = read_namelist(sys.argv[1])
+
+    time_start = datetime.strptime(namelist_obj['sTimeStart'], exec_time_format)
+    time_n = int(namelist_obj['iSimLength'])
+    time_delta = int(namelist_obj['iDtModel'])
+    domain_name = namelist_obj['sDomainName']
+
+    step_time = float(os.environ.get(exec_env_step_time, 0.0))
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Read the domain (terrain header and sections)
+    geo_obj = read_terrain_header(
+        os.path.join(namelist_obj['sPathData_Static_Gridded'], domain_name + '.dem.txt'))
+    section_n = read_section_n(
+        os.path.join(namelist_obj['sPathData_Static_Point'], domain_name + '.info_section.txt'))
+
+    rows, cols = geo_obj['nrows'], geo_obj['ncols']
+    geo_x = geo_obj['xllcorner'] + geo_obj['cellsize'] * (np.arange(cols) + 0.5)
+    geo_y = geo_obj['yllcorner'] + geo_obj['cellsize'] * (np.arange(rows) + 0.5)
+    geo_x_2d, geo_y_2d = np.meshgrid(geo_x, geo_y)
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Iterate over the step(s) of the run
+    print(' ==> Run ' + domain_name + ' from ' + time_start.strftime(exec_time_format) +
+          ' for ' + str(time_n) + ' steps ... ')
+    rng = np.random.default_rng(int(time_start.strftime('%Y%m%d%H')) % (2 ** 32))
+    var_state = np.zeros((rows, cols), dtype=np.float32)
+    hydrograph = np.zeros((time_n, section_n), dtype=np.float32)
+    time_step = time_start
+    for time_id in range(time_n):
+
+        time_step = time_start + timedelta(seconds=time_id * time_delta)
+        if step_time > 0:
+            time.sleep(step_time)
+
+        # gridded outcome
+        var_state = 0.9 * var_state + rng.random((rows, cols), dtype=np.float32)
+        var_data = {var_name: (var_state * (var_id + 1)).astype(np.float32)
+                    for var_id, var_name in enumerate(exec_var_gridded)}
+        write_gridded(
+            os.path.join(fill_path(namelist_obj['sPathData_Output_Gridded'], time_step),
+                         'hmc.output-grid.' + time_step.strftime(exec_time_format) + '.nc.gz'),
+            var_data, geo_x_2d, geo_y_2d)
+
+        # point outcome (discharge at the sections)
+        hydrograph[time_id, :] = 1.0 + 10.0 * (np.arange(section_n) + 1) * (1.0 + np.sin(time_id / 6.0)) / 2.0
+        write_point(
+            os.path.join(fill_path(namelist_obj['sPathData_Output_Point'], time_step),
+                         'hmc.discharge.' + time_step.strftime(exec_time_format) + '.txt'),
+            hydrograph[time_id, :])
+
+    # time-series outcome (hydrograph at the sections)
+    write_time_series(
+        os.path.join(fill_path(namelist_obj['sPathData_Output_TimeSeries'], time_step), 'hmc.hydrograph.txt'),
+        hydrograph)
+
+    # state (last step)
+    write_gridded(
+        os.path.join(fill_path(namelist_obj['sPathData_State_Gridded'], time_step),
+                     'hmc.state-grid.' + time_step.strftime(exec_time_format) + '.nc.gz'),
+        {'VTot': var_state, 'VRet': var_state * 0.1, 'HydroLevel': var_state * 0.01}, geo_x_2d, geo_y_2d)
+
+    print(' ==> Run ' + domain_name + ' ... DONE')
+    # -------------------------------------------------------------------------------------
+
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to read the namelist (fortran namelist with one variable for each line)
+def read_namelist(file_name):
+
+    namelist_obj = {}
+    with open(file_name, 'r') as file_handle:
+        for file_line in file_handle:
+            file_line = file_line.strip()
+            if (not file_line) or file_line.startswith('&') or file_line.startswith('/') or ('=' not in file_line):
+                continue
+            var_name, var_value = file_line.split('=', 1)
+            var_value = var_value.strip().rstrip(',')
+            if var_value.startswith('"') or var_value.startswith("'"):
+                var_value = var_value[1:-1]
+            namelist_obj[var_name.strip()] = var_value
+
+    return namelist_obj
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to fill the time tags of a model path
+def fill_path(path_name, time_step):
+    for tag_name, tag_format in exec_template_date.items():
+        path_name = path_name.replace(tag_name, time_step.strftime(tag_format))
+    os.makedirs(path_name, exist_ok=True)
+    return path_name
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to read the header of the terrain file (ascii grid)
+def read_terrain_header(file_name, header_n=6):
+
+    header_obj = {}
+    with open(file_name, 'r') as file_handle:
+        for line_id in range(header_n):
+            header_key, header_value = file_handle.readline().split()[:2]
+            header_obj[header_key.lower()] = float(header_value)
+
+    header_obj['nrows'], header_obj['ncols'] = int(header_obj['nrows']), int(header_obj['ncols'])
+    if 'xllcenter' in header_obj:
+        header_obj['xllcorner'] = header_obj['xllcenter'] - header_obj['cellsize'] / 2.0
+        header_obj['yllcorner'] = header_obj['yllcenter'] - header_obj['cellsize'] / 2.0
+
+    return header_obj
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to read the number of the sections
+def read_section_n(file_name):
+    with open(file_name, 'r') as file_handle:
+        return sum([1 for file_line in file_handle if file_line.strip()])
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to write a gridded file (netcdf zipped; rows ordered from south to north)
+def write_gridded(file_name, var_data, geo_x, geo_y):
+
+    file_name_unzip = file_name[:-len('.gz')]
+    with netCDF4.Dataset(file_name_unzip, 'w') as file_handle:
+        file_handle.createDimension('west_east', geo_x.shape[1])
+        file_handle.createDimension('south_north', geo_x.shape[0])
+        for var_name, var_values in {**{'Longitude': geo_x, 'Latitude': geo_y}, **var_data}.items():
+            var_handle = file_handle.createVariable(var_name, 'f4', ('south_north', 'west_east'), zlib=True)
+            var_handle[:, :] = var_values
+
+    with open(file_name_unzip, 'rb') as file_handle_unzip, gzip.open(file_name, 'wb') as file_handle_zip:
+        shutil.copyfileobj(file_handle_unzip, file_handle_zip)
+    os.remove(file_name_unzip)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to write a point file (one value for each section)
+def write_point(file_name, point_values):
+    with open(file_name, 'w') as file_handle:
+        file_handle.write('\n'.join(['{:.3f}'.format(point_value) for point_value in point_values]) + '\n')
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to write a time-series file (one row for each step and one column for each section)
+def write_time_series(file_name, ts_values):
+    with open(file_name, 'w') as file_handle:
+        for ts_row in ts_values:
+            file_handle.write(' '.join(['{:.3f}'.format(ts_value) for ts_value in ts_row]) + '\n')
+# -------------------------------------------------------------------------------------
+
+
+# ----------------------------------------------------------------------------
+# Call script from external library
+if __name__ == "__main__":
+    main()
+# ----------------------------------------------------------------------------
@@ -0,0 +1,433 @@
+#!/usr/bin/python3
+
+"""
+HYDROLOGICAL MODEL CONTINUUM - Tool benchmark chain
+__date__ = '20261018'
+__version__ = '1.0.0'
+__author__ =
+        'Fabio Delogu' (fabio.delogu@cimafoundation.org',
+
+__library__ = 'hmc'
+
+General command line:
+python hmc_tool_benchmark_chain_main.py -settings_file "configuration.json" -time "YYYY-MM-DD HH:MM"
+    [-domain_size "ROWSxCOLS"]
+
+Notes:
+The tool generates a synthetic domain (terrain, flow directions, sections and parameters), the hourly forcing
+(netcdf or tiff) and the point observations of the run period; then, it runs the chain of the run manager
+(initializer, builder, runner, finalizer and cleaner) using a stand-in executable that writes synthetic outcome
+in place of the hmc model. Time, cpu time, peak rss and bytes read/written of each stage are saved in a report in
+json format.
+
+Version(s):
+20261018 (1.0.0) --> Beta release
+"""
+# -------------------------------------------------------------------------------------
+
+# -------------------------------------------------------------------------------------
+# Library
+import logging
+import os
+import sys
+import stat
+import argparse
+import platform
+import time
+
+import pandas as pd
+
+from hmc.driver.configuration.drv_configuration_hmc_logging import ModelLogging
+from hmc.coupler.cpl_hmc_manager import ModelInitializer, ModelCleaner
+from hmc.coupler.cpl_hmc_builder import ModelBuilder
+from hmc.coupler.cpl_hmc_runner import ModelRunner
+from hmc.coupler.cpl_hmc_finalizer import ModelFinalizer
+from hmc.version import version as hmc_version
+
+from tools.benchmark_tool_hmc_chain.lib_info_args import logger_name, time_format_algorithm, \
+    exec_stand_in, exec_env_step_time
+from tools.benchmark_tool_hmc_chain.lib_utils_settings import read_file_json, write_file_json, \
+    set_settings_algorithm, set_settings_datasets, set_settings_tags
+from tools.benchmark_tool_hmc_chain.lib_utils_domain import create_domain, write_domain_static
+from tools.benchmark_tool_hmc_chain.lib_utils_forcing import create_forcing_grid, write_forcing_gridded, \
+    write_forcing_point
+from tools.benchmark_tool_hmc_chain.lib_utils_monitor import monitor_stage, get_folder_size
+
+# Logging
+log_stream = logging.getLogger(logger_name)
+# -------------------------------------------------------------------------------------
+
+# -------------------------------------------------------------------------------------
+# Algorithm information
+project_name = 'HMC'
+alg_name = 'TOOL BENCHMARK CHAIN'
+alg_type = 'Model'
+alg_version = '1.0.0'
+alg_release = '2026-10-18'
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Script Main
+def main():
+
+    # -------------------------------------------------------------------------------------
+    # Get algorithm settings
+    alg_settings, alg_time, alg_domain_size = get_args()
+
+    # Set algorithm settings
+    data_settings = read_file_json(alg_settings)
+    folder_settings = os.path.dirname(os.path.abspath(alg_settings))
+
+    settings_benchmark = data_settings['benchmark']
+    settings_domain = data_settings['domain']
+    settings_forcing = data_settings['forcing']
+    settings_configuration = data_settings['configuration']
+
+    if alg_domain_size is not None:
+        settings_domain['rows'], settings_domain['cols'] = [int(size) for size in alg_domain_size.lower().split('x')]
+
+    domain_name = settings_domain['domain_name']
+    folder_root = settings_benchmark['folder_root'].format(domain_name=domain_name).rstrip(os.sep)
+    folder_settings_run = os.path.join(folder_root, 'settings')
+    folder_library = os.path.join(folder_root, 'library')
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Set the stand-in executable (shebang is set to the current interpreter)
+    file_exec = set_executable(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), exec_stand_in),
+        os.path.join(folder_library, exec_stand_in))
+
+    if 'step_time' in settings_benchmark:
+        os.environ[exec_env_step_time] = str(settings_benchmark['step_time'])
+    else:
+        os.environ[exec_env_step_time] = '0.0'
+
+    # Set the settings of the run manager (paths are moved in the benchmark workspace)
+    path_replace = {path_src: path_dst.format(folder_root=folder_root)
+                    for path_src, path_dst in settings_configuration['path_replace'].items()}
+
+    obj_algorithm = set_settings_algorithm(
+        read_file_json(os.path.join(folder_settings, settings_configuration['file_algorithm'])),
+        domain_name=domain_name, exec_folder=os.path.dirname(file_exec), exec_name=os.path.basename(file_exec),
+        path_replace=path_replace, obj_update=settings_configuration.get('algorithm_update', None))
+    obj_datasets = set_settings_datasets(
+        read_file_json(os.path.join(folder_settings, settings_configuration['file_datasets'])),
+        forcing_format=settings_forcing['format'], path_replace=path_replace,
+        obj_update=settings_configuration.get('datasets_update', None))
+
+    file_algorithm = os.path.join(folder_settings_run, 'hmc_configuration_algorithm_' + domain_name + '.json')
+    file_datasets = os.path.join(folder_settings_run, 'hmc_configuration_datasets_' + domain_name + '.json')
+    write_file_json(file_algorithm, obj_algorithm)
+    write_file_json(file_datasets, obj_datasets)
+
+    # Set algorithm logging (same logger of the run manager)
+    driver_hmc_logging = ModelLogging(file_algorithm)
+    driver_hmc_logging.configure_logging()
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Info algorithm
+    log_stream.info(' ============================================================================ ')
+    log_stream.info('[' + project_name + ' ' + alg_type + ' - ' + alg_name + ' (Version ' + alg_version +
+                    ' - Release ' + alg_release + ')]')
+    log_stream.info(' ==> START ... ')
+    log_stream.info(' ')
+
+    # Time algorithm information
+    alg_time_start = time.time()
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Organize time run and period of the synthetic datasets
+    if alg_time is None:
+        alg_time = settings_benchmark['time_run']
+    time_run = pd.Timestamp(alg_time).floor('H')
+    time_period = define_time_period(time_run, obj_algorithm['Time_Info'])
+
+    tags_format, tags_filling_static = set_settings_tags(obj_algorithm)
+
+    def tags_filling_dynamic(time_step):
+        return set_settings_tags(obj_algorithm, time_step=time_step)[1]
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Generate the synthetic datasets
+    log_stream.info(' ---> Generate synthetic datasets ... ')
+    stage_generator = []
+
+    domain_obj, stage_info = monitor_stage(
+        'generate_domain', create_domain, domain_name,
+        domain_rows=settings_domain['rows'], domain_cols=settings_domain['cols'],
+        domain_cell_size=settings_domain['cell_size'],
+        domain_x_ll=settings_domain['x_ll'], domain_y_ll=settings_domain['y_ll'],
+        domain_seed=settings_domain.get('seed', 1), section_n=settings_domain.get('section_n', 5))
+    stage_generator.append(stage_info)
+
+    file_static, stage_info = monitor_stage(
+        'generate_static', write_domain_static, domain_obj, obj_datasets, tags_format, tags_filling_static)
+    stage_generator.append(stage_info)
+
+    forcing_grid = create_forcing_grid(domain_obj, cell_factor=settings_forcing.get('cell_factor', 2.0),
+                                       cell_margin=settings_forcing.get('cell_margin', 5))
+    file_forcing, stage_info = monitor_stage(
+        'generate_forcing', write_forcing_gridded, forcing_grid, obj_datasets, time_period,
+        tags_format, tags_filling_dynamic)
+    stage_generator.append(stage_info)
+
+    file_obs, stage_info = monitor_stage(
+        'generate_obs', write_forcing_point, domain_obj, obj_datasets, time_period,
+        tags_format, tags_filling_dynamic)
+    stage_generator.append(stage_info)
+
+    log_stream.info(' ---> Generate synthetic datasets ... DONE')
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Run the chain (each run is measured stage by stage)
+    run_repeat = int(settings_benchmark.get('run_repeat', 1))
+    run_collections = []
+    for run_id in range(run_repeat):
+        log_stream.info(' ---> Run chain ' + str(run_id + 1) + '/' + str(run_repeat) + ' ... ')
+        run_stages = run_chain(file_algorithm, file_datasets, time_run.strftime(time_format_algorithm))
+        run_collections.append({'run': run_id + 1, 'stages': run_stages,
+                                'time_elapsed': round(sum([stage['time_elapsed'] for stage in run_stages]), 3)})
+        log_stream.info(' ---> Run chain ' + str(run_id + 1) + '/' + str(run_repeat) + ' ... DONE')
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Write the report
+    workspace_n, workspace_bytes = get_folder_size(folder_root)
+    report_obj = {
+        'benchmark': {
+            'name': settings_benchmark.get('name', 'hmc_benchmark_chain'),
+            'version': alg_version, 'hmc_version': hmc_version,
+            'python': platform.python_version(), 'platform': platform.platform(), 'cpu_n': os.cpu_count(),
+            'time_run': time_run.strftime(time_format_algorithm),
+            'time_report': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'settings_algorithm': file_algorithm, 'settings_datasets': file_datasets},
+        'domain': {
+            'domain_name': domain_name, 'rows': domain_obj['rows'], 'cols': domain_obj['cols'],
+            'cells': domain_obj['rows'] * domain_obj['cols'], 'cell_size': domain_obj['cell_size'],
+            'sections': domain_obj['sections'].__len__()},
+        'forcing': {
+            'format': settings_forcing['format'], 'rows': forcing_grid['rows'], 'cols': forcing_grid['cols'],
+            'steps': time_period.__len__(),
+            'time_start': time_period[0].strftime(time_format_algorithm),
+            'time_end': time_period[-1].strftime(time_format_algorithm)},
+        'datasets': {
+            'files_static': file_static.__len__(), 'files_forcing': file_forcing.__len__(),
+            'files_obs': file_obs.__len__(), 'workspace_files': workspace_n, 'workspace_bytes': workspace_bytes},
+        'generator': stage_generator,
+        'runs': run_collections,
+        'summary': summarize_runs(run_collections)}
+
+    file_report = settings_benchmark['report_file'].format(folder_root=folder_root, domain_name=domain_name)
+    write_file_json(file_report, report_obj)
+    log_stream.info(' ---> Benchmark report saved in ' + file_report)
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Info algorithm
+    alg_time_elapsed = round(time.time() - alg_time_start, 1)
+
+    log_stream.info(' ')
+    log_stream.info('[' + project_name + ' ' + alg_type + ' - ' + alg_name + ' (Version ' + alg_version +
+                    ' - Release ' + alg_release + ')]')
+    log_stream.info(' ==> TIME ELAPSED: ' + str(alg_time_elapsed) + ' seconds')
+    log_stream.info(' ==> ... END')
+    log_stream.info(' ==> Bye, Bye')
+    log_stream.info(' ============================================================================ ')
+    # -------------------------------------------------------------------------------------
+
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to run the chain of the run manager (each stage is measured)
+def run_chain(file_algorithm, file_datasets, time_run):
+
+    stage_list = []
+
+    # Configure model initializer class
+    driver_hmc_initializer, stage_info = monitor_stage(
+        'initializer', ModelInitializer, file_algorithm=file_algorithm, file_datasets=file_datasets, time=time_run)
+    stage_list.append(stage_info)
+
+    (time_series_collections, time_info_collections, run_info_collections, run_cline_collections), stage_info = \
+        monitor_stage('initializer_algorithm', driver_hmc_initializer.configure_algorithm)
+    stage_list.append(stage_info)
+
+    ancillary_datasets_collections, stage_info = monitor_stage(
+        'initializer_ancillary', driver_hmc_initializer.configure_ancillary_datasets, time_info_collections)
+    stage_list.append(stage_info)
+
+    # Configure model builder class
+    driver_hmc_builder = ModelBuilder(
+        obj_geo_reference=driver_hmc_initializer.dset_ref_geo,
+        obj_args=driver_hmc_initializer.obj_args,
+        obj_run=driver_hmc_initializer.obj_run,
+        obj_ancillary=driver_hmc_initializer.obj_ancillary)
+
+    static_datasets_collections, stage_info = monitor_stage(
+        'builder_static', driver_hmc_builder.configure_static_datasets, ancillary_datasets_collections)
+    stage_list.append(stage_info)
+
+    forcing_datasets_collections, stage_info = monitor_stage(
+        'builder_dynamic', driver_hmc_builder.configure_dynamic_datasets,
+        time_series_collections, time_info_collections, static_datasets_collections, ancillary_datasets_collections)
+    stage_list.append(stage_info)
+
+    # Configure model runner and finalizer classes
+    driver_hmc_runner = ModelRunner(time_info=time_info_collections, run_info=run_info_collections,
+                                    command_line_info=run_cline_collections,
+                                    obj_args=driver_hmc_initializer.obj_args,
+                                    obj_ancillary=driver_hmc_initializer.obj_ancillary)
+    driver_hmc_finalizer = ModelFinalizer(
+        collection_dynamic=forcing_datasets_collections,
+        obj_geo_reference=driver_hmc_initializer.dset_ref_geo,
+        obj_args=driver_hmc_initializer.obj_args,
+        obj_run=driver_hmc_initializer.obj_run,
+        obj_ancillary=driver_hmc_initializer.obj_ancillary)
+
+    if driver_hmc_finalizer.analysis_pipeline:
+
+        # Configure model execution and outcome datasets (runs and analysis are overlapped in a single stage)
+        def run_pipeline():
+            driver_hmc_finalizer.open_dynamic_pipeline(
+                time_series_collections, time_info_collections, static_datasets_collections,
+                ancillary_datasets_collections)
+            driver_hmc_runner.configure_execution(
+                ancillary_datasets_collections, callback_run=driver_hmc_finalizer.submit_dynamic_pipeline)
+            return driver_hmc_finalizer.close_dynamic_pipeline(
+                time_series_collections, time_info_collections, static_datasets_collections,
+                ancillary_datasets_collections)
+
+        outcome_datasets_collections, stage_info = monitor_stage('runner_finalizer_pipeline', run_pipeline)
+        stage_list.append(stage_info)
+
+    else:
+
+        _, stage_info = monitor_stage(
+            'runner', driver_hmc_runner.configure_execution, ancillary_datasets_collections)
+        stage_list.append(stage_info)
+
+        outcome_datasets_collections, stage_info = monitor_stage(
+            'finalizer_outcome', driver_hmc_finalizer.configure_dynamic_datasets,
+            time_series_collections, time_info_collections, static_datasets_collections,
+            ancillary_datasets_collections)
+        stage_list.append(stage_info)
+
+    _, stage_info = monitor_stage(
+        'finalizer_summary', driver_hmc_finalizer.configure_summary_datasets,
+        time_series_collections, time_info_collections, static_datasets_collections, outcome_datasets_collections)
+    stage_list.append(stage_info)
+
+    # Configure model cleaner class
+    driver_hmc_cleaner = ModelCleaner(
+        collections_ancillary=ancillary_datasets_collections,
+        obj_args=driver_hmc_initializer.obj_args,
+        obj_run=driver_hmc_initializer.obj_run)
+    _, stage_info = monitor_stage('cleaner', driver_hmc_cleaner.configure_cleaner)
+    stage_list.append(stage_info)
+
+    return stage_list
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to summarize the stages over the runs (min, mean and max of time and peak rss)
+def summarize_runs(run_collections):
+
+    summary_obj = {}
+    for run_fields in run_collections:
+        for stage_fields in run_fields['stages']:
+            stage_name = stage_fields['stage']
+            if stage_name not in summary_obj:
+                summary_obj[stage_name] = {'time_elapsed': [], 'rss_peak': [], 'bytes_read': [], 'bytes_written': []}
+            for summary_key, summary_values in summary_obj[stage_name].items():
+                if stage_fields[summary_key] is not None:
+                    summary_values.append(stage_fields[summary_key])
+
+    for stage_name, stage_fields in summary_obj.items():
+        for summary_key, summary_values in stage_fields.items():
+            if summary_values:
+                stage_fields[summary_key] = {
+                    'min': min(summary_values), 'max': max(summary_values),
+                    'mean': round(sum(summary_values) / summary_values.__len__(), 3)}
+            else:
+                stage_fields[summary_key] = None
+
+    return summary_obj
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to define the period of the synthetic datasets
+# (observed, check and forecast periods of the run; the start is rounded to the day as the check period)
+def define_time_period(time_run, obj_time_info, time_frequency='H'):
+
+    time_observed_period = obj_time_info.get('time_observed_period', 0)
+    time_check_period = obj_time_info.get('time_check_period', 0)
+    time_forecast_period = obj_time_info.get('time_forecast_period', 0)
+
+    time_start = (time_run - pd.Timedelta(hours=time_observed_period + time_check_period + 1)).floor('D')
+    time_end = time_run + pd.Timedelta(hours=time_forecast_period)
+
+    return pd.date_range(start=time_start, end=time_end, freq=time_frequency)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to copy the stand-in executable (shebang is set to the current interpreter and the file is executable)
+def set_executable(file_src, file_dst):
+
+    with open(file_src, 'r') as file_handle:
+        file_lines = file_handle.readlines()
+    if file_lines and file_lines[0].startswith('#!'):
+        file_lines[0] = '#!' + sys.executable + '\n'
+
+    os.makedirs(os.path.dirname(file_dst), exist_ok=True)
+    with open(file_dst, 'w') as file_handle:
+        file_handle.writelines(file_lines)
+    os.chmod(file_dst, os.stat(file_dst).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+    return file_dst
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to get script argument(s)
+def get_args():
+    parser_handle = argparse.ArgumentParser()
+    parser_handle.add_argument('-settings_file', action="store", dest="alg_settings")
+    parser_handle.add_argument('-time', action="store", dest="alg_time")
+    parser_handle.add_argument('-domain_size', action="store", dest="alg_domain_size")
+    parser_values = parser_handle.parse_args()
+
+    if parser_values.alg_settings:
+        alg_settings = parser_values.alg_settings
+    else:
+        alg_settings = 'configuration.json'
+
+    if parser_values.alg_time:
+        alg_time = parser_values.alg_time
+    else:
+        alg_time = None
+
+    if parser_values.alg_domain_size:
+        alg_domain_size = parser_values.alg_domain_size
+    else:
+        alg_domain_size = None
+
+    return alg_settings, alg_time, alg_domain_size
+
+# -------------------------------------------------------------------------------------
+
+
+# ----------------------------------------------------------------------------
+# Call script from external library
+if __name__ == "__main__":
+    main()
+# ----------------------------------------------------------------------------
@@ -0,0 +1,208 @@
+#!/usr/bin/python3
+
+"""
+HYDROLOGICAL MODEL CONTINUUM - Tool benchmark import
+__date__ = '20261018'
+__version__ = '1.0.0'
+__author__ =
+        'Fabio Delogu' (fabio.delogu@cimafoundation.org',
+
+__library__ = 'hmc'
+
+General command line:
+python hmc_tool_benchmark_import.py [-module "apps.HMC_Model_RUN_Manager"] [-budget 2.0] [-repeat 3]
+    [-report_file "report.json"]
+
+Notes:
+The tool measures the import time of the run manager in a new interpreter (python -X importtime) and checks that:
+[1] the import time (best of the repetitions) is less than the budget in seconds;
+[2] the heavy optional module(s) (matplotlib, pysheds, geopandas, pyproj, rasterio, netCDF4, scipy.io, ...) are
+not imported before their first use.
+The exit code is 1 if one of the checks fails (the tool can be used as a gate of the deployment chain).
+
+Version(s):
+20261018 (1.0.0) --> Beta release
+"""
+# -------------------------------------------------------------------------------------
+
+# -------------------------------------------------------------------------------------
+# Library
+import logging
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+from tools.benchmark_tool_hmc_chain.lib_info_args import logger_name, import_module_default, \
+    import_budget_default, import_deferred_default
+
+# Logging
+log_stream = logging.getLogger(logger_name)
+# -------------------------------------------------------------------------------------
+
+# -------------------------------------------------------------------------------------
+# Algorithm information
+project_name = 'HMC'
+alg_name = 'TOOL BENCHMARK IMPORT'
+alg_type = 'Model'
+alg_version = '1.0.0'
+alg_release = '2026-10-18'
+
+# Root of the package (used as working directory of the interpreter)
+folder_package = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Script Main
+def main():
+
+    # -------------------------------------------------------------------------------------
+    # Get algorithm settings
+    alg_module, alg_budget, alg_repeat, alg_report = get_args()
+
+    # Set algorithm logging
+    log_handle = logging.StreamHandler()
+    log_handle.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+    log_stream.addHandler(log_handle)
+    log_stream.setLevel(logging.INFO)
+
+    log_stream.info(' ============================================================================ ')
+    log_stream.info('[' + project_name + ' ' + alg_type + ' - ' + alg_name + ' (Version ' + alg_version +
+                    ' - Release ' + alg_release + ')]')
+    log_stream.info(' ==> START ... ')
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Measure the import time (best of the repetitions; the interpreter start-up is subtracted)
+    log_stream.info(' ---> Measure import of "' + alg_module + '" ... ')
+    time_base, import_base = min([measure_import(None) for _ in range(alg_repeat)],
+                                 key=lambda import_step: import_step[0])
+
+    import_collections = [measure_import(alg_module) for _ in range(alg_repeat)]
+    time_import, import_modules = min(import_collections, key=lambda import_step: import_step[0])
+    time_import = round(max(time_import - time_base, 0.0), 3)
+
+    import_top = sorted(import_modules.items(), key=lambda module_step: module_step[1]['cumulative'],
+                        reverse=True)
+    import_top = [(module_name, round(module_info['cumulative'] / 1000000.0, 3))
+                  for module_name, module_info in import_top
+                  if (module_info['level'] == 0) and (module_name not in import_base)][:15]
+    for module_name, module_time in import_top:
+        log_stream.info(' ----> Module "' + module_name + '" - Cumulative time: ' + str(module_time) + ' seconds')
+    log_stream.info(' ---> Measure import of "' + alg_module + '" ... DONE')
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Check the budget and the deferred module(s)
+    check_budget = time_import <= alg_budget
+    log_stream.info(' ---> Import time: ' + str(time_import) + ' seconds - Budget: ' + str(alg_budget) +
+                    ' seconds ... ' + ('PASSED' if check_budget else 'FAILED'))
+
+    import_deferred = [module_name for module_name in import_modules
+                       if any([(module_name == deferred_name) or module_name.startswith(deferred_name + '.')
+                               for deferred_name in import_deferred_default])]
+    check_deferred = import_deferred.__len__() == 0
+    if check_deferred:
+        log_stream.info(' ---> Deferred modules ... PASSED')
+    else:
+        log_stream.info(' ---> Deferred modules ... FAILED. Modules imported at start: ' +
+                        ', '.join(sorted(set([module_name.split('.')[0] for module_name in import_deferred]))))
+
+    if alg_report is not None:
+        report_obj = {'module': alg_module, 'time_import': time_import, 'time_interpreter': round(time_base, 3),
+                      'budget': alg_budget, 'check_budget': check_budget, 'check_deferred': check_deferred,
+                      'modules_deferred': sorted(import_deferred), 'modules_top': dict(import_top),
+                      'modules_n': import_modules.__len__()}
+        folder_report = os.path.dirname(alg_report)
+        if folder_report and not os.path.exists(folder_report):
+            os.makedirs(folder_report)
+        with open(alg_report, 'w') as file_handle:
+            json.dump(report_obj, file_handle, indent=2)
+    # -------------------------------------------------------------------------------------
+
+    # -------------------------------------------------------------------------------------
+    # Info algorithm
+    log_stream.info(' ==> ... END')
+    log_stream.info(' ============================================================================ ')
+
+    if not (check_budget and check_deferred):
+        sys.exit(1)
+    # -------------------------------------------------------------------------------------
+
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to measure the import of a module in a new interpreter [seconds, {module: {self, cumulative, level}}]
+def measure_import(module_name, time_tag='import time:'):
+
+    command_line = [sys.executable, '-X', 'importtime', '-c',
+                    'import ' + module_name if module_name is not None else 'pass']
+    process_handle = subprocess.run(command_line, cwd=folder_package, stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.PIPE, env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'})
+    process_err = process_handle.stderr.decode('utf-8', errors='replace')
+    if process_handle.returncode != 0:
+        log_stream.error(' ===> Import of "' + str(module_name) + '" failed: \n' + process_err)
+        raise RuntimeError('Module is not importable in the current environment')
+
+    # line format: "import time: self [us] | cumulative | imported package" (nested modules are indented)
+    module_obj = {}
+    time_total = 0
+    for process_line in process_err.splitlines():
+        if not process_line.startswith(time_tag):
+            continue
+        time_self, time_cumulative, module_tag = process_line[len(time_tag):].split('|')
+        if not time_self.strip().isdigit():
+            continue
+        module_level = (len(module_tag) - len(module_tag.lstrip()) - 1) // 2
+        module_obj[module_tag.strip()] = {'self': int(time_self), 'cumulative': int(time_cumulative),
+                                          'level': module_level}
+        if module_level == 0:
+            time_total += int(time_cumulative)
+
+    return time_total / 1000000.0, module_obj
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to get script argument(s)
+def get_args():
+    parser_handle = argparse.ArgumentParser()
+    parser_handle.add_argument('-module', action="store", dest="alg_module")
+    parser_handle.add_argument('-budget', action="store", dest="alg_budget")
+    parser_handle.add_argument('-repeat', action="store", dest="alg_repeat")
+    parser_handle.add_argument('-report_file', action="store", dest="alg_report")
+    parser_values = parser_handle.parse_args()
+
+    if parser_values.alg_module:
+        alg_module = parser_values.alg_module
+    else:
+        alg_module = import_module_default
+
+    if parser_values.alg_budget:
+        alg_budget = float(parser_values.alg_budget)
+    else:
+        alg_budget = import_budget_default
+
+    if parser_values.alg_repeat:
+        alg_repeat = max(int(parser_values.alg_repeat), 1)
+    else:
+        alg_repeat = 3
+
+    if parser_values.alg_report:
+        alg_report = parser_values.alg_report
+    else:
+        alg_report = None
+
+    return alg_module, alg_budget, alg_repeat, alg_report
+
+# -------------------------------------------------------------------------------------
+
+
+# ----------------------------------------------------------------------------
+# Call script from external library
+if __name__ == "__main__":
+    main()
+# ----------------------------------------------------------------------------
@@ -0,0 +1,60 @@
+"""
+Library Features:
+
+Name:          lib_info_args
+Author(s):     Fabio Delogu (fabio.delogu@cimafoundation.org)
+Date:          '20261018'
+Version:       '1.0.0'
+"""
+
+#######################################################################################
+# Library
+import pandas as pd
+#######################################################################################
+
+# -------------------------------------------------------------------------------------
+# Time information
+time_type = 'GMT'  # 'GMT', 'local'
+time_format_datasets = "%Y%m%d%H%M"
+time_format_algorithm = '%Y-%m-%d %H:%M'
+time_machine = pd.Timestamp.now
+
+# Logging information (the chain is logged by the hmc logger)
+logger_name = 'hmc_logger'
+
+# Definition of wkt for projections
+proj_epsg = 'EPSG:4326'
+
+# Definition of zip extension
+zip_extension = '.gz'
+
+# Definition of no data value
+no_data_default = -9999.0
+
+# Definition of the run mode of a deterministic run
+run_mode_default = 'deterministic'
+
+# Definition of the import budget (module imported by the run manager, budget [seconds] and deferred module(s))
+import_module_default = 'apps.HMC_Model_RUN_Manager'
+import_budget_default = 2.0
+import_deferred_default = ['matplotlib', 'pysheds', 'geopandas', 'pyproj', 'rasterio', 'netCDF4',
+                           'scipy.io', 'scipy.sparse', 'fiona', 'shapely']
+
+# Definition of the stand-in executable and of its environment variable(s)
+exec_stand_in = 'hmc_tool_benchmark_chain_executable.py'
+exec_env_step_time = 'HMC_BENCHMARK_STEP_TIME'
+
+# Definition of the static value(s) of the hmc parameters [var_name: value]
+static_values_default = {
+    'alpha': 1.3, 'beta': 0.5, 'cf': 0.04, 'ct': 0.4, 'ct_wp': 0.4, 'uh': 0.23, 'uc': 30.0,
+    'coeffres': 1.0, 'ia': 0.0, 'ws': 3.678e-09, 'wdl': 3.678e-09, 'nature': 1.0, 'width': 10.0,
+    'fr': 0.7, 'lfl': 0.0, 'rfl': 0.0, 'RSmin': 100.0, 'Hveg': 1.0, 'Gd': 0.1, 'BareSoil': 0.0,
+    'wt_max': 500.0}
+
+# Definition of the range of the forcing variable(s) [var_key: [min, max]]
+forcing_range_default = {
+    'Rain': [0.0, 12.0], 'AirTemperature': [-2.0, 24.0], 'Wind': [0.0, 8.0], 'RelHumidity': [30.0, 100.0],
+    'IncRadiation': [0.0, 850.0], 'AirPressure': [1010.0, 1020.0],
+    'SnowHeight': [0.0, 50.0], 'SnowKernel': [0.0, 1.0], 'SnowCoverArea': [0.0, 4.0],
+    'SnowQualityArea': [0.0, 1.0]}
+# -------------------------------------------------------------------------------------
@@ -0,0 +1,180 @@
+"""
+Library Features:
+
+Name:          lib_utils_domain
+Author(s):     Fabio Delogu (fabio.delogu@cimafoundation.org)
+Date:          '20261018'
+Version:       '1.0.0'
+"""
+
+#######################################################################################
+# Library
+import logging
+import os
+
+import numpy as np
+
+from rasterio.transform import from_origin
+
+from hmc.algorithm.io.lib_data_geo_ascii import write_data_grid, write_data_point_section, \
+    write_data_point_undefined
+from hmc.algorithm.utils.lib_utils_system import create_folder
+
+from tools.benchmark_tool_hmc_chain.lib_info_args import logger_name, static_values_default
+from tools.benchmark_tool_hmc_chain.lib_utils_settings import fill_settings_path
+
+# Logging
+log_stream = logging.getLogger(logger_name)
+
+# Debug
+# import matplotlib.pylab as plt
+#######################################################################################
+
+
+# -------------------------------------------------------------------------------------
+# Method to create a synthetic domain
+# (the domain is drained by a river along the central column flowing southward to the outlet in the last row;
+# the other cells flow eastward or westward to the river; flow directions are defined in the hmc keypad codes)
+def create_domain(domain_name, domain_rows=100, domain_cols=100, domain_cell_size=0.005,
+                  domain_x_ll=12.0, domain_y_ll=43.0, domain_seed=1, section_n=5,
+                  fdir_east=6, fdir_west=4, fdir_south=2):
+
+    rng = np.random.default_rng(domain_seed)
+
+    rows, cols = int(domain_rows), int(domain_cols)
+    col_river = cols // 2
+
+    # geographical reference (cell centers; rows are ordered from north to south)
+    geo_x = domain_x_ll + domain_cell_size * (np.arange(cols) + 0.5)
+    geo_y = domain_y_ll + domain_cell_size * (rows - np.arange(rows) - 0.5)
+    geo_x_2d, geo_y_2d = np.meshgrid(geo_x, geo_y)
+
+    idx_row, idx_col = np.meshgrid(np.arange(rows), np.arange(cols), indexing='ij')
+
+    # flow directions and drained area [n cells]
+    fdir = np.full((rows, cols), fdir_south, dtype=np.int32)
+    fdir[idx_col < col_river] = fdir_east
+    fdir[idx_col > col_river] = fdir_west
+
+    area = np.where(idx_col < col_river, idx_col + 1,
+                    np.where(idx_col > col_river, cols - idx_col, (idx_row + 1) * cols)).astype(np.float32)
+    choice = (idx_col == col_river).astype(np.int32)
+
+    # terrain (decreasing along the flow directions with a small noise)
+    terrain = 50.0 + 2.0 * (rows - 1 - idx_row) + 3.0 * np.abs(idx_col - col_river) + \
+        0.5 * rng.random((rows, cols))
+    terrain = terrain.astype(np.float32)
+
+    # cell size [m] and cell area [m^2]
+    cell_dy = domain_cell_size * 110540.0
+    cell_dx = domain_cell_size * 111320.0 * np.cos(np.radians(geo_y_2d))
+    cell_area = (cell_dx * cell_dy).astype(np.float32)
+
+    # curve number (smooth field defined by two waves with random phases)
+    phase_x, phase_y = rng.random(2) * 2.0 * np.pi
+    cn = 40.0 + 50.0 * (0.5 + 0.25 * np.sin(2.0 * np.pi * idx_col / max(cols, 1) + phase_x) +
+                        0.25 * np.sin(2.0 * np.pi * idx_row / max(rows, 1) + phase_y))
+    cn = cn.astype(np.float32)
+
+    domain_values = {
+        'dem': terrain, 'pnt': fdir, 'area': area, 'choice': choice, 'areacell': cell_area,
+        'cn': cn, 'mask': np.ones((rows, cols), dtype=np.int32),
+        'partial_distance': cell_dx.astype(np.float32),
+        'lon': geo_x_2d.astype(np.float32), 'lat': geo_y_2d.astype(np.float32)}
+
+    # sections along the river (from the upper part of the domain to the outlet)
+    section_rows = np.unique(np.linspace(max(rows // max(section_n, 1) - 1, 0), rows - 1,
+                                         max(section_n, 1)).astype(int))
+    domain_sections = {}
+    for section_id, section_row in enumerate(section_rows):
+        section_name = 'Section_' + str(section_id + 1).zfill(3)
+        section_area = float(area[section_row, col_river] * np.mean(cell_area) / 1000000.0)
+        section_key = ':'.join([domain_name, section_name])
+        domain_sections[section_key] = {
+            'section_idx_j': int(section_row + 1), 'section_idx_i': int(col_river + 1),
+            'section_domain': domain_name, 'section_name': section_name,
+            'section_code': int(1000 + section_id + 1), 'section_drained_area': round(section_area, 2),
+            'section_discharge_thr_alert': round(section_area * 0.5, 1),
+            'section_discharge_thr_alarm': round(section_area * 1.0, 1),
+            'section_discharge_thr_emergency': round(section_area * 2.0, 1),
+            'section_reference': 1.0, 'section_baseflow': round(section_area * 0.01, 3)}
+
+    domain_obj = {
+        'domain_name': domain_name, 'rows': rows, 'cols': cols, 'cell_size': domain_cell_size,
+        'bb_left': domain_x_ll, 'bb_bottom': domain_y_ll,
+        'bb_right': domain_x_ll + cols * domain_cell_size, 'bb_top': domain_y_ll + rows * domain_cell_size,
+        'res_lon': domain_cell_size, 'res_lat': domain_cell_size,
+        'transform': from_origin(domain_x_ll, domain_y_ll + rows * domain_cell_size,
+                                 domain_cell_size, domain_cell_size),
+        'longitude': geo_x_2d, 'latitude': geo_y_2d,
+        'values': domain_values, 'sections': domain_sections}
+
+    return domain_obj
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to write the static datasets of the domain (using the file(s) defined by the "DataGeo" settings)
+def write_domain_static(domain_obj, obj_datasets, tags_format, tags_filling,
+                        tag_dset='DataGeo', tag_tags_geo='dset_var_name_geo'):
+
+    dset_obj = obj_datasets[tag_dset]
+    file_list = []
+
+    # gridded datasets (ascii grid)
+    if 'Gridded' in dset_obj:
+        dset_grid = dset_obj['Gridded']
+        for var_key, var_fields in dset_grid['hmc_file_variable'].items():
+
+            var_name = var_fields['var_name']
+            file_path = fill_settings_path(dset_grid['hmc_file_folder'], dset_grid['hmc_file_name'],
+                                           tags_format, {**tags_filling, **{tag_tags_geo: var_name}})
+
+            if var_name in domain_obj['values']:
+                var_values = domain_obj['values'][var_name]
+            elif var_name in static_values_default:
+                var_values = np.full((domain_obj['rows'], domain_obj['cols']),
+                                     static_values_default[var_name], dtype=np.float32)
+            else:
+                log_stream.warning(' ===> Static variable "' + var_name + '" has not a default value. '
+                                   'Variable will be initialized to 0.0')
+                var_values = np.zeros((domain_obj['rows'], domain_obj['cols']), dtype=np.float32)
+
+            if np.issubdtype(var_values.dtype, np.integer):
+                var_precision = 0
+            elif var_name in ['lon', 'lat']:
+                var_precision = 6
+            else:
+                var_precision = 3
+
+            file_ancillary = {key: domain_obj[key] for key in ['bb_left', 'bb_bottom', 'res_lon', 'res_lat',
+                                                               'transform']}
+            file_ancillary['decimal_precision'] = var_precision
+
+            create_folder(os.path.dirname(file_path))
+            write_data_grid(file_path, var_values, file_ancillary=file_ancillary)
+            file_list.append(file_path)
+
+    # point datasets (sections are defined by the domain; the other points are defined as empty)
+    if 'Point' in dset_obj:
+        dset_point = dset_obj['Point']
+        for var_key, var_fields in dset_point['hmc_file_variable'].items():
+
+            var_name = var_fields['var_name']
+            file_path = fill_settings_path(dset_point['hmc_file_folder'], dset_point['hmc_file_name'],
+                                           tags_format, {**tags_filling, **{tag_tags_geo: var_name}})
+
+            create_folder(os.path.dirname(file_path))
+            if var_key == 'Section':
+                write_data_point_section(file_path, domain_obj['sections'])
+            else:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                write_data_point_undefined(file_path, element_n=2, element_init=0)
+            file_list.append(file_path)
+
+    if 'Shapefile' in dset_obj:
+        log_stream.warning(' ===> Static shapefile datasets are not generated by the benchmark')
+
+    return file_list
+# -------------------------------------------------------------------------------------
@@ -0,0 +1,235 @@
+"""
+Library Features:
+
+Name:          lib_utils_forcing
+Author(s):     Fabio Delogu (fabio.delogu@cimafoundation.org)
+Date:          '20261018'
+Version:       '1.0.0'
+"""
+
+#######################################################################################
+# Library
+import logging
+import os
+
+import numpy as np
+import xarray as xr
+import rasterio
+
+from rasterio.crs import CRS
+from rasterio.transform import from_origin
+
+from hmc.algorithm.io.lib_data_zip_gzip import zip_filename
+from hmc.algorithm.utils.lib_utils_system import create_folder
+
+from tools.benchmark_tool_hmc_chain.lib_info_args import logger_name, proj_epsg, zip_extension, \
+    forcing_range_default
+from tools.benchmark_tool_hmc_chain.lib_utils_settings import fill_settings_path
+
+# Logging
+log_stream = logging.getLogger(logger_name)
+
+# Debug
+# import matplotlib.pylab as plt
+#######################################################################################
+
+
+# -------------------------------------------------------------------------------------
+# Method to create the forcing grid (coarser than the domain grid and extended by a margin around the domain)
+def create_forcing_grid(domain_obj, cell_factor=2.0, cell_margin=5):
+
+    cell_size = domain_obj['cell_size'] * cell_factor
+
+    x_ll = domain_obj['bb_left'] - cell_margin * cell_size
+    y_ll = domain_obj['bb_bottom'] - cell_margin * cell_size
+    cols = int(np.ceil((domain_obj['bb_right'] - domain_obj['bb_left']) / cell_size)) + 2 * cell_margin
+    rows = int(np.ceil((domain_obj['bb_top'] - domain_obj['bb_bottom']) / cell_size)) + 2 * cell_margin
+
+    # rows are ordered from south to north (as in the most common netcdf forcing)
+    geo_x = x_ll + cell_size * (np.arange(cols) + 0.5)
+    geo_y = y_ll + cell_size * (np.arange(rows) + 0.5)
+    geo_x_2d, geo_y_2d = np.meshgrid(geo_x, geo_y)
+
+    forcing_grid = {'rows': rows, 'cols': cols, 'cell_size': cell_size,
+                    'bb_left': x_ll, 'bb_bottom': y_ll, 'bb_top': y_ll + rows * cell_size,
+                    'longitude': geo_x_2d, 'latitude': geo_y_2d,
+                    'transform': from_origin(x_ll, y_ll + rows * cell_size, cell_size, cell_size)}
+
+    return forcing_grid
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to compute the values of a forcing variable for a time step
+# (rain is defined by a storm moving across the grid; the other variables by a daily cycle and a spatial pattern)
+def compute_forcing_values(var_key, var_range, time_step, forcing_grid, time_id=0, time_n=1):
+
+    var_min, var_max = var_range
+    geo_x, geo_y = forcing_grid['longitude'], forcing_grid['latitude']
+
+    geo_x_norm = (geo_x - geo_x.min()) / max(float(np.ptp(geo_x)), 1e-9)
+    geo_y_norm = (geo_y - geo_y.min()) / max(float(np.ptp(geo_y)), 1e-9)
+
+    if var_key == 'Rain':
+        storm_x = (time_id + 0.5) / max(time_n, 1)
+        storm_dist = (geo_x_norm - storm_x) ** 2 + (geo_y_norm - 0.5) ** 2
+        var_values = var_max * np.exp(-storm_dist / (2.0 * 0.15 ** 2))
+        var_values[var_values < 0.1] = 0.0
+    else:
+        time_cycle = np.sin(2.0 * np.pi * (time_step.hour - 9) / 24.0)
+        var_pattern = 0.5 + 0.3 * time_cycle + 0.2 * (geo_x_norm - geo_y_norm)
+        var_values = var_min + (var_max - var_min) * np.clip(var_pattern, 0.0, 1.0)
+
+    return var_values.astype(np.float32)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to get the range of a forcing variable (default range, file limits or unit range)
+def get_forcing_range(var_key, var_limits=None):
+
+    if var_key in forcing_range_default:
+        return forcing_range_default[var_key]
+    if (var_limits is not None) and (var_limits.__len__() == 2) and \
+            (var_limits[0] is not None) and (var_limits[1] is not None):
+        return [float(var_limits[0]), float(var_limits[1])]
+    return [0.0, 1.0]
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to write a forcing file in netcdf format (all the variables of the file; zipped if needed)
+def write_forcing_nc(file_path, file_data, time_step, forcing_grid,
+                     dim_name_x='west_east', dim_name_y='south_north', dim_name_time='time'):
+
+    dset = xr.Dataset(
+        {var_name: ((dim_name_time, dim_name_y, dim_name_x), var_values[np.newaxis, :, :])
+         for var_name, var_values in file_data.items()},
+        coords={'Longitude': ((dim_name_y, dim_name_x), forcing_grid['longitude']),
+                'Latitude': ((dim_name_y, dim_name_x), forcing_grid['latitude']),
+                dim_name_time: [np.datetime64(time_step)]})
+
+    create_folder(os.path.dirname(file_path))
+    if file_path.endswith(zip_extension):
+        file_path_unzip = file_path[:-len(zip_extension)]
+        dset.to_netcdf(file_path_unzip)
+        zip_filename(file_path_unzip, file_path)
+        os.remove(file_path_unzip)
+    else:
+        dset.to_netcdf(file_path)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to write a forcing file in tiff format (one variable; rows ordered from north to south)
+def write_forcing_tiff(file_path, var_values, forcing_grid):
+
+    file_meta = dict(driver='GTiff', height=forcing_grid['rows'], width=forcing_grid['cols'], count=1,
+                     dtype=str(var_values.dtype), crs=CRS.from_string(proj_epsg),
+                     transform=forcing_grid['transform'])
+
+    create_folder(os.path.dirname(file_path))
+    with rasterio.open(file_path, 'w', **file_meta) as file_handle:
+        file_handle.write(np.flipud(var_values), 1)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to write the gridded forcing datasets of a period (using the file(s) defined by the settings)
+def write_forcing_gridded(forcing_grid, obj_datasets, time_period, tags_format, tags_filling_fx,
+                          dset_list=None):
+
+    if dset_list is None:
+        dset_list = ['DataForcing', 'DataUpdating']
+
+    # collect the variable(s) with a defined source file
+    var_collections = []
+    for dset_name in dset_list:
+        if (dset_name not in obj_datasets) or ('Gridded' not in obj_datasets[dset_name]):
+            continue
+        for var_type, var_obj in obj_datasets[dset_name]['Gridded']['hmc_file_variable'].items():
+            if (not var_obj) or ('var_list' not in var_obj):
+                continue
+            for var_key, var_fields in var_obj['var_list'].items():
+                if (var_fields['var_file_name'] is None) or (var_fields['var_file_folder'] is None):
+                    continue
+                var_collections.append([var_key, var_fields])
+
+    time_n = time_period.__len__()
+    file_list = []
+    for time_id, time_step in enumerate(time_period):
+
+        tags_filling = tags_filling_fx(time_step)
+
+        # group the variable(s) by file (netcdf files could include more variables)
+        file_obj = {}
+        for var_key, var_fields in var_collections:
+            file_path = fill_settings_path(var_fields['var_file_folder'], var_fields['var_file_name'],
+                                           tags_format, tags_filling)
+            var_range = get_forcing_range(var_key, var_fields.get('var_file_limits', None))
+            var_values = compute_forcing_values(var_key, var_range, time_step, forcing_grid,
+                                                time_id=time_id, time_n=time_n)
+
+            if file_path not in file_obj:
+                file_obj[file_path] = {'format': var_fields['var_file_format'], 'data': {}}
+            file_obj[file_path]['data'][var_fields['var_file_dset']] = var_values
+
+        for file_path, file_fields in file_obj.items():
+            if file_fields['format'] == 'netcdf':
+                write_forcing_nc(file_path, file_fields['data'], time_step, forcing_grid)
+            elif file_fields['format'] == 'tiff':
+                write_forcing_tiff(file_path, list(file_fields['data'].values())[0], forcing_grid)
+            else:
+                log_stream.error(' ===> Forcing format "' + file_fields['format'] + '" is not supported')
+                raise NotImplementedError('Case not implemented yet')
+            file_list.append(file_path)
+
+    return file_list
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to write the point observations of a period (discharge at the sections in ascii_point format)
+def write_forcing_point(domain_obj, obj_datasets, time_period, tags_format, tags_filling_fx,
+                        dset_name='DataForcing'):
+
+    if (dset_name not in obj_datasets) or ('Point' not in obj_datasets[dset_name]):
+        return []
+
+    var_collections = []
+    for var_type, var_obj in obj_datasets[dset_name]['Point']['hmc_file_variable'].items():
+        if (not var_obj) or ('var_list' not in var_obj):
+            continue
+        for var_key, var_fields in var_obj['var_list'].items():
+            if (var_fields['var_file_name'] is None) or (var_fields['var_file_folder'] is None):
+                continue
+            if var_key == 'Discharge':
+                var_collections.append(var_fields)
+            else:
+                log_stream.warning(' ===> Point observations "' + var_key + '" are not generated by the benchmark')
+
+    file_list = []
+    for time_id, time_step in enumerate(time_period):
+
+        tags_filling = tags_filling_fx(time_step)
+        time_cycle = 1.0 + 0.5 * np.sin(2.0 * np.pi * time_id / 24.0)
+
+        for var_fields in var_collections:
+            file_path = fill_settings_path(var_fields['var_file_folder'], var_fields['var_file_name'],
+                                           tags_format, tags_filling)
+
+            # row format: code value tag (tag is defined by domain:section as in the outlet names)
+            file_rows = []
+            for section_key, section_fields in domain_obj['sections'].items():
+                section_value = section_fields['section_baseflow'] + \
+                    0.02 * section_fields['section_drained_area'] * time_cycle
+                file_rows.append(' '.join([str(section_fields['section_code']),
+                                           '{:.3f}'.format(section_value), section_key]))
+
+            create_folder(os.path.dirname(file_path))
+            with open(file_path, 'w') as file_handle:
+                file_handle.write('\n'.join(file_rows) + '\n')
+            file_list.append(file_path)
+
+    return file_list
+# -------------------------------------------------------------------------------------
@@ -0,0 +1,128 @@
+"""
+Library Features:
+
+Name:          lib_utils_monitor
+Author(s):     Fabio Delogu (fabio.delogu@cimafoundation.org)
+Date:          '20261018'
+Version:       '1.0.0'
+"""
+
+#######################################################################################
+# Library
+import logging
+import os
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from hmc.algorithm.utils.lib_utils_monitor import get_process_memory, get_process_io
+
+from tools.benchmark_tool_hmc_chain.lib_info_args import logger_name
+
+# Logging
+log_stream = logging.getLogger(logger_name)
+
+# Monitor settings (linux process file; peak rss is reset for each stage when clear_refs is writable)
+file_proc_clear_refs = '/proc/self/clear_refs'
+
+# Debug
+# import matplotlib.pylab as plt
+#######################################################################################
+
+
+# -------------------------------------------------------------------------------------
+# Method to round the memory info [MB]
+def round_memory(memory_value):
+    return round(memory_value, 1) if memory_value is not None else None
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to reset the peak rss of the process (False if the reset is not available)
+def reset_process_memory():
+    try:
+        with open(file_proc_clear_refs, 'w') as file_handle:
+            file_handle.write('5')
+        return True
+    except OSError:
+        return False
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to get the usage of the children processes (model runs and process pools) [bytes, MB, seconds]
+def get_children_usage():
+
+    if resource is None:
+        return {'storage_read': 0, 'storage_write': 0, 'rss_peak': None, 'time_cpu': 0.0}
+
+    usage_obj = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {'storage_read': usage_obj.ru_inblock * 512, 'storage_write': usage_obj.ru_oublock * 512,
+            'rss_peak': round(usage_obj.ru_maxrss / 1024.0, 1),
+            'time_cpu': usage_obj.ru_utime + usage_obj.ru_stime}
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to run a stage and to measure time, peak rss and bytes read/written
+def monitor_stage(stage_name, stage_fx, *stage_args, **stage_kwargs):
+
+    log_stream.info(' ---> Benchmark stage "' + stage_name + '" ... ')
+
+    memory_start = get_process_memory()
+    memory_reset = reset_process_memory()
+    io_start = get_process_io()
+    children_start = get_children_usage()
+    time_cpu_start = time.process_time()
+    time_start = time.perf_counter()
+
+    stage_result = stage_fx(*stage_args, **stage_kwargs)
+
+    time_elapsed = time.perf_counter() - time_start
+    time_cpu = time.process_time() - time_cpu_start
+    io_end = get_process_io()
+    children_end = get_children_usage()
+    memory_end = get_process_memory()
+
+    stage_info = {
+        'stage': stage_name,
+        'time_elapsed': round(time_elapsed, 3),
+        'time_cpu': round(time_cpu, 3),
+        'time_cpu_children': round(children_end['time_cpu'] - children_start['time_cpu'], 3),
+        'rss_start': round_memory(memory_start['rss']),
+        'rss_end': round_memory(memory_end['rss']),
+        'rss_peak': round_memory(memory_end['rss_peak']),
+        'rss_peak_reset': memory_reset,
+        'rss_peak_children': children_end['rss_peak'],
+        'bytes_read': io_end['read'] - io_start['read'],
+        'bytes_written': io_end['write'] - io_start['write'],
+        'bytes_storage_read': io_end['storage_read'] - io_start['storage_read'],
+        'bytes_storage_written': io_end['storage_write'] - io_start['storage_write'],
+        'bytes_storage_read_children': children_end['storage_read'] - children_start['storage_read'],
+        'bytes_storage_written_children': children_end['storage_write'] - children_start['storage_write']}
+
+    log_stream.info(' ---> Benchmark stage "' + stage_name + '" ... DONE [time: ' +
+                    str(stage_info['time_elapsed']) + ' s - rss peak: ' + str(stage_info['rss_peak']) + ' MB]')
+
+    return stage_result, stage_info
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to compute the size of the file(s) in a folder [n, bytes]
+def get_folder_size(folder_name):
+
+    file_n, file_bytes = 0, 0
+    for folder_root, folder_dirs, folder_files in os.walk(folder_name):
+        for file_name in folder_files:
+            try:
+                file_bytes += os.path.getsize(os.path.join(folder_root, file_name))
+                file_n += 1
+            except OSError:
+                continue
+
+    return file_n, file_bytes
+# -------------------------------------------------------------------------------------
@@ -0,0 +1,178 @@
+"""
+Library Features:
+
+Name:          lib_utils_settings
+Author(s):     Fabio Delogu (fabio.delogu@cimafoundation.org)
+Date:          '20261018'
+Version:       '1.0.0'
+"""
+
+#######################################################################################
+# Library
+import logging
+import os
+import json
+
+from copy import deepcopy
+
+from hmc.algorithm.utils.lib_utils_string import fill_tags2string
+
+from tools.benchmark_tool_hmc_chain.lib_info_args import logger_name, run_mode_default
+
+# Logging
+log_stream = logging.getLogger(logger_name)
+
+# Debug
+# import matplotlib.pylab as plt
+#######################################################################################
+
+
+# -------------------------------------------------------------------------------------
+# Method to read a file in json format
+def read_file_json(file_name):
+    if os.path.exists(file_name):
+        with open(file_name, 'r') as file_handle:
+            file_data = json.load(file_handle)
+    else:
+        log_stream.error(' ===> File settings ' + file_name + ' not found')
+        raise IOError('File settings not found. Check your configuration file.')
+    return file_data
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to write a file in json format
+def write_file_json(file_name, file_data, file_indent=2):
+    folder_name = os.path.dirname(file_name)
+    if folder_name:
+        os.makedirs(folder_name, exist_ok=True)
+    with open(file_name, 'w') as file_handle:
+        json.dump(file_data, file_handle, indent=file_indent)
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to update the settings using a nested dictionary (only the defined keys are updated)
+def update_settings(obj_settings, obj_update=None):
+
+    if obj_update is None:
+        return obj_settings
+
+    for update_key, update_value in obj_update.items():
+        if update_key.startswith('__'):
+            continue
+        if isinstance(update_value, dict) and isinstance(obj_settings.get(update_key, None), dict):
+            obj_settings[update_key] = update_settings(obj_settings[update_key], update_value)
+        else:
+            obj_settings[update_key] = deepcopy(update_value)
+
+    return obj_settings
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to move the path(s) of the settings in the benchmark workspace [path_src: path_dst]
+def relocate_settings(obj_settings, path_replace=None):
+
+    if path_replace is None:
+        return obj_settings
+
+    if isinstance(obj_settings, dict):
+        return {obj_key: relocate_settings(obj_value, path_replace) for obj_key, obj_value in obj_settings.items()}
+    elif isinstance(obj_settings, list):
+        return [relocate_settings(obj_value, path_replace) for obj_value in obj_settings]
+    elif isinstance(obj_settings, str):
+        for path_src, path_dst in path_replace.items():
+            if obj_settings.startswith(path_src):
+                obj_settings = path_dst.rstrip(os.sep) + os.sep + obj_settings[len(path_src):].lstrip(os.sep)
+                break
+        return obj_settings
+    else:
+        return obj_settings
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to define the algorithm settings of the benchmark (domain, stand-in executable and updates)
+def set_settings_algorithm(obj_algorithm, domain_name, exec_folder, exec_name, path_replace=None,
+                           obj_update=None):
+
+    obj_algorithm = relocate_settings(deepcopy(obj_algorithm), path_replace)
+
+    obj_algorithm['Run_Info']['run_type']['run_domain'] = domain_name
+    obj_algorithm['Run_Info']['run_location']['library']['file_folder'] = exec_folder
+    obj_algorithm['Run_Info']['run_location']['library']['file_name'] = exec_name
+    obj_algorithm['Run_Info']['run_location']['library']['dependencies'] = []
+
+    obj_algorithm = update_settings(obj_algorithm, obj_update)
+
+    return obj_algorithm
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to define the datasets settings of the benchmark (forcing format and updates)
+def set_settings_datasets(obj_datasets, forcing_format='netcdf', path_replace=None, obj_update=None,
+                          dset_list_forcing=None):
+
+    if dset_list_forcing is None:
+        dset_list_forcing = ['DataForcing', 'DataUpdating']
+
+    obj_datasets = relocate_settings(deepcopy(obj_datasets), path_replace)
+
+    # tiff forcing is defined by a file for each variable and step (same name root of the netcdf file)
+    if forcing_format == 'tiff':
+        for dset_name in dset_list_forcing:
+            if (dset_name not in obj_datasets) or ('Gridded' not in obj_datasets[dset_name]):
+                continue
+            for var_type, var_obj in obj_datasets[dset_name]['Gridded']['hmc_file_variable'].items():
+                if (not var_obj) or ('var_list' not in var_obj):
+                    continue
+                for var_key, var_fields in var_obj['var_list'].items():
+                    if var_fields['var_file_name'] is None:
+                        continue
+                    file_root = var_fields['var_file_name']
+                    for file_ext in ['.gz', '.nc']:
+                        if file_root.endswith(file_ext):
+                            file_root = file_root[:-len(file_ext)]
+                    var_fields['var_file_name'] = '.'.join([file_root, var_key.lower(), 'tif'])
+                    var_fields['var_file_format'] = 'tiff'
+    elif forcing_format != 'netcdf':
+        log_stream.error(' ===> Forcing format "' + str(forcing_format) + '" is not supported')
+        raise NotImplementedError('Case not implemented yet')
+
+    obj_datasets = update_settings(obj_datasets, obj_update)
+
+    return obj_datasets
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to define the template tags of the algorithm settings (format and filling values)
+def set_settings_tags(obj_algorithm, time_step=None, tags_extra=None, tag_template='Template'):
+
+    obj_template = obj_algorithm[tag_template]
+
+    tags_format, tags_filling = {}, {}
+    for template_group, template_fields in obj_template.items():
+        tags_format.update(template_fields)
+        if (template_group == 'time') and (time_step is not None):
+            tags_filling.update(dict.fromkeys(list(template_fields.keys()), time_step))
+
+    tags_filling['run_domain'] = obj_algorithm['Run_Info']['run_type']['run_domain']
+    tags_filling['run_name'] = obj_algorithm['Run_Info']['run_type']['run_name']
+    tags_filling['run_mode'] = run_mode_default
+    if tags_extra is not None:
+        tags_filling.update(tags_extra)
+
+    return tags_format, tags_filling
+# -------------------------------------------------------------------------------------
+
+
+# -------------------------------------------------------------------------------------
+# Method to fill the path of a file using the template tags
+def fill_settings_path(folder_name_raw, file_name_raw, tags_format, tags_filling):
+    folder_name_def = fill_tags2string(folder_name_raw, tags_format, tags_filling)
+    file_name_def = fill_tags2string(file_name_raw, tags_format, tags_filling)
+    return os.path.join(folder_name_def, file_name_def)
+# -------------------------------------------------------------------------------------
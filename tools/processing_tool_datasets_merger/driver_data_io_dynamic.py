@@ -176,6 +176,11 @@ class DriverDynamic:
         if 'layer_method_mask_destination' in list(alg_ancillary.keys()):
             self.method_mask_destination = alg_ancillary['layer_method_mask_destination']
 
+        # folder of the regrid weights (weights are stored and reused by the next runs, as in the hmc drivers)
+        self.regrid_path = None
+        if 'layer_regrid_folder' in list(alg_ancillary.keys()):
+            self.regrid_path = alg_ancillary['layer_regrid_folder']
+
         self.nc_compression_level = 9
         self.nc_type_file = 'NETCDF4'
         self.nc_type_engine = 'netcdf4'
@@ -685,12 +690,12 @@ class DriverDynamic:
                                         ' ------> Interpolate from ancillary domain "' + var_domain_name_anc +
                                         '" to destination domain "' + var_domain_name_dst + '" ... ')
 
-                                    if method_interpolate in ['nearest']:
+                                    if method_interpolate in ['nearest', 'bilinear', 'conservative']:
                                         var_dset_dst = apply_var_interpolate(
                                             var_dset_anc, geo_da_dst,
                                             dim_name_geo_x=self.dim_name_geo_x, dim_name_geo_y=self.dim_name_geo_y,
                                             coord_name_geo_x=self.coord_name_geo_x, coord_name_geo_y=self.coord_name_geo_y,
-                                            interp_method=method_interpolate)
+                                            interp_method=method_interpolate, regrid_path=self.regrid_path)
                                         var_dset_dst.attrs = deepcopy(geo_da_dst.attrs)
 
                                         log_stream.info(
@@ -1114,12 +1119,12 @@ class DriverDynamic:
 
                                         # Apply the interpolation method to the variable source data-array
                                         if active_interp:
-                                            if method_interpolate in ['nearest', 'linear']:
+                                            if method_interpolate in ['nearest', 'linear', 'bilinear', 'conservative']:
                                                 var_dset_anc = apply_var_interpolate(
                                                     var_dset_src, geo_da_anc,
                                                     dim_name_geo_x=self.dim_name_geo_x, dim_name_geo_y=self.dim_name_geo_y,
                                                     coord_name_geo_x=self.coord_name_geo_x, coord_name_geo_y=self.coord_name_geo_y,
-                                                    interp_method=method_interpolate)
+                                                    interp_method=method_interpolate, regrid_path=self.regrid_path)
                                             elif method_interpolate == 'sample':
                                                 var_dset_anc = apply_var_sample(
                                                     var_dset_src, geo_da_anc,
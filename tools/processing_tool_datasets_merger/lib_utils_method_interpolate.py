@@ -14,6 +14,7 @@ import xarray as xr
 import numpy as np
 
 from tools.processing_tool_datasets_merger.lib_info_args import logger_name
+from hmc.algorithm.utils.lib_utils_regrid import get_regrid_index, apply_regrid
 
 # Logging
 log_stream = logging.getLogger(logger_name)
@@ -59,21 +60,71 @@ def active_var_interpolate(var_attrs, geo_attrs, fields_included=None):
 def apply_var_interpolate(var_obj_in, geo_da_out,
                           dim_name_geo_x='longitude', dim_name_geo_y='latitude',
                           coord_name_geo_x='longitude', coord_name_geo_y='latitude',
-                          interp_method='nearest'):
+                          interp_method='nearest', regrid_path=None):
 
     if not isinstance(var_obj_in, (xr.DataArray, xr.Dataset)):
         raise RuntimeError('Data format for variable not allowed for applying the interpolation method')
     if not isinstance(geo_da_out, xr.DataArray):
         raise RuntimeError('Data format for geographical reference not allowed for applying the interpolation method')
 
-    interp_dict = {dim_name_geo_y: geo_da_out[coord_name_geo_y], dim_name_geo_x: geo_da_out[coord_name_geo_x]}
-    var_obj_out = var_obj_in.interp(interp_dict, method=interp_method)
+    if interp_method in ['bilinear', 'conservative']:
+        var_obj_out = apply_var_regrid(var_obj_in, geo_da_out,
+                                       dim_name_geo_x=dim_name_geo_x, dim_name_geo_y=dim_name_geo_y,
+                                       coord_name_geo_x=coord_name_geo_x, coord_name_geo_y=coord_name_geo_y,
+                                       regrid_method=interp_method, regrid_path=regrid_path)
+    else:
+        interp_dict = {dim_name_geo_y: geo_da_out[coord_name_geo_y], dim_name_geo_x: geo_da_out[coord_name_geo_x]}
+        var_obj_out = var_obj_in.interp(interp_dict, method=interp_method)
 
     return var_obj_out
 
 # -------------------------------------------------------------------------------------
 
 
+# -------------------------------------------------------------------------------------
+# Method to apply regrid method (weights shared with the hmc package; one sparse product for all the steps)
+def apply_var_regrid(var_obj_in, geo_da_out,
+                     dim_name_geo_x='longitude', dim_name_geo_y='latitude',
+                     coord_name_geo_x='longitude', coord_name_geo_y='latitude',
+                     regrid_method='bilinear', regrid_path=None):
+
+    if isinstance(var_obj_in, xr.Dataset):
+        var_obj_out = xr.Dataset(attrs=var_obj_in.attrs)
+        for var_name in list(var_obj_in.data_vars):
+            var_obj_out[var_name] = apply_var_regrid(
+                var_obj_in[var_name], geo_da_out,
+                dim_name_geo_x=dim_name_geo_x, dim_name_geo_y=dim_name_geo_y,
+                coord_name_geo_x=coord_name_geo_x, coord_name_geo_y=coord_name_geo_y,
+                regrid_method=regrid_method, regrid_path=regrid_path)
+        return var_obj_out
+
+    if (dim_name_geo_x not in var_obj_in.dims) or (dim_name_geo_y not in var_obj_in.dims):
+        return var_obj_in
+
+    dims_in = list(var_obj_in.dims)
+    dims_other = [dim_step for dim_step in dims_in if dim_step not in [dim_name_geo_y, dim_name_geo_x]]
+    var_da_in = var_obj_in.transpose(*([dim_name_geo_y, dim_name_geo_x] + dims_other))
+
+    regrid_obj = get_regrid_index(
+        var_da_in[coord_name_geo_x].values, var_da_in[coord_name_geo_y].values,
+        geo_da_out[coord_name_geo_x].values, geo_da_out[coord_name_geo_y].values,
+        regrid_method=regrid_method, regrid_path=regrid_path)
+    var_values_out = apply_regrid(var_da_in.values, regrid_obj)
+
+    var_coords_out = {coord_name_geo_x: (dim_name_geo_x, geo_da_out[coord_name_geo_x].values),
+                      coord_name_geo_y: (dim_name_geo_y, geo_da_out[coord_name_geo_y].values)}
+    for dim_step in dims_other:
+        if dim_step in var_da_in.coords:
+            var_coords_out[dim_step] = var_da_in[dim_step]
+
+    var_da_out = xr.DataArray(var_values_out, dims=[dim_name_geo_y, dim_name_geo_x] + dims_other,
+                              coords=var_coords_out, name=var_obj_in.name, attrs=var_obj_in.attrs)
+    var_da_out = var_da_out.transpose(*dims_in)
+
+    return var_da_out
+# -------------------------------------------------------------------------------------
+
+
 # -------------------------------------------------------------------------------------
 # Method to apply sample method
 def apply_var_sample(var_dset_in, geo_da_out,